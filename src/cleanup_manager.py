@@ -21,6 +21,7 @@ from rich.console import Console
 from rich.table import Table
 
 from src.utils.logger import get_logger
+from src.utils.mezzanine import get_mezzanine_path
 from src.utils.state_manager import StateManager
 
 logger = get_logger(__name__)
@@ -155,7 +156,24 @@ class CleanupManager:
                 'clip_count': clip_count
             }
 
-        # 5. Temporary files (orphaned *_temp.mp4 files from interrupted exports)
+        # 5. Mezzanine (intermedio GOP corto/CFR junto al transcript)
+        # Si el state no lo registró (export interrumpido), lo busco junto al transcript
+        mezzanine_path_str = video_state.get('mezzanine_path')
+        if mezzanine_path_str:
+            mezzanine_path = Path(mezzanine_path_str)
+        elif transcript_path:
+            mezzanine_path = get_mezzanine_path(str(transcript_path))
+        else:
+            mezzanine_path = None
+        if mezzanine_path is not None and (mezzanine_path_str or mezzanine_path.exists()):
+            artifacts['mezzanine'] = {
+                'path': mezzanine_path,
+                'exists': mezzanine_path.exists(),
+                'size': mezzanine_path.stat().st_size if mezzanine_path.exists() else 0,
+                'type': 'video'
+            }
+
+        # 6. Temporary files (orphaned *_temp.mp4 files from interrupted exports)
         # DECISIÓN: Detectar archivos temporales huérfanos para cleanup
         # - Estos archivos se generan durante face tracking
         # - Normalmente se eliminan automáticamente, pero pueden quedar si hay interrupciones
@@ -197,7 +215,7 @@ class CleanupManager:
 
         Args:
             video_key: Clave del video
-            artifact_types: Lista de tipos a eliminar: ['download', 'transcript', 'clips_metadata', 'output', 'temp_files']
+            artifact_types: Lista de tipos a eliminar: ['download', 'transcript', 'clips_metadata', 'output', 'mezzanine', 'temp_files']
                            Si None, elimina TODO
             dry_run: Si True, solo simula (no elimina nada)
 
@@ -205,7 +223,7 @@ class CleanupManager:
             Dict con resultado de cada eliminación: {'download': True, 'transcript': False, ...}
         """
         if artifact_types is None:
-            artifact_types = ['download', 'transcript', 'clips_metadata', 'output', 'temp_files']
+            artifact_types = ['download', 'transcript', 'clips_metadata', 'output', 'mezzanine', 'temp_files']
 
         artifacts = self.get_video_artifacts(video_key)
         results = {}
@@ -302,6 +320,10 @@ class CleanupManager:
             video_state['exported_clips'] = []
             logger.debug(f"Cleared exported clips for {video_key} in state")
 
+        if 'mezzanine' in deleted_types and results.get('mezzanine'):
+            video_state['mezzanine_path'] = None
+            logger.debug(f"Cleared mezzanine for {video_key} in state")
+
         # Si eliminamos TODO, remover video del state completamente
         all_types = ['download', 'transcript', 'clips_metadata', 'output']
         if all(t in deleted_types for t in all_types):
@@ -542,8 +564,9 @@ class CleanupManager:
             transcript_size = artifacts.get('transcript', {}).get('size', 0)
             clips_size = artifacts.get('clips_metadata', {}).get('size', 0)
             output_size = artifacts.get('output', {}).get('size', 0)
+            mezzanine_size = artifacts.get('mezzanine', {}).get('size', 0)
 
-            total_size = download_size + transcript_size + clips_size + output_size
+            total_size = download_size + transcript_size + clips_size + output_size + mezzanine_size
 
             # Nombre corto del video (primeras 40 chars)
             video_name = vkey[:40] + "..." if len(vkey) > 40 else vkey
@@ -6,14 +6,103 @@ ClipsAI analiza la transcripción y detecta cambios de tema usando
 algoritmo TextTiling con BERT embeddings para marcar puntos de corte.
 """
 
+import hashlib
 import json
+import time
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Any, Dict, NamedTuple, Optional, List
 from clipsai import ClipFinder, Transcription
 
 from .utils.logger import setup_logger
 
 
+# Versión del formato del cache de fronteras; si cambia, los caches viejos se ignoran
+BOUNDARY_CACHE_VERSION = 1
+
+# Rondas de TextTiling cuyo mínimo depende de min_clip_duration.
+# ClipsAI usa k=5,7 con el mínimo configurado y mínimos fijos (180s/600s) para el resto.
+CONFIGURABLE_MIN_K_VALUES = (5, 7)
+
+# Métodos privados de ClipFinder que envuelvo para grabar las fronteras de cada ronda.
+# Existen en clipsai==0.2.1 (versión fijada en pyproject.toml); sin ellos no hay cache.
+CLIPFINDER_BOUNDARY_HOOKS = ("_text_tile_multiple_rounds", "_remove_duplicates")
+
+# ClipsAI considera duplicado un clip si |Δinicio| + |Δfin| < 15s
+DUPLICATE_TOLERANCE_SECONDS = 15.0
+
+
+class BoundaryClip(NamedTuple):
+    """Clip candidato resuelto desde el cache (misma interfaz que clipsai.Clip)"""
+    start_time: float
+    end_time: float
+
+
+def get_boundary_cache_path(transcript_path: str) -> Path:
+    """
+    Ruta del cache de fronteras de un transcript
+
+    Lo guardo junto al transcript: temp/video_transcript.json → temp/video_transcript_boundaries.json
+    """
+    transcript_file = Path(transcript_path)
+    return transcript_file.with_name(f"{transcript_file.stem}_boundaries.json")
+
+
+def compute_transcript_digest(transcript_path: str) -> Optional[str]:
+    """SHA-256 del transcript; invalida el cache si el transcript cambia"""
+    try:
+        return hashlib.sha256(Path(transcript_path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def solve_clips_from_boundaries(
+    boundary_data: Dict[str, Any],
+    min_clip_duration: float,
+    max_clip_duration: float,
+) -> List[BoundaryClip]:
+    """
+    Resuelvo la selección de clips sobre las fronteras cacheadas
+
+    Reproduzco exactamente el paso de selección de ClipFinder.find_clips:
+    - el video completo cuenta como clip si dura <= max
+    - cada ronda filtra sus candidatos por duración (min de la ronda, max global)
+      y descarta duplicados contra los clips ya aceptados
+
+    El TextTiling (y los embeddings BERT) no dependen de min/max, así que
+    el resultado es idéntico a correr ClipsAI de nuevo, pero en milisegundos.
+    """
+    accepted: List[Dict[str, float]] = []
+
+    media_end = boundary_data.get("media_end_time")
+    if media_end is not None and float(media_end) <= max_clip_duration:
+        accepted.append({"start_time": 0.0, "end_time": float(media_end)})
+
+    for round_info in boundary_data.get("rounds", []):
+        round_min = round_info.get("min_duration")
+        if round_min is None:
+            round_min = min_clip_duration
+
+        new_clips = []
+        for start, end in round_info.get("candidates", []):
+            duration = end - start
+            if duration < round_min or duration > max_clip_duration:
+                continue
+
+            is_duplicate = any(
+                abs(start - clip["start_time"]) + abs(end - clip["end_time"])
+                < DUPLICATE_TOLERANCE_SECONDS
+                for clip in accepted
+            )
+            if is_duplicate:
+                continue
+
+            new_clips.append({"start_time": start, "end_time": end})
+
+        accepted.extend(new_clips)
+
+    return [BoundaryClip(c["start_time"], c["end_time"]) for c in accepted]
+
+
 class ClipsGenerator:
     """
     Genero clips automáticamente detectando cambios de tema en la transcripción
@@ -300,21 +389,44 @@ class ClipsGenerator:
         if not whisperx_data:
             return None
 
-        # PASO 2: Convierto al formato que ClipsAI entiende
-        clipsai_transcript = self._convert_to_clipsai_format(whisperx_data)
+        # Si ya analicé este transcript, re-resuelvo solo la selección
+        # (cambio de min/max/max_clips no requiere volver a correr ClipsAI)
+        transcript_digest = compute_transcript_digest(transcript_path)
+        boundary_data = self._load_boundary_cache(transcript_path, transcript_digest)
 
-        if not clipsai_transcript:
-            return None
+        clipsai_transcript = None
+        if boundary_data is None:
+            # PASO 2: Convierto al formato que ClipsAI entiende
+            clipsai_transcript = self._convert_to_clipsai_format(whisperx_data)
 
-        try:
-            # PASO 3: Uso ClipsAI para detectar puntos de corte
-            self.logger.info("🤖 Analizando transcripción con ClipsAI...")
-            self.logger.info("Detectando cambios de tema...")
+            if not clipsai_transcript:
+                return None
 
-            # find_clips retorna una lista de objetos Clip
-            # Cada Clip tiene: start_time, end_time
-            # Nota: debe ser argumento posicional, no keyword
-            clips_found = self.clip_finder.find_clips(clipsai_transcript)
+        try:
+            if boundary_data is not None:
+                solve_start = time.perf_counter()
+                clips_found = solve_clips_from_boundaries(
+                    boundary_data,
+                    self.min_clip_duration,
+                    self.max_clip_duration,
+                )
+                self.logger.info(
+                    f"⚡ Clips re-resueltos desde fronteras cacheadas "
+                    f"en {(time.perf_counter() - solve_start) * 1000:.1f}ms"
+                )
+            else:
+                # PASO 3: Uso ClipsAI para detectar puntos de corte
+                self.logger.info("🤖 Analizando transcripción con ClipsAI...")
+                self.logger.info("Detectando cambios de tema...")
+
+                # find_clips retorna una lista de objetos Clip
+                # Cada Clip tiene: start_time, end_time
+                # Grabo las fronteras de cada ronda para re-resolver después
+                clips_found = self._find_clips_recording_boundaries(
+                    clipsai_transcript,
+                    transcript_path,
+                    transcript_digest,
+                )
 
             if not clips_found:
                 self.logger.warning("ClipsAI no encontró clips válidos")
@@ -394,6 +506,123 @@ class ClipsGenerator:
             return None
 
 
+    def _find_clips_recording_boundaries(
+        self,
+        clipsai_transcript: Transcription,
+        transcript_path: str,
+        transcript_digest: Optional[str],
+    ) -> List[Any]:
+        """
+        Corro ClipFinder.find_clips grabando los candidatos de cada ronda de TextTiling
+
+        ClipsAI no expone sus fronteras, así que envuelvo (solo en esta instancia)
+        _text_tile_multiple_rounds y _remove_duplicates: el primero me dice qué k
+        se está usando y el segundo recibe los super-clips de cada ronda antes
+        del filtro por duración. Con eso guardo todo lo que necesita
+        solve_clips_from_boundaries().
+        """
+        finder = self.clip_finder
+        rounds: List[Dict[str, Any]] = []
+        current_k: Dict[str, Optional[int]] = {"k": None}
+
+        original_multiple_rounds = getattr(finder, "_text_tile_multiple_rounds", None)
+        original_remove_duplicates = getattr(finder, "_remove_duplicates", None)
+
+        def _recording_multiple_rounds(clips, clip_embeddings, k, *args, **kwargs):
+            current_k["k"] = k
+            return original_multiple_rounds(clips, clip_embeddings, k, *args, **kwargs)
+
+        def _recording_remove_duplicates(potential_clips, clips_to_check_against, min_duration_secs, max_duration_secs):
+            k = current_k["k"]
+            rounds.append({
+                "k": k,
+                # None = usa el min_clip_duration configurado al re-resolver
+                "min_duration": None if k in CONFIGURABLE_MIN_K_VALUES else float(min_duration_secs),
+                "candidates": [
+                    [float(clip["start_time"]), float(clip["end_time"])]
+                    for clip in potential_clips
+                ],
+            })
+            return original_remove_duplicates(
+                potential_clips, clips_to_check_against, min_duration_secs, max_duration_secs
+            )
+
+        can_record = callable(original_multiple_rounds) and callable(original_remove_duplicates)
+        if not can_record:
+            missing = [name for name in CLIPFINDER_BOUNDARY_HOOKS if not callable(getattr(finder, name, None))]
+            self.logger.warning(
+                f"ClipFinder no tiene {', '.join(missing)} (¿otra versión de clipsai?): "
+                "no guardo el cache de fronteras y cada cambio de duración re-corre ClipsAI"
+            )
+        if can_record:
+            finder._text_tile_multiple_rounds = _recording_multiple_rounds
+            finder._remove_duplicates = _recording_remove_duplicates
+
+        try:
+            # Nota: debe ser argumento posicional, no keyword
+            clips_found = finder.find_clips(clipsai_transcript)
+        finally:
+            if can_record:
+                finder._text_tile_multiple_rounds = original_multiple_rounds
+                finder._remove_duplicates = original_remove_duplicates
+
+        if rounds and transcript_digest:
+            media_end = getattr(clipsai_transcript, "end_time", None)
+            self._save_boundary_cache(
+                transcript_path,
+                {
+                    "version": BOUNDARY_CACHE_VERSION,
+                    "transcript_sha256": transcript_digest,
+                    "media_end_time": float(media_end) if isinstance(media_end, (int, float)) else None,
+                    "rounds": rounds,
+                },
+            )
+
+        return clips_found
+
+
+    def _load_boundary_cache(
+        self,
+        transcript_path: str,
+        transcript_digest: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
+        """Cargo el cache de fronteras si existe y corresponde a este transcript"""
+        if not transcript_digest:
+            return None
+
+        cache_path = get_boundary_cache_path(transcript_path)
+        if not cache_path.exists():
+            return None
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Cache de fronteras ilegible, lo ignoro: {e}")
+            return None
+
+        if data.get("version") != BOUNDARY_CACHE_VERSION:
+            return None
+        if data.get("transcript_sha256") != transcript_digest:
+            self.logger.info("Transcript cambió desde el último análisis; recalculo fronteras")
+            return None
+
+        return data
+
+
+    def _save_boundary_cache(self, transcript_path: str, data: Dict[str, Any]) -> Optional[str]:
+        """Guardo las fronteras de TextTiling junto al transcript"""
+        cache_path = get_boundary_cache_path(transcript_path)
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            self.logger.info(f"📝 Fronteras guardadas: {cache_path}")
+            return str(cache_path)
+        except Exception as e:
+            self.logger.warning(f"No pude guardar el cache de fronteras: {e}")
+            return None
+
+
     def _get_text_for_timerange(
         self,
         transcript_data: Dict,
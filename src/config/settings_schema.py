@@ -249,12 +249,25 @@ def _normalize_face_tracking_strategy(value: str) -> str:
     return v
 
 
+def _normalize_face_tracking_mode(value: str) -> str:
+    v = value.strip().lower()
+    if v not in {"trajectory", "frames"}:
+        raise ValueError("Must be 'trajectory' or 'frames'")
+    return v
+
+
 def _normalize_sample_rate(value: int) -> int:
     if value < 1 or value > 30:
         raise ValueError("Sample rate must be between 1 and 30")
     return value
 
 
+def _normalize_face_coverage(value: float) -> float:
+    if value < 0 or value > 1:
+        raise ValueError("Must be between 0 and 1")
+    return value
+
+
 def _normalize_ffmpeg_threads(value: int) -> int:
     # 0 = auto-detect, positive = specific thread count, negative = all minus N
     if value < -16 or value > 64:
@@ -262,6 +275,54 @@ def _normalize_ffmpeg_threads(value: int) -> int:
     return value
 
 
+def _normalize_export_workers(value: int) -> int:
+    # 0 = auto (one worker per 8 CPUs), positive = concurrent clip exports
+    if value < 0 or value > 32:
+        raise ValueError("Workers must be between 0 and 32 (0=auto, 1=sequential)")
+    return value
+
+
+def _normalize_ffmpeg_timeout_minutes(value: int) -> int:
+    # 0 = sin plazo total (queda el de estancamiento)
+    if value < 0 or value > 1440:
+        raise ValueError("Timeout must be between 0 and 1440 minutes (0=no limit)")
+    return value
+
+
+def _normalize_full_video_segments(value: int) -> int:
+    # 0 = auto (one segment per 4 CPUs), 1 = single encode
+    if value < 0 or value > 32:
+        raise ValueError("Segments must be between 0 and 32 (0=auto, 1=single encode)")
+    return value
+
+
+def _normalize_loudness_normalization(value: str) -> str:
+    v = value.strip().lower()
+    if v not in {"off", "gain", "loudnorm"}:
+        raise ValueError("Must be 'off', 'gain' or 'loudnorm'")
+    return v
+
+
+def _normalize_loudness_target(value: float) -> float:
+    if value < -40.0 or value > -5.0:
+        raise ValueError("Must be between -40 and -5 LUFS")
+    return value
+
+
+def _normalize_render_cache_max_mb(value: int) -> int:
+    # 0 = cache desactivado
+    if value < 0 or value > 1_000_000:
+        raise ValueError("Render cache size must be between 0 and 1000000 MB (0=disabled)")
+    return value
+
+
+def _normalize_mezzanine_mode(value: str) -> str:
+    v = value.strip().lower()
+    if v not in {"off", "auto", "on"}:
+        raise ValueError("Must be 'off', 'auto' or 'on'")
+    return v
+
+
 # --- Output/naming normalizers ---
 
 
@@ -421,6 +482,16 @@ APP_SETTINGS: Tuple[SettingDefinition, ...] = (
         help_text="Maximum silence after speech. Trims only if exceeded (0=disabled).",
         normalize=_normalize_non_negative_int,
     ),
+    SettingDefinition(
+        key="jump_cut_max_silence_ms",
+        group="clip_generation",
+        label="Max silence between words (ms):",
+        python_type=int,
+        default=0,
+        placeholder="0",
+        help_text="Shorten every pause between words to this length in the same encode (jump cuts; 0=disabled).",
+        normalize=_normalize_non_negative_int,
+    ),
     # --- Subtitle settings ---
     SettingDefinition(
         key="subtitle_style_mode",
@@ -561,6 +632,112 @@ APP_SETTINGS: Tuple[SettingDefinition, ...] = (
         help_text="Thread count: 0=auto, 7=use 7 threads, -2=all CPUs minus 2.",
         normalize=_normalize_ffmpeg_threads,
     ),
+    SettingDefinition(
+        key="export_workers",
+        group="export",
+        label="Parallel clip exports:",
+        python_type=int,
+        default=1,
+        placeholder="1",
+        help_text="Clips encoded at the same time: 1=sequential, 0=auto. FFmpeg threads are split between workers.",
+        normalize=_normalize_export_workers,
+    ),
+    SettingDefinition(
+        key="ffmpeg_timeout_minutes",
+        group="export",
+        label="FFmpeg time limit (min):",
+        python_type=int,
+        default=0,
+        placeholder="0",
+        help_text="Kill an export encode that runs longer than this, even if it still reports progress. 0 = no limit (stalled encodes are still killed after 5 minutes without progress).",
+        normalize=_normalize_ffmpeg_timeout_minutes,
+    ),
+    SettingDefinition(
+        key="full_video_segments",
+        group="export",
+        label="Full-video segments:",
+        python_type=int,
+        default=1,
+        placeholder="1",
+        help_text="Full-video shorts: encode N keyframe-aligned segments in parallel. 1=single encode, 0=auto.",
+        normalize=_normalize_full_video_segments,
+    ),
+    SettingDefinition(
+        key="single_decode_export",
+        group="export",
+        label="Single-decode export:",
+        python_type=bool,
+        default=False,
+        placeholder="true or false",
+        help_text="Export nearby clips from one decode of the source (disabled with face tracking).",
+    ),
+    SettingDefinition(
+        key="stream_copy_export",
+        group="export",
+        label="Stream-copy raw cuts:",
+        python_type=bool,
+        default=False,
+        placeholder="true or false",
+        help_text="Without aspect ratio, logo or subtitles: copy whole GOPs and re-encode only clip edges.",
+    ),
+    SettingDefinition(
+        key="mezzanine_mode",
+        group="export",
+        label="Mezzanine proxy:",
+        python_type=str,
+        default="off",
+        placeholder="off, auto or on",
+        help_text="Transcode the source once to a short-GOP, constant frame rate proxy that all clips read from.",
+        normalize=_normalize_mezzanine_mode,
+    ),
+    SettingDefinition(
+        key="render_cache_max_mb",
+        group="export",
+        label="Render cache size (MB):",
+        python_type=int,
+        default=2048,
+        placeholder="2048",
+        help_text="Reuse clips whose source window, filters and encoder settings are unchanged. Uses up to this much disk in temp/render_cache (2 GB by default); 0 disables the cache.",
+        normalize=_normalize_render_cache_max_mb,
+    ),
+    SettingDefinition(
+        key="render_cache_layers",
+        group="export",
+        label="Cache render layers:",
+        python_type=bool,
+        default=False,
+        placeholder="true or false",
+        help_text="Also cache the reframed base and logo layers, so a subtitle style change only redoes the subtitle burn.",
+    ),
+    SettingDefinition(
+        key="audio_passthrough",
+        group="export",
+        label="Audio passthrough:",
+        python_type=bool,
+        default=False,
+        placeholder="true or false",
+        help_text="Copy AAC source audio instead of re-encoding it (other codecs are still encoded to AAC). Cut accuracy relies on the MP4 edit list; players that ignore it start up to one AAC frame early.",
+    ),
+    SettingDefinition(
+        key="loudness_normalization",
+        group="export",
+        label="Loudness normalization:",
+        python_type=str,
+        default="off",
+        placeholder="off, gain or loudnorm",
+        help_text="Bring every clip to the target loudness from one cached measurement of the source ('gain' = static gain, 'loudnorm' = linear loudnorm).",
+        normalize=_normalize_loudness_normalization,
+    ),
+    SettingDefinition(
+        key="loudness_target_lufs",
+        group="export",
+        label="Loudness target (LUFS):",
+        python_type=float,
+        default=-14.0,
+        placeholder="-14.0",
+        help_text="Integrated loudness each clip is normalized to.",
+        normalize=_normalize_loudness_target,
+    ),
     SettingDefinition(
         key="enable_face_tracking",
         group="export",
@@ -590,6 +767,26 @@ APP_SETTINGS: Tuple[SettingDefinition, ...] = (
         help_text="Process every Nth frame (higher = faster but less smooth).",
         normalize=_normalize_sample_rate,
     ),
+    SettingDefinition(
+        key="face_tracking_mode",
+        group="export",
+        label="Face tracking mode:",
+        python_type=str,
+        default="trajectory",
+        placeholder="trajectory or frames",
+        help_text="'trajectory' computes the crop path on small frames and crops in the clip encode; 'frames' writes an intermediate reframed video.",
+        normalize=_normalize_face_tracking_mode,
+    ),
+    SettingDefinition(
+        key="face_tracking_min_coverage",
+        group="export",
+        label="Face tracking min coverage:",
+        python_type=float,
+        default=0.2,
+        placeholder="0.2",
+        help_text="Skip face tracking when fewer than this fraction of sampled frames show a face (0 = always track).",
+        normalize=_normalize_face_coverage,
+    ),
     # --- Output settings ---
     SettingDefinition(
         key="output_dir",
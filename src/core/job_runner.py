@@ -4,6 +4,7 @@ from __future__ import annotations
 import re
 import json
 import shutil
+import time
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 
@@ -24,6 +25,9 @@ from src.utils.video_namer import generate_video_name
 
 EmitFn = Callable[[object], None]
 
+# Como mucho un ProgressEvent por segundo y por invocación de ffmpeg
+FFMPEG_PROGRESS_MIN_INTERVAL_SECONDS = 1.0
+
 
 class JobRunner:
     """
@@ -36,6 +40,8 @@ class JobRunner:
         self.emit = emit
         self._cli_output_dir = cli_output_dir
         self._dependency_ok_cache: set[tuple[str, str, str, str]] = set()
+        # (current, total, label) del paso en curso; lo usan los pasos para reportar sub-progreso
+        self._active_progress: tuple[int, int, str] = (0, 0, "")
 
     def run_job(self, job: JobSpec) -> JobStatus:
         status = JobStatus(progress_current=0, progress_total=len(job.video_ids) * max(1, len(job.steps)))
@@ -58,6 +64,7 @@ class JobRunner:
                             label=status.label,
                         )
                     )
+                    self._active_progress = (status.progress_current, status.progress_total, status.label)
                     self._run_step(job_id=job.job_id, video_id=video_id, step=step, settings=job.settings, run_output_dir=run_output_dir)
                     status.progress_current += 1
                     self.emit(
@@ -87,6 +94,10 @@ class JobRunner:
             self._step_generate_clips(job_id=job_id, video_id=video_id, settings=settings.get("clips") or {}, run_output_dir=run_output_dir)
         elif step == JobStep.EXPORT_CLIPS:
             self._step_export_clips(job_id=job_id, video_id=video_id, settings=settings.get("export") or {}, run_output_dir=run_output_dir)
+        elif step == JobStep.EXPORT_DRAFTS:
+            self._step_export_clips(job_id=job_id, video_id=video_id, settings=settings.get("export") or {}, run_output_dir=run_output_dir, draft=True)
+        elif step == JobStep.FINALIZE_CLIPS:
+            self._step_export_clips(job_id=job_id, video_id=video_id, settings=settings.get("export") or {}, run_output_dir=run_output_dir, approved_only=True)
         elif step == JobStep.EXPORT_SHORTS:
             self._step_export_shorts(job_id=job_id, video_id=video_id, settings=settings, run_output_dir=run_output_dir)
         elif step == JobStep.DOWNLOAD:
@@ -94,6 +105,45 @@ class JobRunner:
         else:
             raise ValueError(f"Unknown job step: {step}")
 
+    def _emit_step_progress(self, *, job_id: str, video_id: str, detail: str) -> None:
+        """Emite un ProgressEvent con el progreso del job y un detalle del paso en curso."""
+        current, total, label = self._active_progress
+        self.emit(
+            ProgressEvent(
+                job_id=job_id,
+                video_id=video_id,
+                current=current,
+                total=total,
+                label=f"{label} - {detail}" if label else detail,
+            )
+        )
+
+    def _ffmpeg_progress_emitter(self, *, job_id: str, video_id: str) -> Callable[[Any], None]:
+        """Convierte los bloques de progreso de ffmpeg en ProgressEvents (limitados por tiempo)."""
+        last_emitted: Dict[str, float] = {}
+
+        def _on_progress(progress) -> None:
+            now = time.monotonic()
+            if not progress.finished and now - last_emitted.get(progress.label, 0.0) < FFMPEG_PROGRESS_MIN_INTERVAL_SECONDS:
+                return
+            last_emitted[progress.label] = now
+            summary = progress.summary()
+            self._emit_step_progress(
+                job_id=job_id,
+                video_id=video_id,
+                detail=f"{progress.label}: {summary}" if summary else progress.label,
+            )
+
+        return _on_progress
+
+    def _ffmpeg_timeout_seconds(self, settings: Dict[str, Any], app_settings: Dict[str, Any]) -> Optional[float]:
+        """Plazo total por invocación de ffmpeg (setting ffmpeg_timeout_minutes, 0 = sin plazo)."""
+        try:
+            minutes = float(settings.get("ffmpeg_timeout_minutes", app_settings.get("ffmpeg_timeout_minutes", 0)) or 0)
+        except (TypeError, ValueError):
+            return None
+        return minutes * 60 if minutes > 0 else None
+
     def _slugify(self, value: str, *, max_len: int = 48) -> str:
         cleaned = (value or "").strip().lower()
         cleaned = cleaned.replace(" ", "_")
@@ -372,7 +422,22 @@ class JobRunner:
         if not transcript_path:
             raise RuntimeError("No transcript_path found; run Transcribe first")
 
-        if (state.get("clips_generated") or state.get("clips_metadata_path")) and settings.get("skip_done", True):
+        # Get clip generation settings from job settings or app settings
+        app_settings = self.state_manager.load_settings()
+        clips_params = {
+            "min_clip_duration": int(settings.get("min_seconds", app_settings.get("min_clip_duration", 30))),
+            "max_clip_duration": int(settings.get("max_seconds", app_settings.get("max_clip_duration", 90))),
+            "min_clips": int(settings.get("min_clips", app_settings.get("min_clips", 3))),
+            "max_clips": int(settings.get("max_clips", app_settings.get("max_clips", 10))),
+        }
+
+        # Clips generados con otros parámetros se regeneran; la re-segmentación
+        # reutiliza las fronteras cacheadas del transcript, así que es barata.
+        # Estados viejos sin clips_params se consideran vigentes.
+        recorded_params = state.get("clips_params")
+        params_changed = bool(recorded_params) and recorded_params != clips_params
+
+        if (state.get("clips_generated") or state.get("clips_metadata_path")) and settings.get("skip_done", True) and not params_changed:
             clips_metadata_existing = state.get("clips_metadata_path")
             if clips_metadata_existing:
                 video_run_dir = self._ensure_video_run_dir(run_output_dir=run_output_dir, video_id=video_id)
@@ -384,18 +449,19 @@ class JobRunner:
             self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message="Clips already generated; skipping"))
             return
 
+        if params_changed:
+            self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message="Clip parameters changed; re-segmenting"))
+
         from src.clips_generator import ClipsGenerator
 
-        # Get clip generation settings from job settings or app settings
-        app_settings = self.state_manager.load_settings()
         generator = ClipsGenerator(
-            min_clip_duration=int(settings.get("min_seconds", app_settings.get("min_clip_duration", 30))),
-            max_clip_duration=int(settings.get("max_seconds", app_settings.get("max_clip_duration", 90))),
+            min_clip_duration=clips_params["min_clip_duration"],
+            max_clip_duration=clips_params["max_clip_duration"],
         )
         clips = generator.generate_clips(
             transcript_path=transcript_path,
-            min_clips=int(settings.get("min_clips", app_settings.get("min_clips", 3))),
-            max_clips=int(settings.get("max_clips", app_settings.get("max_clips", 10))),
+            min_clips=clips_params["min_clips"],
+            max_clips=clips_params["max_clips"],
         )
 
         if not clips:
@@ -408,7 +474,12 @@ class JobRunner:
             output_path=str(video_run_dir / "clips" / f"{video_id}_clips.json"),
         )
 
-        self.state_manager.mark_clips_generated(video_id, clips or [], clips_metadata_path=clips_metadata_path)
+        self.state_manager.mark_clips_generated(
+            video_id,
+            clips or [],
+            clips_metadata_path=clips_metadata_path,
+            clips_params=clips_params,
+        )
         self.state_manager.update_job_status(job_id, {"clips_metadata_path": clips_metadata_path})
         self.emit(
             StateEvent(
@@ -423,15 +494,50 @@ class JobRunner:
         )
         self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message="Clips generation complete"))
 
-    def _step_export_clips(self, *, job_id: str, video_id: str, settings: Dict[str, Any], run_output_dir: Path) -> None:
-        self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message="Exporting clips"))
+    def _step_export_clips(
+        self,
+        *,
+        job_id: str,
+        video_id: str,
+        settings: Dict[str, Any],
+        run_output_dir: Path,
+        draft: bool = False,
+        approved_only: bool = False,
+    ) -> None:
+        """
+        Exporto los clips del video
+
+        Args:
+            draft: Borradores (360p, ultrafast) de todos los clips en exports/drafts/, para revisar
+            approved_only: Render final solo de los clips aprobados en la revisión (finalize)
+        """
+        if draft:
+            message = "Exporting draft clips"
+        elif approved_only:
+            message = "Finalizing approved clips"
+        else:
+            message = "Exporting clips"
+        self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message=message))
 
         state = self.state_manager.get_video_state(video_id) or {}
         clips = state.get("clips") or []
         if not clips:
             raise RuntimeError("No clips in state; run Generate Clips first")
 
-        if state.get("clips_exported") and settings.get("skip_done", True):
+        if approved_only:
+            approved_ids = {str(clip_id) for clip_id in self.state_manager.get_approved_clip_ids(video_id)}
+            clips = [clip for clip in clips if str(clip.get("clip_id")) in approved_ids]
+            if not clips:
+                raise RuntimeError("No approved clips; review the drafts and approve some first")
+            self.emit(
+                LogEvent(
+                    job_id=job_id,
+                    video_id=video_id,
+                    level=LogLevel.INFO,
+                    message=f"Rendering {len(clips)} approved clip(s) at full quality",
+                )
+            )
+        elif not draft and state.get("clips_exported") and settings.get("skip_done", True):
             existing_paths = [Path(p) for p in (state.get("exported_clips") or []) if p]
             video_run_dir = self._ensure_video_run_dir(run_output_dir=run_output_dir, video_id=video_id)
             copied: list[Path] = []
@@ -461,8 +567,10 @@ class JobRunner:
             self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message="Clips already exported; skipping"))
             return
 
-        def _safe_int_setting(key: str, default: int = 0) -> int:
-            raw_value = settings.get(key, default)
+        def _safe_int_setting(key: str, default: int = 0, *, app_fallback: bool = False) -> int:
+            # app_fallback: sin valor en el job, uso el de app_settings (lo que guarda la TUI)
+            fallback = app_settings.get(key, default) if app_fallback else default
+            raw_value = settings.get(key, fallback)
             if raw_value is None or raw_value == "":
                 return default
             try:
@@ -500,9 +608,13 @@ class JobRunner:
         self.state_manager.set_auto_generated_name(video_id, video_name)
         self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message=f"Auto-generated video name: {video_name}"))
 
-        # Use flat exports directory
+        # Use flat exports directory (drafts go to their own subfolder)
         exports_dir = self._get_exports_dir()
-        exporter = VideoExporter(output_dir=str(exports_dir))
+        if draft:
+            exports_dir = exports_dir / "drafts"
+        exporter = VideoExporter(output_dir=str(exports_dir), draft=draft)
+        exporter.ffmpeg_progress_callback = self._ffmpeg_progress_emitter(job_id=job_id, video_id=video_id)
+        exporter.ffmpeg_timeout = self._ffmpeg_timeout_seconds(settings, app_settings)
 
         saved_logo_path = self.state_manager.get_setting("logo_path", DEFAULT_BUILTIN_LOGO_PATH)
         resolved_logo_path = resolve_logo_path(
@@ -518,6 +630,13 @@ class JobRunner:
         effective_style = get_effective_subtitle_style(app_settings)
         custom_style = build_custom_subtitle_style(app_settings) if effective_style == "__custom__" else None
 
+        render_cache_max_mb = int(settings.get("render_cache_max_mb", app_settings.get("render_cache_max_mb", 2048)))
+        render_cache_dir = self.state_manager.state_file.parent / "render_cache" if render_cache_max_mb > 0 else None
+
+        from src.utils.face_presence import FaceCoverage
+
+        face_coverage = FaceCoverage.from_dict(state.get("face_coverage"))
+
         exported_paths = exporter.export_clips(
             video_path=video_path,
             clips=clips,
@@ -534,18 +653,64 @@ class JobRunner:
             enable_face_tracking=bool(settings.get("enable_face_tracking", app_settings.get("enable_face_tracking", False))),
             face_tracking_strategy=str(settings.get("face_tracking_strategy", app_settings.get("face_tracking_strategy", "keep_in_frame"))),
             face_tracking_sample_rate=int(settings.get("face_tracking_sample_rate", app_settings.get("face_tracking_sample_rate", 3))),
+            face_tracking_mode=str(settings.get("face_tracking_mode", app_settings.get("face_tracking_mode", "trajectory"))),
+            face_coverage=face_coverage,
+            face_coverage_threshold=float(settings.get("face_tracking_min_coverage", app_settings.get("face_tracking_min_coverage", 0.2))),
             add_logo=add_logo,
             logo_path=(resolved_logo_path if add_logo else None),
             logo_position=str(settings.get("logo_position", app_settings.get("logo_position", "top-right"))),
             logo_scale=float(settings.get("logo_scale", app_settings.get("logo_scale", 0.1))),
             video_crf=int(settings.get("video_crf", app_settings.get("video_crf", 23))),
             ffmpeg_threads=int(settings.get("ffmpeg_threads", app_settings.get("ffmpeg_threads", 0))),
+            export_workers=int(settings.get("export_workers", app_settings.get("export_workers", 1))),
+            single_decode=bool(settings.get("single_decode_export", app_settings.get("single_decode_export", False))),
+            stream_copy=bool(settings.get("stream_copy_export", app_settings.get("stream_copy_export", False))),
+            mezzanine=str(settings.get("mezzanine_mode", app_settings.get("mezzanine_mode", "off"))),
+            render_cache_dir=str(render_cache_dir) if render_cache_dir else None,
+            render_cache_max_mb=render_cache_max_mb,
+            render_cache_layers=bool(settings.get("render_cache_layers", app_settings.get("render_cache_layers", False))),
+            audio_passthrough=bool(settings.get("audio_passthrough", app_settings.get("audio_passthrough", False))),
+            loudness_normalization=str(settings.get("loudness_normalization", app_settings.get("loudness_normalization", "off"))),
+            loudness_target_lufs=float(settings.get("loudness_target_lufs", app_settings.get("loudness_target_lufs", -14.0))),
+            jump_cut_max_silence_ms=_safe_int_setting("jump_cut_max_silence_ms", 0, app_fallback=True),
             subtitle_max_chars_per_line=int(settings.get("subtitle_max_chars_per_line", app_settings.get("subtitle_max_chars_per_line", 42))),
             subtitle_max_duration=float(settings.get("subtitle_max_duration", app_settings.get("subtitle_max_duration", 5.0))),
             flat_output=True,
+            aspect_ratios=settings.get("aspect_ratios") or None,
+            progress_callback=lambda done, total, clip_id: self._emit_step_progress(
+                job_id=job_id,
+                video_id=video_id,
+                detail=f"clip {done}/{total}",
+            ),
         )
 
-        self.state_manager.mark_clips_exported(video_id, exported_paths, aspect_ratio=settings.get("aspect_ratio"))
+        resumed_clips = getattr(exporter, "last_resumed_clips", 0)
+        if resumed_clips:
+            self.emit(
+                LogEvent(
+                    job_id=job_id,
+                    video_id=video_id,
+                    level=LogLevel.INFO,
+                    message=f"Resumed export: {resumed_clips} clips were already exported",
+                )
+            )
+
+        # La cobertura de rostros vale mientras la fuente no cambie: la guardo para el próximo export
+        last_face_coverage = getattr(exporter, "last_face_coverage", None)
+        if isinstance(last_face_coverage, FaceCoverage) and last_face_coverage != face_coverage:
+            self.state_manager.set_face_coverage(video_id, last_face_coverage.to_dict())
+
+        render_cache_stats = getattr(exporter, "last_render_cache_stats", None)
+        if render_cache_stats is not None:
+            self.emit(
+                LogEvent(
+                    job_id=job_id,
+                    video_id=video_id,
+                    level=LogLevel.INFO,
+                    message=f"Render cache: {render_cache_stats.summary()}",
+                )
+            )
+
         if exported_paths:
             self.state_manager.update_job_status(
                 job_id,
@@ -554,6 +719,30 @@ class JobRunner:
                     "final_video_paths": [str(Path(p).resolve()) for p in exported_paths],
                 },
             )
+
+        if transcript_path:
+            from src.utils.mezzanine import get_mezzanine_path
+
+            mezzanine_path = get_mezzanine_path(transcript_path)
+            if mezzanine_path.exists():
+                self.state_manager.set_mezzanine_path(video_id, str(mezzanine_path))
+
+        if draft:
+            self.state_manager.mark_drafts_exported(video_id, exported_paths)
+            self.emit(
+                StateEvent(
+                    job_id=job_id,
+                    video_id=video_id,
+                    updates={"drafts_exported": True, "draft_count": len(exported_paths)},
+                )
+            )
+            self.emit(LogEvent(job_id=job_id, video_id=video_id, level=LogLevel.INFO, message="Drafts exported; review and approve clips to finalize"))
+            return
+
+        export_aspect_ratio = settings.get("aspect_ratio")
+        if settings.get("aspect_ratios"):
+            export_aspect_ratio = ",".join(settings["aspect_ratios"])
+        self.state_manager.mark_clips_exported(video_id, exported_paths, aspect_ratio=export_aspect_ratio)
         self.emit(
             StateEvent(
                 job_id=job_id,
@@ -640,6 +829,8 @@ class JobRunner:
         # Use flat exports directory
         exports_dir = self._get_exports_dir()
         exporter = VideoExporter(output_dir=str(exports_dir))
+        exporter.ffmpeg_progress_callback = self._ffmpeg_progress_emitter(job_id=job_id, video_id=video_id)
+        exporter.ffmpeg_timeout = self._ffmpeg_timeout_seconds(shorts_settings, app_settings)
 
         # Build settings dict for subtitle style helpers
         effective_style = get_effective_subtitle_style(app_settings)
@@ -668,6 +859,10 @@ class JobRunner:
             # Dead space trimming
             trim_ms_start=int(shorts_settings.get("trim_ms_start", app_settings.get("trim_ms_start", 0))),
             trim_ms_end=int(shorts_settings.get("trim_ms_end", app_settings.get("trim_ms_end", 0))),
+            segments=int(shorts_settings.get("full_video_segments", app_settings.get("full_video_segments", 1))),
+            audio_passthrough=bool(shorts_settings.get("audio_passthrough", app_settings.get("audio_passthrough", False))),
+            loudness_normalization=str(shorts_settings.get("loudness_normalization", app_settings.get("loudness_normalization", "off"))),
+            loudness_target_lufs=float(shorts_settings.get("loudness_target_lufs", app_settings.get("loudness_target_lufs", -14.0))),
         )
 
         self.state_manager.mark_shorts_exported(video_id, exported_path, srt_path=str(srt_path), input_path=input_path)
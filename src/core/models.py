@@ -13,6 +13,9 @@ class JobStep(str, Enum):
     GENERATE_CLIPS = "generate_clips"
     EXPORT_CLIPS = "export_clips"
     EXPORT_SHORTS = "export_shorts"
+    # Borradores en baja resolución para revisar, y render final solo de los aprobados
+    EXPORT_DRAFTS = "export_drafts"
+    FINALIZE_CLIPS = "finalize_clips"
 
 
 class JobState(str, Enum):
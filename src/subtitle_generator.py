@@ -8,7 +8,7 @@ Los subtítulos pueden quemarse en el video (hard-coded) o agregarse como pista
 
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from rich.console import Console
 
 from src.utils.logger import get_logger
@@ -93,7 +93,8 @@ class SubtitleGenerator:
         clip_end: float,
         output_path: str,
         max_chars_per_line: int = 42,
-        max_duration: float = 5.0
+        max_duration: float = 5.0,
+        time_map: Optional[Callable[[float], float]] = None
     ) -> Optional[str]:
         """
         Genero archivo SRT para un clip específico
@@ -105,6 +106,8 @@ class SubtitleGenerator:
             output_path: Ruta de salida para el SRT
             max_chars_per_line: Máximo de caracteres por línea
             max_duration: Duración máxima de un subtítulo
+            time_map: Si el clip tiene jump cuts, pasa un tiempo relativo al clip a la
+                línea de tiempo compactada (ver JumpCutPlan.remap)
 
         Returns:
             Ruta al archivo SRT generado, o None si falla
@@ -139,6 +142,9 @@ class SubtitleGenerator:
                                 adjusted_word = word.copy()
                                 adjusted_word['start'] = word_start - clip_start
                                 adjusted_word['end'] = word_end - clip_start
+                                if time_map is not None:
+                                    adjusted_word['start'] = time_map(adjusted_word['start'])
+                                    adjusted_word['end'] = time_map(adjusted_word['end'])
                                 adjusted_words.append(adjusted_word)
 
                         adjusted_segment['words'] = adjusted_words
@@ -146,6 +152,9 @@ class SubtitleGenerator:
                     # Ajusto los timestamps del segmento
                     adjusted_segment['start'] = max(0, seg_start - clip_start)
                     adjusted_segment['end'] = min(clip_end - clip_start, seg_end - clip_start)
+                    if time_map is not None:
+                        adjusted_segment['start'] = time_map(adjusted_segment['start'])
+                        adjusted_segment['end'] = time_map(adjusted_segment['end'])
 
                     clip_segments.append(adjusted_segment)
 
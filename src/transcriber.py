@@ -7,13 +7,13 @@ me permiten detectar dónde cortar los clips
 """
 
 import json
-import subprocess
 from pathlib import Path
 from typing import Dict, Optional, List
 import gc
 import torch
 
 from .utils.logger import setup_logger
+from .utils.ffmpeg_runner import run_ffmpeg
 from .core.dependency_manager import load_align_model, load_whisper_model
 
 
@@ -105,13 +105,8 @@ class Transcriber:
                 output_audio_path
             ]
 
-            # Ejecuto el comando
-            result = subprocess.run(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Ejecuto el comando (progreso, plazos y cola de stderr en el runner común)
+            result = run_ffmpeg(command, label=f"audio {Path(video_path).name}")
 
             if result.returncode == 0:
                 self.logger.info(f"Audio extraído: {output_audio_path}")
@@ -123,6 +123,66 @@ class ProcessShortsModal(ModalScreen[Optional[Dict[str, object]]]):
             self.dismiss({"input_path": input_path})
 
 
+class ReviewDraftsModal(ModalScreen[Optional[Dict[str, object]]]):
+    """Reviso los borradores: Enter aprueba/desaprueba el clip; Finalize renderiza los aprobados."""
+
+    BINDINGS = [
+        Binding("escape", "dismiss", "Cancel"),
+    ]
+
+    def __init__(self, *, clips: List[Dict[str, object]], approved: List[object], draft_paths: List[str]):
+        super().__init__()
+        self._clips = clips
+        self._approved: Set[str] = {str(clip_id) for clip_id in approved}
+        self._draft_by_name = {Path(p).stem: p for p in draft_paths}
+
+    def on_mount(self) -> None:
+        table = self.query_one("#draft_clips", DataTable)
+        table.cursor_type = "row"
+        table.focus()
+
+    def compose(self) -> ComposeResult:
+        yield Static("Review Drafts", id="title")
+        yield Static("Enter approves or unapproves the selected clip:", classes="label")
+        table = DataTable(id="draft_clips")
+        table.add_columns("✓", "Clip", "Window", "Draft")
+        for clip in self._clips:
+            clip_id = str(clip.get("clip_id"))
+            start = float(clip.get("start_time") or 0)
+            end = float(clip.get("end_time") or 0)
+            table.add_row(
+                "✓" if clip_id in self._approved else "",
+                clip_id,
+                f"{start:.1f}s - {end:.1f}s",
+                self._draft_by_name.get(clip_id, "-"),
+                key=clip_id,
+            )
+        yield table
+        with Horizontal(classes="buttons"):
+            yield Button("Finalize Approved", id="finalize", variant="primary")
+            yield Button("Save", id="save")
+            yield Button("Cancel", id="cancel")
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        event.stop()
+        clip_id = str(getattr(event.row_key, "value", None) or event.row_key)
+        if clip_id in self._approved:
+            self._approved.remove(clip_id)
+        else:
+            self._approved.add(clip_id)
+        event.data_table.update_cell_at((event.cursor_row, 0), "✓" if clip_id in self._approved else "")
+
+    def _approved_clip_ids(self) -> List[object]:
+        return [clip.get("clip_id") for clip in self._clips if str(clip.get("clip_id")) in self._approved]
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel":
+            self.dismiss(None)
+            return
+        if event.button.id in ("save", "finalize"):
+            self.dismiss({"approved": self._approved_clip_ids(), "finalize": event.button.id == "finalize"})
+
+
 class CustomShortsModal(ModalScreen[Optional[Dict[str, object]]]):
     """Modal for custom shorts processing with options for subtitles, logo, face tracking, and trim."""
 
@@ -820,6 +880,8 @@ class CliperTUI(App):
         Binding("t", "enqueue_transcribe", "Transcribe"),
         Binding("c", "enqueue_clips", "Clips"),
         Binding("e", "enqueue_export", "Export"),
+        Binding("D", "enqueue_drafts", "Drafts"),
+        Binding("v", "review_drafts", "Review Drafts"),
         Binding("p", "enqueue_process_shorts", "Process Shorts"),
         Binding("P", "custom_shorts", "Custom Shorts"),
         Binding("r", "refresh", "Refresh"),
@@ -1039,6 +1101,8 @@ class CliperTUI(App):
                 parts.append("Transcribed")
             if state.get("clips_generated"):
                 parts.append(f"Clips: {len(state.get('clips', []) or [])}")
+            if state.get("drafts_exported"):
+                parts.append(f"Approved: {len(state.get('approved_clips') or [])}")
             if state.get("clips_exported"):
                 parts.append("Exported")
             if state.get("shorts_exported"):
@@ -1194,7 +1258,9 @@ class CliperTUI(App):
         if not video_ids:
             self.query_one("#logs", RichLog).write("[yellow]No videos selected.[/yellow]")
             return
+        self._enqueue_job_for(video_ids, steps, settings=settings)
 
+    def _enqueue_job_for(self, video_ids: List[str], steps: List[JobStep], *, settings: Optional[Dict[str, object]] = None) -> None:
         job_id = self.state_manager.create_job_id()
         spec = JobSpec(job_id=job_id, video_ids=video_ids, steps=steps, settings=dict(settings or {}))
         self.state_manager.enqueue_job(spec.to_dict(), initial_status={"state": "pending", "progress_current": 0, "progress_total": len(video_ids) * len(steps)})
@@ -1210,6 +1276,45 @@ class CliperTUI(App):
     def action_enqueue_export(self) -> None:
         self._enqueue_job([JobStep.EXPORT_CLIPS])
 
+    def action_enqueue_drafts(self) -> None:
+        self._enqueue_job([JobStep.EXPORT_DRAFTS])
+
+    async def action_review_drafts(self) -> None:
+        logs = self.query_one("#logs", RichLog)
+        video_ids = self._selected_or_current_video_ids()
+        if len(video_ids) != 1:
+            logs.write("[yellow]Select a single video to review its drafts.[/yellow]")
+            return
+
+        video_id = video_ids[0]
+        state = self.state_manager.get_video_state(video_id) or {}
+        if not state.get("drafts_exported"):
+            logs.write("[yellow]No drafts yet; press D to export drafts first.[/yellow]")
+            return
+
+        await self.push_screen(
+            ReviewDraftsModal(
+                clips=list(state.get("clips") or []),
+                approved=self.state_manager.get_approved_clip_ids(video_id),
+                draft_paths=[str(p) for p in (state.get("draft_clips") or [])],
+            ),
+            callback=lambda result: self._on_review_drafts_dismissed(video_id, result),
+        )
+
+    def _on_review_drafts_dismissed(self, video_id: str, result: Optional[Dict[str, object]]) -> None:
+        if result is None:
+            return
+        logs = self.query_one("#logs", RichLog)
+        approved = list(result.get("approved") or [])
+        self.state_manager.set_approved_clips(video_id, approved)
+        logs.write(f"[green]Approved {len(approved)} clip(s).[/green]")
+        self.refresh_library()
+        if result.get("finalize"):
+            if not approved:
+                logs.write("[yellow]No approved clips to finalize.[/yellow]")
+                return
+            self._enqueue_job_for([video_id], [JobStep.FINALIZE_CLIPS])
+
     async def action_settings(self) -> None:
         await self.push_screen(SettingsModal(state_manager=self.state_manager), callback=self._on_settings_dismissed)
 
@@ -1461,6 +1566,8 @@ class CliperTUI(App):
             "",
             f"Transcribed: {bool(state.get('transcribed'))}",
             f"Clips generated: {bool(state.get('clips_generated'))}",
+            f"Drafts exported: {bool(state.get('drafts_exported'))}",
+            f"Approved clips: {len(state.get('approved_clips') or [])}",
             f"Clips exported: {bool(state.get('clips_exported'))}",
             f"Short exported: {bool(state.get('shorts_exported'))}",
         ]
@@ -0,0 +1,561 @@
+# -*- coding: utf-8 -*-
+"""
+Perfil de encoder por máquina.
+
+`video_crf`, `-preset fast` y los threads de ffmpeg eran fijos, y el reframer probaba
+h264_videotoolbox en cada clip aunque la máquina no lo tuviera. Calibro una vez por
+host: encodeo un clip sintético (lavfi) en las resoluciones de salida con cada preset de
+libx264, varias cantidades de threads y los encoders H.264 por hardware que funcionan.
+Mido fps, bitrate y SSIM contra la referencia sin pérdida, y guardo por resolución la
+opción más rápida que cumple el objetivo:
+
+- SSIM como mucho `max_ssim_drop` por debajo del encode actual (libx264 fast)
+- bitrate como mucho `max_bitrate_ratio` veces el del encode actual
+
+VideoExporter y FFmpegVideoWriter leen el perfil; sin perfil todo sigue igual.
+
+Calibrar: python -m src.utils.encoder_profile
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.ffmpeg_runner import run_ffmpeg
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENCODER_PROFILE_VERSION = 1
+
+# Lo que hoy usa cada export: la referencia contra la que comparo
+REFERENCE_ENCODER = "libx264"
+REFERENCE_PRESET = "fast"
+
+CALIBRATION_PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium")
+
+# Resoluciones de salida (ASPECT_RATIO_OUTPUT_SIZES de video_exporter)
+CALIBRATION_RESOLUTIONS = ((1080, 1920), (1080, 1080), (1920, 1080))
+
+# Encoders H.264 por hardware que pruebo si ffmpeg los lista.
+# h264_vaapi queda afuera: necesita -vaapi_device y hwupload en el grafo.
+HARDWARE_ENCODERS = ("h264_videotoolbox", "h264_nvenc", "h264_qsv", "h264_amf")
+
+DEFAULT_CALIBRATION_SECONDS = 2.0
+CALIBRATION_FPS = 30
+DEFAULT_MAX_SSIM_DROP = 0.01
+DEFAULT_MAX_BITRATE_RATIO = 1.5
+
+# Diferencias de velocidad menores a esto se consideran empate (gana menos threads)
+THREADS_TIE_RATIO = 0.05
+
+# Clip sintético: testsrc2 tiene movimiento; el ruido temporal imita el grano de cámara
+_SYNTHETIC_SOURCE = "testsrc2=size={w}x{h}:rate={fps}:duration={seconds}"
+_SYNTHETIC_FILTER = "noise=alls=6:allf=t+u"
+
+_SSIM_RE = re.compile(r"All:([0-9.]+)")
+
+
+@dataclass(frozen=True)
+class EncoderChoice:
+    """Opción de encode elegida para una resolución"""
+    encoder: str
+    preset: Optional[str] = None
+    threads: int = 0
+    # Rate control para encoders por hardware (ignoran -crf): ["-b:v", "5200k"]
+    rate_args: Tuple[str, ...] = ()
+    fps: float = 0.0
+    kbps: float = 0.0
+    ssim: Optional[float] = None
+
+    def video_args(self, crf: int) -> List[str]:
+        """Args de video para ffmpeg (-c:v ...), con el CRF del usuario si el encoder lo usa"""
+        if self.encoder == "libx264":
+            return ["-c:v", "libx264", "-preset", self.preset or REFERENCE_PRESET, "-crf", str(crf)]
+        return ["-c:v", self.encoder, *self.rate_args]
+
+
+@dataclass
+class EncoderProfile:
+    """Resultado de la calibración de un host"""
+    host: str
+    ffmpeg_version: str
+    crf: int
+    encoders: List[str]
+    choices: Dict[str, EncoderChoice]
+    max_ssim_drop: float = DEFAULT_MAX_SSIM_DROP
+    max_bitrate_ratio: float = DEFAULT_MAX_BITRATE_RATIO
+    created_at: float = 0.0
+    measurements: List[Dict] = field(default_factory=list)
+    version: int = ENCODER_PROFILE_VERSION
+
+    def choice_for(self, width: Optional[int] = None, height: Optional[int] = None) -> Optional[EncoderChoice]:
+        """
+        Elijo la opción calibrada más parecida a la salida
+
+        Con tamaño: la resolución calibrada de área más cercana (a igual área, la misma
+        orientación). Sin tamaño: la de mayor área, la más exigente.
+        """
+        if not self.choices:
+            return None
+        sizes = {key: _parse_size(key) for key in self.choices}
+        sizes = {key: size for key, size in sizes.items() if size}
+        if not sizes:
+            return None
+        if not width or not height:
+            key = max(sizes, key=lambda k: sizes[k][0] * sizes[k][1])
+        else:
+            key = min(
+                sizes,
+                key=lambda k: (
+                    abs(sizes[k][0] * sizes[k][1] - width * height),
+                    (sizes[k][0] >= sizes[k][1]) != (width >= height),
+                ),
+            )
+        return self.choices[key]
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["choices"] = {
+            key: {**asdict(choice), "rate_args": list(choice.rate_args)}
+            for key, choice in self.choices.items()
+        }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EncoderProfile":
+        choices = {
+            key: EncoderChoice(**{**value, "rate_args": tuple(value.get("rate_args") or ())})
+            for key, value in (data.get("choices") or {}).items()
+        }
+        return cls(
+            host=data["host"],
+            ffmpeg_version=data.get("ffmpeg_version", ""),
+            crf=int(data.get("crf", 23)),
+            encoders=list(data.get("encoders") or []),
+            choices=choices,
+            max_ssim_drop=float(data.get("max_ssim_drop", DEFAULT_MAX_SSIM_DROP)),
+            max_bitrate_ratio=float(data.get("max_bitrate_ratio", DEFAULT_MAX_BITRATE_RATIO)),
+            created_at=float(data.get("created_at", 0.0)),
+            measurements=list(data.get("measurements") or []),
+            version=int(data.get("version", 0)),
+        )
+
+    def save(self, path: Path) -> None:
+        """Escritura atómica (tmp + rename)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def _parse_size(key: str) -> Optional[Tuple[int, int]]:
+    try:
+        width, height = key.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        return None
+
+
+def _size_key(width: int, height: int) -> str:
+    return f"{width}x{height}"
+
+
+def default_profile_path() -> Path:
+    """
+    Ruta del perfil de este host
+
+    CLIPER_ENCODER_PROFILE la reemplaza; si no, $XDG_CACHE_HOME/cliper/encoder_profile_<host>.json
+    """
+    override = os.environ.get("CLIPER_ENCODER_PROFILE", "").strip()
+    if override:
+        return Path(override).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "cliper" / f"encoder_profile_{socket.gethostname()}.json"
+
+
+@lru_cache(maxsize=4)
+def ffmpeg_version(ffmpeg: str = "ffmpeg") -> Optional[str]:
+    """Primera línea de `ffmpeg -version` (None si ffmpeg no está)"""
+    try:
+        result = subprocess.run([ffmpeg, "-version"], capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return result.stdout.splitlines()[0].strip()
+
+
+def _listed_encoders(ffmpeg: str) -> List[str]:
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"], capture_output=True, text=True, check=False
+        )
+    except OSError:
+        return []
+    names = []
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith("V"):
+            names.append(parts[1])
+    return names
+
+
+def _encoder_works(ffmpeg: str, encoder: str) -> bool:
+    """Que ffmpeg lo liste no alcanza (nvenc sin GPU, videotoolbox en Linux): encodeo 3 frames"""
+    result = run_ffmpeg(
+        [
+            ffmpeg, "-hide_banner", "-y",
+            "-f", "lavfi", "-i", f"color=c=black:size=256x256:rate={CALIBRATION_FPS}",
+            "-frames:v", "3",
+            "-c:v", encoder,
+            "-f", "null", "-",
+        ],
+        label=f"probe {encoder}",
+        timeout=30,
+    )
+    return result.returncode == 0
+
+
+@lru_cache(maxsize=4)
+def available_encoders(ffmpeg: str = "ffmpeg") -> Tuple[str, ...]:
+    """
+    Encoders H.264 que funcionan en este host (libx264 primero)
+
+    Cacheado por proceso; el perfil además lo persiste, así no se prueba por clip.
+    """
+    listed = set(_listed_encoders(ffmpeg))
+    candidates = [name for name in (REFERENCE_ENCODER, *HARDWARE_ENCODERS) if name in listed]
+    working = tuple(name for name in candidates if _encoder_works(ffmpeg, name))
+    logger.info(f"Working H.264 encoders: {', '.join(working) or 'none'}")
+    return working
+
+
+_profile_cache: Dict[str, Tuple[float, Optional[EncoderProfile]]] = {}
+
+
+def load_encoder_profile(path: Optional[Path] = None, *, check_ffmpeg: bool = True) -> Optional[EncoderProfile]:
+    """
+    Cargo el perfil del host (cacheado por ruta y mtime)
+
+    Devuelvo None si no existe, no se puede leer, es de otro host o de otra versión
+    de ffmpeg: en esos casos se usan los defaults y conviene recalibrar.
+    """
+    path = Path(path) if path is not None else default_profile_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    cache_key = str(path)
+    cached = _profile_cache.get(cache_key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    profile: Optional[EncoderProfile] = None
+    try:
+        profile = EncoderProfile.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable encoder profile {path}: {e}")
+
+    if profile is not None:
+        reason = None
+        if profile.version != ENCODER_PROFILE_VERSION:
+            reason = f"version {profile.version} != {ENCODER_PROFILE_VERSION}"
+        elif profile.host != socket.gethostname():
+            reason = f"calibrated on {profile.host}"
+        elif check_ffmpeg and profile.ffmpeg_version != ffmpeg_version():
+            reason = "ffmpeg changed since calibration"
+        if reason:
+            logger.warning(f"Ignoring encoder profile {path} ({reason}); run `python -m src.utils.encoder_profile`")
+            profile = None
+
+    _profile_cache[cache_key] = (mtime, profile)
+    return profile
+
+
+def writer_encoders(profile: Optional[EncoderProfile] = None) -> List[str]:
+    """Encoders a probar para un writer, en orden: los del perfil, los probados, o libx264"""
+    if profile is not None and profile.encoders:
+        return list(profile.encoders)
+    return list(available_encoders()) or [REFERENCE_ENCODER]
+
+
+# ============================================================================
+# CALIBRACIÓN
+# ============================================================================
+
+
+def _measure_ssim(ffmpeg: str, encoded: Path, reference: Path) -> Optional[float]:
+    result = run_ffmpeg(
+        [
+            ffmpeg, "-hide_banner",
+            "-i", str(encoded), "-i", str(reference),
+            "-lavfi", "[0:v][1:v]ssim",
+            "-f", "null", "-",
+        ],
+        label=f"ssim {encoded.name}",
+    )
+    match = _SSIM_RE.search(result.stderr or "")
+    return float(match.group(1)) if result.returncode == 0 and match else None
+
+
+def _measure_encode(
+    ffmpeg: str,
+    reference: Path,
+    output: Path,
+    video_args: Sequence[str],
+    threads: int,
+    frames: int,
+    seconds: float,
+) -> Optional[Dict]:
+    result = run_ffmpeg(
+        [
+            ffmpeg, "-hide_banner", "-y",
+            "-i", str(reference),
+            *video_args,
+            "-pix_fmt", "yuv420p",
+            "-threads", str(threads),
+            "-an",
+            str(output),
+        ],
+        label=f"calibrate {output.stem}",
+        timeout=600,
+    )
+    if result.returncode != 0 or not output.exists():
+        return None
+    return {
+        "fps": round(frames / max(result.elapsed_seconds, 1e-3), 2),
+        "kbps": round(output.stat().st_size * 8 / 1000 / seconds, 1),
+        "cpu_seconds": result.cpu_seconds,
+    }
+
+
+def _pick_fastest(candidates: List[Dict], reference: Dict, max_ssim_drop: float, max_bitrate_ratio: float) -> Dict:
+    """La opción más rápida que cumple calidad y bitrate; si ninguna, la referencia"""
+    ref_ssim = reference.get("ssim")
+    eligible = [
+        c for c in candidates
+        if c["kbps"] <= reference["kbps"] * max_bitrate_ratio
+        and (ref_ssim is None or (c.get("ssim") is not None and c["ssim"] >= ref_ssim - max_ssim_drop))
+    ]
+    return max(eligible, key=lambda c: c["fps"]) if eligible else reference
+
+
+def _thread_candidates() -> List[int]:
+    cpu_count = os.cpu_count() or 1
+    return sorted({0, 1, max(1, cpu_count // 2), cpu_count})
+
+
+def calibrate_encoder_profile(
+    *,
+    resolutions: Sequence[Tuple[int, int]] = CALIBRATION_RESOLUTIONS,
+    presets: Sequence[str] = CALIBRATION_PRESETS,
+    thread_counts: Optional[Sequence[int]] = None,
+    crf: int = 23,
+    seconds: float = DEFAULT_CALIBRATION_SECONDS,
+    max_ssim_drop: float = DEFAULT_MAX_SSIM_DROP,
+    max_bitrate_ratio: float = DEFAULT_MAX_BITRATE_RATIO,
+    ffmpeg: str = "ffmpeg",
+    on_step: Optional[Callable[[str], None]] = None,
+) -> EncoderProfile:
+    """
+    Calibro los encoders de este host y devuelvo el perfil (sin guardarlo)
+
+    Por resolución: referencia sin pérdida → libx264 en cada preset (threads auto) y
+    cada encoder por hardware al bitrate de la referencia, con SSIM; después barro los
+    threads del preset ganador. Los threads no cambian la calidad, así que no repito SSIM.
+    """
+    version = ffmpeg_version(ffmpeg)
+    if version is None:
+        raise RuntimeError(f"{ffmpeg} not found; cannot calibrate encoders")
+
+    encoders = list(available_encoders(ffmpeg))
+    if REFERENCE_ENCODER not in encoders:
+        raise RuntimeError("libx264 is not available; cannot calibrate encoders")
+    hardware = [name for name in encoders if name != REFERENCE_ENCODER]
+    thread_counts = list(thread_counts) if thread_counts else _thread_candidates()
+    frames = int(round(seconds * CALIBRATION_FPS))
+
+    def _step(message: str) -> None:
+        logger.info(message)
+        if on_step is not None:
+            on_step(message)
+
+    measurements: List[Dict] = []
+    choices: Dict[str, EncoderChoice] = {}
+
+    with tempfile.TemporaryDirectory(prefix="cliper_calibrate_") as tmp:
+        work_dir = Path(tmp)
+        for width, height in resolutions:
+            size = _size_key(width, height)
+            reference = work_dir / f"reference_{size}.mkv"
+            _step(f"{size}: rendering synthetic reference ({seconds:.0f}s)")
+            result = run_ffmpeg(
+                [
+                    ffmpeg, "-hide_banner", "-y",
+                    "-f", "lavfi",
+                    "-i", _SYNTHETIC_SOURCE.format(w=width, h=height, fps=CALIBRATION_FPS, seconds=seconds),
+                    "-vf", _SYNTHETIC_FILTER,
+                    "-c:v", "libx264", "-preset", "ultrafast", "-qp", "0",
+                    "-pix_fmt", "yuv420p",
+                    str(reference),
+                ],
+                label=f"calibrate reference {size}",
+            )
+            if result.returncode != 0:
+                logger.warning(f"Could not render calibration reference {size}: {result.stderr[-500:]}")
+                continue
+
+            candidates: List[Dict] = []
+
+            def _run(name: str, encoder: str, preset: Optional[str], video_args: List[str], threads: int,
+                     with_ssim: bool, rate_args: Tuple[str, ...] = ()) -> Optional[Dict]:
+                output = work_dir / f"{size}_{name}_t{threads}.mp4"
+                measured = _measure_encode(ffmpeg, reference, output, video_args, threads, frames, seconds)
+                if measured is None:
+                    _step(f"{size}: {name} threads={threads} failed")
+                    return None
+                entry = {
+                    "size": size,
+                    "encoder": encoder,
+                    "preset": preset,
+                    "threads": threads,
+                    "rate_args": list(rate_args),
+                    **measured,
+                    "ssim": _measure_ssim(ffmpeg, output, reference) if with_ssim else None,
+                }
+                output.unlink(missing_ok=True)
+                measurements.append(entry)
+                ssim_text = f", SSIM {entry['ssim']:.4f}" if entry["ssim"] is not None else ""
+                _step(f"{size}: {name} threads={threads}: {entry['fps']:.1f} fps, {entry['kbps']:.0f} kbps{ssim_text}")
+                return entry
+
+            for preset in presets:
+                entry = _run(
+                    f"libx264-{preset}", "libx264", preset,
+                    ["-c:v", "libx264", "-preset", preset, "-crf", str(crf)], 0, True,
+                )
+                if entry is not None:
+                    candidates.append(entry)
+
+            reference_entry = next(
+                (c for c in candidates if c["preset"] == REFERENCE_PRESET),
+                None,
+            )
+            if reference_entry is None:
+                reference_entry = _run(
+                    f"libx264-{REFERENCE_PRESET}", "libx264", REFERENCE_PRESET,
+                    ["-c:v", "libx264", "-preset", REFERENCE_PRESET, "-crf", str(crf)], 0, True,
+                )
+            if reference_entry is None:
+                continue
+
+            # Hardware: sin CRF, al bitrate de la referencia (cumple el límite por construcción)
+            rate_args = ("-b:v", f"{int(reference_entry['kbps'])}k")
+            for encoder in hardware:
+                entry = _run(encoder, encoder, None, ["-c:v", encoder, *rate_args], 0, True, rate_args)
+                if entry is not None:
+                    candidates.append(entry)
+
+            best = _pick_fastest(candidates, reference_entry, max_ssim_drop, max_bitrate_ratio)
+
+            # Threads del ganador (solo libx264; los de hardware no usan -threads)
+            if best["encoder"] == "libx264":
+                timed = [best]
+                for threads in thread_counts:
+                    if threads == best["threads"]:
+                        continue
+                    entry = _run(
+                        f"libx264-{best['preset']}", "libx264", best["preset"],
+                        ["-c:v", "libx264", "-preset", best["preset"], "-crf", str(crf)], threads, False,
+                    )
+                    if entry is not None:
+                        timed.append({**entry, "ssim": best["ssim"]})
+                fastest = max(c["fps"] for c in timed)
+                best = min(
+                    (c for c in timed if c["fps"] >= fastest * (1 - THREADS_TIE_RATIO)),
+                    key=lambda c: (c["threads"] == 0, c["threads"]),
+                )
+
+            choices[size] = EncoderChoice(
+                encoder=best["encoder"],
+                preset=best["preset"],
+                threads=int(best["threads"]),
+                rate_args=tuple(best["rate_args"]),
+                fps=best["fps"],
+                kbps=best["kbps"],
+                ssim=best["ssim"],
+            )
+            _step(
+                f"{size}: using {best['encoder']}"
+                f"{' ' + best['preset'] if best['preset'] else ''} threads={best['threads']} "
+                f"({best['fps']:.1f} fps vs {reference_entry['fps']:.1f} fps for libx264 {REFERENCE_PRESET})"
+            )
+
+    return EncoderProfile(
+        host=socket.gethostname(),
+        ffmpeg_version=version,
+        crf=crf,
+        encoders=encoders,
+        choices=choices,
+        max_ssim_drop=max_ssim_drop,
+        max_bitrate_ratio=max_bitrate_ratio,
+        created_at=time.time(),
+        measurements=measurements,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.utils.encoder_profile",
+        description="Calibrate ffmpeg encoders on this machine and write the encoder profile.",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Profile path (default: per-host cache file)")
+    parser.add_argument(
+        "--resolutions",
+        default=",".join(_size_key(w, h) for w, h in CALIBRATION_RESOLUTIONS),
+        help="Comma-separated WxH list",
+    )
+    parser.add_argument("--presets", default=",".join(CALIBRATION_PRESETS), help="Comma-separated libx264 presets")
+    parser.add_argument("--threads", default="", help="Comma-separated thread counts (default: 0,1,CPUs/2,CPUs)")
+    parser.add_argument("--crf", type=int, default=23)
+    parser.add_argument("--seconds", type=float, default=DEFAULT_CALIBRATION_SECONDS)
+    parser.add_argument("--max-ssim-drop", type=float, default=DEFAULT_MAX_SSIM_DROP)
+    parser.add_argument("--max-bitrate-ratio", type=float, default=DEFAULT_MAX_BITRATE_RATIO)
+    args = parser.parse_args(argv)
+
+    resolutions = [size for size in (_parse_size(s.strip()) for s in args.resolutions.split(",")) if size]
+    presets = [p.strip() for p in args.presets.split(",") if p.strip()]
+    threads = [int(t) for t in args.threads.split(",") if t.strip()]
+
+    profile = calibrate_encoder_profile(
+        resolutions=resolutions,
+        presets=presets,
+        thread_counts=threads or None,
+        crf=args.crf,
+        seconds=args.seconds,
+        max_ssim_drop=args.max_ssim_drop,
+        max_bitrate_ratio=args.max_bitrate_ratio,
+        on_step=print,
+    )
+    path = args.output or default_profile_path()
+    profile.save(path)
+    print(f"Encoder profile written to {path}")
+    for size, choice in profile.choices.items():
+        print(f"  {size}: {' '.join(choice.video_args(profile.crf))} -threads {choice.threads}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Journal de export por video, para retomar un export cortado a mitad.
+
+Cada clip terminado queda anotado con su clave de render (todo lo que define la
+salida), la duración que verifiqué con ffprobe y el tamaño/mtime del archivo. Si
+el proceso muere en el clip 23 de 30, la próxima corrida salta los 22 que el
+journal da por buenos y solo renderiza el resto.
+
+Un clip cuenta como terminado solo si el archivo sigue siendo el que anoté (mismo
+tamaño y mtime) y la clave coincide: cambiar un parámetro, borrar o pisar el
+archivo lo vuelve a renderizar. El journal se reescribe con temporal + rename,
+así que un corte mientras lo guardo deja la versión anterior entera.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils.logger import get_logger
+from src.utils.media_info import probe_media
+
+logger = get_logger(__name__)
+
+EXPORT_JOURNAL_VERSION = 1
+
+# Diferencia máxima entre la duración del archivo y la ventana del clip (AAC priming,
+# redondeo al último frame)
+EXPORT_DURATION_TOLERANCE_SECONDS = 0.5
+
+
+def get_export_journal_path(output_dir: Path, video_name: str) -> Path:
+    """
+    Un journal por video dentro de la carpeta de salida
+
+    Con salida plana varios videos comparten carpeta: el nombre lleva el video.
+    """
+    return Path(output_dir) / f".{video_name}.export_journal.json"
+
+
+def verify_clip_duration(output_path: Path, expected_duration: float) -> Optional[float]:
+    """
+    Duración del clip exportado si coincide con la esperada (con tolerancia)
+
+    Returns:
+        Duración medida, o None si no puedo probar el archivo o no coincide
+    """
+    info = probe_media(str(output_path))
+    if info is None or info.duration <= 0:
+        return None
+    if abs(info.duration - expected_duration) > EXPORT_DURATION_TOLERANCE_SECONDS:
+        logger.warning(
+            f"{output_path.name}: duration {info.duration:.3f}s does not match the clip "
+            f"window ({expected_duration:.3f}s); not recorded as complete"
+        )
+        return None
+    return info.duration
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """Un clip terminado"""
+    clip_id: str
+    render_key: str
+    duration: float
+    size: int
+    mtime_ns: int
+
+
+class ExportJournal:
+    """
+    Clips ya exportados de un video, indexados por ruta relativa a la carpeta del journal
+
+    Es seguro usarlo desde varios workers de export a la vez.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, JournalEntry] = self._load()
+
+    def _load(self) -> Dict[str, JournalEntry]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable export journal {self.path.name}, starting fresh: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != EXPORT_JOURNAL_VERSION:
+            return {}
+        entries: Dict[str, JournalEntry] = {}
+        for name, raw in (data.get("clips") or {}).items():
+            try:
+                entries[name] = JournalEntry(
+                    clip_id=str(raw["clip_id"]),
+                    render_key=str(raw["render_key"]),
+                    duration=float(raw["duration"]),
+                    size=int(raw["size"]),
+                    mtime_ns=int(raw["mtime_ns"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        return entries
+
+    def _save(self) -> None:
+        payload = {
+            "version": EXPORT_JOURNAL_VERSION,
+            "clips": {name: asdict(entry) for name, entry in sorted(self._entries.items())},
+        }
+        tmp = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write export journal {self.path.name}: {e}")
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _name(self, output_path: Path) -> str:
+        output_path = Path(output_path)
+        try:
+            return output_path.resolve().relative_to(self.path.parent.resolve()).as_posix()
+        except ValueError:
+            return str(output_path.resolve())
+
+    def is_complete(self, output_path: Path, render_key: str) -> bool:
+        """True si el clip ya está exportado con esta clave y el archivo no cambió"""
+        with self._lock:
+            entry = self._entries.get(self._name(output_path))
+        if entry is None or entry.render_key != render_key:
+            return False
+        try:
+            stat = Path(output_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == entry.size and stat.st_mtime_ns == entry.mtime_ns
+
+    def record(self, output_path: Path, *, clip_id, render_key: str, duration: float) -> None:
+        """Anoto un clip terminado y guardo el journal"""
+        try:
+            stat = Path(output_path).stat()
+        except OSError:
+            return
+        entry = JournalEntry(
+            clip_id=str(clip_id),
+            render_key=render_key,
+            duration=round(duration, 6),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+        )
+        with self._lock:
+            self._entries[self._name(output_path)] = entry
+            self._save()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Sonda de presencia de rostros por video fuente.
+
+Antes de reencuadrar con face tracking miro si la fuente tiene rostros: una sola
+pasada de ffmpeg decodifica solo keyframes, toma unas pocas docenas repartidas por
+todo el video ya escaladas a 320 px y MediaPipe las revisa. La fracción de muestras
+con algún rostro es la "cobertura" del video.
+
+Con un tutorial grabado de pantalla o una charla de slides la cobertura queda en ~0 y
+el export usa el crop estático directamente, sin el pase de FaceReframer (que decodifica
+y pasa por MediaPipe cada frame de cada clip para terminar en el mismo center crop).
+El resultado se guarda en el estado del video; vale mientras el archivo no cambie.
+"""
+
+from __future__ import annotations
+
+_OPTIONAL_DEPENDENCY_ERROR = None
+try:
+    import numpy as np  # type: ignore
+    import mediapipe as mp  # type: ignore
+except Exception as e:
+    np = None  # type: ignore
+    mp = None  # type: ignore
+    _OPTIONAL_DEPENDENCY_ERROR = str(e)
+
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from src.utils.ffmpeg_runner import run_ffmpeg
+from src.utils.logger import get_logger
+from src.utils.media_info import probe_media
+
+logger = get_logger(__name__)
+
+FACE_PRESENCE_VERSION = 1
+
+# Muestras repartidas por todo el video (solo keyframes: no hay que decodificar GOPs)
+FACE_PRESENCE_SAMPLES = 36
+# Ancho de las muestras: MediaPipe (full-range) sigue encontrando rostros de plano medio
+FACE_PROBE_WIDTH = 320
+# Por debajo de esta cobertura no hago face tracking
+DEFAULT_FACE_COVERAGE_THRESHOLD = 0.2
+
+
+@dataclass(frozen=True)
+class FaceCoverage:
+    """Cuántas de las muestras de un video tienen al menos un rostro"""
+
+    source_size: int
+    source_mtime: float
+    samples: int
+    frames_with_face: int
+
+    @property
+    def coverage(self) -> float:
+        return self.frames_with_face / self.samples if self.samples else 0.0
+
+    def matches_source(self, video_path: str) -> bool:
+        """True si el archivo no cambió desde que lo sondeé"""
+        try:
+            stat = Path(video_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and abs(stat.st_mtime - self.source_mtime) < 1e-3
+
+    def summary(self) -> str:
+        return f"faces in {self.frames_with_face}/{self.samples} sampled frames ({self.coverage:.0%})"
+
+    def to_dict(self) -> dict:
+        return {
+            "version": FACE_PRESENCE_VERSION,
+            "source_size": self.source_size,
+            "source_mtime": self.source_mtime,
+            "samples": self.samples,
+            "frames_with_face": self.frames_with_face,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["FaceCoverage"]:
+        if not isinstance(data, dict) or data.get("version") != FACE_PRESENCE_VERSION:
+            return None
+        try:
+            return cls(
+                source_size=int(data["source_size"]),
+                source_mtime=float(data["source_mtime"]),
+                samples=int(data["samples"]),
+                frames_with_face=int(data["frames_with_face"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def _probe_frame_size(width: int, height: int) -> tuple:
+    """Tamaño de las muestras: FACE_PROBE_WIDTH de ancho, alto par con el aspecto de la fuente"""
+    probe_height = max(2, int(round(FACE_PROBE_WIDTH * height / width / 2)) * 2)
+    return FACE_PROBE_WIDTH, probe_height
+
+
+def sample_probe_frames(video_path: str, samples: int = FACE_PRESENCE_SAMPLES) -> Optional[List]:
+    """
+    Hasta `samples` frames RGB chicos repartidos por todo el video
+
+    ffmpeg decodifica solo keyframes (-skip_frame nokey), elige uno cada
+    duración/samples segundos y los escala a FACE_PROBE_WIDTH antes de escribirlos.
+
+    Returns:
+        Lista de arrays (alto, ancho, 3), o None si no pude leer el video
+    """
+    info = probe_media(str(video_path))
+    if info is None or info.duration <= 0 or not info.width or not info.height:
+        return None
+    width, height = info.display_size
+    probe_width, probe_height = _probe_frame_size(width, height)
+
+    fd, raw_path = tempfile.mkstemp(suffix=".rgb", prefix="face_probe_")
+    os.close(fd)
+    try:
+        cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-skip_frame",
+            "nokey",
+            "-i",
+            str(video_path),
+            "-map",
+            "0:v:0",
+            "-an",
+            "-vf",
+            f"fps={samples / info.duration:.6f},scale={probe_width}:{probe_height}",
+            "-frames:v",
+            str(samples),
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-y",
+            raw_path,
+        ]
+        result = run_ffmpeg(cmd, label=f"face probe {Path(video_path).name}")
+        if result.returncode != 0:
+            logger.warning(f"Face presence probe failed for {Path(video_path).name}: {result.stderr[-500:]}")
+            return None
+        data = np.fromfile(raw_path, dtype=np.uint8)
+    finally:
+        Path(raw_path).unlink(missing_ok=True)
+
+    frame_bytes = probe_width * probe_height * 3
+    count = data.size // frame_bytes
+    if count == 0:
+        return None
+    return list(data[: count * frame_bytes].reshape(count, probe_height, probe_width, 3))
+
+
+def probe_face_coverage(
+    video_path: str,
+    samples: int = FACE_PRESENCE_SAMPLES,
+    min_detection_confidence: float = 0.5,
+) -> Optional[FaceCoverage]:
+    """
+    Sondeo qué fracción del video tiene rostros
+
+    Returns:
+        FaceCoverage, o None si faltan dependencias o no pude muestrear el video
+        (en ese caso el export decide como siempre)
+    """
+    if np is None or mp is None:
+        logger.warning(f"Face presence probe unavailable: {_OPTIONAL_DEPENDENCY_ERROR}")
+        return None
+    try:
+        stat = Path(video_path).stat()
+    except OSError as e:
+        logger.warning(f"Cannot probe faces in {video_path}: {e}")
+        return None
+
+    frames = sample_probe_frames(video_path, samples)
+    if not frames:
+        return None
+
+    # Mismo modelo que FaceReframer (full-range): rostros lejanos también cuentan
+    with mp.solutions.face_detection.FaceDetection(
+        model_selection=1, min_detection_confidence=min_detection_confidence
+    ) as detector:
+        frames_with_face = sum(1 for frame in frames if detector.process(frame).detections)
+
+    coverage = FaceCoverage(
+        source_size=stat.st_size,
+        source_mtime=stat.st_mtime,
+        samples=len(frames),
+        frames_with_face=frames_with_face,
+    )
+    logger.info(f"Face presence probe for {Path(video_path).name}: {coverage.summary()}")
+    return coverage
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de detecciones de rostros por video fuente.
+
+Cada clip con face tracking detectaba rostros desde cero sobre su ventana: clips que
+se solapan, varios aspect ratios y cada re-export repetían el mismo trabajo de
+MediaPipe. Las detecciones no dependen de la estrategia ni de la safe zone (eso es
+cómo se mueve el crop, no dónde está el rostro), así que las guardo una vez por fuente.
+
+Formato: un .npy mapeado en memoria con una fila por frame de la fuente
+(timestamp = frame / fps, fuente de frame rate constante) y columnas
+[estado, x, y, ancho, alto]. El archivo nuevo está lleno de ceros (estado
+desconocido); las filas se llenan a medida que un clip pide su ventana y solo se
+detecta lo que falta. Al lado va un .json con la identidad de la fuente y los
+parámetros de detección: si alguno cambia, el cache se descarta.
+"""
+
+from __future__ import annotations
+
+_OPTIONAL_DEPENDENCY_ERROR = None
+try:
+    import numpy as np  # type: ignore
+except Exception as e:
+    np = None  # type: ignore
+    _OPTIONAL_DEPENDENCY_ERROR = str(e)
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.logger import get_logger
+from src.utils.media_info import probe_media
+
+logger = get_logger(__name__)
+
+FACE_TRACK_VERSION = 1
+
+# Estado de cada fila (0 = todavía no detecté ese frame: así arranca el archivo)
+FACE_UNKNOWN = 0
+FACE_ABSENT = 1
+FACE_PRESENT = 2
+
+
+class FaceTrack:
+    """
+    Detecciones del rostro más grande por frame de una fuente
+
+    Las cajas están en píxeles del frame de la fuente (display_size). Varios workers de
+    export pueden compartir la misma instancia: las escrituras van con lock.
+    """
+
+    def __init__(
+        self,
+        rows,
+        *,
+        fps: float,
+        width: int,
+        height: int,
+        min_detection_confidence: float,
+        detection_width: int,
+    ):
+        self.rows = rows
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.min_detection_confidence = min_detection_confidence
+        self.detection_width = detection_width
+        self._lock = threading.Lock()
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.rows)
+
+    def timestamp(self, frame_number: int) -> float:
+        return frame_number / self.fps
+
+    def is_known(self, frame_number: int) -> bool:
+        """True si ya detecté ese frame (con o sin rostro)"""
+        return 0 <= frame_number < self.frame_count and int(self.rows[frame_number, 0]) != FACE_UNKNOWN
+
+    def face(self, frame_number: int) -> Optional[Dict]:
+        """El rostro guardado para ese frame (mismo dict que FaceReframer), o None"""
+        if not 0 <= frame_number < self.frame_count:
+            return None
+        state, x, y, width, height = (int(v) for v in self.rows[frame_number])
+        if state != FACE_PRESENT:
+            return None
+        return {
+            'x': x,
+            'y': y,
+            'width': width,
+            'height': height,
+            'center_x': x + width // 2,
+            'center_y': y + height // 2,
+        }
+
+    def missing(self, frame_numbers: Iterable[int]) -> List[int]:
+        """Los frames pedidos (dentro del video) que todavía no detecté"""
+        return [
+            n for n in frame_numbers
+            if 0 <= n < self.frame_count and int(self.rows[n, 0]) == FACE_UNKNOWN
+        ]
+
+    def store(self, detections: Dict[int, Optional[Dict]]) -> None:
+        """Guardo las detecciones {frame: rostro o None} y las bajo a disco"""
+        with self._lock:
+            for frame_number, face in detections.items():
+                if not 0 <= frame_number < self.frame_count:
+                    continue
+                if face is None:
+                    self.rows[frame_number] = (FACE_ABSENT, 0, 0, 0, 0)
+                else:
+                    self.rows[frame_number] = (
+                        FACE_PRESENT, face['x'], face['y'], face['width'], face['height']
+                    )
+            flush = getattr(self.rows, "flush", None)
+            if flush is not None:
+                flush()
+
+    def matches_detector(self, min_detection_confidence: float, detection_width: int) -> bool:
+        """True si las filas salieron del mismo detector que pide el reframer"""
+        return (
+            abs(self.min_detection_confidence - min_detection_confidence) < 1e-6
+            and self.detection_width == detection_width
+        )
+
+
+def get_face_track_paths(transcript_path: str) -> tuple:
+    """
+    Rutas del cache de rostros de un video (datos, metadatos)
+
+    Lo guardo junto al transcript, como el índice de keyframes:
+    temp/video_transcript.json → temp/video_transcript_faces.npy (+ _faces.json)
+    """
+    transcript_file = Path(transcript_path)
+    return (
+        transcript_file.with_name(f"{transcript_file.stem}_faces.npy"),
+        transcript_file.with_name(f"{transcript_file.stem}_faces.json"),
+    )
+
+
+def open_face_track(
+    video_path: str,
+    transcript_path: Optional[str] = None,
+    *,
+    min_detection_confidence: float = 0.5,
+    detection_width: int = 320,
+) -> Optional[FaceTrack]:
+    """
+    Abro (o creo) el cache de rostros de una fuente
+
+    Con transcript_path el cache vive en disco junto al transcript y sirve para los
+    próximos exports; sin él queda en memoria y solo lo comparten los clips de este export.
+
+    Returns:
+        FaceTrack, o None si falta numpy o la fuente no es de frame rate constante
+        (sin eso un número de frame no es un timestamp)
+    """
+    if np is None:
+        logger.warning(f"Face track cache unavailable: {_OPTIONAL_DEPENDENCY_ERROR}")
+        return None
+    media = probe_media(str(video_path))
+    if media is None or not media.fps or not media.is_cfr:
+        return None
+    width, height = media.display_size
+    if not width or not height:
+        return None
+    frame_count = media.frame_count or int(media.duration * media.fps) + 1
+    if frame_count <= 0:
+        return None
+
+    track_args = dict(
+        fps=media.fps,
+        width=width,
+        height=height,
+        min_detection_confidence=min_detection_confidence,
+        detection_width=detection_width,
+    )
+    if not transcript_path:
+        return FaceTrack(np.zeros((frame_count, 5), dtype=np.int32), **track_args)
+
+    data_path, meta_path = get_face_track_paths(transcript_path)
+    try:
+        stat = Path(video_path).stat()
+    except OSError as e:
+        logger.warning(f"Cannot cache faces for {video_path}: {e}")
+        return None
+    meta = {
+        "version": FACE_TRACK_VERSION,
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+        "frame_count": frame_count,
+        **track_args,
+    }
+
+    try:
+        stored = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else None
+    except (OSError, ValueError):
+        stored = None
+    try:
+        if stored == meta and data_path.exists():
+            rows = np.load(data_path, mmap_mode="r+")
+            if rows.shape == (frame_count, 5) and rows.dtype == np.int32:
+                known = int(np.count_nonzero(rows[:, 0]))
+                logger.info(f"Face track cache for {Path(video_path).name}: {known}/{frame_count} frames known")
+                return FaceTrack(rows, **track_args)
+            del rows
+
+        # Fuente nueva o cambiada: archivo en ceros (todo desconocido) y metadatos después,
+        # así un corte a mitad de camino no deja metadatos apuntando a datos de otra fuente
+        meta_path.unlink(missing_ok=True)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        rows = np.lib.format.open_memmap(data_path, mode="w+", dtype=np.int32, shape=(frame_count, 5))
+        rows.flush()
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Face track cache unavailable for {Path(video_path).name} ({e}); keeping it in memory")
+        return FaceTrack(np.zeros((frame_count, 5), dtype=np.int32), **track_args)
+    return FaceTrack(rows, **track_args)
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+Supervisor común para procesos de ffmpeg.
+
+Todas las llamadas a ffmpeg pasan por acá en vez de subprocess.run(capture_output=True):
+
+- Agrego `-progress pipe:1 -nostats` y parseo los bloques key=value en FFmpegProgress
+  (frame, fps, speed, out_time) mientras el proceso corre.
+- Guardo solo una cola acotada de stderr (los errores de ffmpeg están al final).
+- Aplico plazos: uno total (timeout) y otro de estancamiento (sin progreso durante
+  stall_timeout segundos). Al vencer mato el proceso y marco timed_out.
+- Mido tiempo de CPU y RSS pico de cada invocación (wait4; None donde no existe).
+  Solo cosecho el proceso bajo un lock que también toman poll() y kill(): así nunca
+  se mezcla con el waitpid de Popen ni se manda una señal a un pid ya reusado.
+
+ffprobe no pasa por acá: son lecturas cortas que necesitan stdout completo.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes de stderr que conservo por invocación
+DEFAULT_STDERR_TAIL_BYTES = 64 * 1024
+
+# Sin un bloque de progreso nuevo en este tiempo, considero a ffmpeg colgado
+DEFAULT_STALL_TIMEOUT_SECONDS = 300.0
+
+ProgressHandler = Callable[["FFmpegProgress"], None]
+
+
+@dataclass(frozen=True)
+class FFmpegProgress:
+    """Un bloque de `-progress`: estado de la invocación en curso"""
+    label: str
+    frame: Optional[int] = None
+    fps: Optional[float] = None
+    speed: Optional[float] = None
+    out_time_seconds: Optional[float] = None
+    total_size: Optional[int] = None
+    finished: bool = False
+
+    def summary(self) -> str:
+        parts = []
+        if self.out_time_seconds is not None:
+            minutes, seconds = divmod(int(self.out_time_seconds), 60)
+            parts.append(f"{minutes:02d}:{seconds:02d}")
+        if self.fps is not None:
+            parts.append(f"{self.fps:.0f} fps")
+        if self.speed is not None:
+            parts.append(f"{self.speed:.2f}x")
+        return ", ".join(parts)
+
+
+@dataclass
+class FFmpegResult:
+    """
+    Resultado de una invocación; returncode/stdout/stderr como subprocess.CompletedProcess
+
+    stderr es solo la cola (DEFAULT_STDERR_TAIL_BYTES).
+    """
+    args: List[str]
+    returncode: int
+    stderr: str = ""
+    stdout: str = ""
+    label: str = ""
+    elapsed_seconds: float = 0.0
+    cpu_seconds: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    timed_out: bool = False
+    last_progress: Optional[FFmpegProgress] = None
+
+    def summary(self) -> str:
+        parts = [f"{self.elapsed_seconds:.1f}s wall"]
+        if self.cpu_seconds is not None:
+            parts.append(f"{self.cpu_seconds:.1f}s CPU")
+        if self.peak_rss_mb is not None:
+            parts.append(f"peak {self.peak_rss_mb:.0f} MB RSS")
+        if self.last_progress is not None and self.last_progress.speed is not None:
+            parts.append(f"{self.last_progress.speed:.2f}x")
+        if self.timed_out:
+            parts.append("timed out")
+        return ", ".join(parts)
+
+
+def _parse_out_time(value: str) -> Optional[float]:
+    """"00:01:02.500000" → 62.5"""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+def parse_progress_block(block: Dict[str, str], label: str = "") -> FFmpegProgress:
+    """Convierto un bloque key=value de -progress en FFmpegProgress (campos ausentes → None)"""
+
+    def _number(key: str, cast):
+        raw = (block.get(key) or "").strip().rstrip("x")
+        if not raw or raw == "N/A":
+            return None
+        try:
+            return cast(raw)
+        except ValueError:
+            return None
+
+    out_time = block.get("out_time")
+    out_time_seconds = _parse_out_time(out_time) if out_time and out_time != "N/A" else None
+    if out_time_seconds is None:
+        out_time_us = _number("out_time_us", int)
+        out_time_seconds = out_time_us / 1_000_000 if out_time_us is not None and out_time_us >= 0 else None
+
+    return FFmpegProgress(
+        label=label,
+        frame=_number("frame", int),
+        fps=_number("fps", float),
+        speed=_number("speed", float),
+        out_time_seconds=out_time_seconds,
+        total_size=_number("total_size", int),
+        finished=block.get("progress") == "end",
+    )
+
+
+def _with_progress_args(cmd: Sequence[str]) -> List[str]:
+    """Inserto -progress pipe:1 -nostats después del ejecutable (si no están ya)"""
+    cmd = list(cmd)
+    if "-progress" in cmd:
+        return cmd
+    return [
+        cmd[0],
+        "-nostats",
+        "-progress", "pipe:1",
+        *cmd[1:],
+    ]
+
+
+class FFmpegProcess:
+    """
+    Un proceso de ffmpeg supervisado
+
+    Para los llamados de una sola vez usar run_ffmpeg(). Esta clase sirve cuando hay
+    que alimentar stdin mientras corre (FFmpegVideoWriter) o leer su salida a medida
+    que la produce (read_stdout: frames crudos a pipe:1, sin -progress).
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str],
+        *,
+        label: Optional[str] = None,
+        timeout: Optional[float] = None,
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT_SECONDS,
+        on_progress: Optional[ProgressHandler] = None,
+        stdin: Optional[int] = None,
+        stderr_tail_bytes: int = DEFAULT_STDERR_TAIL_BYTES,
+        read_stdout: bool = False,
+    ):
+        # Con read_stdout, stdout es la salida de ffmpeg: no hay bloques de progreso
+        # (ni plazo de estancamiento que dependa de ellos)
+        self.args = [cmd[0], "-nostats", *cmd[1:]] if read_stdout else _with_progress_args(cmd)
+        self.label = label or os.path.basename(str(cmd[-1]))
+        self.timeout = timeout
+        self.stall_timeout = None if read_stdout else stall_timeout
+        self.on_progress = on_progress
+        self.last_progress: Optional[FFmpegProgress] = None
+        self.timed_out = False
+
+        self._stderr_tail: Deque[bytes] = deque()
+        self._stderr_tail_len = 0
+        self._stderr_tail_bytes = stderr_tail_bytes
+        self._last_activity = time.monotonic()
+        self._done = threading.Event()
+        # Cosechar (wait4/waitpid) y señalizar van siempre con este lock
+        self._reap_lock = threading.Lock()
+        self._result: Optional[FFmpegResult] = None
+        self._started = time.monotonic()
+
+        self.process = subprocess.Popen(
+            self.args,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.stdin = self.process.stdin
+        self.stdout = self.process.stdout if read_stdout else None
+
+        self._readers = [threading.Thread(target=self._read_stderr, name="ffmpeg-stderr", daemon=True)]
+        if not read_stdout:
+            self._readers.append(
+                threading.Thread(target=self._read_progress, name="ffmpeg-progress", daemon=True)
+            )
+        for reader in self._readers:
+            reader.start()
+        if timeout or self.stall_timeout:
+            threading.Thread(target=self._watchdog, name="ffmpeg-watchdog", daemon=True).start()
+
+    def poll(self) -> Optional[int]:
+        """
+        Código de salida si ya terminó, None si sigue corriendo
+
+        Miro con WNOWAIT: el proceso queda sin cosechar para que _reap lea su rusage.
+        """
+        if self._result is not None:
+            return self._result.returncode
+        with self._reap_lock:
+            if self.process.returncode is not None or not hasattr(os, "waitid"):
+                return self.process.poll()
+            try:
+                info = os.waitid(os.P_PID, self.process.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            except ChildProcessError:
+                return self.process.poll()
+            if info is None or info.si_pid == 0:
+                return None
+            return info.si_status if info.si_code == os.CLD_EXITED else -info.si_status
+
+    def _read_progress(self) -> None:
+        block: Dict[str, str] = {}
+        for raw_line in iter(self.process.stdout.readline, b""):
+            self._last_activity = time.monotonic()
+            key, sep, value = raw_line.decode("utf-8", errors="replace").strip().partition("=")
+            if not sep:
+                continue
+            block[key] = value
+            if key != "progress":
+                continue
+            progress = parse_progress_block(block, self.label)
+            block = {}
+            self.last_progress = progress
+            if self.on_progress is not None:
+                try:
+                    self.on_progress(progress)
+                except Exception as e:
+                    logger.debug(f"ffmpeg progress handler failed: {e}")
+
+    def _read_stderr(self) -> None:
+        for chunk in iter(lambda: self.process.stderr.read(4096), b""):
+            self._stderr_tail.append(chunk)
+            self._stderr_tail_len += len(chunk)
+            while self._stderr_tail_len > self._stderr_tail_bytes and len(self._stderr_tail) > 1:
+                self._stderr_tail_len -= len(self._stderr_tail.popleft())
+
+    def _watchdog(self) -> None:
+        while not self._done.wait(1.0):
+            now = time.monotonic()
+            reason = None
+            if self.timeout and now - self._started > self.timeout:
+                reason = f"exceeded {self.timeout:.0f}s deadline"
+            elif self.stall_timeout and now - self._last_activity > self.stall_timeout:
+                reason = f"no progress for {self.stall_timeout:.0f}s"
+            if reason:
+                logger.warning(f"Killing ffmpeg ({self.label}): {reason}")
+                self.timed_out = True
+                self.kill()
+                return
+
+    def kill(self) -> None:
+        # Con el lock el pid no puede haberse cosechado (y reusado) entre el chequeo y la señal
+        with self._reap_lock:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+
+    def _reap(self) -> tuple:
+        """
+        Espero al proceso; con wait4 obtengo también su uso de CPU y memoria
+
+        Bloqueo en waitid(WNOWAIT), que no cosecha, así el watchdog puede matarlo
+        mientras espero; el wait4 (ya sin bloquear) va bajo el lock.
+        """
+        if not hasattr(os, "wait4") or not hasattr(os, "waitid"):
+            return self.process.wait(), None, None
+        try:
+            os.waitid(os.P_PID, self.process.pid, os.WEXITED | os.WNOWAIT)
+        except ChildProcessError:
+            pass
+        with self._reap_lock:
+            if self.process.returncode is not None:
+                # Lo cosechó Popen (kill() llama a poll()): sin rusage
+                return self.process.returncode, None, None
+            try:
+                _, status, usage = os.wait4(self.process.pid, 0)
+            except ChildProcessError:
+                return self.process.wait(), None, None
+            self.process.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss: KiB en Linux, bytes en macOS
+        rss_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        return self.process.returncode, usage.ru_utime + usage.ru_stime, rss_bytes / (1024 * 1024)
+
+    def wait(self, timeout: Optional[float] = None) -> FFmpegResult:
+        """
+        Espero a que termine y devuelvo el resultado (idempotente)
+
+        Args:
+            timeout: Plazo adicional desde ahora; al vencer mato el proceso
+        """
+        if self._result is not None:
+            return self._result
+
+        killer = None
+        if timeout is not None:
+            def _expire() -> None:
+                logger.warning(f"Killing ffmpeg ({self.label}): did not finish within {timeout:.0f}s")
+                self.timed_out = True
+                self.kill()
+
+            killer = threading.Timer(timeout, _expire)
+            killer.daemon = True
+            killer.start()
+
+        try:
+            returncode, cpu_seconds, peak_rss_mb = self._reap()
+        finally:
+            if killer is not None:
+                killer.cancel()
+            self._done.set()
+
+        for reader in self._readers:
+            reader.join(timeout=5)
+
+        stderr = b"".join(self._stderr_tail).decode("utf-8", errors="replace")
+        if self.timed_out:
+            stderr += f"\n[ffmpeg killed: timed out ({self.label})]"
+
+        self._result = FFmpegResult(
+            args=self.args,
+            returncode=returncode,
+            stderr=stderr,
+            label=self.label,
+            elapsed_seconds=time.monotonic() - self._started,
+            cpu_seconds=cpu_seconds,
+            peak_rss_mb=peak_rss_mb,
+            timed_out=self.timed_out,
+            last_progress=self.last_progress,
+        )
+        logger.info(f"ffmpeg {self.label}: {self._result.summary()}")
+        return self._result
+
+
+def run_ffmpeg(
+    cmd: Sequence[str],
+    *,
+    label: Optional[str] = None,
+    timeout: Optional[float] = None,
+    stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT_SECONDS,
+    on_progress: Optional[ProgressHandler] = None,
+    stderr_tail_bytes: int = DEFAULT_STDERR_TAIL_BYTES,
+) -> FFmpegResult:
+    """
+    Corro ffmpeg bajo supervisión y espero el resultado
+
+    Args:
+        cmd: Comando completo (empezando por "ffmpeg")
+        label: Nombre para logs y progreso (default: archivo de salida)
+        timeout: Plazo total en segundos (None = sin plazo)
+        stall_timeout: Segundos sin progreso antes de matar el proceso (None = sin límite)
+        on_progress: Llamado con cada bloque de progreso (desde un thread lector)
+
+    Returns:
+        FFmpegResult (si no se pudo lanzar ffmpeg, returncode=-1 y el error en stderr)
+    """
+    try:
+        process = FFmpegProcess(
+            cmd,
+            label=label,
+            timeout=timeout,
+            stall_timeout=stall_timeout,
+            on_progress=on_progress,
+            stdin=subprocess.DEVNULL,
+            stderr_tail_bytes=stderr_tail_bytes,
+        )
+    except OSError as e:
+        logger.error(f"Could not start ffmpeg: {e}")
+        return FFmpegResult(args=list(cmd), returncode=-1, stderr=str(e), label=label or "")
+    return process.wait()
@@ -0,0 +1,695 @@
+# -*- coding: utf-8 -*-
+"""
+Filtergraphs de ffmpeg armados como grafo en vez de strings pegados a mano.
+
+Cada camino de export describe su video con FilterGraph: cadenas de filtros con
+labels de entrada/salida, más overlays de logo. build() aplica los pases de
+optimización y serializa el grafo:
+
+1. Descarto no-ops (null, scale/crop al tamaño que el frame ya tiene) y junto
+   scale/crop consecutivos.
+2. El logo se escala una sola vez a un tamaño fijo por ancho de salida, en vez de un
+   scale2ref que lo reescala en cada frame (y que en ffmpeg 7 corta el video cuando
+   la imagen llega a EOF). Si no conozco el ancho, queda scale2ref como fallback.
+3. La conversión a yuv420p va después del frame más chico del camino: ahí la hace
+   el mismo scale, y overlay/subtítulos ya trabajan en 8 bits 4:2:0.
+4. Uno las cadenas lineales (label consumido una sola vez) y serializo: -vf si el
+   grafo es una sola cadena desde un stream, -filter_complex si no.
+
+Los tamaños se propagan desde los inputs declarados con set_input(); sin tamaño,
+los pases que dependen de él no hacen nada y el grafo sale igual que se armó.
+"""
+
+from __future__ import annotations
+
+import ast
+import copy
+import operator
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# Posición del logo → expresión de overlay (margen de 20 px)
+LOGO_OVERLAY_POSITIONS = {
+    "top-right": "W-w-20:20",
+    "top-left": "20:20",
+    "bottom-right": "W-w-20:H-h-20",
+    "bottom-left": "20:H-h-20",
+}
+
+# Filtros que no cambian el tamaño del frame (el primer input en overlay)
+SIZE_PRESERVING_FILTERS = frozenset(
+    {
+        "null",
+        "copy",
+        "format",
+        "select",
+        "setpts",
+        "settb",
+        "setsar",
+        "trim",
+        "fps",
+        "subtitles",
+        "ass",
+        "overlay",
+        "drawtext",
+        "split",
+        "sendcmd",
+    }
+)
+
+_STREAM_LABEL = re.compile(r"^\[\d+:[vas](?::\d+)?\]$")
+_EXPR_CHARS = re.compile(r"^[0-9a-z_\.\+\-\*/\(\)\s]+$")
+_EXPR_NAMES = re.compile(r"[a-z_]+")
+
+# Aritmética permitida en expresiones de tamaño (lo que usan los exports: iw*9/16, ih/2...)
+_EXPR_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_EXPR_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+# Sin pix_fmt conocido asumo 4:2:0, que es lo que traen (y lo que exportan) los videos
+_DEFAULT_CHROMA_SHIFT = (1, 1)
+
+Size = Tuple[int, int]
+
+
+def split_filter_chain(chain: str) -> List[str]:
+    """
+    Separo "a=1,b='x,y'" en filtros, respetando comillas simples y comas escapadas
+    """
+    filters: List[str] = []
+    current: List[str] = []
+    quoted = False
+    escaped = False
+    for char in chain:
+        if escaped:
+            current.append(char)
+            escaped = False
+            continue
+        if char == "\\":
+            current.append(char)
+            escaped = True
+            continue
+        if char == "'":
+            quoted = not quoted
+        if char == "," and not quoted:
+            filters.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        filters.append("".join(current))
+    return [f.strip() for f in filters if f.strip()]
+
+
+def logo_overlay_width(main_width: int, scale: float) -> int:
+    """Ancho del logo escalado: scale × ancho del video, mínimo 2 px"""
+    return max(2, int(round(main_width * scale)))
+
+
+def _filter_name(spec: str) -> str:
+    # crop@reframe es un crop con nombre de instancia (destino de sendcmd)
+    return spec.split("=", 1)[0].split("@", 1)[0].strip()
+
+
+def _filter_options(spec: str) -> Tuple[List[str], Dict[str, str]]:
+    """Opciones de un filtro: (posicionales, con nombre)"""
+    if "=" not in spec:
+        return [], {}
+    positional: List[str] = []
+    named: Dict[str, str] = {}
+    for option in spec.split("=", 1)[1].split(":"):
+        if "=" in option:
+            key, value = option.split("=", 1)
+            named[key.strip()] = value.strip()
+        else:
+            positional.append(option.strip())
+    return positional, named
+
+
+def _eval_node(node: ast.AST, variables: Dict[str, float]) -> float:
+    """Evalúo un nodo del árbol: solo números, variables conocidas y + - * /"""
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body, variables)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return float(node.value)
+    if isinstance(node, ast.Name) and node.id in variables:
+        return float(variables[node.id])
+    if isinstance(node, ast.BinOp) and type(node.op) in _EXPR_BINARY_OPS:
+        left = _eval_node(node.left, variables)
+        right = _eval_node(node.right, variables)
+        return _EXPR_BINARY_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _EXPR_UNARY_OPS:
+        return _EXPR_UNARY_OPS[type(node.op)](_eval_node(node.operand, variables))
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def _eval_dimension(expr: str, size: Optional[Size]) -> Optional[float]:
+    """Evalúo una expresión de tamaño simple (números, iw/ih) o None si no puedo"""
+    expr = expr.strip().strip("'")
+    if not expr or not _EXPR_CHARS.match(expr):
+        return None
+    names = set(_EXPR_NAMES.findall(expr))
+    if names and size is None:
+        return None
+    variables: Dict[str, float] = {}
+    if size is not None:
+        variables = {"iw": size[0], "ih": size[1], "in_w": size[0], "in_h": size[1]}
+    if not names <= set(variables):
+        return None
+    try:
+        return _eval_node(ast.parse(expr, mode="eval"), variables)
+    except (SyntaxError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _size_options(spec: str, width_keys: Sequence[str], height_keys: Sequence[str]) -> Tuple[Optional[str], Optional[str], Dict[str, str]]:
+    positional, named = _filter_options(spec)
+    width = next((named.pop(k) for k in width_keys if k in named), positional[0] if positional else None)
+    height = next((named.pop(k) for k in height_keys if k in named), positional[1] if len(positional) > 1 else None)
+    return width, height, named
+
+
+def _scale_size(spec: str, size: Optional[Size]) -> Optional[Size]:
+    """Tamaño de salida de un scale (incluye -1/-n con el aspecto de la entrada)"""
+    width_expr, height_expr, _ = _size_options(spec, ("w", "width"), ("h", "height"))
+    if width_expr is None or height_expr is None:
+        return None
+    width = _eval_dimension(width_expr, size)
+    height = _eval_dimension(height_expr, size)
+    if width is None or height is None:
+        return None
+    width_i, height_i = int(width), int(height)
+    if width_i > 0 and height_i > 0:
+        return width_i, height_i
+    if size is None or (width_i <= 0 and height_i <= 0):
+        return None
+    # Como scale_eval de ffmpeg: -n mantiene el aspecto con un múltiplo de n
+    if width_i <= 0:
+        factor = -width_i
+        return int(round(height_i * size[0] / (size[1] * factor))) * factor, height_i
+    factor = -height_i
+    return width_i, int(round(width_i * size[1] / (size[0] * factor))) * factor
+
+
+def _chroma_shift(pix_fmt: Optional[str]) -> Tuple[int, int]:
+    """Submuestreo de croma (log2 horizontal, log2 vertical) de un pix_fmt"""
+    if not pix_fmt:
+        return _DEFAULT_CHROMA_SHIFT
+    if "420" in pix_fmt or pix_fmt.startswith(("nv12", "nv21", "p010", "p016")):
+        return 1, 1
+    if "422" in pix_fmt:
+        return 1, 0
+    if "411" in pix_fmt:
+        return 2, 0
+    if "410" in pix_fmt:
+        return 2, 2
+    return 0, 0
+
+
+def _crop_size(spec: str, size: Optional[Size], pix_fmt: Optional[str] = None) -> Optional[Size]:
+    """
+    Tamaño de salida de un crop, redondeado como ffmpeg
+
+    ffmpeg redondea la expresión al entero más cercano (mitades al par) y, salvo
+    exact=1, la baja a la grilla de croma: en 4:2:0, ih*9/16 sobre 1080 da 608 y
+    un crop impar pierde un píxel.
+    """
+    width_expr, height_expr, named = _size_options(spec, ("w", "out_w"), ("h", "out_h"))
+    width = _eval_dimension(width_expr or "iw", size)
+    height = _eval_dimension(height_expr or "ih", size)
+    if width is None or height is None:
+        return None
+    width_i, height_i = round(width), round(height)
+    if named.get("exact", "0").lower() not in ("1", "true"):
+        hshift, vshift = _chroma_shift(pix_fmt)
+        width_i &= ~((1 << hshift) - 1)
+        height_i &= ~((1 << vshift) - 1)
+    return width_i, height_i
+
+
+def filter_output_size(spec: str, size: Optional[Size], pix_fmt: Optional[str] = None) -> Optional[Size]:
+    """Tamaño del frame después del filtro, o None si no lo sé (pix_fmt: el de su entrada)"""
+    name = _filter_name(spec)
+    if name in SIZE_PRESERVING_FILTERS:
+        return size
+    if name == "scale":
+        return _scale_size(spec, size)
+    if name == "crop":
+        return _crop_size(spec, size, pix_fmt)
+    return None
+
+
+def filter_output_pix_fmt(spec: str, pix_fmt: Optional[str]) -> Optional[str]:
+    """pix_fmt del frame después del filtro (solo format= lo cambia a uno conocido)"""
+    if _filter_name(spec) != "format":
+        return pix_fmt
+    positional, named = _filter_options(spec)
+    formats = named.get("pix_fmts") or (positional[0] if positional else "")
+    # Con varios formatos posibles ("a|b") no sé cuál elige ffmpeg
+    return formats if formats and "|" not in formats else None
+
+
+def _is_plain_resize(spec: str) -> bool:
+    """scale/crop que solo fija el tamaño (sin flags, posición ni formato)"""
+    name = _filter_name(spec)
+    if name == "scale":
+        _, _, extra = _size_options(spec, ("w", "width"), ("h", "height"))
+        positional, _ = _filter_options(spec)
+        return not extra and len(positional) <= 2
+    if name == "crop":
+        _, _, extra = _size_options(spec, ("w", "out_w"), ("h", "out_h"))
+        positional, _ = _filter_options(spec)
+        return not extra and len(positional) <= 2
+    return False
+
+
+@dataclass
+class FilterChain:
+    """Una cadena del filtergraph: [in...]f1,f2,...[out...]"""
+
+    inputs: List[str]
+    filters: List[str]
+    outputs: List[str]
+
+    def serialize(self) -> str:
+        return f"{''.join(self.inputs)}{','.join(self.filters or ['null'])}{''.join(self.outputs)}"
+
+
+@dataclass
+class LogoOverlay:
+    """Overlay de un logo cuyo escalado resuelve build() según el ancho del video"""
+
+    video: str
+    logo: str
+    output: str
+    scale: float
+    position: str = "top-right"
+
+
+@dataclass
+class _InputInfo:
+    size: Optional[Size] = None
+    pix_fmt: Optional[str] = None
+
+
+@dataclass
+class FilterGraph:
+    """
+    Constructor de filtergraphs de ffmpeg con pases de optimización
+
+    Ejemplo:
+        graph = FilterGraph()
+        graph.set_input("[0:v]", size=(1920, 1080), pix_fmt="yuv420p")
+        video = graph.chain("[0:v]", "crop=ih*9/16:ih,scale=1080:1920")
+        video = graph.overlay_logo(video, "[1:v]", scale=0.1)
+        args = graph.filter_args(video, pix_fmt="yuv420p")
+    """
+
+    items: List[Union[FilterChain, LogoOverlay]] = field(default_factory=list)
+    _inputs: Dict[str, _InputInfo] = field(default_factory=dict)
+    _counters: Dict[str, int] = field(default_factory=dict)
+
+    # ------------------------------------------------------------------ armado
+
+    def set_input(self, label: str, *, size: Optional[Size] = None, pix_fmt: Optional[str] = None) -> None:
+        """Declaro el tamaño (de display) y el pix_fmt de un stream de entrada"""
+        self._inputs[label] = _InputInfo(size=tuple(size) if size else None, pix_fmt=pix_fmt)
+
+    def new_label(self, prefix: str = "v") -> str:
+        count = self._counters.get(prefix, 0)
+        self._counters[prefix] = count + 1
+        return f"[{prefix}{count}]"
+
+    def chain(
+        self,
+        inputs: Union[str, Sequence[str]],
+        filters: Union[str, Sequence[str], None],
+        outputs: Union[str, Sequence[str], None] = None,
+    ) -> str:
+        """
+        Agrego una cadena y devuelvo su (primer) label de salida
+
+        filters puede ser un string "a,b" o una lista (cuyos elementos también pueden
+        traer comas); todo se separa respetando comillas.
+        """
+        input_labels = [inputs] if isinstance(inputs, str) else list(inputs)
+        if filters is None:
+            filter_list: List[str] = []
+        elif isinstance(filters, str):
+            filter_list = split_filter_chain(filters)
+        else:
+            filter_list = [part for f in filters if f for part in split_filter_chain(f)]
+        if outputs is None:
+            output_labels = [self.new_label("gv")]
+        elif isinstance(outputs, str):
+            output_labels = [outputs]
+        else:
+            output_labels = list(outputs)
+        self.items.append(FilterChain(inputs=input_labels, filters=filter_list, outputs=output_labels))
+        return output_labels[0]
+
+    def split(self, source: str, outputs: Sequence[str], *, audio: bool = False) -> List[str]:
+        """split/asplit de un label en varios (uno por rama)"""
+        name = "asplit" if audio else "split"
+        self.chain(source, f"{name}={len(outputs)}", list(outputs))
+        return list(outputs)
+
+    def overlay_logo(
+        self,
+        video: str,
+        logo: str,
+        *,
+        scale: float,
+        position: str = "top-right",
+        output: Optional[str] = None,
+    ) -> str:
+        """Superpongo el logo (escalado a scale × ancho del video) y devuelvo el label"""
+        output = output or self.new_label("gv")
+        self.items.append(LogoOverlay(video=video, logo=logo, output=output, scale=scale, position=position))
+        return output
+
+    # ------------------------------------------------------------------ salida
+
+    def build(self, outputs: Sequence[str], *, pix_fmt: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        Optimizo y serializo el grafo
+
+        Args:
+            outputs: Labels que van a un -map (no se funden ni se descartan)
+            pix_fmt: Formato que espera el encoder; si el input declarado tiene otro,
+                agrego la conversión en el punto más barato del camino
+
+        Returns:
+            (filtergraph, map de cada output en orden: "[label]" o "0:v" si no hay filtros)
+        """
+        optimized = _Optimizer(copy.deepcopy(self.items), dict(self._inputs), list(outputs), dict(self._counters))
+        optimized.run(pix_fmt=pix_fmt)
+        graph = ";".join(c.serialize() for c in optimized.chains)
+        return graph, [_map_spec(optimized.resolve(label)) for label in outputs]
+
+    def filter_args(self, output: str, *, pix_fmt: Optional[str] = None) -> List[str]:
+        """
+        Args de ffmpeg para un solo output de video: -vf si alcanza, si no -filter_complex
+
+        Returns:
+            ["-vf", chain, "-map", "0:v"], ["-filter_complex", graph, "-map", label]
+            o ["-map", "0:v"] sin filtros
+        """
+        optimized = _Optimizer(copy.deepcopy(self.items), dict(self._inputs), [output], dict(self._counters))
+        optimized.run(pix_fmt=pix_fmt)
+        chains = optimized.chains
+        final = optimized.resolve(output)
+        if not chains:
+            return ["-map", _map_spec(final)]
+        if len(chains) == 1 and len(chains[0].inputs) == 1 and _STREAM_LABEL.match(chains[0].inputs[0]):
+            only = chains[0]
+            return ["-vf", ",".join(only.filters or ["null"]), "-map", _map_spec(only.inputs[0])]
+        return ["-filter_complex", ";".join(c.serialize() for c in chains), "-map", _map_spec(final)]
+
+
+def _map_spec(label: str) -> str:
+    """Un stream de entrada se mapea sin corchetes ("0:v"); un label con corchetes"""
+    return label[1:-1] if _STREAM_LABEL.match(label) else label
+
+
+class _Optimizer:
+    """Pases de optimización sobre una copia de los ítems de un FilterGraph"""
+
+    def __init__(
+        self,
+        items: List[Union[FilterChain, LogoOverlay]],
+        inputs: Dict[str, _InputInfo],
+        outputs: List[str],
+        counters: Dict[str, int],
+    ):
+        self.items = items
+        self.inputs = inputs
+        self.outputs = outputs
+        self.counters = counters
+        self.aliases: Dict[str, str] = {}
+        self.chains: List[FilterChain] = []
+
+    def _new_label(self, prefix: str) -> str:
+        count = self.counters.get(prefix, 0)
+        self.counters[prefix] = count + 1
+        return f"[{prefix}{count}]"
+
+    def resolve(self, label: str) -> str:
+        while label in self.aliases:
+            label = self.aliases[label]
+        return label
+
+    def run(self, *, pix_fmt: Optional[str]) -> None:
+        self._simplify_chains()
+        self._resolve_logo_overlays()
+        if pix_fmt:
+            self._place_format(pix_fmt)
+        self._fuse_linear_chains()
+        self._drop_empty_chains()
+
+    # ------------------------------------------------------------------ tamaños
+
+    def _sizes(self) -> Dict[str, Optional[Size]]:
+        """Propago el tamaño de cada label en el orden de armado"""
+        sizes: Dict[str, Optional[Size]] = {label: info.size for label, info in self.inputs.items()}
+        formats = self._input_formats()
+        for item in self.items:
+            if isinstance(item, LogoOverlay):
+                sizes[item.output] = sizes.get(item.video)
+                formats[item.output] = formats.get(item.video)
+                continue
+            size = sizes.get(item.inputs[0]) if item.inputs else None
+            pix_fmt = formats.get(item.inputs[0]) if item.inputs else None
+            for spec in item.filters:
+                size = filter_output_size(spec, size, pix_fmt)
+                pix_fmt = filter_output_pix_fmt(spec, pix_fmt)
+            for label in item.outputs:
+                sizes[label] = size
+                formats[label] = pix_fmt
+        return sizes
+
+    def _input_formats(self) -> Dict[str, Optional[str]]:
+        return {label: info.pix_fmt for label, info in self.inputs.items()}
+
+    # ------------------------------------------------------------------ pase 1
+
+    def _simplify_chains(self) -> None:
+        """Saco null y scale/crop no-op; junto scale/crop consecutivos"""
+        sizes: Dict[str, Optional[Size]] = {label: info.size for label, info in self.inputs.items()}
+        formats = self._input_formats()
+        for item in self.items:
+            if isinstance(item, LogoOverlay):
+                sizes[item.output] = sizes.get(item.video)
+                formats[item.output] = formats.get(item.video)
+                continue
+            size = sizes.get(item.inputs[0]) if item.inputs else None
+            pix_fmt = formats.get(item.inputs[0]) if item.inputs else None
+            kept: List[Tuple[str, Optional[Size], Optional[Size]]] = []  # (filtro, tamaño in, tamaño out)
+            for spec in item.filters:
+                name = _filter_name(spec)
+                out_size = filter_output_size(spec, size, pix_fmt)
+                pix_fmt = filter_output_pix_fmt(spec, pix_fmt)
+                if name == "null":
+                    continue
+                if _is_plain_resize(spec) and size is not None and out_size == size:
+                    continue
+                previous = kept[-1] if kept else None
+                if (
+                    previous is not None
+                    and _filter_name(previous[0]) == name
+                    and _is_plain_resize(spec)
+                    and _is_plain_resize(previous[0])
+                    and out_size is not None
+                ):
+                    if name == "scale":
+                        # scale seguido de scale de tamaño fijo: el primero sobra
+                        kept[-1] = (f"scale={out_size[0]}:{out_size[1]}", previous[1], out_size)
+                        size = out_size
+                        continue
+                    if name == "crop" and previous[1] is not None:
+                        # Dos crops centrados equivalen a uno centrado con el tamaño final
+                        kept[-1] = (f"crop={out_size[0]}:{out_size[1]}", previous[1], out_size)
+                        size = out_size
+                        continue
+                kept.append((spec, size, out_size))
+                size = out_size
+            item.filters = [spec for spec, _, _ in kept]
+            for label in item.outputs:
+                sizes[label] = size
+                formats[label] = pix_fmt
+
+    # ------------------------------------------------------------------ pase 2
+
+    def _resolve_logo_overlays(self) -> None:
+        """Reemplazo los overlays de logo por cadenas: escalado fijo compartido o scale2ref"""
+        sizes = self._sizes()
+        overlays = [item for item in self.items if isinstance(item, LogoOverlay)]
+        if not overlays:
+            self.chains = [item for item in self.items if isinstance(item, FilterChain)]
+            return
+
+        # Por logo: anchos distintos (un scale fijo por ancho) y cuántos overlays sin ancho
+        by_logo: Dict[str, Dict[Optional[int], List[LogoOverlay]]] = {}
+        for overlay in overlays:
+            main_size = sizes.get(overlay.video)
+            width = logo_overlay_width(main_size[0], overlay.scale) if main_size else None
+            by_logo.setdefault(overlay.logo, {}).setdefault(width, []).append(overlay)
+
+        logo_labels: Dict[int, str] = {}  # id(overlay) -> label del logo listo (o crudo para scale2ref)
+        prepared: List[FilterChain] = []
+        for logo, groups in by_logo.items():
+            uses: List[Tuple[Optional[int], List[LogoOverlay]]] = []
+            for width, group in groups.items():
+                if width is None:
+                    uses.extend((None, [overlay]) for overlay in group)
+                else:
+                    uses.append((width, group))
+            sources = [logo]
+            if len(uses) > 1:
+                sources = [self._new_label("logo_src") for _ in uses]
+                prepared.append(FilterChain(inputs=[logo], filters=[f"split={len(uses)}"], outputs=sources))
+            for source, (width, group) in zip(sources, uses):
+                if width is None:
+                    logo_labels[id(group[0])] = source
+                    continue
+                labels = [self._new_label("logo") for _ in group]
+                filters = [f"scale={width}:-1"]
+                if len(group) > 1:
+                    filters.append(f"split={len(group)}")
+                prepared.append(FilterChain(inputs=[source], filters=filters, outputs=labels))
+                for overlay, label in zip(group, labels):
+                    logo_labels[id(overlay)] = label
+
+        # Los logos preparados van justo antes del primer overlay
+        chains: List[FilterChain] = []
+        for item in self.items:
+            if isinstance(item, FilterChain):
+                chains.append(item)
+                continue
+            chains.extend(prepared)
+            prepared = []
+            position = LOGO_OVERLAY_POSITIONS.get(item.position, LOGO_OVERLAY_POSITIONS["top-right"])
+            logo_label = logo_labels[id(item)]
+            if sizes.get(item.video) is not None:
+                chains.append(FilterChain(inputs=[item.video, logo_label], filters=[f"overlay={position}"], outputs=[item.output]))
+                continue
+            # Sin el ancho del video: scale2ref (reescala el logo en cada frame)
+            logo_scaled = self._new_label("logo_scaled")
+            video_for_overlay = self._new_label("video_for_overlay")
+            chains.append(
+                FilterChain(
+                    inputs=[logo_label, item.video],
+                    filters=[f"scale2ref=w=main_w*{item.scale}:h=-1"],
+                    outputs=[logo_scaled, video_for_overlay],
+                )
+            )
+            chains.append(
+                FilterChain(inputs=[video_for_overlay, logo_scaled], filters=[f"overlay={position}"], outputs=[item.output])
+            )
+        self.chains = chains
+
+    # ------------------------------------------------------------------ pase 3
+
+    def _producer(self, label: str) -> Optional[FilterChain]:
+        return next((c for c in self.chains if label in c.outputs), None)
+
+    def _place_format(self, pix_fmt: str) -> None:
+        """
+        Agrego format=pix_fmt en el punto más barato del camino a cada output
+
+        Justo después de un scale la conversión la hace el mismo scale (sin otra pasada):
+        elijo el scale de menor salida. Sin scales, va donde el frame es más chico (un
+        crop no copia píxeles). Sin tamaños, después del último scale o al principio.
+        """
+        self.items = list(self.chains)
+        sizes = self._sizes()
+        for output in self.outputs:
+            # Camino (cadena, índice del filtro) desde el input hasta el output
+            path: List[Tuple[FilterChain, int]] = []
+            label = output
+            source: Optional[str] = None
+            while True:
+                producer = self._producer(label)
+                if producer is None:
+                    source = label
+                    break
+                path[:0] = [(producer, i) for i in range(len(producer.filters))]
+                path.insert(0, (producer, -1))
+                if not producer.inputs:
+                    break
+                label = producer.inputs[0]
+            info = self.inputs.get(source or "")
+            if info is None or not info.pix_fmt or info.pix_fmt == pix_fmt:
+                continue
+            if any(_filter_name(c.filters[i]) == "format" for c, i in path if i >= 0):
+                continue
+            if not path:
+                continue
+
+            # Candidatos: después de cada filtro, con el área del frame en ese punto
+            candidates: List[Tuple[Tuple[FilterChain, int], Optional[int], bool]] = []
+            size = info.size
+            for chain, index in path:
+                if index >= 0:
+                    size = filter_output_size(chain.filters[index], size, info.pix_fmt)
+                elif chain.inputs:
+                    size = sizes.get(chain.inputs[0], size)
+                after_scale = index >= 0 and _filter_name(chain.filters[index]) == "scale"
+                candidates.append(((chain, index), size[0] * size[1] if size else None, after_scale))
+            # Pegado a un scale la conversión sale gratis; si no, donde el frame es más chico
+            pool = [c for c in candidates if c[2]] or candidates
+            known = [c for c in pool if c[1] is not None]
+            if known:
+                best = min(known, key=lambda c: c[1])[0]
+            else:
+                best = pool[-1][0] if pool is not candidates else candidates[0][0]
+            chain, index = best
+            chain.filters.insert(index + 1, f"format={pix_fmt}")
+        self.items = []
+
+    # ------------------------------------------------------------------ pase 4
+
+    def _consumers(self, label: str) -> List[FilterChain]:
+        return [c for c in self.chains if label in c.inputs]
+
+    def _fuse_linear_chains(self) -> None:
+        """[a]f1[x];[x]f2[b] → [a]f1,f2[b] si x se consume una sola vez"""
+        changed = True
+        while changed:
+            changed = False
+            for chain in list(self.chains):
+                if len(chain.outputs) != 1 or chain.outputs[0] in self.outputs:
+                    continue
+                consumers = self._consumers(chain.outputs[0])
+                if len(consumers) != 1:
+                    continue
+                nxt = consumers[0]
+                if nxt is chain or len(nxt.inputs) != 1:
+                    continue
+                if chain.filters and _filter_name(chain.filters[-1]) in ("split", "asplit"):
+                    continue
+                chain.filters.extend(nxt.filters)
+                chain.outputs = nxt.outputs
+                self.chains.remove(nxt)
+                changed = True
+                break
+
+    def _drop_empty_chains(self) -> None:
+        """Una cadena sin filtros se reemplaza por su input (si el label no queda repetido)"""
+        for chain in list(self.chains):
+            if chain.filters or len(chain.inputs) != 1 or len(chain.outputs) != 1:
+                continue
+            source, target = chain.inputs[0], chain.outputs[0]
+            other_uses = len(self._consumers(source)) - 1 + (1 if source in self.outputs else 0)
+            target_uses = len(self._consumers(target)) + (1 if target in self.outputs else 0)
+            if other_uses + target_uses > 1:
+                continue
+            self.chains.remove(chain)
+            for consumer in self._consumers(target):
+                consumer.inputs = [source if label == target else label for label in consumer.inputs]
+            self.aliases[target] = source
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Jump cuts: saco los silencios largos de un clip en el mismo encode que lo exporta.
+
+Los tramos que conservo salen de la línea de tiempo de palabras del transcript: cada
+hueco entre palabras más largo que el máximo permitido se acorta a ese máximo (la
+mitad queda después de la palabra anterior y la otra mitad antes de la siguiente).
+Si tengo el análisis de loudness de la fuente, solo corto la parte del hueco que de
+verdad está en silencio: risas o música entre frases se quedan.
+
+El corte se aplica con select/aselect dentro del filtergraph del clip y un setpts que
+resta el tiempo quitado, así que no hay segmentos ni concat ni pasadas extra. Los
+subtítulos se generan sobre la línea de tiempo compactada con JumpCutPlan.remap.
+"""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from src.speech_edge_clip import _coerce_float, _iter_words, load_transcript_segments
+from src.utils.logger import get_logger
+from src.utils.loudness import MOMENTARY_SECONDS, LoudnessAnalysis
+
+logger = get_logger(__name__)
+
+Interval = Tuple[float, float]
+
+# Un corte más corto que esto (≈ 3 frames) no se nota y solo agrega un salto
+MIN_CUT_SECONDS = 0.1
+
+# Un bloque es silencio si su loudness momentáneo queda 20 LU por debajo del integrado
+# del clip (el mismo gate relativo que usa el LRA)
+SILENCE_RELATIVE_GATE_LU = -20.0
+
+
+def _fmt(seconds: float) -> str:
+    return f"{seconds:.3f}"
+
+
+@dataclass(frozen=True)
+class JumpCutPlan:
+    """
+    Tramos que conservo de un clip, en segundos relativos al inicio de su ventana
+
+    El primer tramo empieza en 0 y el último termina en window (la duración de la
+    ventana): solo corto huecos entre palabras, nunca los bordes del clip.
+    """
+
+    keep: Tuple[Interval, ...]
+    window: float
+
+    @property
+    def duration(self) -> float:
+        """Duración del clip ya compactado"""
+        return sum(end - start for start, end in self.keep)
+
+    @property
+    def removed(self) -> float:
+        return self.window - self.duration
+
+    def remap(self, t: float) -> float:
+        """
+        Paso un tiempo de la ventana a la línea de tiempo compactada
+
+        Un tiempo dentro de un corte cae en el punto del corte.
+        """
+        elapsed = 0.0
+        for start, end in self.keep:
+            if t < start:
+                return elapsed
+            if t <= end:
+                return elapsed + t - start
+            elapsed += end - start
+        return elapsed
+
+    def _select_expr(self) -> str:
+        # Intervalos semiabiertos: un frame justo en el borde no sale dos veces.
+        # El último queda abierto para no perder el frame final por redondeo
+        terms = []
+        for index, (start, end) in enumerate(self.keep):
+            if index == len(self.keep) - 1:
+                terms.append(f"gte(t,{_fmt(start)})")
+            else:
+                terms.append(f"gte(t,{_fmt(start)})*lt(t,{_fmt(end)})")
+        return "+".join(terms)
+
+    def _pts_expr(self) -> str:
+        # A cada frame le resto lo que corté antes que él; funciona con VFR
+        shifts = "".join(
+            f"-gte(T,{_fmt(start)})*{_fmt(start - previous_end)}"
+            for (_, previous_end), (start, _) in zip(self.keep, self.keep[1:])
+        )
+        return f"(T{shifts})/TB"
+
+    def video_filter(self) -> str:
+        """select + setpts para el video del clip (antes de cualquier otro filtro)"""
+        return f"select='{self._select_expr()}',setpts='{self._pts_expr()}'"
+
+    def audio_filter(self) -> str:
+        """
+        aselect + asetpts para el audio del clip
+
+        aselect corta en frames de audio (~21 ms): aresample rellena o recorta esos
+        milisegundos contra los timestamps para que el audio no se corra del video.
+        """
+        return (
+            f"aselect='{self._select_expr()}',asetpts='{self._pts_expr()}',"
+            f"aresample=async=1:min_hard_comp=0.01:first_pts=0"
+        )
+
+
+@dataclass(frozen=True)
+class JumpCut:
+    """
+    Habla de un video (tramos de palabras unidos, en segundos de la fuente) y el máximo
+    silencio que dejo entre palabras
+
+    Se carga una vez por video; plan_for calcula los cortes de cada clip.
+    """
+
+    speech: Tuple[Interval, ...]
+    max_silence: float
+    analysis: Optional[LoudnessAnalysis] = None
+
+    def plan_for(self, start: float, end: float) -> Optional[JumpCutPlan]:
+        """
+        Cortes de la ventana [start, end] de la fuente
+
+        Returns:
+            JumpCutPlan, o None si no hay ningún silencio que cortar
+        """
+        spans = [(max(s, start), min(e, end)) for s, e in self.speech if s < end and e > start]
+        if len(spans) < 2:
+            return None
+
+        silence_threshold = None
+        if self.analysis is not None:
+            stats = self.analysis.window_stats(start, end)
+            if stats is not None:
+                silence_threshold = stats.integrated + SILENCE_RELATIVE_GATE_LU
+
+        half = self.max_silence / 2
+        cuts: List[Interval] = []
+        for (_, gap_start), (gap_end, _) in zip(spans, spans[1:]):
+            if gap_end - gap_start <= self.max_silence + MIN_CUT_SECONDS:
+                continue
+            quiet = (
+                self._quiet_runs(gap_start, gap_end, silence_threshold)
+                if silence_threshold is not None
+                else [(gap_start, gap_end)]
+            )
+            for quiet_start, quiet_end in quiet:
+                if quiet_end - quiet_start > self.max_silence + MIN_CUT_SECONDS:
+                    cuts.append((quiet_start + half, quiet_end - half))
+        if not cuts:
+            return None
+
+        keep: List[Interval] = []
+        cursor = start
+        for cut_start, cut_end in cuts:
+            keep.append((round(cursor - start, 3), round(cut_start - start, 3)))
+            cursor = cut_end
+        keep.append((round(cursor - start, 3), round(end - start, 3)))
+        return JumpCutPlan(keep=tuple(keep), window=end - start)
+
+    def _quiet_runs(self, gap_start: float, gap_end: float, threshold: float) -> List[Interval]:
+        """
+        Partes de un hueco entre palabras donde el audio está en silencio
+
+        Cada bloque silencioso cubre los 400 ms de su loudness momentáneo; uno los
+        bloques contiguos y los recorto al hueco.
+        """
+        analysis = self.analysis
+        first = bisect.bisect_right(analysis.block_ends, gap_start)
+        last = bisect.bisect_right(analysis.block_ends, gap_end + MOMENTARY_SECONDS)
+        runs: List[Interval] = []
+        for t, momentary in zip(analysis.block_ends[first:last], analysis.momentary[first:last]):
+            if momentary is not None and momentary >= threshold:
+                continue
+            run_start, run_end = max(t - MOMENTARY_SECONDS, gap_start), min(t, gap_end)
+            if run_end <= run_start:
+                continue
+            if runs and run_start <= runs[-1][1]:
+                runs[-1] = (runs[-1][0], max(runs[-1][1], run_end))
+            else:
+                runs.append((run_start, run_end))
+        return runs
+
+
+def merge_word_spans(words: Sequence[dict]) -> Tuple[Interval, ...]:
+    """Tramos de habla (start, end) a partir de palabras con timestamps, unidos y ordenados"""
+    spans = []
+    for word in words:
+        start = _coerce_float(word.get("start"))
+        end = _coerce_float(word.get("end"))
+        if start is None or end is None or end <= start:
+            continue
+        spans.append((start, end))
+    spans.sort()
+
+    merged: List[Interval] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def load_jump_cut(
+    transcript_path: str,
+    max_silence_ms: int,
+    analysis: Optional[LoudnessAnalysis] = None,
+) -> Optional[JumpCut]:
+    """
+    Cargo la línea de tiempo de palabras del transcript para los jump cuts de un video
+
+    Returns:
+        JumpCut, o None si está desactivado (max_silence_ms <= 0) o el transcript no
+        tiene timestamps por palabra
+    """
+    if max_silence_ms <= 0:
+        return None
+    try:
+        segments, word_segments = load_transcript_segments(transcript_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Jump cuts skipped: cannot read transcript {transcript_path}: {e}")
+        return None
+    speech = merge_word_spans(list(_iter_words(segments, word_segments)))
+    if not speech:
+        logger.warning("Jump cuts skipped: the transcript has no word timestamps")
+        return None
+    return JumpCut(speech=speech, max_silence=max_silence_ms / 1000.0, analysis=analysis)
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de keyframes y paquetes por video fuente.
+
+Una sola pasada de ffprobe sobre los paquetes del primer stream de video (sin
+decodificar) me da los timestamps y offsets de cada keyframe y cuántos paquetes
+tiene cada GOP. Lo guardo junto al transcript y lo reutilizo para planear seeks,
+elegir puntos de smart-cut y estimar cuánto hay que decodificar.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+KEYFRAME_INDEX_VERSION = 1
+
+# Tolerancia al comparar timestamps pedidos con los del índice (redondeo de ffprobe)
+TIMESTAMP_TOLERANCE_SECONDS = 0.001
+
+
+class SeekPlan(NamedTuple):
+    """Keyframe desde el que arranca la decodificación para llegar a un timestamp"""
+    keyframe_time: float
+    keyframe_offset: Optional[int]
+    frames_to_decode: int
+
+
+@dataclass(frozen=True)
+class KeyframeIndex:
+    """
+    Keyframes del primer stream de video de un archivo.
+
+    gop_packet_counts[i] es el número de paquetes con pts en
+    [keyframe_times[i], keyframe_times[i + 1]) (el último GOP llega hasta el final).
+    """
+
+    source_size: int
+    source_mtime: float
+    duration: float
+    keyframe_times: List[float]
+    keyframe_offsets: List[Optional[int]]
+    gop_packet_counts: List[int]
+
+    @property
+    def packet_count(self) -> int:
+        return sum(self.gop_packet_counts)
+
+    def keyframes_between(self, start: float, end: float) -> List[float]:
+        """Keyframes con timestamp en [start, end]"""
+        lo = bisect.bisect_left(self.keyframe_times, start)
+        hi = bisect.bisect_right(self.keyframe_times, end)
+        return self.keyframe_times[lo:hi]
+
+    def packets_between_keyframes(self, start: float, end: float) -> int:
+        """
+        Paquetes con pts en [start, end), con start y end en keyframes del índice.
+
+        Es exacto porque sumo GOPs completos.
+        """
+        lo = bisect.bisect_left(self.keyframe_times, start - TIMESTAMP_TOLERANCE_SECONDS)
+        hi = bisect.bisect_left(self.keyframe_times, end - TIMESTAMP_TOLERANCE_SECONDS)
+        return sum(self.gop_packet_counts[lo:hi])
+
+    def seek_plan(self, timestamp: float) -> Optional[SeekPlan]:
+        """
+        Keyframe anterior o igual a timestamp y frames a decodificar hasta llegar.
+
+        Los frames dentro del GOP se estiman por interpolación lineal del número
+        de paquetes del GOP.
+        """
+        if not self.keyframe_times:
+            return None
+
+        idx = bisect.bisect_right(self.keyframe_times, timestamp + TIMESTAMP_TOLERANCE_SECONDS) - 1
+        if idx < 0:
+            idx = 0
+        keyframe_time = self.keyframe_times[idx]
+        gop_end = (
+            self.keyframe_times[idx + 1]
+            if idx + 1 < len(self.keyframe_times)
+            else max(self.duration, keyframe_time)
+        )
+        gop_span = gop_end - keyframe_time
+        fraction = (timestamp - keyframe_time) / gop_span if gop_span > 0 else 0.0
+        frames = int(round(max(0.0, min(1.0, fraction)) * self.gop_packet_counts[idx]))
+
+        return SeekPlan(
+            keyframe_time=keyframe_time,
+            keyframe_offset=self.keyframe_offsets[idx],
+            frames_to_decode=frames,
+        )
+
+    def matches_source(self, video_path: str) -> bool:
+        """True si el archivo no cambió desde que construí el índice"""
+        try:
+            stat = Path(video_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and abs(stat.st_mtime - self.source_mtime) < 1e-3
+
+    def to_dict(self) -> dict:
+        return {
+            "version": KEYFRAME_INDEX_VERSION,
+            "source_size": self.source_size,
+            "source_mtime": self.source_mtime,
+            "duration": self.duration,
+            "keyframe_times": self.keyframe_times,
+            "keyframe_offsets": self.keyframe_offsets,
+            "gop_packet_counts": self.gop_packet_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["KeyframeIndex"]:
+        if data.get("version") != KEYFRAME_INDEX_VERSION:
+            return None
+        try:
+            index = cls(
+                source_size=int(data["source_size"]),
+                source_mtime=float(data["source_mtime"]),
+                duration=float(data["duration"]),
+                keyframe_times=[float(t) for t in data["keyframe_times"]],
+                keyframe_offsets=[None if o is None else int(o) for o in data["keyframe_offsets"]],
+                gop_packet_counts=[int(c) for c in data["gop_packet_counts"]],
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not (len(index.keyframe_times) == len(index.keyframe_offsets) == len(index.gop_packet_counts)):
+            return None
+        return index
+
+
+def get_keyframe_index_path(transcript_path: str) -> Path:
+    """
+    Ruta del índice de keyframes de un video
+
+    Lo guardo junto al transcript: temp/video_transcript.json → temp/video_transcript_keyframes.json
+    """
+    transcript_file = Path(transcript_path)
+    return transcript_file.with_name(f"{transcript_file.stem}_keyframes.json")
+
+
+def _parse_packet_line(line: str) -> dict:
+    fields = {}
+    for part in line.split("|"):
+        key, sep, value = part.partition("=")
+        if sep:
+            fields[key] = value
+    return fields
+
+
+def build_keyframe_index(video_path: str) -> Optional[KeyframeIndex]:
+    """
+    Construyo el índice con una pasada de ffprobe sobre los paquetes (sin decodificar)
+
+    Returns:
+        KeyframeIndex, o None si ffprobe falla o el video no tiene keyframes
+    """
+    source = Path(video_path)
+    try:
+        stat = source.stat()
+    except OSError as e:
+        logger.warning(f"Cannot index {video_path}: {e}")
+        return None
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,pos,flags",
+        "-of",
+        "compact=p=0",
+        str(source),
+    ]
+
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        logger.warning("ffprobe not found; keyframe index unavailable")
+        return None
+    if result.returncode != 0:
+        logger.warning(f"Keyframe index failed for {source.name}: {result.stderr[-500:]}")
+        return None
+
+    packets = []
+    for line in result.stdout.splitlines():
+        fields = _parse_packet_line(line)
+        try:
+            pts = float(fields.get("pts_time", ""))
+        except ValueError:
+            continue
+        pos = fields.get("pos", "")
+        packets.append((pts, "K" in fields.get("flags", ""), int(pos) if pos.isdigit() else None))
+
+    # Los paquetes vienen en orden de decodificación: ordeno por pts para contar GOPs
+    packets.sort(key=lambda p: p[0])
+    keyframe_times: List[float] = []
+    keyframe_offsets: List[Optional[int]] = []
+    gop_packet_counts: List[int] = []
+    for pts, is_key, pos in packets:
+        if is_key:
+            keyframe_times.append(pts)
+            keyframe_offsets.append(pos)
+            gop_packet_counts.append(0)
+        if gop_packet_counts:
+            gop_packet_counts[-1] += 1
+
+    if not keyframe_times:
+        logger.warning(f"No keyframes found in {source.name}; keyframe index unavailable")
+        return None
+
+    elapsed = time.perf_counter() - started
+    index = KeyframeIndex(
+        source_size=stat.st_size,
+        source_mtime=stat.st_mtime,
+        duration=packets[-1][0] if packets else 0.0,
+        keyframe_times=keyframe_times,
+        keyframe_offsets=keyframe_offsets,
+        gop_packet_counts=gop_packet_counts,
+    )
+    logger.info(
+        f"Keyframe index built for {source.name}: {len(keyframe_times)} keyframes, "
+        f"{index.packet_count} packets in {elapsed:.2f}s"
+    )
+    return index
+
+
+def load_keyframe_index(index_path: Path, video_path: str) -> Optional[KeyframeIndex]:
+    """Cargo el índice si existe y corresponde al archivo actual"""
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = KeyframeIndex.from_dict(json.load(f))
+    except Exception as e:
+        logger.warning(f"Unreadable keyframe index, ignoring it: {e}")
+        return None
+    if index is None or not index.matches_source(video_path):
+        return None
+    return index
+
+
+def load_or_build_keyframe_index(
+    video_path: str,
+    transcript_path: Optional[str] = None,
+) -> Optional[KeyframeIndex]:
+    """
+    Devuelvo el índice cacheado junto al transcript, o lo construyo y lo guardo
+
+    Sin transcript_path lo construyo igual pero no lo persisto.
+    """
+    index_path = get_keyframe_index_path(transcript_path) if transcript_path else None
+    if index_path is not None:
+        cached = load_keyframe_index(index_path, video_path)
+        if cached is not None:
+            return cached
+
+    index = build_keyframe_index(video_path)
+    if index is not None and index_path is not None:
+        try:
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump(index.to_dict(), f)
+        except OSError as e:
+            logger.warning(f"Could not save keyframe index: {e}")
+    return index
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Análisis de loudness (EBU R128) por video fuente.
+
+Una sola pasada de ffmpeg sobre el audio de la fuente (ebur128 a la tasa original,
+sin video) me da, cada 100 ms, el loudness momentáneo (400 ms), el de corto plazo
+(3 s) y el true peak del bloque. Lo guardo junto al transcript y de ahí calculo
+el loudness integrado, el LRA y el true peak de cualquier ventana sin volver a
+decodificar: cada clip se normaliza con una ganancia lineal o con un loudnorm de
+una pasada con los valores medidos, dentro del mismo comando de export.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from src.utils.ffmpeg_runner import run_ffmpeg
+from src.utils.logger import get_logger
+from src.utils.media_info import probe_media
+
+logger = get_logger(__name__)
+
+LOUDNESS_ANALYSIS_VERSION = 1
+
+LOUDNESS_MODES = ("off", "gain", "loudnorm")
+
+# ebur128 informa un bloque cada 100 ms; el momentáneo cubre 400 ms y el de corto plazo 3 s
+BLOCK_SECONDS = 0.1
+MOMENTARY_SECONDS = 0.4
+SHORT_TERM_SECONDS = 3.0
+
+# Gates de BS.1770 / EBU Tech 3342
+ABSOLUTE_GATE_LUFS = -70.0
+INTEGRATED_RELATIVE_GATE_LU = -10.0
+LRA_RELATIVE_GATE_LU = -20.0
+
+DEFAULT_TARGET_LUFS = -14.0
+DEFAULT_TRUE_PEAK_LIMIT_DBTP = -1.0
+LOUDNORM_TARGET_LRA = 11.0
+# loudnorm trabaja a 192 kHz y sale a esa tasa: vuelvo a una tasa estándar para AAC
+LOUDNORM_OUTPUT_SAMPLE_RATE = 48000
+
+# Reservo ~200 bytes de stderr por bloque de 100 ms (una línea de ebur128)
+_STDERR_BYTES_PER_SECOND = 2000
+_STDERR_MIN_BYTES = 256 * 1024
+
+_BLOCK_LINE = re.compile(
+    r"\bt:\s*(?P<t>[-\d.]+)\s+TARGET:.*?\bM:\s*(?P<m>[-\d.inf]+)\s+S:\s*(?P<s>[-\d.inf]+)"
+    r".*?\bFTPK:\s*(?P<ftpk>[-\d.inf\s]+?)\s*dBFS"
+)
+
+
+@dataclass(frozen=True)
+class LoudnessStats:
+    """Medidas de una ventana, con los nombres de los parámetros measured_* de loudnorm"""
+    integrated: float
+    lra: float
+    true_peak: float
+    threshold: float
+
+
+@dataclass(frozen=True)
+class LoudnessAnalysis:
+    """
+    Bloques de 100 ms del audio de un archivo.
+
+    block_ends[i] es el final del bloque i (segundos de la fuente); momentary[i] y
+    short_term[i] son los loudness (LUFS) de los 400 ms / 3 s que terminan ahí y
+    true_peaks[i] el true peak (dBTP) del bloque, todos None si es silencio digital.
+    """
+
+    source_size: int
+    source_mtime: float
+    block_ends: List[float]
+    momentary: List[Optional[float]]
+    short_term: List[Optional[float]]
+    true_peaks: List[Optional[float]]
+
+    def window_stats(self, start: float, end: float) -> Optional[LoudnessStats]:
+        """
+        Loudness integrado, LRA y true peak de [start, end]
+
+        Returns:
+            LoudnessStats, o None si la ventana no tiene audio por encima del gate absoluto
+        """
+        epsilon = BLOCK_SECONDS / 10
+        momentary = [
+            m
+            for t, m in zip(self.block_ends, self.momentary)
+            if m is not None and t - MOMENTARY_SECONDS >= start - epsilon and t <= end + epsilon
+        ]
+        gated = [m for m in momentary if m > ABSOLUTE_GATE_LUFS]
+        if not gated:
+            return None
+        threshold = _power_mean(gated) + INTEGRATED_RELATIVE_GATE_LU
+        integrated = _power_mean([m for m in gated if m > threshold])
+
+        short_term = [
+            s
+            for t, s in zip(self.block_ends, self.short_term)
+            if s is not None and t - SHORT_TERM_SECONDS >= start - epsilon and t <= end + epsilon
+        ]
+        lra = _loudness_range(short_term)
+
+        peaks = [
+            p
+            for t, p in zip(self.block_ends, self.true_peaks)
+            if p is not None and t > start + epsilon and t - BLOCK_SECONDS < end - epsilon
+        ]
+        true_peak = max(peaks) if peaks else -math.inf
+
+        return LoudnessStats(integrated=integrated, lra=lra, true_peak=true_peak, threshold=threshold)
+
+    def matches_source(self, video_path: str) -> bool:
+        """True si el archivo no cambió desde que lo analicé"""
+        try:
+            stat = Path(video_path).stat()
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and abs(stat.st_mtime - self.source_mtime) < 1e-3
+
+    def to_dict(self) -> dict:
+        return {
+            "version": LOUDNESS_ANALYSIS_VERSION,
+            "source_size": self.source_size,
+            "source_mtime": self.source_mtime,
+            "block_ends": self.block_ends,
+            "momentary": self.momentary,
+            "short_term": self.short_term,
+            "true_peaks": self.true_peaks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["LoudnessAnalysis"]:
+        if data.get("version") != LOUDNESS_ANALYSIS_VERSION:
+            return None
+        try:
+            analysis = cls(
+                source_size=int(data["source_size"]),
+                source_mtime=float(data["source_mtime"]),
+                block_ends=[float(t) for t in data["block_ends"]],
+                momentary=[None if v is None else float(v) for v in data["momentary"]],
+                short_term=[None if v is None else float(v) for v in data["short_term"]],
+                true_peaks=[None if v is None else float(v) for v in data["true_peaks"]],
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not (
+            len(analysis.block_ends)
+            == len(analysis.momentary)
+            == len(analysis.short_term)
+            == len(analysis.true_peaks)
+        ):
+            return None
+        return analysis
+
+
+@dataclass(frozen=True)
+class LoudnessNormalization:
+    """Cómo normalizo los clips de una fuente: modo, objetivo y el análisis cacheado"""
+    analysis: LoudnessAnalysis
+    mode: str = "gain"
+    target_lufs: float = DEFAULT_TARGET_LUFS
+    true_peak_limit: float = DEFAULT_TRUE_PEAK_LIMIT_DBTP
+
+    def filter_for(self, start: float, end: float) -> Optional[str]:
+        """
+        Filtro de audio para la ventana [start, end] de la fuente
+
+        - "gain": volume con la ganancia que lleva el integrado al objetivo, limitada
+          para que el true peak no pase true_peak_limit
+        - "loudnorm": loudnorm de una pasada con las medidas de la ventana (lineal
+          cuando alcanza; si no, loudnorm aplica su modo dinámico)
+
+        Returns:
+            Filtro de ffmpeg, o None si la ventana es silencio
+        """
+        stats = self.analysis.window_stats(start, end)
+        if stats is None:
+            return None
+        if self.mode == "loudnorm":
+            return (
+                f"loudnorm=I={self.target_lufs:.1f}:TP={self.true_peak_limit:.1f}:LRA={LOUDNORM_TARGET_LRA:.1f}"
+                f":measured_I={stats.integrated:.2f}:measured_TP={_finite(stats.true_peak):.2f}"
+                f":measured_LRA={stats.lra:.2f}:measured_thresh={stats.threshold:.2f}"
+                f":linear=true,aresample={LOUDNORM_OUTPUT_SAMPLE_RATE}"
+            )
+        gain = self.target_lufs - stats.integrated
+        if math.isfinite(stats.true_peak):
+            gain = min(gain, self.true_peak_limit - stats.true_peak)
+        return f"volume={gain:.2f}dB"
+
+
+def _power_mean(loudness_values: Sequence[float]) -> float:
+    """Promedio en potencia de valores en LUFS (el offset de -0.691 se cancela)"""
+    mean_power = sum(10 ** (value / 10) for value in loudness_values) / len(loudness_values)
+    return 10 * math.log10(mean_power)
+
+
+def _loudness_range(short_term: Sequence[float]) -> float:
+    """LRA (EBU Tech 3342): percentiles 10 y 95 del corto plazo con gates absoluto y relativo"""
+    gated = [s for s in short_term if s > ABSOLUTE_GATE_LUFS]
+    if len(gated) < 2:
+        return 0.0
+    threshold = _power_mean(gated) + LRA_RELATIVE_GATE_LU
+    values = sorted(s for s in gated if s > threshold)
+    if len(values) < 2:
+        return 0.0
+
+    def _percentile(fraction: float) -> float:
+        return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+    return _percentile(0.95) - _percentile(0.10)
+
+
+def _finite(value: float) -> float:
+    # loudnorm no acepta -inf: uso el mínimo de su rango
+    return value if math.isfinite(value) else -99.0
+
+
+def _parse_loudness_value(text: str) -> Optional[float]:
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    # ebur128 informa -120.7 LUFS / -inf dBFS para el silencio digital
+    if not math.isfinite(value) or value <= -120.0:
+        return None
+    return value
+
+
+def parse_ebur128_log(stderr: str) -> List[tuple]:
+    """
+    Bloques (fin, momentáneo, corto plazo, true peak) del log de ebur128 con peak=true
+
+    Con varios canales FTPK trae un valor por canal: me quedo con el mayor.
+    """
+    blocks = []
+    for match in _BLOCK_LINE.finditer(stderr):
+        peaks = [_parse_loudness_value(v) for v in match.group("ftpk").split()]
+        finite_peaks = [p for p in peaks if p is not None]
+        blocks.append(
+            (
+                float(match.group("t")),
+                _parse_loudness_value(match.group("m")),
+                _parse_loudness_value(match.group("s")),
+                max(finite_peaks) if finite_peaks else None,
+            )
+        )
+    return blocks
+
+
+def get_loudness_analysis_path(transcript_path: str) -> Path:
+    """
+    Ruta del análisis de loudness de un video
+
+    Lo guardo junto al transcript: temp/video_transcript.json → temp/video_transcript_loudness.json
+    """
+    transcript_file = Path(transcript_path)
+    return transcript_file.with_name(f"{transcript_file.stem}_loudness.json")
+
+
+def build_loudness_analysis(video_path: str) -> Optional[LoudnessAnalysis]:
+    """
+    Mido el audio completo de la fuente con ebur128 (a su tasa original, sin video)
+
+    Returns:
+        LoudnessAnalysis, o None si la fuente no tiene audio o ffmpeg falla
+    """
+    source = Path(video_path)
+    try:
+        stat = source.stat()
+    except OSError as e:
+        logger.warning(f"Cannot analyze loudness of {video_path}: {e}")
+        return None
+
+    # Una línea de log por bloque: dimensiono la cola de stderr para no perder ninguna
+    info = probe_media(str(source))
+    duration = info.duration if info is not None else 0.0
+    stderr_bytes = max(_STDERR_MIN_BYTES, int(duration * _STDERR_BYTES_PER_SECOND * 1.5))
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        str(source),
+        "-map",
+        "0:a:0",
+        "-af",
+        "ebur128=peak=true",
+        "-f",
+        "null",
+        "-",
+    ]
+    result = run_ffmpeg(cmd, label=f"loudness {source.name}", stderr_tail_bytes=stderr_bytes)
+    if result.returncode != 0:
+        logger.warning(f"Loudness analysis failed for {source.name}: {result.stderr[-500:]}")
+        return None
+
+    blocks = parse_ebur128_log(result.stderr)
+    if not blocks:
+        logger.warning(f"No loudness measurements for {source.name}; is there an audio stream?")
+        return None
+
+    analysis = LoudnessAnalysis(
+        source_size=stat.st_size,
+        source_mtime=stat.st_mtime,
+        block_ends=[b[0] for b in blocks],
+        momentary=[b[1] for b in blocks],
+        short_term=[b[2] for b in blocks],
+        true_peaks=[b[3] for b in blocks],
+    )
+    overall = analysis.window_stats(0.0, blocks[-1][0])
+    if overall is not None:
+        logger.info(
+            f"Loudness analysis for {source.name}: {overall.integrated:.1f} LUFS integrated, "
+            f"LRA {overall.lra:.1f} LU, true peak {overall.true_peak:.1f} dBTP "
+            f"({len(blocks)} blocks)"
+        )
+    return analysis
+
+
+def load_loudness_analysis(analysis_path: Path, video_path: str) -> Optional[LoudnessAnalysis]:
+    """Cargo el análisis si existe y corresponde al archivo actual"""
+    if not analysis_path.exists():
+        return None
+    try:
+        with open(analysis_path, "r", encoding="utf-8") as f:
+            analysis = LoudnessAnalysis.from_dict(json.load(f))
+    except Exception as e:
+        logger.warning(f"Unreadable loudness analysis, ignoring it: {e}")
+        return None
+    if analysis is None or not analysis.matches_source(video_path):
+        return None
+    return analysis
+
+
+def load_or_build_loudness_analysis(
+    video_path: str,
+    transcript_path: Optional[str] = None,
+) -> Optional[LoudnessAnalysis]:
+    """
+    Devuelvo el análisis cacheado junto al transcript, o lo construyo y lo guardo
+
+    Sin transcript_path lo construyo igual pero no lo persisto.
+    """
+    analysis_path = get_loudness_analysis_path(transcript_path) if transcript_path else None
+    if analysis_path is not None:
+        cached = load_loudness_analysis(analysis_path, video_path)
+        if cached is not None:
+            return cached
+
+    analysis = build_loudness_analysis(video_path)
+    if analysis is not None and analysis_path is not None:
+        try:
+            with open(analysis_path, "w", encoding="utf-8") as f:
+                json.dump(analysis.to_dict(), f)
+        except OSError as e:
+            logger.warning(f"Could not save loudness analysis: {e}")
+    return analysis
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Información de medios con cache por archivo.
+
+Un solo ffprobe (-show_format -show_streams) por archivo me da duración, streams,
+codecs, fps, rotación y el layout del audio. Lo guardo en memoria con clave
+(ruta, tamaño, mtime): el exporter, el reframer, el mezzanine y el análisis de
+loudness leen la misma entrada en vez de lanzar su propio ffprobe o abrir el
+contenedor con OpenCV. Si el archivo cambia, cambia la clave y vuelvo a probar.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Entradas en memoria (una por archivo/versión); las más viejas se descartan primero
+MEDIA_INFO_CACHE_SIZE = 128
+
+_cache: "OrderedDict[Tuple[str, int, int], MediaInfo]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _safe_parse_ffprobe_r_frame_rate(r_frame_rate: object) -> float:
+    """
+    Safely parse ffprobe's `r_frame_rate` field into a numeric FPS value.
+
+    Expected formats include strings like "30/1" or "30000/1001".
+    Returns 0.0 if the value is missing or invalid.
+    """
+    if r_frame_rate is None:
+        return 0.0
+    if isinstance(r_frame_rate, (int, float)):
+        return float(r_frame_rate)
+    if not isinstance(r_frame_rate, str):
+        return 0.0
+
+    value = r_frame_rate.strip()
+    if not value:
+        return 0.0
+
+    try:
+        fps = float(Fraction(value))
+    except Exception:
+        return 0.0
+
+    return fps if fps > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    """Un stream del contenedor, en el orden de ffprobe"""
+    index: int
+    codec_type: str
+    codec_name: Optional[str]
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Lo que necesito de un archivo para exportarlo o reencuadrarlo.
+
+    width/height son las dimensiones codificadas del primer stream de video;
+    rotation es la rotación de display (grados, como la aplica ffmpeg/OpenCV).
+    """
+
+    path: str
+    size: int
+    mtime: float
+    duration: float
+    format_name: Optional[str]
+    # Tag comment del contenedor (el mezzanine anota ahí cómo guardó el audio)
+    comment: Optional[str]
+    streams: Tuple[StreamInfo, ...]
+    # Video (primer stream)
+    width: Optional[int]
+    height: Optional[int]
+    fps: float
+    r_frame_rate: Optional[str]
+    avg_frame_rate: Optional[str]
+    codec: Optional[str]
+    pix_fmt: Optional[str]
+    rotation: int
+    frame_count: Optional[int]
+    # Audio (primer stream)
+    has_audio: bool
+    audio_codec: Optional[str]
+    audio_channels: Optional[int]
+    audio_channel_layout: Optional[str]
+    audio_sample_rate: Optional[int]
+
+    @property
+    def is_cfr(self) -> bool:
+        """True si el frame rate nominal y el promedio coinciden"""
+        nominal = _safe_parse_ffprobe_r_frame_rate(self.r_frame_rate)
+        average = _safe_parse_ffprobe_r_frame_rate(self.avg_frame_rate)
+        return nominal > 0 and abs(nominal - average) <= nominal * 0.001
+
+    @property
+    def display_size(self) -> Tuple[Optional[int], Optional[int]]:
+        """(ancho, alto) de los frames decodificados, con la rotación aplicada"""
+        if self.rotation % 180 == 90:
+            return self.height, self.width
+        return self.width, self.height
+
+    def to_video_info(self) -> Dict:
+        """El dict de VideoExporter.get_video_info()"""
+        return {
+            "duration": self.duration,
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "r_frame_rate": self.r_frame_rate,
+            "avg_frame_rate": self.avg_frame_rate,
+            "is_cfr": self.is_cfr,
+            "codec": self.codec,
+            "pix_fmt": self.pix_fmt,
+            "rotation": self.rotation,
+            "frame_count": self.frame_count,
+            "has_audio": self.has_audio,
+            "audio_codec": self.audio_codec,
+            "audio_channels": self.audio_channels,
+            "audio_channel_layout": self.audio_channel_layout,
+            "audio_sample_rate": self.audio_sample_rate,
+        }
+
+
+def _optional_int(value: object) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _stream_rotation(stream: Dict) -> int:
+    """
+    Rotación de display del stream, normalizada a 0/90/180/270
+
+    ffmpeg ≥ 5 la informa en la displaymatrix de side_data_list (sentido antihorario,
+    ej. -90); los contenedores viejos en el tag "rotate" (sentido horario, ej. 90).
+    """
+    for side_data in stream.get("side_data_list") or []:
+        if "rotation" in side_data:
+            rotation = _optional_int(side_data.get("rotation"))
+            if rotation is not None:
+                return (-rotation) % 360
+    rotation = _optional_int((stream.get("tags") or {}).get("rotate"))
+    return rotation % 360 if rotation is not None else 0
+
+
+def parse_ffprobe_output(data: Dict, *, path: str, size: int, mtime: float) -> Optional[MediaInfo]:
+    """
+    Armo MediaInfo desde el JSON de ffprobe -show_format -show_streams
+
+    Returns:
+        MediaInfo, o None si el archivo no tiene stream de video
+    """
+    raw_streams = data.get("streams") or []
+    video_stream = next((s for s in raw_streams if s.get("codec_type") == "video"), None)
+    if not video_stream:
+        return None
+    audio_stream = next((s for s in raw_streams if s.get("codec_type") == "audio"), None)
+
+    format_data = data.get("format") or {}
+    try:
+        duration = float(format_data.get("duration", 0) or 0)
+    except (TypeError, ValueError):
+        duration = 0.0
+    fps = _safe_parse_ffprobe_r_frame_rate(video_stream.get("r_frame_rate"))
+
+    # Igual que OpenCV: nb_frames del contenedor, o duración × fps si no lo trae
+    frame_count = _optional_int(video_stream.get("nb_frames"))
+    if not frame_count and duration > 0 and fps > 0:
+        frame_count = int(round(duration * fps))
+
+    return MediaInfo(
+        path=path,
+        size=size,
+        mtime=mtime,
+        duration=duration,
+        format_name=format_data.get("format_name"),
+        comment=(format_data.get("tags") or {}).get("comment"),
+        streams=tuple(
+            StreamInfo(
+                index=_optional_int(s.get("index")) or 0,
+                codec_type=str(s.get("codec_type") or ""),
+                codec_name=s.get("codec_name"),
+            )
+            for s in raw_streams
+        ),
+        width=_optional_int(video_stream.get("width")),
+        height=_optional_int(video_stream.get("height")),
+        fps=fps,
+        r_frame_rate=video_stream.get("r_frame_rate"),
+        avg_frame_rate=video_stream.get("avg_frame_rate"),
+        codec=video_stream.get("codec_name"),
+        pix_fmt=video_stream.get("pix_fmt"),
+        rotation=_stream_rotation(video_stream),
+        frame_count=frame_count or None,
+        has_audio=audio_stream is not None,
+        audio_codec=audio_stream.get("codec_name") if audio_stream else None,
+        audio_channels=_optional_int(audio_stream.get("channels")) if audio_stream else None,
+        audio_channel_layout=audio_stream.get("channel_layout") if audio_stream else None,
+        audio_sample_rate=_optional_int(audio_stream.get("sample_rate")) if audio_stream else None,
+    )
+
+
+def probe_media(video_path: str) -> Optional[MediaInfo]:
+    """
+    Devuelvo la información del archivo, con un ffprobe solo la primera vez
+
+    La clave es (ruta absoluta, tamaño, mtime): un archivo reescrito (ej. un mezzanine
+    reconstruido) se vuelve a probar. Los fallos no se cachean.
+
+    Returns:
+        MediaInfo, o None si el archivo no existe, ffprobe falla o no hay video
+    """
+    source = Path(video_path)
+    try:
+        stat = source.stat()
+    except OSError:
+        return None
+    key = (str(source.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "quiet",
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        str(source),
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        logger.warning("ffprobe not found; media info unavailable")
+        return None
+    if result.returncode != 0:
+        logger.debug(f"ffprobe failed for {source.name}: {result.stderr[-500:]}")
+        return None
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        logger.debug(f"Unreadable ffprobe output for {source.name}")
+        return None
+
+    info = parse_ffprobe_output(data, path=str(source), size=stat.st_size, mtime=stat.st_mtime)
+    if info is None:
+        return None
+
+    with _cache_lock:
+        _cache[key] = info
+        _cache.move_to_end(key)
+        while len(_cache) > MEDIA_INFO_CACHE_SIZE:
+            _cache.popitem(last=False)
+    logger.debug(
+        f"Probed {source.name}: {info.width}x{info.height} @ {info.fps:.3f}fps, "
+        f"{info.duration:.2f}s, audio {info.audio_codec or 'none'}"
+    )
+    return info
+
+
+def clear_media_info_cache() -> None:
+    """Vacío el cache en memoria"""
+    with _cache_lock:
+        _cache.clear()
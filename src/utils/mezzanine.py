@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Mezzanine por video fuente: un intermedio H.264 con GOP corto y frame rate constante.
+
+Los masters de cámara y las descargas de YouTube suelen traer GOPs de 250 frames o
+timing VFR. Cada export de clip (y el seek de OpenCV del reframer) tiene que
+decodificar desde el keyframe anterior, y con VFR el frame N no siempre cae en
+N / fps. Transcodifico la fuente una sola vez a un intermedio con un keyframe por
+segundo y CFR, a la resolución que necesita el export, y todos los clips leen de ahí.
+
+El archivo vive junto al transcript y lo registra CleanupManager como artifact.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from fractions import Fraction
+from pathlib import Path
+from typing import Optional, Tuple
+
+from src.utils.ffmpeg_runner import run_ffmpeg
+from src.utils.logger import get_logger
+from src.utils.media_info import probe_media
+
+logger = get_logger(__name__)
+
+MEZZANINE_MODES = ("off", "auto", "on")
+
+# Un keyframe por segundo: cualquier seek decodifica como mucho 1s de video
+MEZZANINE_GOP_SECONDS = 1.0
+
+# CRF bajo: el intermedio se vuelve a encodear en cada clip, no quiero perder calidad acá
+MEZZANINE_CRF = 16
+MEZZANINE_PRESET = "veryfast"
+
+# En modo auto solo compensa con varios clips y GOPs largos (o VFR)
+MEZZANINE_AUTO_MIN_CLIPS = 6
+MEZZANINE_AUTO_MIN_GOP_SECONDS = 4.0
+
+# Tag comment del contenedor cuando el audio de la fuente se copió sin re-encodear
+MEZZANINE_AUDIO_COPY_TAG = "cliper:audio=copy"
+
+
+def get_mezzanine_path(transcript_path: str) -> Path:
+    """
+    Ruta del mezzanine de un video
+
+    Lo guardo junto al transcript: temp/video_transcript.json → temp/video_transcript_mezzanine.mp4
+    """
+    transcript_file = Path(transcript_path)
+    return transcript_file.with_name(f"{transcript_file.stem}_mezzanine.mp4")
+
+
+def should_build_mezzanine(
+    mode: str,
+    *,
+    clip_count: int,
+    avg_gop_seconds: Optional[float],
+    is_vfr: bool,
+) -> Tuple[bool, str]:
+    """
+    Decido si vale la pena transcodificar la fuente antes de exportar
+
+    Returns:
+        (usar_mezzanine, motivo legible para el log)
+    """
+    if mode == "off":
+        return False, "disabled"
+    if clip_count <= 0:
+        return False, "no clips to export"
+    if mode == "on":
+        return True, "forced on"
+
+    if clip_count < MEZZANINE_AUTO_MIN_CLIPS:
+        return False, f"{clip_count} clips < {MEZZANINE_AUTO_MIN_CLIPS}"
+    if is_vfr:
+        return True, f"variable frame rate source, {clip_count} clips"
+    if avg_gop_seconds is None:
+        return False, "GOP length unknown"
+    if avg_gop_seconds >= MEZZANINE_AUTO_MIN_GOP_SECONDS:
+        return True, f"average GOP {avg_gop_seconds:.1f}s, {clip_count} clips"
+    return False, f"average GOP {avg_gop_seconds:.1f}s < {MEZZANINE_AUTO_MIN_GOP_SECONDS:.1f}s"
+
+
+def is_mezzanine_current(
+    mezzanine_path: Path,
+    source_path: Path,
+    target_height: int,
+    *,
+    copy_audio: bool = False,
+) -> bool:
+    """
+    True si el mezzanine existe, es más nuevo que la fuente y tiene la altura pedida
+
+    Con copy_audio exijo además que el audio sea la copia de la fuente: un mezzanine
+    viejo con el audio re-encodeado rompería el passthrough sin pérdidas.
+    """
+    try:
+        mezzanine_stat = mezzanine_path.stat()
+        source_stat = source_path.stat()
+    except OSError:
+        return False
+    if mezzanine_stat.st_size == 0 or mezzanine_stat.st_mtime < source_stat.st_mtime:
+        return False
+    info = probe_media(str(mezzanine_path))
+    if info is None or info.height != target_height:
+        return False
+    return not copy_audio or info.comment == MEZZANINE_AUDIO_COPY_TAG
+
+
+def build_mezzanine(
+    video_path: Path,
+    output_path: Path,
+    *,
+    frame_rate: str,
+    source_height: int,
+    target_height: int,
+    has_audio: bool = True,
+    copy_audio: bool = False,
+    ffmpeg_threads: int = 0,
+) -> bool:
+    """
+    Transcodifico la fuente a un intermedio con GOP fijo y CFR
+
+    Con copy_audio (fuente AAC) copio el audio tal cual y lo anoto en el tag comment,
+    así el passthrough de los clips sigue siendo sin pérdidas. Si no, lo paso a AAC.
+
+    Escribo en un archivo parcial y lo renombro al terminar, así un export
+    interrumpido nunca deja un mezzanine truncado que parezca válido.
+    """
+    try:
+        rate = Fraction(str(frame_rate))
+    except (ValueError, ZeroDivisionError):
+        rate = Fraction(30)
+    if rate <= 0:
+        rate = Fraction(30)
+    gop = max(1, round(float(rate) * MEZZANINE_GOP_SECONDS))
+    partial_path = output_path.with_name(f"{output_path.stem}.partial{output_path.suffix}")
+
+    cmd = ["ffmpeg", "-y", "-i", str(video_path), "-map", "0:v:0"]
+    if has_audio:
+        cmd.extend(["-map", "0:a:0"])
+    if target_height < source_height:
+        cmd.extend(["-vf", f"scale=-2:{target_height}"])
+    cmd.extend(
+        [
+            "-r",
+            str(rate),
+            "-c:v",
+            "libx264",
+            "-preset",
+            MEZZANINE_PRESET,
+            "-crf",
+            str(MEZZANINE_CRF),
+            "-g",
+            str(gop),
+            "-keyint_min",
+            str(gop),
+            "-sc_threshold",
+            "0",
+            "-pix_fmt",
+            "yuv420p",
+        ]
+    )
+    if has_audio and copy_audio:
+        cmd.extend(["-c:a", "copy", "-metadata", f"comment={MEZZANINE_AUDIO_COPY_TAG}"])
+    elif has_audio:
+        cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+    cmd.extend(["-sn", "-movflags", "+faststart"])
+    if ffmpeg_threads > 0:
+        cmd.extend(["-threads", str(ffmpeg_threads)])
+    cmd.append(str(partial_path))
+
+    started = time.perf_counter()
+    result = run_ffmpeg(cmd, label=f"mezzanine {video_path.name}")
+    if result.returncode != 0:
+        logger.warning(f"Mezzanine transcode failed for {video_path.name}: {result.stderr[-500:]}")
+        partial_path.unlink(missing_ok=True)
+        return False
+
+    os.replace(partial_path, output_path)
+    logger.info(
+        f"Mezzanine built for {video_path.name}: {target_height}p, GOP {gop} frames "
+        f"at {float(rate):.3f} fps in {time.perf_counter() - started:.1f}s"
+    )
+    return True
+
+
+def ensure_mezzanine(
+    video_path: Path,
+    output_path: Path,
+    *,
+    frame_rate: str,
+    source_height: int,
+    target_height: int,
+    has_audio: bool = True,
+    copy_audio: bool = False,
+    require_audio_copy: bool = False,
+    ffmpeg_threads: int = 0,
+) -> Optional[Path]:
+    """
+    Devuelvo el mezzanine vigente o lo construyo
+
+    require_audio_copy descarta un mezzanine existente cuyo audio no sea la copia de la
+    fuente (hace falta para el passthrough); sin eso cualquier audio AAC me sirve.
+
+    Returns:
+        Ruta al mezzanine, o None si no se pudo crear (el caller usa la fuente)
+    """
+    if is_mezzanine_current(
+        output_path, video_path, target_height, copy_audio=copy_audio and require_audio_copy
+    ):
+        logger.info(f"Reusing mezzanine {output_path.name}")
+        return output_path
+    if build_mezzanine(
+        video_path,
+        output_path,
+        frame_rate=frame_rate,
+        source_height=source_height,
+        target_height=target_height,
+        has_audio=has_audio,
+        copy_audio=copy_audio,
+        ffmpeg_threads=ffmpeg_threads,
+    ):
+        return output_path
+    return None
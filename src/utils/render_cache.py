@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Cache local de renders por contenido.
+
+Cada clip exportado se guarda bajo una clave que resume todo lo que define sus
+píxeles y su audio: id de contenido de la fuente, ventana exacta, filtergraph,
+digest del logo, digest del SRT y argumentos del encoder. Si al re-exportar la
+clave ya existe, copio el archivo cacheado en lugar de re-encodear.
+
+El tamaño total está acotado: al pasarme del límite borro los renders usados
+hace más tiempo (LRU por mtime, que actualizo en cada hit).
+
+Además del clip final puedo guardar capas intermedias (base reencuadrada y capa
+con logo), cada una con una clave que cubre solo sus propias entradas. Así un
+cambio de estilo de subtítulos re-hace solo el último paso.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Subir cuando cambie algo del pipeline que altere la salida sin cambiar la clave
+RENDER_CACHE_VERSION = 3
+
+DEFAULT_RENDER_CACHE_MAX_MB = 2048
+
+# Bloques que leo de la fuente para el id de contenido (inicio, medio y final)
+SOURCE_SAMPLE_BYTES = 1024 * 1024
+
+_DIGEST_CHUNK_BYTES = 1024 * 1024
+
+# Ids de contenido ya calculados: (ruta, tamaño, mtime_ns) → id
+_content_ids: Dict[tuple, str] = {}
+_content_ids_lock = threading.Lock()
+
+
+def file_digest(path: Optional[str]) -> Optional[str]:
+    """SHA-256 del contenido completo de un archivo chico (logo, SRT); None si no existe"""
+    if not path:
+        return None
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_DIGEST_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def source_content_id(video_path: str) -> Optional[str]:
+    """
+    Id de contenido de un video fuente sin leerlo entero
+
+    Hasheo el tamaño y tres muestras de 1 MiB (inicio, medio, final). Sobrevive a
+    renombrar o copiar el archivo, y cualquier re-encode o edición cambia las muestras.
+    Recuerdo el id mientras el archivo no cambie de tamaño ni de mtime, así cada
+    export no vuelve a leer las muestras.
+    """
+    try:
+        stat = Path(video_path).stat()
+        size = stat.st_size
+        memo_key = (str(video_path), size, stat.st_mtime_ns)
+        with _content_ids_lock:
+            known = _content_ids.get(memo_key)
+        if known is not None:
+            return known
+        digest = hashlib.sha256(str(size).encode("ascii"))
+        with open(video_path, "rb") as f:
+            for offset in (0, max(0, size // 2 - SOURCE_SAMPLE_BYTES // 2), max(0, size - SOURCE_SAMPLE_BYTES)):
+                f.seek(offset)
+                digest.update(f.read(SOURCE_SAMPLE_BYTES))
+        content_id = digest.hexdigest()
+        with _content_ids_lock:
+            _content_ids[memo_key] = content_id
+        return content_id
+    except OSError as e:
+        logger.warning(f"Cannot compute content id for {video_path}: {e}")
+        return None
+
+
+def compute_render_key(parts: Dict[str, Any]) -> str:
+    """Clave estable a partir de un dict serializable (orden de claves irrelevante)"""
+    payload = json.dumps(
+        {"version": RENDER_CACHE_VERSION, **parts},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _temp_path(dst: Path) -> Path:
+    # Empieza con "." para que _evict y total_bytes lo ignoren
+    return dst.with_name(f".{dst.name}.{threading.get_ident()}.tmp")
+
+
+def _copy_atomic(src: Path, dst: Path) -> None:
+    """
+    Copio a un temporal y renombro: nunca queda un archivo a medias
+
+    Al materializar un hit copio: el clip queda en manos del usuario, que puede
+    editarlo en el lugar.
+    """
+    tmp = _temp_path(dst)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _link_or_copy(src: Path, tmp: Path) -> None:
+    """
+    Hardlink de src en tmp; si no se puede (otro filesystem, sin soporte), copia
+
+    Compartir el inode es seguro porque los exports publican con rename
+    (_publish_output): un re-export reemplaza la entrada de directorio y nunca
+    reescribe el archivo cacheado.
+    """
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+
+
+class ClipLayerKeys(NamedTuple):
+    """
+    Claves de las capas intermedias de un clip
+
+    base: recorte/reencuadre/escala de la ventana de la fuente.
+    branded: base + logo (None si no hay logo).
+    """
+    base: str
+    branded: Optional[str]
+
+
+@dataclass
+class RenderCacheStats:
+    """Hits y misses de una corrida de export"""
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    layer_hits: int = 0
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return (
+            f"{self.hits}/{total} hits, {self.misses} misses, "
+            f"{self.layer_hits} rebuilt from cached layers, "
+            f"{self.stored} stored, {self.evicted} evicted"
+        )
+
+
+class RenderCache:
+    """
+    Directorio de renders indexado por clave de contenido, con límite de tamaño LRU
+
+    Es seguro usarlo desde varios workers de export a la vez.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_RENDER_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = RenderCacheStats()
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / f"{key}{suffix}"
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """
+        Si la clave está cacheada la materializo en output_path y cuento un hit
+
+        Returns:
+            True si hubo hit (output_path quedó escrito)
+        """
+        entry = self._entry_path(key, output_path.suffix)
+        with self._lock:
+            if not entry.exists():
+                self.stats.misses += 1
+                return False
+            try:
+                # mtime = último uso, para el orden LRU
+                os.utime(entry, None)
+                _copy_atomic(entry, output_path)
+            except OSError as e:
+                logger.warning(f"Render cache entry unusable, re-rendering: {e}")
+                self.stats.misses += 1
+                return False
+            self.stats.hits += 1
+        return True
+
+    def lookup_layer(self, key: str, suffix: str = ".mp4") -> Optional[Path]:
+        """
+        Ruta de una capa intermedia cacheada (solo lectura), o None
+
+        No la copio: ffmpeg la lee directo del cache. Cuenta como layer hit.
+        """
+        entry = self._entry_path(key, suffix)
+        with self._lock:
+            if not entry.exists():
+                return None
+            try:
+                os.utime(entry, None)
+            except OSError:
+                return None
+            self.stats.layer_hits += 1
+        return entry
+
+    def store(self, key: str, output_path: Path) -> None:
+        """
+        Guardo un render recién exportado y aplico el límite de tamaño
+
+        El link (o la copia) va a un temporal fuera del lock, así un worker copiando
+        un clip grande no frena a los demás; con el lock solo renombro y desalojo.
+        """
+        if self.max_bytes <= 0 or not output_path.exists():
+            return
+        entry = self._entry_path(key, output_path.suffix)
+        tmp = _temp_path(entry)
+        try:
+            _link_or_copy(output_path, tmp)
+            with self._lock:
+                os.replace(tmp, entry)
+                self.stats.stored += 1
+                self._evict()
+        except OSError as e:
+            logger.warning(f"Could not store render in cache: {e}")
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats.evicted += 1
+
+    def total_bytes(self) -> int:
+        return sum(
+            entry.stat().st_size
+            for entry in self.cache_dir.iterdir()
+            if entry.is_file() and not entry.name.startswith(".")
+        )
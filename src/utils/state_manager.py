@@ -11,7 +11,7 @@ Este módulo me permite:
 
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 import uuid
 
@@ -289,7 +289,8 @@ class StateManager:
         self,
         video_id: str,
         clips: List[Dict],
-        clips_metadata_path: Optional[str] = None
+        clips_metadata_path: Optional[str] = None,
+        clips_params: Optional[Dict[str, Any]] = None
     ) -> None:
         """
         Marco que ya generé clips para este video
@@ -298,11 +299,22 @@ class StateManager:
             video_id: ID del video
             clips: Lista de dicts con info de cada clip
             clips_metadata_path: Ruta al JSON con metadata de clips
+            clips_params: Parámetros con los que se generaron (min/max duración,
+                min/max clips). Si cambian, el JobRunner re-segmenta.
         """
         if video_id in self.state:
             self.state[video_id]['clips_generated'] = True
             self.state[video_id]['clips'] = clips
             self.state[video_id]['clips_metadata_path'] = self._normalize_path(clips_metadata_path)
+            if clips_params is not None:
+                previous_params = self.state[video_id].get('clips_params')
+                if previous_params and previous_params != clips_params:
+                    # Los clips cambiaron: lo exportado (y lo aprobado) ya no corresponde
+                    self.state[video_id]['clips_exported'] = False
+                    self.state[video_id]['drafts_exported'] = False
+                    self.state[video_id]['draft_clips'] = []
+                    self.state[video_id]['approved_clips'] = []
+                self.state[video_id]['clips_params'] = dict(clips_params)
             self.state[video_id]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             self._save_state()
 
@@ -328,6 +340,77 @@ class StateManager:
             self.state[video_id]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             self._save_state()
 
+    def mark_drafts_exported(self, video_id: str, draft_paths: List[str]) -> None:
+        """
+        Marco que exporté los borradores (baja resolución) para revisar los clips
+
+        Args:
+            video_id: ID del video
+            draft_paths: Rutas a los borradores exportados
+        """
+        if video_id in self.state:
+            self.state[video_id]['drafts_exported'] = True
+            self.state[video_id]['draft_clips'] = [self._normalize_path(p) for p in (draft_paths or []) if p]
+            self.state[video_id]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._save_state()
+
+    def set_approved_clips(self, video_id: str, clip_ids: List[Any]) -> None:
+        """
+        Guardo qué clips aprobé en la revisión de borradores (el finalize solo renderiza esos)
+
+        Args:
+            video_id: ID del video
+            clip_ids: IDs de los clips aprobados (reemplaza la lista anterior)
+        """
+        if video_id in self.state:
+            known_ids = {str(clip.get('clip_id')) for clip in self.state[video_id].get('clips') or []}
+            self.state[video_id]['approved_clips'] = [
+                clip_id for clip_id in dict.fromkeys(clip_ids) if str(clip_id) in known_ids
+            ]
+            self.state[video_id]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._save_state()
+
+    def set_clip_approved(self, video_id: str, clip_id: Any, approved: bool = True) -> None:
+        """
+        Apruebo (o desapruebo) un clip
+        """
+        current = self.get_approved_clip_ids(video_id)
+        others = [c for c in current if str(c) != str(clip_id)]
+        self.set_approved_clips(video_id, others + [clip_id] if approved else others)
+
+    def get_approved_clip_ids(self, video_id: str) -> List[Any]:
+        """
+        IDs de los clips aprobados, en el orden en que se aprobaron
+        """
+        state = self.get_video_state(video_id)
+        return list(state.get('approved_clips') or []) if state else []
+
+    def set_mezzanine_path(self, video_id: str, mezzanine_path: Optional[str]) -> None:
+        """
+        Guardo la ruta del mezzanine (intermedio GOP corto/CFR) para que CleanupManager lo encuentre
+
+        Args:
+            video_id: ID del video
+            mezzanine_path: Ruta al mezzanine, o None si se eliminó
+        """
+        if video_id in self.state:
+            self.state[video_id]['mezzanine_path'] = self._normalize_path(mezzanine_path)
+            self.state[video_id]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._save_state()
+
+    def set_face_coverage(self, video_id: str, face_coverage: Optional[Dict[str, Any]]) -> None:
+        """
+        Guardo la cobertura de rostros sondeada de la fuente (FaceCoverage.to_dict())
+
+        Args:
+            video_id: ID del video
+            face_coverage: Cobertura serializada, o None para descartarla
+        """
+        if video_id in self.state:
+            self.state[video_id]['face_coverage'] = face_coverage
+            self.state[video_id]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._save_state()
+
     def mark_shorts_exported(
         self,
         video_id: str,
@@ -6,12 +6,13 @@ Este módulo toma los clips generados y los exporta a archivos de video reales.
 Usa ffmpeg para cortar con precisión y opcionalmente cambiar aspect ratio.
 """
 
-import json
+import math
 import os
+import shutil
 import subprocess
-from fractions import Fraction
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.progress import Progress, TaskID
 
@@ -19,35 +20,39 @@ from src.utils.logger import get_logger
 from src.subtitle_generator import SubtitleGenerator
 from src.reframer import FaceReframer
 from src.speech_edge_clip import compute_speech_aware_boundaries
+from src.utils.encoder_profile import EncoderChoice, EncoderProfile, load_encoder_profile
+from src.utils.export_journal import ExportJournal, get_export_journal_path, verify_clip_duration
+from src.utils.ffmpeg_runner import FFmpegProgress, FFmpegResult, run_ffmpeg
+from src.utils.face_presence import DEFAULT_FACE_COVERAGE_THRESHOLD, FaceCoverage, probe_face_coverage
+from src.utils.face_track import FaceTrack, open_face_track
+from src.utils.filter_graph import LOGO_OVERLAY_POSITIONS, FilterGraph
+from src.utils.jump_cut import JumpCut, JumpCutPlan, load_jump_cut
+from src.utils.keyframe_index import KeyframeIndex, load_or_build_keyframe_index
+from src.utils.loudness import (
+    DEFAULT_TARGET_LUFS,
+    LoudnessNormalization,
+    get_loudness_analysis_path,
+    load_loudness_analysis,
+    load_or_build_loudness_analysis,
+)
+from src.utils.media_info import probe_media
+from src.utils.mezzanine import (
+    ensure_mezzanine,
+    get_mezzanine_path,
+    should_build_mezzanine,
+)
+from src.utils.render_cache import (
+    DEFAULT_RENDER_CACHE_MAX_MB,
+    ClipLayerKeys,
+    RenderCache,
+    RenderCacheStats,
+    compute_render_key,
+    file_digest,
+    source_content_id,
+)
 
 logger = get_logger(__name__)
 
-def _safe_parse_ffprobe_r_frame_rate(r_frame_rate: object) -> float:
-    """
-    Safely parse ffprobe's `r_frame_rate` field into a numeric FPS value.
-
-    Expected formats include strings like "30/1" or "30000/1001".
-    Returns 0.0 if the value is missing or invalid.
-    """
-    if r_frame_rate is None:
-        return 0.0
-    if isinstance(r_frame_rate, (int, float)):
-        return float(r_frame_rate)
-    if not isinstance(r_frame_rate, str):
-        return 0.0
-
-    value = r_frame_rate.strip()
-    if not value:
-        return 0.0
-
-    try:
-        fps = float(Fraction(value))
-    except Exception:
-        return 0.0
-
-    return fps if fps > 0 else 0.0
-
-
 def _resolve_ffmpeg_threads(threads: int) -> int:
     """
     Resolve thread count for ffmpeg -threads parameter.
@@ -66,6 +71,377 @@ def _resolve_ffmpeg_threads(threads: int) -> int:
     return max(1, result)  # At least 1 thread
 
 
+def _resolve_export_workers(workers: int, clip_count: int) -> int:
+    """
+    Resolve how many clips are exported concurrently.
+
+    Args:
+        workers: 0=auto (one worker per 8 CPUs), positive=specific count
+        clip_count: Number of clips to export (upper bound for workers)
+
+    Returns:
+        Worker count between 1 and clip_count
+    """
+    if workers <= 0:
+        cpu_count = os.cpu_count() or 4
+        workers = cpu_count // 8
+    return max(1, min(workers, max(1, clip_count)))
+
+
+def _split_thread_budget(threads: int, workers: int) -> int:
+    """
+    Split the ffmpeg thread budget between concurrent export workers.
+
+    With a single worker the configured value is used as-is (0 keeps ffmpeg's
+    auto mode). With several workers each ffmpeg gets an equal share of the
+    budget so the processes don't oversubscribe the CPU.
+
+    Args:
+        threads: Same semantics as _resolve_ffmpeg_threads (0=auto, negative=all minus N)
+        workers: Number of concurrent ffmpeg processes
+
+    Returns:
+        Thread count for each ffmpeg process (0 only when workers <= 1 and auto)
+    """
+    resolved = _resolve_ffmpeg_threads(threads)
+    if workers <= 1:
+        return resolved
+    budget = resolved if resolved > 0 else (os.cpu_count() or 4)
+    return max(1, budget // workers)
+
+
+ProgressCallback = Callable[[int, int, str], None]
+
+# Formato que espera el encoder: los filtergraphs convierten a este en el punto más barato
+OUTPUT_PIX_FMT = "yuv420p"
+
+# Resolución de salida de cada aspect ratio (ver _get_aspect_ratio_filter)
+ASPECT_RATIO_OUTPUT_SIZES = {
+    "9:16": (1080, 1920),
+    "1:1": (1080, 1080),
+    "16:9": (1920, 1080),
+}
+
+# Borradores para revisión: lado corto de 360 px y x264 ultrafast
+DRAFT_SHORT_SIDE = 360
+DRAFT_ENCODER_CHOICE = EncoderChoice(encoder="libx264", preset="ultrafast")
+# Sin aspect ratio no conozco el tamaño de la fuente al armar el filtro: llevo el lado
+# corto a DRAFT_SHORT_SIDE con una expresión (-2 mantiene el aspecto con ancho/alto par)
+DRAFT_SCALE_FILTER = (
+    f"scale=w='if(gt(iw,ih),-2,{DRAFT_SHORT_SIDE})':h='if(gt(iw,ih),{DRAFT_SHORT_SIDE},-2)'"
+)
+
+
+def _partial_output_path(output_path: Path) -> Path:
+    """
+    Temp name ffmpeg writes to before the final rename.
+
+    Ends in _temp.mp4 so leftovers from a killed export are swept by CleanupManager.
+    """
+    return output_path.with_name(f"{output_path.stem}_partial_temp{output_path.suffix}")
+
+
+def _publish_output(partial_path: Path, output_path: Path) -> bool:
+    """Atomically rename a finished render to its final name (never a half-written clip)."""
+    try:
+        os.replace(partial_path, output_path)
+    except OSError as e:
+        logger.error(f"Cannot move finished render to {output_path.name}: {e}")
+        return False
+    return True
+
+
+def _draft_output_size(width: int, height: int) -> Tuple[int, int]:
+    """Draft size for a final output size: the short side becomes DRAFT_SHORT_SIDE (even dims)."""
+    factor = DRAFT_SHORT_SIDE / min(width, height)
+    return (
+        max(2, int(round(width * factor / 2)) * 2),
+        max(2, int(round(height * factor / 2)) * 2),
+    )
+
+
+# Con varios aspect ratios, el face tracking aplica a las salidas verticales y
+# cuadradas (la trayectoria del rostro se calcula una vez y se reusa en todas)
+FACE_TRACKING_ASPECT_RATIOS = ("9:16", "1:1")
+
+# Cómo se aplica el face tracking: "trajectory" calcula solo la trayectoria del crop
+# (frames de detección chicos) y ffmpeg cropea en el encode del clip; "frames" escribe
+# un video reencuadrado intermedio que el encode vuelve a decodificar
+FACE_TRACKING_MODES = ("trajectory", "frames")
+DEFAULT_FACE_TRACKING_MODE = "trajectory"
+
+
+def _source_frame(info: Optional[Dict]) -> Tuple[Optional[Tuple[int, int]], Optional[str]]:
+    """Decoded frame size (rotation applied) and pix_fmt from get_video_info(), when known."""
+    info = info or {}
+    width, height = int(info.get("width") or 0), int(info.get("height") or 0)
+    size = None
+    if width > 0 and height > 0:
+        size = (height, width) if int(info.get("rotation") or 0) % 180 == 90 else (width, height)
+    return size, info.get("pix_fmt")
+
+
+def _aspect_ratio_dir_name(aspect_ratio: str) -> str:
+    """Folder name for one aspect-ratio variant ("9:16" -> "9x16")."""
+    return aspect_ratio.replace(":", "x")
+
+# Single-decode: cada rama es un encoder libx264 con su propio lookahead, así que
+# limito las ramas por proceso. Un hueco mayor entre clips no compensa decodificarlo.
+SINGLE_DECODE_MAX_BRANCHES = 8
+SINGLE_DECODE_MAX_GAP_SECONDS = 30.0
+
+
+def _plan_single_decode_groups(
+    windows: List[Tuple[float, float]],
+    *,
+    max_branches: int = SINGLE_DECODE_MAX_BRANCHES,
+    max_gap: float = SINGLE_DECODE_MAX_GAP_SECONDS,
+) -> List[List[int]]:
+    """
+    Group clip windows that can share one decode of the source.
+
+    Clips are ordered by start time and greedily merged while the gap to the
+    group's decoded range stays within max_gap and the group has fewer than
+    max_branches clips (larger graphs fall back to separate processes).
+
+    Args:
+        windows: (start, end) of each clip in source seconds
+        max_branches: Maximum clips (outputs) per ffmpeg invocation
+        max_gap: Maximum undecoded-for-nothing gap (seconds) between clips
+
+    Returns:
+        Groups of indices into windows; single-element groups are exported per clip
+    """
+    order = sorted(range(len(windows)), key=lambda i: (windows[i][0], windows[i][1]))
+
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_end = 0.0
+    for idx in order:
+        start, end = windows[idx]
+        if current and (start - current_end) <= max_gap and len(current) < max_branches:
+            current.append(idx)
+            current_end = max(current_end, end)
+            continue
+        if current:
+            groups.append(current)
+        current = [idx]
+        current_end = end
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+# Smart-cut: tolerancia para considerar que un keyframe cae justo en el borde del
+# clip, y tramo mínimo copiado para que el fast path compense los procesos extra
+SMART_CUT_EDGE_TOLERANCE_SECONDS = 0.001
+SMART_CUT_MIN_COPY_SECONDS = 1.0
+
+# Codecs de video que sé concatenar, y contenedor de las piezas: MPEG-TS lleva
+# SPS/PPS in-band, así las piezas re-encodeadas y copiadas conservan sus parámetros
+SMART_CUT_CODECS = {"h264"}
+SMART_CUT_PIECE_FORMAT = "mpegts"
+
+
+def _plan_smart_cut(
+    keyframes: List[float],
+    start: float,
+    end: float,
+    *,
+    min_copy: float = SMART_CUT_MIN_COPY_SECONDS,
+) -> Optional[Tuple[float, float]]:
+    """
+    Choose the stream-copyable span of a clip window.
+
+    The copied span runs from the first keyframe at/after start to the last
+    keyframe at/before end, so it contains only complete GOPs. The partial
+    GOPs before and after it are re-encoded.
+
+    Args:
+        keyframes: Keyframe timestamps (seconds, source timeline)
+        start: Clip start in source seconds
+        end: Clip end in source seconds
+        min_copy: Minimum copied duration for the fast path to be worth it
+
+    Returns:
+        (copy_start, copy_end), or None if no useful span exists
+    """
+    inside = sorted(
+        k
+        for k in keyframes
+        if start - SMART_CUT_EDGE_TOLERANCE_SECONDS <= k <= end + SMART_CUT_EDGE_TOLERANCE_SECONDS
+    )
+    if len(inside) < 2:
+        return None
+
+    copy_start = max(start, inside[0])
+    copy_end = min(end, inside[-1])
+    if copy_end - copy_start < min_copy:
+        return None
+    return copy_start, copy_end
+
+
+# Export segmentado del video completo: duración mínima de cada segmento (más
+# cortos no compensan el proceso extra) y segmentos por CPU en modo auto
+FULL_VIDEO_MIN_SEGMENT_SECONDS = 60.0
+FULL_VIDEO_CPUS_PER_SEGMENT = 4
+
+
+def _resolve_full_video_segments(segments: int) -> int:
+    """
+    Resolve how many segments a full-video export is split into.
+
+    Args:
+        segments: 1=single encode, 0=auto (one segment per 4 CPUs), N=at most N segments
+
+    Returns:
+        Segment count (at least 1)
+    """
+    if segments <= 0:
+        segments = (os.cpu_count() or 4) // FULL_VIDEO_CPUS_PER_SEGMENT
+    return max(1, segments)
+
+
+def _plan_full_video_segments(
+    window_start: float,
+    window_end: float,
+    keyframes: List[float],
+    segments: int,
+    frame_interval: float,
+    *,
+    min_segment: float = FULL_VIDEO_MIN_SEGMENT_SECONDS,
+) -> List[Tuple[float, float]]:
+    """
+    Split a full-video window into segments that can be encoded independently.
+
+    Each cut goes half a frame after the keyframe closest to an even split, so
+    the segment's input seek lands on that keyframe (one frame decoded and
+    dropped) and no frame sits exactly on a boundary: every frame belongs to
+    exactly one segment whatever the timestamp rounding.
+
+    Args:
+        window_start: Export window start (source seconds)
+        window_end: Export window end (source seconds)
+        keyframes: Keyframe timestamps of the source
+        segments: Maximum number of segments
+        frame_interval: Seconds per frame (constant frame rate)
+        min_segment: Segments are never planned shorter than this on average
+
+    Returns:
+        (start, end) pairs covering the window; a single pair if it can't be split
+    """
+    duration = window_end - window_start
+    count = min(segments, int(duration // min_segment)) if min_segment > 0 else segments
+    candidates = sorted(
+        k for k in keyframes
+        if window_start + frame_interval < k + frame_interval / 2 < window_end - frame_interval
+    )
+    if count < 2 or not candidates:
+        return [(window_start, window_end)]
+
+    cuts: List[float] = []
+    for i in range(1, count):
+        ideal = window_start + duration * i / count
+        keyframe = min(candidates, key=lambda k: abs(k - ideal))
+        cut = keyframe + frame_interval / 2
+        if not cuts or cut > cuts[-1]:
+            cuts.append(cut)
+
+    bounds = [window_start, *cuts, window_end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _count_cfr_frames(start: float, end: float, phase: float, frame_interval: float) -> int:
+    """
+    Count the frames of a constant frame rate stream with start <= pts < end.
+
+    Args:
+        phase: Timestamp of any frame of the stream (e.g. a keyframe)
+        frame_interval: Seconds per frame
+    """
+    epsilon = 1e-6
+    first = math.ceil((start - phase) / frame_interval - epsilon)
+    last = math.ceil((end - phase) / frame_interval - epsilon)
+    return max(0, last - first)
+
+
+def _clip_encoder_args(
+    video_crf: int, audio_codec: str = "aac", choice: Optional[EncoderChoice] = None
+) -> List[str]:
+    """
+    Encoder args shared by every per-clip encode (also part of the render cache key).
+
+    Without an encoder profile choice this is libx264 `fast` at `video_crf`.
+    """
+    if choice is None:
+        return ["-c:v", "libx264", "-c:a", audio_codec, "-preset", "fast", "-crf", str(video_crf)]
+    video_args = choice.video_args(video_crf)
+    return [*video_args[:2], "-c:a", audio_codec, *video_args[2:]]
+
+
+# Códigos de audio que el MP4 de salida acepta tal cual: con ellos copio el audio
+# en vez de re-encodearlo (no aplico filtros de audio)
+PASSTHROUGH_AUDIO_CODECS = frozenset({"aac"})
+
+
+def _resolve_audio_codec(source_audio_codec: Optional[str], passthrough: bool = False) -> str:
+    """
+    Pick the output audio codec for a source: "copy" when its audio can go into the
+    MP4 untouched, "aac" otherwise.
+
+    With an input seek, ffmpeg keeps the copied audio packets around the cut and
+    writes an MP4 edit list, so playback still starts on the exact sample. Players
+    that ignore edit lists start up to one AAC frame early, hence opt-in.
+    """
+    if passthrough and source_audio_codec in PASSTHROUGH_AUDIO_CODECS:
+        return "copy"
+    return "aac"
+
+
+def _clip_audio_filter(
+    start: float,
+    end: float,
+    loudness: Optional[LoudnessNormalization],
+    jump_cut_plan: Optional[JumpCutPlan],
+) -> Optional[str]:
+    """
+    Audio filter chain of a clip: jump cuts first, then loudness normalization.
+
+    The loudness filter is measured on the whole source window; the gated integrated
+    loudness barely changes when the silences are removed.
+    """
+    filters = []
+    if jump_cut_plan is not None:
+        filters.append(jump_cut_plan.audio_filter())
+    if loudness is not None:
+        loudness_filter = loudness.filter_for(start, end)
+        if loudness_filter:
+            filters.append(loudness_filter)
+    return ",".join(filters) or None
+
+
+def _jump_cut_output_args(jump_cut_plan: Optional[JumpCutPlan]) -> List[str]:
+    """
+    Output args for a jump-cut clip: keep the compacted timestamps as they are.
+
+    setpts with a time expression drops the frame rate of the link; without
+    passthrough ffmpeg would resample the output to its 25 fps default.
+    """
+    return ["-fps_mode", "passthrough"] if jump_cut_plan is not None else []
+
+
+# Capas intermedias del render cache: casi sin pérdida y rápidas de encodear,
+# porque se vuelven a encodear al armar el clip final
+RENDER_LAYER_PRESET = "veryfast"
+RENDER_LAYER_CRF = 14
+
+
+# Nombre fijo del SRT dentro de la clave de render: la ruta real depende de la
+# carpeta de salida, el contenido ya entra por su digest
+RENDER_KEY_SRT_PLACEHOLDER = "clip.srt"
+
+
 class VideoExporter:
     """
     Exporto clips de video usando ffmpeg
@@ -77,8 +453,30 @@ class VideoExporter:
     - Nombres descriptivos para clips
     """
 
-    def __init__(self, output_dir: str = "output"):
+    # Llamado con cada bloque de progreso de ffmpeg (JobRunner lo conecta a la UI)
+    ffmpeg_progress_callback: Optional[Callable[[FFmpegProgress], None]] = None
+    # Plazo total de cada invocación de ffmpeg en segundos (None = solo el de estancamiento)
+    ffmpeg_timeout: Optional[float] = None
+    # Perfil de encoder calibrado para este host (None = libx264 fast)
+    encoder_profile: Optional[EncoderProfile] = None
+    # Borrador: salida a 360p con ultrafast, para revisar cortes y subtítulos
+    draft: bool = False
+    # Clips del último export_clips() que el journal ya daba por exportados
+    last_resumed_clips: int = 0
+    # Cobertura de rostros usada en el último export_clips() (None si no hizo falta)
+    last_face_coverage: Optional[FaceCoverage] = None
+    # SRT ya escritos en este export_clips() (ventana → ruta y digest); None fuera de uno
+    _clip_srts: Optional[Dict[tuple, Tuple[Path, str]]] = None
+
+    def __init__(self, output_dir: str = "output", *, draft: bool = False):
+        """
+        Args:
+            output_dir: Carpeta base de salida
+            draft: Exporto borradores (lado corto de 360 px, x264 ultrafast) en vez del
+                render final. Logo y subtítulos se mantienen, escalados con el video.
+        """
         self.output_dir = Path(output_dir)
+        self.draft = draft
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.console = Console()
         self.subtitle_generator = SubtitleGenerator()
@@ -90,6 +488,10 @@ class VideoExporter:
                 "Instala con: brew install ffmpeg (macOS) o apt install ffmpeg (Linux)"
             )
 
+        self.encoder_profile = load_encoder_profile()
+        if self.encoder_profile is not None:
+            logger.info(f"Using encoder profile calibrated for {self.encoder_profile.host}")
+
     def _check_ffmpeg(self) -> bool:
         """
         Verifico si ffmpeg está disponible en el sistema
@@ -102,6 +504,203 @@ class VideoExporter:
         except FileNotFoundError:
             return False
 
+    def _encoder_choice(self, aspect_ratio: Optional[str]) -> Optional[EncoderChoice]:
+        """
+        Opción del perfil de encoder para la salida de este aspect ratio (None sin perfil)
+
+        Los borradores usan siempre x264 ultrafast, sin importar el perfil.
+        """
+        if self.draft:
+            return DRAFT_ENCODER_CHOICE
+        if self.encoder_profile is None:
+            return None
+        width, height = ASPECT_RATIO_OUTPUT_SIZES.get(aspect_ratio or "", (None, None))
+        return self.encoder_profile.choice_for(width, height)
+
+    def _output_size(
+        self, aspect_ratio: Optional[str], source_size: Optional[Tuple[int, int]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Resolución de salida de un aspect ratio (o de la fuente sin aspect ratio),
+        reducida al tamaño de borrador en modo draft
+        """
+        size = ASPECT_RATIO_OUTPUT_SIZES.get(aspect_ratio or "") or source_size
+        if size and self.draft:
+            return _draft_output_size(*size)
+        return size
+
+    def _base_video_filter(
+        self, aspect_ratio: Optional[str], source_size: Optional[Tuple[int, int]] = None
+    ) -> Optional[str]:
+        """
+        Primer filtro de video de un clip: el de aspect ratio, o en modo draft sin
+        aspect ratio el que reduce la fuente al tamaño de borrador (numérico si conozco
+        el tamaño de la fuente)
+        """
+        if aspect_ratio:
+            return self._get_aspect_ratio_filter(aspect_ratio)
+        if not self.draft:
+            return None
+        if source_size:
+            return "scale={}:{}".format(*self._output_size(None, source_size))
+        return DRAFT_SCALE_FILTER
+
+    def _profile_threads(self, ffmpeg_threads: int, aspect_ratio: Optional[str]) -> int:
+        """
+        Con ffmpeg_threads en auto (0) uso los threads más rápidos medidos en la calibración
+        """
+        if ffmpeg_threads != 0:
+            return ffmpeg_threads
+        choice = self._encoder_choice(aspect_ratio)
+        return choice.threads if choice is not None and choice.threads > 0 else ffmpeg_threads
+
+    def _audio_codec_for(self, video_path: Path, passthrough: bool) -> str:
+        """
+        Decido si el audio de la fuente se copia o se re-encodea a AAC
+        """
+        if not passthrough:
+            return "aac"
+        source_codec = (self.get_video_info(str(video_path)) or {}).get("audio_codec")
+        audio_codec = _resolve_audio_codec(source_codec, passthrough)
+        if audio_codec == "copy":
+            logger.info(f"Audio passthrough: copying {source_codec} audio from {video_path.name}")
+        elif source_codec:
+            logger.info(f"Audio passthrough not available for {source_codec}; re-encoding to AAC")
+        return audio_codec
+
+    def _prepare_loudness(
+        self,
+        video_path: Path,
+        *,
+        mode: str,
+        target_lufs: float,
+        transcript_path: Optional[str],
+    ) -> Optional[LoudnessNormalization]:
+        """
+        Cargo (o mido una vez) el loudness de la fuente para normalizar sus clips
+
+        Returns:
+            LoudnessNormalization, o None si está desactivado o no se pudo medir
+        """
+        if mode == "off":
+            return None
+        analysis = load_or_build_loudness_analysis(str(video_path), transcript_path)
+        if analysis is None:
+            logger.warning("Loudness normalization skipped: could not analyze the source audio")
+            return None
+        return LoudnessNormalization(analysis=analysis, mode=mode, target_lufs=target_lufs)
+
+    def _prepare_jump_cut(
+        self,
+        video_path: Path,
+        *,
+        max_silence_ms: int,
+        transcript_path: Optional[str],
+        loudness: Optional[LoudnessNormalization],
+    ) -> Optional[JumpCut]:
+        """
+        Cargo la línea de tiempo de palabras para los jump cuts de los clips
+
+        Como envolvente de energía uso el análisis de loudness si ya lo tengo (el de la
+        normalización o el cacheado junto al transcript); no lo mido solo para esto.
+
+        Returns:
+            JumpCut, o None si está desactivado o no hay transcript con palabras
+        """
+        if max_silence_ms <= 0:
+            return None
+        if not transcript_path:
+            logger.warning("Jump cuts skipped: they need the transcript word timeline")
+            return None
+        if loudness is not None:
+            analysis = loudness.analysis
+        else:
+            analysis = load_loudness_analysis(get_loudness_analysis_path(transcript_path), str(video_path))
+        return load_jump_cut(transcript_path, max_silence_ms, analysis)
+
+    def _face_tracking_worthwhile(
+        self,
+        video_path: Path,
+        clip_jobs: List[Tuple[Dict, Path]],
+        *,
+        face_coverage: Optional[FaceCoverage],
+        threshold: float,
+    ) -> bool:
+        """
+        Decido si vale la pena el face tracking para los clips de este video
+
+        Uso la cobertura que me pasan si sigue correspondiendo a la fuente; si no, la
+        sondeo (queda en self.last_face_coverage para guardarla en el estado). Si no la
+        puedo medir hago face tracking como siempre. La decisión queda en el log de cada clip.
+
+        Returns:
+            False si la fuente casi no tiene rostros (cobertura < threshold)
+        """
+        if face_coverage is None or not face_coverage.matches_source(str(video_path)):
+            face_coverage = probe_face_coverage(str(video_path))
+        self.last_face_coverage = face_coverage
+        if face_coverage is None:
+            return True
+
+        worthwhile = face_coverage.coverage >= threshold
+        decision = "used" if worthwhile else "skipped, using static crop"
+        for clip, _ in clip_jobs:
+            logger.info(
+                f"Clip {clip['clip_id']}: face tracking {decision} "
+                f"({face_coverage.summary()}, threshold {threshold:.0%})"
+            )
+        return worthwhile
+
+    def _reframe_filters(
+        self,
+        reframer: FaceReframer,
+        video_path: Path,
+        aspect_ratios: List[str],
+        *,
+        start_time: float,
+        end_time: float,
+        jump_cut_plan: Optional[JumpCutPlan],
+        clip_id,
+        face_track: Optional[FaceTrack] = None,
+    ) -> Dict[str, str]:
+        """
+        Pase 1 del face tracking en modo trajectory: el crop dinámico de cada aspect ratio
+
+        Devuelvo el filtro (sendcmd + crop + scale) que reemplaza al de aspect ratio en el
+        encode del clip. Va después de los jump cuts, así que sus tiempos pasan por la
+        línea de tiempo compactada.
+
+        Returns:
+            {aspect ratio: filtro}, vacío si no pude calcular la trayectoria (el caller
+            reencuadra por frames)
+        """
+        try:
+            trajectories = reframer.compute_crop_trajectories(
+                input_path=str(video_path),
+                outputs={aspect_ratio: self._output_size(aspect_ratio) for aspect_ratio in aspect_ratios},
+                start_time=start_time,
+                end_time=end_time,
+                face_track=face_track,
+            )
+        except (ValueError, RuntimeError) as e:
+            logger.warning(f"Crop trajectory unavailable for clip {clip_id} ({e}); reframing frames instead")
+            return {}
+        return {
+            aspect_ratio: trajectory.video_filter(
+                name=f"reframe_{_aspect_ratio_dir_name(aspect_ratio)}",
+                time_map=jump_cut_plan.remap if jump_cut_plan is not None else None,
+            )
+            for aspect_ratio, trajectory in trajectories.items()
+        }
+
+    def _run_ffmpeg(self, cmd: List[str], label: str) -> FFmpegResult:
+        """
+        Corro ffmpeg con el runner común (progreso, plazos, CPU/RSS, cola de stderr)
+        """
+        return run_ffmpeg(
+            cmd, label=label, timeout=self.ffmpeg_timeout, on_progress=self.ffmpeg_progress_callback
+        )
+
     def export_clips(
         self,
         video_path: str,
@@ -118,6 +717,7 @@ class VideoExporter:
         enable_face_tracking: bool = False,
         face_tracking_strategy: str = "keep_in_frame",
         face_tracking_sample_rate: int = 3,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
         # Branding parameters (PASO4 - Logo)
         add_logo: bool = False,
         logo_path: Optional[str] = None,
@@ -129,11 +729,27 @@ class VideoExporter:
         # Video quality and performance
         video_crf: int = 23,
         ffmpeg_threads: int = 0,
+        export_workers: int = 1,
+        single_decode: bool = False,
+        stream_copy: bool = False,
+        mezzanine: str = "off",
+        render_cache_dir: Optional[str] = None,
+        render_cache_max_mb: int = DEFAULT_RENDER_CACHE_MAX_MB,
+        render_cache_layers: bool = False,
+        audio_passthrough: bool = False,
+        loudness_normalization: str = "off",
+        loudness_target_lufs: float = DEFAULT_TARGET_LUFS,
+        jump_cut_max_silence_ms: int = 0,
+        # Face presence: cobertura ya sondeada (estado) y mínimo para hacer face tracking
+        face_coverage: Optional[FaceCoverage] = None,
+        face_coverage_threshold: float = DEFAULT_FACE_COVERAGE_THRESHOLD,
         # Subtitle formatting
         subtitle_max_chars_per_line: int = 42,
         subtitle_max_duration: float = 5.0,
         # Output structure
         flat_output: bool = False,
+        aspect_ratios: Optional[List[str]] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> List[str]:
         """
         Exporto todos los clips de un video
@@ -151,21 +767,68 @@ class VideoExporter:
             enable_face_tracking: Si True, usa detección de rostros para reencuadre dinámico (9:16 only)
             face_tracking_strategy: "keep_in_frame" (menos movimiento) o "centered" (siempre centrado)
             face_tracking_sample_rate: Procesar cada N frames (default: 3 = 3x speedup)
+            face_tracking_mode: "trajectory" (default): calculo solo la trayectoria del crop
+                sobre frames de detección chicos y ffmpeg cropea en el mismo encode que logo y
+                subtítulos (una decodificación, un encode). "frames": FaceReframer escribe un
+                video reencuadrado intermedio. Si la trayectoria no se puede calcular (ej.
+                fuente VFR), ese clip usa "frames".
             add_logo: Si True, superpone el logo en el video.
             logo_path: Ruta al archivo del logo (solo .png/.jpg/.jpeg).
             logo_position: Posición del logo ("top-right", "top-left", "bottom-right", "bottom-left").
             logo_scale: Escala del logo relativa al ancho del video (0.1 = 10%).
             trim_ms_start: Máximo silencio (ms) a conservar antes del habla (requiere transcript_path).
             trim_ms_end: Máximo silencio (ms) a conservar después del habla (requiere transcript_path).
+            export_workers: Clips exportados en paralelo (1 = secuencial, 0 = auto).
+                El presupuesto de ffmpeg_threads se reparte entre los workers.
+            single_decode: Si True, los clips cercanos entre sí se exportan desde
+                una sola decodificación (split/trim/atrim con varias salidas).
+                No aplica con face tracking; si el grupo falla, se exporta clip por clip.
+            stream_copy: Si True y no hay aspect ratio, logo ni subtítulos, copio los
+                GOPs completos del clip y solo re-encodeo los bordes (smart cut).
+            mezzanine: "off", "auto" u "on". Con "on" (o "auto" si hay suficientes clips
+                y la fuente tiene GOPs largos o es VFR) transcodifico la fuente una vez a
+                un intermedio con GOP corto y CFR, y todos los clips leen de ahí.
+                Requiere transcript_path (el mezzanine se guarda junto al transcript).
+            render_cache_dir: Si se indica, reutilizo clips ya renderizados con la misma
+                clave (fuente, ventana, filtergraph, logo, SRT y encoder) en vez de
+                re-encodearlos. Hits/misses quedan en self.last_render_cache_stats.
+            render_cache_max_mb: Tamaño máximo del cache; se desalojan los renders menos usados.
+            render_cache_layers: Si True (con render_cache_dir), además cacheo capas intermedias
+                (base reencuadrada y base + logo). Un cambio de estilo de subtítulos re-hace solo
+                la quema de subtítulos; un cambio de logo parte de la base.
+            audio_passthrough: Si True y el audio de la fuente es AAC, lo copio en vez de
+                re-encodearlo (no hay filtros de audio). Con otro códec uso AAC.
+            loudness_normalization: "off", "gain" o "loudnorm". Mido el loudness de la
+                fuente una vez (cacheado junto al transcript) y cada clip lleva su ganancia
+                lineal o un loudnorm de una pasada con sus valores medidos.
+            loudness_target_lufs: Loudness integrado objetivo de cada clip.
+            jump_cut_max_silence_ms: Si > 0 (con transcript_path), acorto a este máximo cada
+                silencio entre palabras del clip, en el mismo encode (select/aselect) y con
+                los subtítulos sobre la línea de tiempo compactada. Si hay análisis de
+                loudness solo corto lo que de verdad está en silencio. No se combina con
+                single_decode, stream_copy ni render_cache_layers.
+            face_coverage: Cobertura de rostros de la fuente ya sondeada (se vuelve a sondear
+                si no corresponde al archivo). La usada queda en self.last_face_coverage.
+            face_coverage_threshold: Con face tracking pedido, si menos de esta fracción de
+                las muestras de la fuente tiene rostros, exporto con crop estático (sin el
+                pase de FaceReframer).
             flat_output: Si True, escribe directamente en output_dir sin crear subcarpeta.
+            aspect_ratios: Varios aspect ratios a la vez (ej. ["9:16", "1:1", "16:9"]). Cada
+                variante va a su subcarpeta ("9x16", "1x1", ...) y todas salen de una sola
+                decodificación por clip (split con un encoder por salida). Con face tracking la
+                trayectoria del rostro se calcula una vez para las salidas verticales y cuadradas.
+                Reemplaza a aspect_ratio; con un solo valor equivale a aspect_ratio.
+            progress_callback: Llamado como (completados, total, clip_id) al terminar cada clip.
 
         Returns:
-            Lista de rutas a los clips exportados
+            Lista de rutas a los clips exportados (en el orden de `clips`; con aspect_ratios,
+            las variantes de cada clip en el orden pedido)
         """
         video_path = Path(video_path)
 
         if not video_path.exists():
             raise FileNotFoundError(f"Video no encontrado: {video_path}")
+        self._clip_srts = {}
 
         # Nombre base para los clips
         if video_name is None:
@@ -180,8 +843,6 @@ class VideoExporter:
 
         logger.info(f"Exportando clips a: {video_output_dir}")
 
-        exported_clips = []
-
         resolved_logo_path = None
         if add_logo:
             from src.utils.logo import coerce_logo_file
@@ -193,53 +854,382 @@ class VideoExporter:
                 )
                 add_logo = False
 
-        # Progress bar
-        with Progress() as progress:
-            task = progress.add_task(
-                f"[cyan]Exporting {len(clips)} clips...", total=len(clips)
+        # Preparo carpetas en el hilo principal: las rutas de salida dependen solo
+        # del clip_id, así que son las mismas con o sin paralelismo
+        clip_jobs = []
+        for clip in clips:
+            # Determinar carpeta de salida según estilo (si aplica)
+            clip_output_dir = video_output_dir
+
+            if organize_by_style and clip_styles:
+                clip_id = clip["clip_id"]
+                style = clip_styles.get(clip_id, "unclassified")
+
+                # Crear subcarpeta por estilo
+                clip_output_dir = video_output_dir / style
+                clip_output_dir.mkdir(parents=True, exist_ok=True)
+
+            clip_jobs.append((clip, clip_output_dir))
+
+        variant_ratios = self._resolve_variant_aspect_ratios(aspect_ratios)
+        if len(variant_ratios) == 1:
+            aspect_ratio = variant_ratios[0]
+
+        if self.draft and stream_copy:
+            # Copiar GOPs de la fuente dejaría el borrador a resolución completa
+            logger.info("Draft export: stream copy does not apply")
+            stream_copy = False
+
+        # Sin rostros en la fuente, el face tracking solo agrega un encode para
+        # terminar en el mismo center crop
+        self.last_face_coverage = None
+        if enable_face_tracking and (
+            any(ar in FACE_TRACKING_ASPECT_RATIOS for ar in variant_ratios)
+            if len(variant_ratios) > 1
+            else aspect_ratio == "9:16"
+        ):
+            enable_face_tracking = self._face_tracking_worthwhile(
+                Path(video_path),
+                clip_jobs,
+                face_coverage=face_coverage,
+                threshold=face_coverage_threshold,
             )
 
-            for clip in clips:
-                # Determinar carpeta de salida según estilo (si aplica)
-                clip_output_dir = video_output_dir
+        uses_face_tracking = enable_face_tracking and aspect_ratio == "9:16"
+        if face_tracking_mode not in FACE_TRACKING_MODES:
+            logger.warning(
+                f"Unknown face tracking mode '{face_tracking_mode}', using '{DEFAULT_FACE_TRACKING_MODE}'"
+            )
+            face_tracking_mode = DEFAULT_FACE_TRACKING_MODE
+        filterless = not aspect_ratio and not add_logo and not (add_subtitles and transcript_path)
+        ffmpeg_threads = self._profile_threads(ffmpeg_threads, aspect_ratio)
+
+        # Mezzanine: a partir de acá todos los clips (y el reframer) leen del intermedio.
+        # Con varias variantes, la altura la define la más alta
+        source_path = video_path
+        mezzanine_path = self._prepare_mezzanine(
+            video_path,
+            mode=mezzanine,
+            clip_count=len(clip_jobs),
+            aspect_ratio=(
+                max(variant_ratios, key=lambda ar: ASPECT_RATIO_OUTPUT_SIZES[ar][1])
+                if len(variant_ratios) > 1
+                else aspect_ratio
+            ),
+            transcript_path=transcript_path,
+            ffmpeg_threads=ffmpeg_threads,
+            audio_passthrough=audio_passthrough,
+        )
+        if mezzanine_path is not None:
+            video_path = mezzanine_path
+        # La normalización filtra el audio: con ella no hay passthrough
+        loudness = self._prepare_loudness(
+            source_path,
+            mode=loudness_normalization,
+            target_lufs=loudness_target_lufs,
+            transcript_path=transcript_path,
+        )
+        jump_cut = self._prepare_jump_cut(
+            source_path,
+            max_silence_ms=jump_cut_max_silence_ms,
+            transcript_path=transcript_path,
+            loudness=loudness,
+        )
+        if jump_cut is not None:
+            # Los cortes se filtran en el encode del clip: nada de copiar GOPs ni de capas
+            # intermedias sin cortar
+            if single_decode or stream_copy or render_cache_layers:
+                logger.info(
+                    "Jump cuts: single-decode grouping, stream copy and cached layers do not apply"
+                )
+            single_decode = stream_copy = render_cache_layers = False
+            filterless = False
+        # Los filtros de audio (normalización, jump cuts) no admiten passthrough
+        audio_codec = (
+            "aac"
+            if loudness is not None or jump_cut is not None
+            else self._audio_codec_for(video_path, audio_passthrough)
+        )
 
-                if organize_by_style and clip_styles:
-                    clip_id = clip["clip_id"]
-                    style = clip_styles.get(clip_id, "unclassified")
+        # Journal del export: un corte a mitad de corrida no obliga a rehacer los clips ya terminados
+        journal = ExportJournal(get_export_journal_path(video_output_dir, video_name))
+        self.last_resumed_clips = 0
 
-                    # Crear subcarpeta por estilo
-                    clip_output_dir = video_output_dir / style
-                    clip_output_dir.mkdir(parents=True, exist_ok=True)
+        if len(variant_ratios) > 1:
+            if single_decode or stream_copy or render_cache_layers:
+                logger.info(
+                    "Multi-aspect export: single-decode grouping, stream copy and cached layers "
+                    "do not apply (each clip is already decoded once for all variants)"
+                )
+            return self._export_clip_variant_sets(
+                video_path=video_path,
+                source_path=source_path,
+                clip_jobs=clip_jobs,
+                aspect_ratios=variant_ratios,
+                add_subtitles=add_subtitles,
+                transcript_path=transcript_path,
+                subtitle_style=subtitle_style,
+                custom_style=custom_style,
+                enable_face_tracking=enable_face_tracking,
+                face_tracking_strategy=face_tracking_strategy,
+                face_tracking_sample_rate=face_tracking_sample_rate,
+                face_tracking_mode=face_tracking_mode,
+                add_logo=add_logo,
+                logo_path=resolved_logo_path,
+                logo_position=logo_position,
+                logo_scale=logo_scale,
+                trim_ms_start=trim_ms_start,
+                trim_ms_end=trim_ms_end,
+                video_crf=video_crf,
+                audio_codec=audio_codec,
+                loudness=loudness,
+                ffmpeg_threads=ffmpeg_threads,
+                export_workers=export_workers,
+                render_cache_dir=render_cache_dir,
+                render_cache_max_mb=render_cache_max_mb,
+                subtitle_max_chars_per_line=subtitle_max_chars_per_line,
+                subtitle_max_duration=subtitle_max_duration,
+                progress_callback=progress_callback,
+                journal=journal,
+                jump_cut=jump_cut,
+            )
 
-                clip_path = self._export_single_clip(
-                    video_path=video_path,
-                    clip=clip,
-                    video_name=video_name,
-                    output_dir=clip_output_dir,
-                    aspect_ratio=aspect_ratio,
-                    add_subtitles=add_subtitles,
+        # La clave de render identifica cada clip en el journal y en el cache de renders:
+        # los clips ya exportados con la misma clave se saltan, los cacheados se copian
+        results: List[Optional[Path]] = [None] * len(clip_jobs)
+        self.last_render_cache_stats: Optional[RenderCacheStats] = None
+        render_cache: Optional[RenderCache] = None
+        render_keys: Dict[int, str] = {}
+        layer_keys: Dict[int, ClipLayerKeys] = {}
+        render_keys, layer_keys = self._compute_clip_render_keys(
+            clip_jobs,
+            video_path=video_path,
+            aspect_ratio=aspect_ratio,
+            add_subtitles=add_subtitles,
+            transcript_path=transcript_path,
+            subtitle_style=subtitle_style,
+            custom_style=custom_style,
+            uses_face_tracking=uses_face_tracking,
+            face_tracking_strategy=face_tracking_strategy,
+            face_tracking_sample_rate=face_tracking_sample_rate,
+            face_tracking_mode=face_tracking_mode,
+            logo_path=resolved_logo_path if add_logo else None,
+            logo_position=logo_position,
+            logo_scale=logo_scale,
+            trim_ms_start=trim_ms_start,
+            trim_ms_end=trim_ms_end,
+            video_crf=video_crf,
+            audio_codec=audio_codec,
+            loudness=loudness,
+            smart_cut=stream_copy and filterless,
+            subtitle_max_chars_per_line=subtitle_max_chars_per_line,
+            subtitle_max_duration=subtitle_max_duration,
+            with_layers=render_cache_layers and bool(render_cache_dir),
+            jump_cut=jump_cut,
+        )
+        if render_keys and render_cache_dir:
+            render_cache = RenderCache(render_cache_dir, max_bytes=render_cache_max_mb * 1024 * 1024)
+
+        resumed_indices: List[int] = []
+        cached_indices: List[int] = []
+        pending_indices: List[int] = []
+        for idx, (clip, clip_output_dir) in enumerate(clip_jobs):
+            output_path = clip_output_dir / f"{clip['clip_id']}.mp4"
+            if idx in render_keys and journal.is_complete(output_path, render_keys[idx]):
+                logger.info(f"✓ Clip {clip['clip_id']} already exported (export journal): {output_path.name}")
+                results[idx] = output_path
+                resumed_indices.append(idx)
+            elif render_cache is not None and render_cache.fetch(render_keys[idx], output_path):
+                logger.info(f"✓ Clip {clip['clip_id']} reused from render cache: {output_path.name}")
+                results[idx] = output_path
+                cached_indices.append(idx)
+            else:
+                pending_indices.append(idx)
+
+        # Cada tarea es una lista de índices de clip_jobs: un clip suelto va por
+        # _export_single_clip; un grupo comparte una sola decodificación
+        tasks: List[List[int]] = [[idx] for idx in pending_indices]
+        if single_decode and stream_copy and filterless:
+            logger.info("Single-decode export skipped: filterless clips use the stream-copy fast path")
+        elif single_decode and layer_keys:
+            logger.info("Single-decode export skipped: the layered render cache needs per-clip layer outputs")
+        elif single_decode and uses_face_tracking:
+            logger.info("Single-decode export disabled: face tracking needs a per-clip reframe pass")
+        elif single_decode and len(pending_indices) > 1:
+            windows = [
+                self._resolve_clip_window(
+                    clip_jobs[idx][0],
                     transcript_path=transcript_path,
-                    subtitle_style=subtitle_style,
-                    custom_style=custom_style,
                     trim_ms_start=trim_ms_start,
                     trim_ms_end=trim_ms_end,
-                    enable_face_tracking=enable_face_tracking,
-                    face_tracking_strategy=face_tracking_strategy,
-                    face_tracking_sample_rate=face_tracking_sample_rate,
-                    add_logo=add_logo,
-                    logo_path=resolved_logo_path,
-                    logo_position=logo_position,
-                    logo_scale=logo_scale,
-                    video_crf=video_crf,
-                    ffmpeg_threads=ffmpeg_threads,
-                    subtitle_max_chars_per_line=subtitle_max_chars_per_line,
-                    subtitle_max_duration=subtitle_max_duration,
                 )
+                for idx in pending_indices
+            ]
+            tasks = [
+                [pending_indices[i] for i in group]
+                for group in _plan_single_decode_groups(windows)
+            ]
+            grouped = sum(len(t) for t in tasks if len(t) > 1)
+            logger.info(
+                f"Single-decode export: {grouped}/{len(pending_indices)} clips in "
+                f"{sum(1 for t in tasks if len(t) > 1)} shared decodes"
+            )
 
-                if clip_path:
-                    exported_clips.append(str(clip_path))
+        # Índice de keyframes (una pasada de ffprobe por fuente, cacheado junto al
+        # transcript) para los caminos que planean seeks: smart cut y face tracking por
+        # frames (la trayectoria la lee ffmpeg). El del mezzanine no lo persisto: el
+        # archivo junto al transcript es el de la fuente
+        keyframe_index: Optional[KeyframeIndex] = None
+        if pending_indices and (
+            (stream_copy and filterless) or (uses_face_tracking and face_tracking_mode == "frames")
+        ):
+            keyframe_index = load_or_build_keyframe_index(
+                str(video_path),
+                transcript_path if video_path == source_path else None,
+            )
 
-                progress.update(task, advance=1)
+        # Cache de rostros de la fuente (junto al transcript, como el índice): clips que
+        # se solapan y los re-exports solo detectan los frames que todavía no tiene
+        face_track: Optional[FaceTrack] = None
+        if pending_indices and uses_face_tracking:
+            face_track = open_face_track(
+                str(video_path),
+                transcript_path if video_path == source_path else None,
+            )
+
+        workers = _resolve_export_workers(export_workers, len(tasks))
+        threads_per_worker = _split_thread_budget(ffmpeg_threads, workers)
+        if workers > 1:
+            logger.info(
+                f"Exportando {len(clips)} clips con {workers} workers "
+                f"({threads_per_worker} threads de ffmpeg cada uno)"
+            )
+
+        def _export(idx: int) -> Optional[Path]:
+            clip, clip_output_dir = clip_jobs[idx]
+            return self._export_single_clip(
+                video_path=video_path,
+                clip=clip,
+                video_name=video_name,
+                output_dir=clip_output_dir,
+                aspect_ratio=aspect_ratio,
+                add_subtitles=add_subtitles,
+                transcript_path=transcript_path,
+                subtitle_style=subtitle_style,
+                custom_style=custom_style,
+                trim_ms_start=trim_ms_start,
+                trim_ms_end=trim_ms_end,
+                enable_face_tracking=enable_face_tracking,
+                face_tracking_strategy=face_tracking_strategy,
+                face_tracking_sample_rate=face_tracking_sample_rate,
+                face_tracking_mode=face_tracking_mode,
+                add_logo=add_logo,
+                logo_path=resolved_logo_path,
+                logo_position=logo_position,
+                logo_scale=logo_scale,
+                video_crf=video_crf,
+                audio_codec=audio_codec,
+                loudness=loudness,
+                ffmpeg_threads=threads_per_worker,
+                subtitle_max_chars_per_line=subtitle_max_chars_per_line,
+                subtitle_max_duration=subtitle_max_duration,
+                stream_copy=stream_copy,
+                keyframe_index=keyframe_index,
+                face_track=face_track,
+                render_cache=render_cache,
+                render_key=render_keys.get(idx),
+                layer_keys=layer_keys.get(idx),
+                jump_cut=jump_cut,
+            )
+
+        def _run_task(indices: List[int]) -> List[Optional[Path]]:
+            if len(indices) == 1:
+                return [_export(indices[0])]
+
+            group_paths = self._export_clip_group(
+                video_path=video_path,
+                clip_jobs=[clip_jobs[idx] for idx in indices],
+                aspect_ratio=aspect_ratio,
+                add_subtitles=add_subtitles,
+                transcript_path=transcript_path,
+                subtitle_style=subtitle_style,
+                custom_style=custom_style,
+                trim_ms_start=trim_ms_start,
+                trim_ms_end=trim_ms_end,
+                add_logo=add_logo,
+                logo_path=resolved_logo_path,
+                logo_position=logo_position,
+                logo_scale=logo_scale,
+                video_crf=video_crf,
+                audio_codec=audio_codec,
+                loudness=loudness,
+                ffmpeg_threads=threads_per_worker,
+                subtitle_max_chars_per_line=subtitle_max_chars_per_line,
+                subtitle_max_duration=subtitle_max_duration,
+            )
+            if group_paths is not None:
+                if render_cache is not None:
+                    for idx, path in zip(indices, group_paths):
+                        if path is not None:
+                            render_cache.store(render_keys[idx], path)
+                return group_paths
+
+            # Fallback: un proceso por clip
+            logger.warning(
+                f"Single-decode export failed for {len(indices)} clips; falling back to per-clip export"
+            )
+            return [_export(idx) for idx in indices]
+
+        completed = 0
+
+        # Progress bar
+        with Progress() as progress:
+            task = progress.add_task(
+                f"[cyan]Exporting {len(clips)} clips...", total=len(clips)
+            )
+
+            def _on_task_done(indices: List[int], paths: List[Optional[Path]], *, journaled: bool = False) -> None:
+                nonlocal completed
+                for idx, path in zip(indices, paths):
+                    results[idx] = path
+                    if path is not None and not journaled and idx in render_keys:
+                        self._journal_exported_clip(
+                            journal,
+                            path,
+                            clip=clip_jobs[idx][0],
+                            render_key=render_keys[idx],
+                            transcript_path=transcript_path,
+                            trim_ms_start=trim_ms_start,
+                            trim_ms_end=trim_ms_end,
+                            jump_cut=jump_cut,
+                        )
+                    completed += 1
+                    progress.update(task, advance=1)
+                    if progress_callback:
+                        progress_callback(completed, len(clip_jobs), str(clip_jobs[idx][0].get("clip_id")))
+
+            if resumed_indices:
+                self.last_resumed_clips = len(resumed_indices)
+                logger.info(f"Resuming export: {len(resumed_indices)}/{len(clip_jobs)} clips already exported")
+                _on_task_done(resumed_indices, [results[idx] for idx in resumed_indices], journaled=True)
+            if cached_indices:
+                _on_task_done(cached_indices, [results[idx] for idx in cached_indices])
+
+            if workers <= 1:
+                for indices in tasks:
+                    _on_task_done(indices, _run_task(indices))
+            else:
+                # ffmpeg hace el trabajo pesado fuera del GIL; los threads solo esperan
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clip-export") as pool:
+                    futures = {pool.submit(_run_task, indices): indices for indices in tasks}
+                    for future in as_completed(futures):
+                        _on_task_done(futures[future], future.result())
+
+        if render_cache is not None:
+            self.last_render_cache_stats = render_cache.stats
+            logger.info(f"Render cache: {render_cache.stats.summary()}")
+
+        exported_clips = [str(path) for path in results if path]
 
         return exported_clips
 
@@ -265,6 +1255,11 @@ class VideoExporter:
         # Speech-aware trimming: maximum silence buffer at start/end (milliseconds)
         trim_ms_start: int = 0,
         trim_ms_end: int = 0,
+        # Encode en paralelo por segmentos: 1=un solo encode, 0=auto, N=hasta N segmentos
+        segments: int = 1,
+        audio_passthrough: bool = False,
+        loudness_normalization: str = "off",
+        loudness_target_lufs: float = DEFAULT_TARGET_LUFS,
     ) -> str:
         """
         Exporto un video completo aplicando (opcionalmente) subtítulos y logo.
@@ -274,6 +1269,11 @@ class VideoExporter:
 
         Args:
             flat_output: Si True, escribe directamente en output_dir sin crear subcarpeta.
+            segments: Con más de 1, corto el timeline en keyframes y encodeo los
+                segmentos en paralelo (ver _export_full_video_segmented).
+            audio_passthrough: Si True y el audio de la fuente es AAC, lo copio.
+            loudness_normalization: "off", "gain" o "loudnorm" (ver export_clips); se
+                mide la ventana exportada completa.
         """
         video_path_p = Path(video_path)
         if not video_path_p.exists():
@@ -365,171 +1365,1645 @@ class VideoExporter:
             else:
                 logger.warning("Failed to regenerate trimmed SRT; subtitles may be desynced if trimming occurred.")
 
-        # Use a two-step process when both logo and subtitles are enabled to avoid subtitle duplication bugs.
-        needs_two_steps = has_logo and has_subtitles
-        temp_path_step1 = video_output_dir / f"{output_path.stem}_step1_temp.mp4"
+        loudness = self._prepare_loudness(
+            video_path_p,
+            mode=loudness_normalization,
+            target_lufs=loudness_target_lufs,
+            transcript_path=transcript_path,
+        )
+        audio_filter = None
+        if loudness is not None:
+            window_end = trim_window_end
+            if window_end is None:
+                window_end = float(self.get_video_info(str(video_path_p)).get("duration") or 0)
+            audio_filter = loudness.filter_for(trim_window_start, window_end)
+        audio_codec = "aac" if loudness is not None else self._audio_codec_for(video_path_p, audio_passthrough)
 
         try:
-            if needs_two_steps:
-                logger.info("Applying logo first, then subtitles in a second step (shorts export).")
-
-                logo_chains, logo_out = self._get_logo_overlay_filter(
-                    video_stream="[0:v]",
-                    logo_stream="[1:v]",
-                    position=logo_position,
-                    scale=logo_scale,
+            segment_count = _resolve_full_video_segments(segments)
+            if segment_count > 1:
+                segmented_path = self._export_full_video_segmented(
+                    video_path=video_path_p,
+                    output_path=output_path,
+                    transcript_path=transcript_path,
+                    window_start=trim_window_start,
+                    window_end=trim_window_end,
+                    segment_count=segment_count,
+                    srt_file=srt_file if has_subtitles else None,
+                    subtitle_style=subtitle_style,
+                    custom_style=custom_style,
+                    logo_path=resolved_logo_path if has_logo else None,
+                    logo_position=logo_position,
+                    logo_scale=logo_scale,
+                    video_crf=video_crf,
+                    audio_codec=audio_codec,
+                    audio_filter=audio_filter,
+                    ffmpeg_threads=ffmpeg_threads,
                 )
-                resolved_threads = _resolve_ffmpeg_threads(ffmpeg_threads)
-                # Build command with trim args before -i for fast seeking
-                cmd1 = ["ffmpeg"]
-                cmd1.extend(trim_args)  # -ss before -i for fast seeking
-                cmd1.extend(["-i", str(video_path_p)])
-                cmd1.extend(["-i", str(resolved_logo_path)])
-                cmd1.extend(duration_args)  # -t after inputs
-                cmd1.extend([
-                    "-filter_complex",
-                    ";".join(logo_chains),
-                    "-map",
-                    logo_out,
-                    "-map",
-                    "0:a?",
-                    "-sn",
-                    "-c:v",
-                    "libx264",
-                    "-c:a",
-                    "aac",
-                    "-preset",
-                    "fast",
-                    "-crf",
-                    str(video_crf),
-                    "-threads",
-                    str(resolved_threads),
-                    "-y",
-                    str(temp_path_step1),
-                ])
-                result1 = subprocess.run(cmd1, capture_output=True, text=True, check=False)
-                if result1.returncode != 0:
-                    raise RuntimeError(f"Error exporting short (step 1): {result1.stderr}")
-
-                subtitle_filter = self._get_subtitle_filter(str(srt_file), subtitle_style, custom_style)
-                cmd2 = [
-                    "ffmpeg",
-                    "-i",
-                    str(temp_path_step1),
-                    "-vf",
-                    subtitle_filter,
-                    "-c:a",
-                    "copy",
+                if segmented_path is not None:
+                    return str(segmented_path)
+
+            # Un solo encode: logo y subtítulos en el mismo filtergraph (subtítulos al final).
+            # Build command with trim args
+            cmd = ["ffmpeg"]
+            cmd.extend(trim_args)  # -ss before -i for fast seeking
+
+            subtitle_filter = (
+                self._get_subtitle_filter(str(srt_file), subtitle_style, custom_style) if has_subtitles else None
+            )
+
+            cmd.extend(["-i", str(video_path_p)])
+            if has_logo:
+                cmd.extend(["-i", str(resolved_logo_path)])
+            cmd.extend(duration_args)  # -t after inputs
+            cmd.extend(
+                self._build_full_video_filter_args(
+                    video_path=video_path_p,
+                    subtitle_filter=subtitle_filter,
+                    has_logo=has_logo,
+                    logo_position=logo_position,
+                    logo_scale=logo_scale,
+                )
+            )
+
+            # El short conserva la resolución de la fuente: opción de mayor área del perfil
+            resolved_threads = _resolve_ffmpeg_threads(self._profile_threads(ffmpeg_threads, None))
+            if audio_filter:
+                cmd.extend(["-filter:a", audio_filter])
+            cmd.extend(
+                [
+                    "-map",
+                    "0:a?",
+                    "-sn",
+                    *_clip_encoder_args(video_crf, audio_codec, choice=self._encoder_choice(None)),
+                    "-threads",
+                    str(resolved_threads),
                     "-y",
                     str(output_path),
                 ]
-                result2 = subprocess.run(cmd2, capture_output=True, text=True, check=False)
-                if result2.returncode != 0:
-                    raise RuntimeError(f"Error exporting short (step 2): {result2.stderr}")
+            )
+
+            result = self._run_ffmpeg(cmd, label=f"full video {output_path.name}")
+            if result.returncode != 0:
+                raise RuntimeError(f"Error exporting short: {result.stderr}")
+
+            return str(output_path)
+
+        finally:
+            if temp_srt_path and temp_srt_path.exists():
+                temp_srt_path.unlink()
+
+    def _build_full_video_filter_args(
+        self,
+        *,
+        video_path: Path,
+        subtitle_filter: Optional[str],
+        has_logo: bool,
+        logo_position: str,
+        logo_scale: float,
+        video_label: str = "[0:v]",
+        pts_offset: float = 0.0,
+    ) -> List[str]:
+        """
+        Args de filtro del video completo: logo (input 1) → subtítulos
+
+        Args:
+            video_label: Stream de video de la fuente (los segmentos mapean "[0:v:0]")
+            pts_offset: Con un segmento que no arranca en la ventana, corro los
+                timestamps solo para quemar los subtítulos con el reloj de la ventana
+        """
+        graph = FilterGraph()
+        input_size, input_pix_fmt = _source_frame(self.get_video_info(str(video_path)))
+        graph.set_input(video_label, size=input_size, pix_fmt=input_pix_fmt)
+        video = video_label
+        if has_logo:
+            video = graph.overlay_logo(video, "[1:v]", scale=logo_scale, position=logo_position, output="[v_out]")
+        if subtitle_filter:
+            filters = [subtitle_filter]
+            if pts_offset:
+                filters = [f"setpts=PTS+{pts_offset:.6f}/TB", subtitle_filter, f"setpts=PTS-{pts_offset:.6f}/TB"]
+            video = graph.chain(video, filters, "[v_sub]")
+        return graph.filter_args(video, pix_fmt=OUTPUT_PIX_FMT)
+
+    def _export_full_video_segmented(
+        self,
+        *,
+        video_path: Path,
+        output_path: Path,
+        transcript_path: Optional[str],
+        window_start: float,
+        window_end: Optional[float],
+        segment_count: int,
+        srt_file: Optional[Path] = None,
+        subtitle_style: str = "default",
+        custom_style: Optional[Dict[str, str]] = None,
+        logo_path: Optional[str] = None,
+        logo_position: str = "top-right",
+        logo_scale: float = 0.1,
+        video_crf: int = 23,
+        audio_codec: str = "aac",
+        audio_filter: Optional[str] = None,
+        ffmpeg_threads: int = 0,
+    ) -> Optional[Path]:
+        """
+        Exporto el video completo en segmentos encodeados en paralelo.
+
+        Corto el timeline justo después de keyframes (cada segmento arranca con un
+        seek barato), encodeo cada segmento con el mismo filtergraph y los uno con el
+        concat demuxer en MPEG-TS, como el smart-cut. Los subtítulos se queman con el
+        timestamp de la ventana completa (setpts desplazado por segmento). El audio no
+        pasa por los segmentos: se encodea (o se copia) una sola vez para toda la
+        ventana en el mux, así no quedan huecos en las uniones.
+
+        Returns:
+            Ruta exportada, o None si no se puede segmentar o algo falla
+            (el caller hace el encode único)
+        """
+        info = self.get_video_info(str(video_path))
+        if not info:
+            return None
+        # Los cortes a medio frame necesitan un frame rate constante
+        if not info.get("is_cfr", True):
+            logger.info("Segmented full-video export skipped: variable frame rate source")
+            return None
+        fps = float(info.get("fps") or 0)
+        if fps <= 0:
+            return None
+
+        if window_end is None:
+            window_end = float(info.get("duration") or 0)
+        if window_end - window_start <= 0:
+            return None
+
+        index = load_or_build_keyframe_index(str(video_path), transcript_path)
+        if index is None or not index.keyframe_times:
+            logger.info("Segmented full-video export skipped: no keyframe index for the source")
+            return None
+
+        plan = _plan_full_video_segments(
+            window_start, window_end, index.keyframe_times, segment_count, 1.0 / fps
+        )
+        if len(plan) < 2:
+            logger.info("Segmented full-video export skipped: window too short to split")
+            return None
+
+        subtitle_filter = (
+            self._get_subtitle_filter(str(srt_file), subtitle_style, custom_style) if srt_file else None
+        )
+        segment_threads = _split_thread_budget(self._profile_threads(ffmpeg_threads, None), len(plan))
+        work_dir = output_path.parent / f"{output_path.stem}_segments_temp"
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        def _segment_cmd(number: int, seg_start: float, seg_end: float) -> List[str]:
+            cmd = ["ffmpeg", "-ss", str(seg_start), "-i", str(video_path)]
+            if logo_path:
+                cmd.extend(["-i", str(logo_path)])
+            cmd.extend(["-t", str(seg_end - seg_start)])
+            cmd.extend(
+                self._build_full_video_filter_args(
+                    video_path=video_path,
+                    subtitle_filter=subtitle_filter,
+                    has_logo=bool(logo_path),
+                    logo_position=logo_position,
+                    logo_scale=logo_scale,
+                    video_label="[0:v:0]",
+                    pts_offset=seg_start - window_start,
+                )
+            )
+            cmd.extend(
+                [
+                    "-an",
+                    "-sn",
+                    *_clip_encoder_args(video_crf, choice=self._encoder_choice(None)),
+                    "-threads", str(segment_threads),
+                    "-f", SMART_CUT_PIECE_FORMAT,
+                    "-y", str(work_dir / f"segment_{number:03d}.ts"),
+                ]
+            )
+            return cmd
+
+        def _encode_segment(number: int, seg_start: float, seg_end: float) -> FFmpegResult:
+            return self._run_ffmpeg(
+                _segment_cmd(number, seg_start, seg_end),
+                label=f"full video {output_path.name} segment {number + 1}/{len(plan)}",
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(plan)) as pool:
+                results = list(pool.map(lambda item: _encode_segment(item[0], *item[1]), enumerate(plan)))
+            for number, result in enumerate(results):
+                if result.returncode != 0:
+                    logger.warning(
+                        f"Full-video segment {number + 1}/{len(plan)} failed: {result.stderr[-1000:]}"
+                    )
+                    return None
+
+            # Duración exacta de cada segmento (frames * intervalo): la que lee el concat
+            # demuxer del archivo se corre hasta un frame y deja saltos en las uniones
+            frame_interval = 1.0 / fps
+            phase = index.keyframe_times[0]
+            concat_list = work_dir / "segments.txt"
+            concat_list.write_text(
+                "".join(
+                    f"file '{(work_dir / f'segment_{number:03d}.ts').as_posix()}'\n"
+                    f"duration {_count_cfr_frames(seg_start, seg_end, phase, frame_interval) * frame_interval:.6f}\n"
+                    for number, (seg_start, seg_end) in enumerate(plan)
+                ),
+                encoding="utf-8",
+            )
+            mux_cmd = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(concat_list)]
+            if window_start > 0:
+                mux_cmd.extend(["-ss", str(window_start)])
+            mux_cmd.extend(
+                [
+                    "-t", str(window_end - window_start),
+                    "-i", str(video_path),
+                    "-map", "0:v:0",
+                    "-map", "1:a?",
+                    "-sn",
+                    "-c:v", "copy",
+                    "-c:a", audio_codec,
+                    *(["-filter:a", audio_filter] if audio_filter else []),
+                    "-y", str(output_path),
+                ]
+            )
+            result = self._run_ffmpeg(mux_cmd, label=f"full video {output_path.name} concat")
+            if result.returncode != 0:
+                logger.warning(f"Full-video segment concat failed: {result.stderr[-1000:]}")
+                return None
+
+            logger.info(
+                f"✓ Exported full video in {len(plan)} parallel segments: {output_path.name} "
+                f"({window_end - window_start:.2f}s)"
+            )
+            return output_path
+
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _escape_ffmpeg_filter_path(self, path: str) -> str:
+        """
+        Escapa una ruta para usarse dentro de un string de filtro de ffmpeg.
+
+        Nota: esto está pensado para filtros como `subtitles=...` y `movie=...`.
+        """
+        # Order matters: escape backslashes first.
+        return path.replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
+
+    def _export_single_clip(
+        self,
+        video_path: Path,
+        clip: Dict,
+        video_name: str,
+        output_dir: Path,
+        aspect_ratio: Optional[str] = None,
+        add_subtitles: bool = False,
+        transcript_path: Optional[str] = None,
+        subtitle_style: str = "default",
+        custom_style: Optional[Dict[str, str]] = None,
+        enable_face_tracking: bool = False,
+        face_tracking_strategy: str = "keep_in_frame",
+        face_tracking_sample_rate: int = 3,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
+        add_logo: bool = False,
+        logo_path: Optional[str] = None,
+        logo_position: str = "top-right",
+        logo_scale: float = 0.1,
+        # Speech-edge trimming parameters
+        trim_ms_start: int = 0,
+        trim_ms_end: int = 0,
+        # Video quality and performance
+        video_crf: int = 23,
+        audio_codec: str = "aac",
+        loudness: Optional[LoudnessNormalization] = None,
+        ffmpeg_threads: int = 0,
+        # Subtitle formatting
+        subtitle_max_chars_per_line: int = 42,
+        subtitle_max_duration: float = 5.0,
+        # Fast path without filters
+        stream_copy: bool = False,
+        keyframe_index: Optional[KeyframeIndex] = None,
+        face_track: Optional[FaceTrack] = None,
+        # Cache de renders (la clave la calcula export_clips)
+        render_cache: Optional[RenderCache] = None,
+        render_key: Optional[str] = None,
+        layer_keys: Optional[ClipLayerKeys] = None,
+        jump_cut: Optional[JumpCut] = None,
+    ) -> Optional[Path]:
+        clip_id = clip["clip_id"]
+        start_time, end_time = self._resolve_clip_window(
+            clip,
+            transcript_path=transcript_path,
+            trim_ms_start=trim_ms_start,
+            trim_ms_end=trim_ms_end,
+        )
+
+        duration = end_time - start_time
+        jump_cut_plan = jump_cut.plan_for(start_time, end_time) if jump_cut is not None else None
+        if jump_cut_plan is not None:
+            logger.info(
+                f"Jump cuts for clip {clip_id}: {len(jump_cut_plan.keep) - 1} silences, "
+                f"{jump_cut_plan.removed:.2f}s removed"
+            )
+        audio_filter = _clip_audio_filter(start_time, end_time, loudness, jump_cut_plan)
+
+        output_filename = f"{clip_id}.mp4"
+        output_path = output_dir / output_filename
+
+        # Sin filtros de video no hace falta re-encodear los GOPs completos
+        filterless = (
+            not aspect_ratio
+            and not (add_logo and logo_path)
+            and not (add_subtitles and transcript_path)
+            and jump_cut_plan is None
+        )
+        if stream_copy and filterless:
+            smart_cut_path = self._export_smart_cut_clip(
+                video_path=video_path,
+                clip_id=clip_id,
+                start_time=start_time,
+                end_time=end_time,
+                output_path=output_path,
+                video_crf=video_crf,
+                audio_codec=audio_codec,
+                audio_filter=audio_filter,
+                ffmpeg_threads=ffmpeg_threads,
+                keyframe_index=keyframe_index,
+            )
+            if smart_cut_path is not None:
+                if render_cache is not None and render_key:
+                    render_cache.store(render_key, smart_cut_path)
+                return smart_cut_path
+
+        # Define paths for temporary files
+        temp_reframed_path = output_dir / f"{clip_id}_reframed_temp.mp4"
+
+        subtitle_file = None
+        if add_subtitles and transcript_path:
+            subtitle_filename = f"{clip_id}.srt"
+            subtitle_file = output_dir / subtitle_filename
+            self._write_clip_srt(
+                subtitle_file,
+                transcript_path=transcript_path,
+                start_time=start_time,
+                end_time=end_time,
+                max_chars_per_line=subtitle_max_chars_per_line,
+                max_duration=subtitle_max_duration,
+                time_map=jump_cut_plan.remap if jump_cut_plan is not None else None,
+            )
+
+        # Capas cacheadas: si solo cambió el estilo de subtítulos, no vuelvo a la fuente
+        use_layers = render_cache is not None and layer_keys is not None and jump_cut_plan is None
+        if use_layers:
+            layered_path = self._export_clip_from_cached_layer(
+                clip_id=clip_id,
+                layer_keys=layer_keys,
+                render_cache=render_cache,
+                output_path=output_path,
+                subtitle_filter=(
+                    self._get_subtitle_filter(str(subtitle_file), subtitle_style, custom_style)
+                    if subtitle_file is not None and subtitle_file.exists()
+                    else None
+                ),
+                logo_path=logo_path if add_logo else None,
+                logo_position=logo_position,
+                logo_scale=logo_scale,
+                video_crf=video_crf,
+                ffmpeg_threads=ffmpeg_threads,
+                aspect_ratio=aspect_ratio,
+                audio_filter=audio_filter,
+            )
+            if layered_path is not None:
+                if render_key:
+                    render_cache.store(render_key, layered_path)
+                return layered_path
+
+        video_to_process = video_path
+        layer_temp_paths: Dict[str, Path] = {}
+        partial_path = _partial_output_path(output_path)
+
+        face_tracking_requested = enable_face_tracking and aspect_ratio == "9:16"
+        # Modo trajectory: crop dinámico que ffmpeg aplica sobre la fuente en este encode
+        reframe_filter: Optional[str] = None
+        if face_tracking_requested:
+            logger.info(
+                f"Face tracking enabled for clip {clip_id} "
+                f"(strategy: {face_tracking_strategy}, mode: {face_tracking_mode})"
+            )
+            try:
+                reframer = FaceReframer(
+                    frame_sample_rate=face_tracking_sample_rate,
+                    strategy=face_tracking_strategy,
+                )
+                if face_tracking_mode == "trajectory":
+                    reframe_filter = self._reframe_filters(
+                        reframer,
+                        video_path,
+                        ["9:16"],
+                        start_time=start_time,
+                        end_time=end_time,
+                        jump_cut_plan=jump_cut_plan,
+                        clip_id=clip_id,
+                        face_track=face_track,
+                    ).get("9:16")
+                if reframe_filter is None:
+                    reframer.reframe_video(
+                        input_path=str(video_path),
+                        output_path=str(temp_reframed_path),
+                        target_resolution=self._output_size("9:16"),
+                        start_time=start_time,
+                        end_time=end_time,
+                        keyframe_index=keyframe_index,
+                        face_track=face_track,
+                    )
+                    video_to_process = temp_reframed_path
+                logger.info(f"Face tracking completed for clip {clip_id}")
+            except Exception as e:
+                logger.warning(
+                    f"Face tracking failed for clip {clip_id}: {e}, falling back to static crop."
+                )
+                video_to_process = video_path
+
+        has_subtitle_file = bool(add_subtitles and subtitle_file and subtitle_file.exists())
+
+        try:
+            # Un solo encode: aspect ratio → logo → subtítulos en el mismo filtergraph.
+            # Los subtítulos van al final para quedar encima del logo.
+            inputs = []
+            using_reframed_file = (
+                video_to_process == temp_reframed_path and temp_reframed_path.exists()
+            )
+            # Modo de face tracking con el que sale el clip (None = crop estático)
+            face_tracking_used = (
+                "frames" if using_reframed_file else "trajectory" if reframe_filter else None
+            )
+            video_input_idx, audio_input_idx = (0, 1) if using_reframed_file else (0, 0)
+
+            if using_reframed_file:
+                inputs.extend(["-i", str(video_to_process)])
+                inputs.extend(["-ss", str(start_time), "-t", str(duration), "-i", str(video_path)])
+            else:
+                inputs.extend(["-ss", str(start_time), "-t", str(duration), "-i", str(video_path)])
+
+            logo_input_idx = -1
+            if add_logo and logo_path:
+                inputs.extend(["-i", str(logo_path)])
+                logo_input_idx = audio_input_idx + 1
+                logger.info(f"Adding logo from {logo_path}")
+
+            subtitle_filter = None
+            if has_subtitle_file:
+                subtitle_filter = self._get_subtitle_filter(str(subtitle_file), subtitle_style, custom_style)
+
+            # El reencuadre sale a la resolución final; la fuente la conozco por el probe cacheado
+            if using_reframed_file:
+                input_size, input_pix_fmt = self._output_size("9:16"), None
+            else:
+                input_size, input_pix_fmt = _source_frame(self.get_video_info(str(video_path)))
+
+            # Si el face tracking cayó al crop estático (o a otro modo) la salida y sus
+            # capas no corresponden a su clave
+            matches_key = face_tracking_used == (face_tracking_mode if face_tracking_requested else None)
+
+            cmd = ["ffmpeg"] + inputs
+            # Con el cache por capas derivo las capas intermedias en el mismo proceso
+            layer_taps: Dict[str, str] = {}
+            if use_layers and matches_key:
+                filter_complex, final_stream, layer_taps = self._build_layered_clip_graph(
+                    video_input_idx=video_input_idx,
+                    logo_input_idx=logo_input_idx,
+                    aspect_ratio=None if using_reframed_file else aspect_ratio,
+                    subtitle_filter=subtitle_filter,
+                    logo_position=logo_position,
+                    logo_scale=logo_scale,
+                    input_size=input_size,
+                    input_pix_fmt=input_pix_fmt,
+                    reframe_filter=reframe_filter,
+                )
+                if filter_complex:
+                    cmd.extend(["-filter_complex", filter_complex])
+                cmd.extend(["-map", final_stream])
+            else:
+                cmd.extend(
+                    self._build_clip_filter_args(
+                        video_input_idx=video_input_idx,
+                        logo_input_idx=logo_input_idx,
+                        aspect_ratio=None if using_reframed_file else aspect_ratio,
+                        subtitle_filter=subtitle_filter,
+                        logo_position=logo_position,
+                        logo_scale=logo_scale,
+                        input_size=input_size,
+                        input_pix_fmt=input_pix_fmt,
+                        jump_cut_filter=jump_cut_plan.video_filter() if jump_cut_plan is not None else None,
+                        reframe_filter=reframe_filter,
+                    )
+                )
+
+            # BUGFIX: -sn descarta cualquier stream de subtítulos del input; los únicos
+            # subtítulos de la salida son los quemados por el filtro (sin duplicados)
+            resolved_threads = _resolve_ffmpeg_threads(ffmpeg_threads)
+            # La normalización va solo en la salida final: las capas guardan el audio original
+            if audio_filter:
+                cmd.extend(["-filter:a", audio_filter])
+            cmd.extend(
+                [
+                    "-map",
+                    f"{audio_input_idx}:a?",
+                    "-sn",
+                    *_jump_cut_output_args(jump_cut_plan),
+                    *_clip_encoder_args(video_crf, audio_codec, choice=self._encoder_choice(aspect_ratio)),
+                    "-threads",
+                    str(resolved_threads),
+                    "-y",
+                    str(partial_path),
+                ]
+            )
+            for layer_name, layer_stream in layer_taps.items():
+                layer_temp_paths[layer_name] = output_dir / f"{clip_id}_{layer_name}_layer_temp.mp4"
+                cmd.extend(
+                    [
+                        "-map",
+                        layer_stream,
+                        "-map",
+                        f"{audio_input_idx}:a?",
+                        "-sn",
+                        "-c:v",
+                        "libx264",
+                        "-c:a",
+                        audio_codec,
+                        "-preset",
+                        RENDER_LAYER_PRESET,
+                        "-crf",
+                        str(RENDER_LAYER_CRF),
+                        "-threads",
+                        str(resolved_threads),
+                        "-y",
+                        str(layer_temp_paths[layer_name]),
+                    ]
+                )
+
+            result = self._run_ffmpeg(cmd, label=f"clip {clip_id}")
+            if result.returncode != 0:
+                logger.error(
+                    f"Error in video processing for clip {clip_id}: {result.stderr}"
+                )
+                return None
+            if not _publish_output(partial_path, output_path):
+                return None
 
-                return str(output_path)
+            logger.info(f"✓ Exported clip {clip_id}: {output_path.name}")
+            if render_cache is not None and render_key and matches_key:
+                render_cache.store(render_key, output_path)
+            for layer_name, layer_temp_path in layer_temp_paths.items():
+                render_cache.store(getattr(layer_keys, layer_name), layer_temp_path)
+            return output_path
+
+        finally:
+            # Cleanup all temporary files
+            if temp_reframed_path and temp_reframed_path.exists():
+                temp_reframed_path.unlink()
+            for layer_temp_path in layer_temp_paths.values():
+                layer_temp_path.unlink(missing_ok=True)
+            partial_path.unlink(missing_ok=True)
+
+    def _export_clip_group(
+        self,
+        *,
+        video_path: Path,
+        clip_jobs: List[Tuple[Dict, Path]],
+        aspect_ratio: Optional[str] = None,
+        add_subtitles: bool = False,
+        transcript_path: Optional[str] = None,
+        subtitle_style: str = "default",
+        custom_style: Optional[Dict[str, str]] = None,
+        trim_ms_start: int = 0,
+        trim_ms_end: int = 0,
+        add_logo: bool = False,
+        logo_path: Optional[str] = None,
+        logo_position: str = "top-right",
+        logo_scale: float = 0.1,
+        video_crf: int = 23,
+        audio_codec: str = "aac",
+        loudness: Optional[LoudnessNormalization] = None,
+        ffmpeg_threads: int = 0,
+        subtitle_max_chars_per_line: int = 42,
+        subtitle_max_duration: float = 5.0,
+    ) -> Optional[List[Optional[Path]]]:
+        """
+        Exporto varios clips desde una sola decodificación del video fuente.
+
+        Decodifico una vez el rango [inicio del primer clip, fin del último] y
+        lo reparto con split/asplit; cada rama recorta su ventana con
+        trim/atrim y aplica su propio aspect ratio, logo y subtítulos antes
+        de ir a su propia salida (un encoder por clip). Con audio_codec="copy"
+        el audio de cada clip sale de su propio input con seek (solo demux).
+
+        Args:
+            clip_jobs: Lista de (clip, carpeta de salida) del grupo
+
+        Returns:
+            Rutas exportadas en el orden de clip_jobs, o None si ffmpeg falla
+            (el caller exporta esos clips uno por uno)
+        """
+        windows = [
+            self._resolve_clip_window(
+                clip,
+                transcript_path=transcript_path,
+                trim_ms_start=trim_ms_start,
+                trim_ms_end=trim_ms_end,
+            )
+            for clip, _ in clip_jobs
+        ]
+        group_start = min(start for start, _ in windows)
+        group_end = max(end for _, end in windows)
+        branch_count = len(clip_jobs)
+
+        # setpts borra el frame rate del grafo: lo fijo en cada salida con el del
+        # fuente. Sin probe no puedo hacerlo de forma segura → export por clip.
+        source_info = self.get_video_info(str(video_path))
+        frame_rate = source_info.get("r_frame_rate") if source_info else None
+        if not frame_rate or not source_info.get("fps"):
+            logger.warning("Could not probe source frame rate; skipping single-decode export")
+            return None
+
+        has_audio = bool(source_info.get("has_audio", True))
+        has_logo = bool(add_logo and logo_path)
+        source_size, source_pix_fmt = _source_frame(source_info)
+        aspect_filter = self._base_video_filter(aspect_ratio, source_size)
+        output_size = self._output_size(aspect_ratio, source_size)
+        output_width = output_size[0] if output_size else 0
+        if has_logo and output_width <= 0:
+            logger.warning("Could not determine output width for logo; skipping single-decode export")
+            return None
+        # Cada rama tiene su propio encoder: reparto los threads entre ellas
+        threads_per_branch = _split_thread_budget(ffmpeg_threads, branch_count)
+        choice = self._encoder_choice(aspect_ratio)
+        video_args = (
+            choice.video_args(video_crf)
+            if choice is not None
+            else ["-c:v", "libx264", "-preset", "fast", "-crf", str(video_crf)]
+        )
+
+        cmd = [
+            "ffmpeg",
+            "-ss", str(group_start),
+            "-t", str(group_end - group_start),
+            "-i", str(video_path),
+        ]
+        if has_logo:
+            cmd.extend(["-i", str(logo_path)])
+
+        graph = FilterGraph()
+        graph.set_input("[0:v]", size=source_size, pix_fmt=source_pix_fmt)
+        graph.split("[0:v]", [f"[vsrc{i}]" for i in range(branch_count)])
+        copy_audio = has_audio and audio_codec == "copy"
+        if copy_audio:
+            # El audio copiado no pasa por el grafo: un input por clip con su ventana
+            audio_input_base = 2 if has_logo else 1
+            for start_time, end_time in windows:
+                cmd.extend(["-ss", str(start_time), "-t", str(end_time - start_time), "-i", str(video_path)])
+        elif has_audio:
+            graph.split("[0:a]", [f"[asrc{i}]" for i in range(branch_count)], audio=True)
+
+        # Labels de cada salida: (video, audio del grafo o None)
+        branch_outputs: List[Tuple[str, Optional[str]]] = []
+        output_paths: List[Path] = []
+        for i, ((clip, clip_output_dir), (start_time, end_time)) in enumerate(zip(clip_jobs, windows)):
+            clip_id = clip["clip_id"]
+            rel_start = start_time - group_start
+            rel_end = end_time - group_start
+            output_path = clip_output_dir / f"{clip_id}.mp4"
+
+            subtitle_file = None
+            if add_subtitles and transcript_path:
+                subtitle_file = clip_output_dir / f"{clip_id}.srt"
+                self._write_clip_srt(
+                    subtitle_file,
+                    transcript_path=transcript_path,
+                    start_time=start_time,
+                    end_time=end_time,
+                    max_chars_per_line=subtitle_max_chars_per_line,
+                    max_duration=subtitle_max_duration,
+                )
+
+            # trim + setpts: cada salida empieza en 0, igual que con -ss por clip
+            branch_filters = [
+                f"trim=start={rel_start:.6f}:end={rel_end:.6f}",
+                "setpts=PTS-STARTPTS",
+            ]
+            if aspect_filter:
+                branch_filters.append(aspect_filter)
+            video_label = graph.chain(f"[vsrc{i}]", branch_filters, f"[vtrim{i}]")
+
+            if has_logo:
+                # El grafo escala el logo una vez al ancho final conocido y lo reparte
+                # (scale2ref por rama termina la rama si el logo llega a EOF antes que
+                # los frames del clip, algo normal cuando el clip empieza tarde en el grupo)
+                video_label = graph.overlay_logo(
+                    video_label, "[1:v]", scale=logo_scale, position=logo_position, output=f"[vlogo{i}]"
+                )
+
+            if subtitle_file and subtitle_file.exists():
+                subtitle_filter = self._get_subtitle_filter(str(subtitle_file), subtitle_style, custom_style)
+                video_label = graph.chain(video_label, subtitle_filter, f"[vsub{i}]")
+
+            audio_label = None
+            if has_audio and not copy_audio:
+                audio_filter = loudness.filter_for(start_time, end_time) if loudness is not None else None
+                audio_label = graph.chain(
+                    f"[asrc{i}]",
+                    [
+                        f"atrim=start={rel_start:.6f}:end={rel_end:.6f}",
+                        "asetpts=PTS-STARTPTS",
+                        *([audio_filter] if audio_filter else []),
+                    ],
+                    f"[aout{i}]",
+                )
+            branch_outputs.append((video_label, audio_label))
+            output_paths.append(output_path)
+
+        filter_complex, maps = graph.build(
+            [label for outputs in branch_outputs for label in outputs if label], pix_fmt=OUTPUT_PIX_FMT
+        )
+        map_iter = iter(maps)
+        output_args: List[str] = []
+        for i, ((_, audio_label), output_path) in enumerate(zip(branch_outputs, output_paths)):
+            output_args.extend(["-map", next(map_iter)])
+            if copy_audio:
+                output_args.extend(["-map", f"{audio_input_base + i}:a", "-c:a", "copy"])
+            elif audio_label:
+                output_args.extend(["-map", next(map_iter), "-c:a", "aac"])
+
+            output_args.extend(
+                [
+                    "-sn",
+                    "-r",
+                    str(frame_rate),
+                    *video_args,
+                    "-threads",
+                    str(threads_per_branch),
+                    "-y",
+                    str(_partial_output_path(output_path)),
+                ]
+            )
+
+        cmd.extend(["-filter_complex", filter_complex])
+        cmd.extend(output_args)
+
+        logger.info(
+            f"Single-decode export of {branch_count} clips "
+            f"({group_start:.2f}s-{group_end:.2f}s of source)"
+        )
+        try:
+            result = self._run_ffmpeg(cmd, label=f"group of {branch_count} clips")
+            if result.returncode != 0:
+                logger.error(f"Error in single-decode export: {result.stderr[-2000:]}")
+                return None
+            if not all(_publish_output(_partial_output_path(path), path) for path in output_paths):
+                return None
+        finally:
+            for output_path in output_paths:
+                _partial_output_path(output_path).unlink(missing_ok=True)
+
+        for (clip, _), output_path in zip(clip_jobs, output_paths):
+            logger.info(f"✓ Exported clip {clip['clip_id']}: {output_path.name}")
+        return list(output_paths)
+
+    def _resolve_variant_aspect_ratios(self, aspect_ratios: Optional[List[str]]) -> List[str]:
+        """
+        Normalizo la lista de aspect ratios pedidos: sin duplicados y solo los conocidos
+
+        Returns:
+            Aspect ratios en el orden pedido (vacío si no se pidió ninguno)
+        """
+        resolved: List[str] = []
+        for aspect_ratio in aspect_ratios or []:
+            if aspect_ratio not in ASPECT_RATIO_OUTPUT_SIZES:
+                logger.warning(f"Aspect ratio '{aspect_ratio}' no reconocido; se omite esa variante")
+                continue
+            if aspect_ratio not in resolved:
+                resolved.append(aspect_ratio)
+        return resolved
+
+    def _export_clip_variant_sets(
+        self,
+        *,
+        video_path: Path,
+        source_path: Path,
+        clip_jobs: List[Tuple[Dict, Path]],
+        aspect_ratios: List[str],
+        add_subtitles: bool,
+        transcript_path: Optional[str],
+        subtitle_style: str,
+        custom_style: Optional[Dict[str, str]],
+        enable_face_tracking: bool,
+        face_tracking_strategy: str,
+        face_tracking_sample_rate: int,
+        add_logo: bool,
+        logo_path: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        trim_ms_start: int,
+        trim_ms_end: int,
+        video_crf: int,
+        audio_codec: str,
+        loudness: Optional[LoudnessNormalization],
+        ffmpeg_threads: int,
+        export_workers: int,
+        render_cache_dir: Optional[str],
+        render_cache_max_mb: int,
+        subtitle_max_chars_per_line: int,
+        subtitle_max_duration: float,
+        progress_callback: Optional[ProgressCallback],
+        journal: Optional[ExportJournal] = None,
+        jump_cut: Optional[JumpCut] = None,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
+    ) -> List[str]:
+        """
+        Exporto cada clip en todos los aspect ratios pedidos (una decodificación por clip)
+
+        Las variantes van a una subcarpeta por aspect ratio dentro de la carpeta del clip.
+        Cada variante tiene su propia clave de render: las que el journal ya da por
+        exportadas o que están en el cache no entran en la decodificación compartida.
+
+        Returns:
+            Rutas exportadas, clip por clip y en el orden de aspect_ratios
+        """
+        variant_dirs: Dict[str, List[Path]] = {}
+        for aspect_ratio in aspect_ratios:
+            dirs = []
+            for _, clip_output_dir in clip_jobs:
+                variant_dir = clip_output_dir / _aspect_ratio_dir_name(aspect_ratio)
+                variant_dir.mkdir(parents=True, exist_ok=True)
+                dirs.append(variant_dir)
+            variant_dirs[aspect_ratio] = dirs
+
+        face_tracked = [
+            ar for ar in aspect_ratios if enable_face_tracking and ar in FACE_TRACKING_ASPECT_RATIOS
+        ]
+
+        # Una clave de render por (clip, variante), para el journal y el cache de renders
+        self.last_render_cache_stats = None
+        render_cache: Optional[RenderCache] = None
+        variant_keys: Dict[str, Dict[int, str]] = {}
+        if render_cache_dir or journal is not None:
+            for aspect_ratio in aspect_ratios:
+                keys, _ = self._compute_clip_render_keys(
+                    [(clip, variant_dir) for (clip, _), variant_dir in zip(clip_jobs, variant_dirs[aspect_ratio])],
+                    video_path=video_path,
+                    aspect_ratio=aspect_ratio,
+                    add_subtitles=add_subtitles,
+                    transcript_path=transcript_path,
+                    subtitle_style=subtitle_style,
+                    custom_style=custom_style,
+                    uses_face_tracking=aspect_ratio in face_tracked,
+                    face_tracking_strategy=face_tracking_strategy,
+                    face_tracking_sample_rate=face_tracking_sample_rate,
+                    face_tracking_mode=face_tracking_mode,
+                    logo_path=logo_path if add_logo else None,
+                    logo_position=logo_position,
+                    logo_scale=logo_scale,
+                    trim_ms_start=trim_ms_start,
+                    trim_ms_end=trim_ms_end,
+                    video_crf=video_crf,
+                    audio_codec=audio_codec,
+                    loudness=loudness,
+                    smart_cut=False,
+                    subtitle_max_chars_per_line=subtitle_max_chars_per_line,
+                    subtitle_max_duration=subtitle_max_duration,
+                    jump_cut=jump_cut,
+                )
+                if not keys:
+                    variant_keys = {}
+                    break
+                variant_keys[aspect_ratio] = keys
+            if variant_keys and render_cache_dir:
+                render_cache = RenderCache(render_cache_dir, max_bytes=render_cache_max_mb * 1024 * 1024)
+
+        def _journal(idx: int, aspect_ratio: str, output_path: Path) -> None:
+            if journal is not None and variant_keys:
+                self._journal_exported_clip(
+                    journal,
+                    output_path,
+                    clip=clip_jobs[idx][0],
+                    render_key=variant_keys[aspect_ratio][idx],
+                    transcript_path=transcript_path,
+                    trim_ms_start=trim_ms_start,
+                    trim_ms_end=trim_ms_end,
+                    jump_cut=jump_cut,
+                )
+
+        results: List[Dict[str, Optional[Path]]] = [{} for _ in clip_jobs]
+        pending: List[List[str]] = []
+        resumed = 0
+        for idx, (clip, _) in enumerate(clip_jobs):
+            missing = []
+            for aspect_ratio in aspect_ratios:
+                output_path = variant_dirs[aspect_ratio][idx] / f"{clip['clip_id']}.mp4"
+                render_key = variant_keys[aspect_ratio][idx] if variant_keys else None
+                if journal is not None and render_key and journal.is_complete(output_path, render_key):
+                    results[idx][aspect_ratio] = output_path
+                    resumed += 1
+                elif render_cache is not None and render_cache.fetch(render_key, output_path):
+                    results[idx][aspect_ratio] = output_path
+                    _journal(idx, aspect_ratio, output_path)
+                else:
+                    missing.append(aspect_ratio)
+            pending.append(missing)
+        if resumed:
+            self.last_resumed_clips = resumed
+            logger.info(
+                f"Resuming export: {resumed}/{len(clip_jobs) * len(aspect_ratios)} variants already exported"
+            )
+
+        keyframe_index: Optional[KeyframeIndex] = None
+        if (
+            face_tracked
+            and face_tracking_mode == "frames"
+            and any(set(missing) & set(face_tracked) for missing in pending)
+        ):
+            keyframe_index = load_or_build_keyframe_index(
+                str(video_path),
+                transcript_path if video_path == source_path else None,
+            )
+
+        face_track: Optional[FaceTrack] = None
+        if face_tracked and any(set(missing) & set(face_tracked) for missing in pending):
+            face_track = open_face_track(
+                str(video_path),
+                transcript_path if video_path == source_path else None,
+            )
+
+        pending_indices = [idx for idx, missing in enumerate(pending) if missing]
+        workers = _resolve_export_workers(export_workers, len(pending_indices))
+        threads_per_worker = _split_thread_budget(ffmpeg_threads, workers)
+        logger.info(
+            f"Multi-aspect export of {len(clip_jobs)} clips × {len(aspect_ratios)} variants "
+            f"({', '.join(aspect_ratios)}); {len(pending_indices)} clips need a decode"
+        )
+
+        common = dict(
+            add_subtitles=add_subtitles,
+            transcript_path=transcript_path,
+            subtitle_style=subtitle_style,
+            custom_style=custom_style,
+            trim_ms_start=trim_ms_start,
+            trim_ms_end=trim_ms_end,
+            add_logo=add_logo,
+            logo_path=logo_path,
+            logo_position=logo_position,
+            logo_scale=logo_scale,
+            video_crf=video_crf,
+            audio_codec=audio_codec,
+            loudness=loudness,
+            subtitle_max_chars_per_line=subtitle_max_chars_per_line,
+            subtitle_max_duration=subtitle_max_duration,
+            jump_cut=jump_cut,
+        )
+
+        def _run(idx: int) -> Dict[str, Optional[Path]]:
+            clip = clip_jobs[idx][0]
+            missing = pending[idx]
+            outputs = self._export_clip_variants(
+                video_path=video_path,
+                clip=clip,
+                variants=[(ar, variant_dirs[ar][idx]) for ar in missing],
+                face_tracked=[ar for ar in missing if ar in face_tracked],
+                face_tracking_strategy=face_tracking_strategy,
+                face_tracking_sample_rate=face_tracking_sample_rate,
+                face_tracking_mode=face_tracking_mode,
+                ffmpeg_threads=threads_per_worker,
+                keyframe_index=keyframe_index,
+                face_track=face_track,
+                render_cache=render_cache,
+                render_keys={ar: variant_keys[ar][idx] for ar in missing} if render_cache else None,
+                **common,
+            )
+            if outputs is not None:
+                return outputs
+
+            # Fallback: un proceso por variante
+            logger.warning(
+                f"Multi-aspect export failed for clip {clip['clip_id']}; exporting each variant separately"
+            )
+            return {
+                ar: self._export_single_clip(
+                    video_path=video_path,
+                    clip=clip,
+                    video_name=clip_jobs[idx][1].name,
+                    output_dir=variant_dirs[ar][idx],
+                    aspect_ratio=ar,
+                    enable_face_tracking=enable_face_tracking and ar == "9:16",
+                    face_tracking_strategy=face_tracking_strategy,
+                    face_tracking_sample_rate=face_tracking_sample_rate,
+                    face_tracking_mode=face_tracking_mode,
+                    ffmpeg_threads=threads_per_worker,
+                    keyframe_index=keyframe_index,
+                    face_track=face_track,
+                    render_cache=render_cache,
+                    # _export_single_clip solo hace face tracking en 9:16: otra variante
+                    # con face tracking no correspondería a su clave
+                    render_key=(
+                        variant_keys[ar][idx]
+                        if render_cache and (ar not in face_tracked or ar == "9:16")
+                        else None
+                    ),
+                    **common,
+                )
+                for ar in missing
+            }
+
+        completed = 0
+        with Progress() as progress:
+            task = progress.add_task(
+                f"[cyan]Exporting {len(clip_jobs)} clips × {len(aspect_ratios)} aspect ratios...",
+                total=len(clip_jobs),
+            )
+
+            def _on_done(idx: int, outputs: Dict[str, Optional[Path]]) -> None:
+                nonlocal completed
+                results[idx].update(outputs)
+                for aspect_ratio, output_path in outputs.items():
+                    if output_path is not None:
+                        _journal(idx, aspect_ratio, output_path)
+                completed += 1
+                progress.update(task, advance=1)
+                if progress_callback:
+                    progress_callback(completed, len(clip_jobs), str(clip_jobs[idx][0].get("clip_id")))
+
+            for idx in range(len(clip_jobs)):
+                if not pending[idx]:
+                    _on_done(idx, {})
+
+            if workers <= 1:
+                for idx in pending_indices:
+                    _on_done(idx, _run(idx))
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clip-export") as pool:
+                    futures = {pool.submit(_run, idx): idx for idx in pending_indices}
+                    for future in as_completed(futures):
+                        _on_done(futures[future], future.result())
+
+        if render_cache is not None:
+            self.last_render_cache_stats = render_cache.stats
+            logger.info(f"Render cache: {render_cache.stats.summary()}")
+
+        return [
+            str(outputs[aspect_ratio])
+            for outputs in results
+            for aspect_ratio in aspect_ratios
+            if outputs.get(aspect_ratio)
+        ]
+
+    def _export_clip_variants(
+        self,
+        *,
+        video_path: Path,
+        clip: Dict,
+        variants: List[Tuple[str, Path]],
+        face_tracked: List[str],
+        face_tracking_strategy: str = "keep_in_frame",
+        face_tracking_sample_rate: int = 3,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
+        add_subtitles: bool = False,
+        transcript_path: Optional[str] = None,
+        subtitle_style: str = "default",
+        custom_style: Optional[Dict[str, str]] = None,
+        trim_ms_start: int = 0,
+        trim_ms_end: int = 0,
+        add_logo: bool = False,
+        logo_path: Optional[str] = None,
+        logo_position: str = "top-right",
+        logo_scale: float = 0.1,
+        video_crf: int = 23,
+        audio_codec: str = "aac",
+        loudness: Optional[LoudnessNormalization] = None,
+        ffmpeg_threads: int = 0,
+        subtitle_max_chars_per_line: int = 42,
+        subtitle_max_duration: float = 5.0,
+        keyframe_index: Optional[KeyframeIndex] = None,
+        face_track: Optional[FaceTrack] = None,
+        render_cache: Optional[RenderCache] = None,
+        render_keys: Optional[Dict[str, str]] = None,
+        jump_cut: Optional[JumpCut] = None,
+    ) -> Optional[Dict[str, Optional[Path]]]:
+        """
+        Exporto un clip en varios aspect ratios desde una sola decodificación
+
+        Las variantes salen de un split de la fuente. Las que llevan face tracking usan
+        una sola trayectoria del rostro: en modo trajectory cada rama cropea con su propio
+        sendcmd + crop; en modo frames salen de un único pase de FaceReframer (una salida
+        reencuadrada por aspect ratio, como inputs extra). Cada rama aplica su logo
+        (escalado a su ancho final) y sus subtítulos y va a su propio encoder.
+
+        Args:
+            variants: Lista de (aspect ratio, carpeta de salida)
+            face_tracked: Aspect ratios de variants que usan face tracking
+
+        Returns:
+            {aspect ratio: ruta exportada}, o None si ffmpeg falla (el caller exporta
+            cada variante por separado)
+        """
+        clip_id = clip["clip_id"]
+        start_time, end_time = self._resolve_clip_window(
+            clip,
+            transcript_path=transcript_path,
+            trim_ms_start=trim_ms_start,
+            trim_ms_end=trim_ms_end,
+        )
+        jump_cut_plan = jump_cut.plan_for(start_time, end_time) if jump_cut is not None else None
+
+        # El SRT es el mismo para todas las variantes: lo genero una vez y lo copio
+        # al lado de cada salida
+        subtitle_files: Dict[str, Path] = {}
+        if add_subtitles and transcript_path:
+            first_dir = variants[0][1]
+            first_srt = first_dir / f"{clip_id}.srt"
+            self._write_clip_srt(
+                first_srt,
+                transcript_path=transcript_path,
+                start_time=start_time,
+                end_time=end_time,
+                max_chars_per_line=subtitle_max_chars_per_line,
+                max_duration=subtitle_max_duration,
+                time_map=jump_cut_plan.remap if jump_cut_plan is not None else None,
+            )
+            if first_srt.exists():
+                for aspect_ratio, variant_dir in variants:
+                    srt_path = variant_dir / f"{clip_id}.srt"
+                    if srt_path != first_srt:
+                        shutil.copyfile(first_srt, srt_path)
+                    subtitle_files[aspect_ratio] = srt_path
+
+        reframed_paths: Dict[str, Path] = {}
+        reframe_filters: Dict[str, str] = {}
+        if face_tracked:
+            variant_dirs = dict(variants)
+            targets = {
+                aspect_ratio: variant_dirs[aspect_ratio] / f"{clip_id}_reframed_temp.mp4"
+                for aspect_ratio in face_tracked
+            }
+            logger.info(
+                f"Face tracking enabled for clip {clip_id} "
+                f"({', '.join(face_tracked)}, strategy: {face_tracking_strategy}, mode: {face_tracking_mode})"
+            )
+            try:
+                reframer = FaceReframer(
+                    frame_sample_rate=face_tracking_sample_rate,
+                    strategy=face_tracking_strategy,
+                )
+                if face_tracking_mode == "trajectory":
+                    reframe_filters = self._reframe_filters(
+                        reframer,
+                        video_path,
+                        face_tracked,
+                        start_time=start_time,
+                        end_time=end_time,
+                        jump_cut_plan=jump_cut_plan,
+                        clip_id=clip_id,
+                        face_track=face_track,
+                    )
+                    targets = {ar: path for ar, path in targets.items() if ar not in reframe_filters}
+                if targets:
+                    reframer.reframe_video_variants(
+                        input_path=str(video_path),
+                        outputs={
+                            str(path): self._output_size(aspect_ratio)
+                            for aspect_ratio, path in targets.items()
+                        },
+                        start_time=start_time,
+                        end_time=end_time,
+                        keyframe_index=keyframe_index,
+                        face_track=face_track,
+                    )
+                    reframed_paths = {ar: path for ar, path in targets.items() if path.exists()}
+                logger.info(f"Face tracking completed for clip {clip_id}")
+            except Exception as e:
+                logger.warning(
+                    f"Face tracking failed for clip {clip_id}: {e}, falling back to static crop."
+                )
+                for path in targets.values():
+                    path.unlink(missing_ok=True)
+
+        try:
+            cmd = [
+                "ffmpeg",
+                "-ss", str(start_time),
+                "-t", str(end_time - start_time),
+                "-i", str(video_path),
+            ]
+            reframed_inputs: Dict[str, int] = {}
+            for aspect_ratio, path in reframed_paths.items():
+                reframed_inputs[aspect_ratio] = len(reframed_inputs) + 1
+                cmd.extend(["-i", str(path)])
+
+            has_logo = bool(add_logo and logo_path)
+            logo_input_idx = len(reframed_inputs) + 1
+            if has_logo:
+                cmd.extend(["-i", str(logo_path)])
+
+            static_variants = [ar for ar, _ in variants if ar not in reframed_inputs]
+            audio_filter = _clip_audio_filter(start_time, end_time, loudness, jump_cut_plan)
+            jump_cut_filter = jump_cut_plan.video_filter() if jump_cut_plan is not None else None
+            graph = FilterGraph()
+            source_size, source_pix_fmt = _source_frame(self.get_video_info(str(video_path)))
+            graph.set_input("[0:v]", size=source_size, pix_fmt=source_pix_fmt)
+            for aspect_ratio, input_idx in reframed_inputs.items():
+                # El reencuadre ya sale a la resolución final
+                graph.set_input(f"[{input_idx}:v]", size=self._output_size(aspect_ratio))
+            # Los jump cuts van antes del split: cada rama recibe solo los frames que quedan
+            static_source = "[0:v]"
+            if jump_cut_filter and static_variants:
+                static_source = graph.chain("[0:v]", jump_cut_filter)
+            if len(static_variants) > 1:
+                graph.split(static_source, [f"[vsrc_{_aspect_ratio_dir_name(ar)}]" for ar in static_variants])
+
+            video_labels: Dict[str, str] = {}
+            for aspect_ratio, _ in variants:
+                tag = _aspect_ratio_dir_name(aspect_ratio)
+                if aspect_ratio in reframed_inputs:
+                    video_label = graph.chain(
+                        f"[{reframed_inputs[aspect_ratio]}:v]", jump_cut_filter, f"[vbase_{tag}]"
+                    )
+                else:
+                    # Con trayectoria, la rama de la fuente cropea siguiendo el rostro
+                    source = f"[vsrc_{tag}]" if len(static_variants) > 1 else static_source
+                    base_filter = reframe_filters.get(aspect_ratio) or self._get_aspect_ratio_filter(aspect_ratio)
+                    video_label = graph.chain(source, base_filter, f"[vbase_{tag}]")
+
+                if has_logo:
+                    # El grafo escala el logo una vez por ancho de salida (sin scale2ref)
+                    video_label = graph.overlay_logo(
+                        video_label,
+                        f"[{logo_input_idx}:v]",
+                        scale=logo_scale,
+                        position=logo_position,
+                        output=f"[vlogo_{tag}]",
+                    )
+
+                if aspect_ratio in subtitle_files:
+                    subtitle_filter = self._get_subtitle_filter(
+                        str(subtitle_files[aspect_ratio]), subtitle_style, custom_style
+                    )
+                    video_label = graph.chain(video_label, subtitle_filter, f"[vsub_{tag}]")
+                video_labels[aspect_ratio] = video_label
+
+            filter_complex, maps = graph.build(list(video_labels.values()), pix_fmt=OUTPUT_PIX_FMT)
+            if filter_complex:
+                cmd.extend(["-filter_complex", filter_complex])
+
+            threads_per_branch = _split_thread_budget(ffmpeg_threads, len(variants))
+            output_args: List[str] = []
+            output_paths: Dict[str, Path] = {}
+            for (aspect_ratio, variant_dir), video_map in zip(variants, maps):
+                output_path = variant_dir / f"{clip_id}.mp4"
+                output_paths[aspect_ratio] = output_path
+                if audio_filter:
+                    output_args.extend(["-filter:a", audio_filter])
+                output_args.extend(
+                    [
+                        "-map", video_map,
+                        "-map", "0:a?",
+                        "-sn",
+                        *_jump_cut_output_args(jump_cut_plan),
+                        *_clip_encoder_args(video_crf, audio_codec, choice=self._encoder_choice(aspect_ratio)),
+                        "-threads", str(threads_per_branch),
+                        "-y", str(_partial_output_path(output_path)),
+                    ]
+                )
+
+            cmd.extend(output_args)
+
+            result = self._run_ffmpeg(cmd, label=f"clip {clip_id} ({len(output_paths)} aspect ratios)")
+            if result.returncode != 0:
+                logger.error(f"Error in multi-aspect export for clip {clip_id}: {result.stderr[-2000:]}")
+                return None
+            if not all(_publish_output(_partial_output_path(path), path) for path in output_paths.values()):
+                return None
+
+            for aspect_ratio, output_path in output_paths.items():
+                logger.info(f"✓ Exported clip {clip_id} ({aspect_ratio}): {output_path}")
+                # Si el face tracking cayó al crop estático (o al otro modo) la salida no
+                # corresponde a la clave
+                tracked = reframe_filters if face_tracking_mode == "trajectory" else reframed_inputs
+                face_tracking_ok = (aspect_ratio in tracked) == (aspect_ratio in face_tracked)
+                if render_cache is not None and render_keys and face_tracking_ok:
+                    render_cache.store(render_keys[aspect_ratio], output_path)
+            return dict(output_paths)
+
+        finally:
+            for path in reframed_paths.values():
+                path.unlink(missing_ok=True)
+            for _, variant_dir in variants:
+                _partial_output_path(variant_dir / f"{clip_id}.mp4").unlink(missing_ok=True)
+
+    def _probe_video_packets(self, video_path: Path, start: float, end: float) -> List[Tuple[float, bool]]:
+        """
+        Obtengo (pts, es_keyframe) de los paquetes del primer stream de video en [start, end].
+
+        Leo solo paquetes (sin decodificar) y solo el intervalo pedido.
+        """
+        cmd = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-read_intervals",
+            f"{max(0.0, start)}%{end}",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            str(video_path),
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            logger.warning(f"Could not probe video packets: {result.stderr[-500:]}")
+            return []
+
+        packets = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(",")
+            try:
+                packets.append((float(pts_time), "K" in flags))
+            except ValueError:
+                continue
+        return packets
+
+    def _export_smart_cut_clip(
+        self,
+        *,
+        video_path: Path,
+        clip_id,
+        start_time: float,
+        end_time: float,
+        output_path: Path,
+        video_crf: int = 23,
+        audio_codec: str = "aac",
+        audio_filter: Optional[str] = None,
+        ffmpeg_threads: int = 0,
+        keyframe_index: Optional[KeyframeIndex] = None,
+    ) -> Optional[Path]:
+        """
+        Exporto un clip sin filtros copiando los GOPs completos (sin re-encode).
+
+        Solo re-encodeo los GOPs parciales del inicio y del final, y uno las piezas
+        con el concat demuxer (en MPEG-TS, que lleva SPS/PPS in-band, así cada pieza
+        conserva sus parámetros). El audio se re-encodea una vez para toda la
+        ventana (o se copia con audio_codec="copy"): cortar audio en cada unión deja
+        huecos o desfases.
+
+        Returns:
+            Ruta exportada, o None si el fast path no aplica o falla
+            (el caller hace el export normal)
+        """
+        source_info = self.get_video_info(str(video_path))
+        codec = (source_info or {}).get("codec")
+        if codec not in SMART_CUT_CODECS:
+            logger.info(f"Stream copy not available for codec {codec!r}; re-encoding clip {clip_id}")
+            return None
 
-            # Single-step path (logo only, subtitles only, or neither).
-            # Build command with trim args
-            cmd = ["ffmpeg"]
-            cmd.extend(trim_args)  # -ss before -i for fast seeking
+        # Con el índice de la fuente no hace falta leer paquetes por clip
+        packets: List[Tuple[float, bool]] = []
+        if keyframe_index is not None:
+            keyframes = keyframe_index.keyframes_between(
+                start_time - SMART_CUT_EDGE_TOLERANCE_SECONDS,
+                end_time + SMART_CUT_EDGE_TOLERANCE_SECONDS,
+            )
+        else:
+            packets = self._probe_video_packets(video_path, start_time, end_time)
+            keyframes = [pts for pts, is_key in packets if is_key]
 
-            if has_logo:
-                logo_chains, logo_out = self._get_logo_overlay_filter(
-                    video_stream="[0:v]",
-                    logo_stream="[1:v]",
-                    position=logo_position,
-                    scale=logo_scale,
-                )
-                cmd.extend(["-i", str(video_path_p)])
-                cmd.extend(["-i", str(resolved_logo_path)])
-                cmd.extend(duration_args)  # -t after inputs
-                cmd.extend([
-                    "-filter_complex",
-                    ";".join(logo_chains),
-                    "-map",
-                    logo_out,
-                ])
-            elif has_subtitles:
-                subtitle_filter = self._get_subtitle_filter(str(srt_file), subtitle_style, custom_style)
-                cmd.extend(["-i", str(video_path_p)])
-                cmd.extend(duration_args)
-                cmd.extend(["-vf", subtitle_filter, "-map", "0:v"])
-            else:
-                cmd.extend(["-i", str(video_path_p)])
-                cmd.extend(duration_args)
-                cmd.extend(["-map", "0:v"])
+        copy_span = _plan_smart_cut(keyframes, start_time, end_time)
+        if copy_span is None:
+            logger.info(f"No complete GOP inside clip {clip_id}; re-encoding")
+            return None
+        copy_start, copy_end = copy_span
+        # Con stream copy, -t corta por orden de decodificación y se cuelan el keyframe
+        # siguiente y sus referencias: limito por número de paquetes del tramo
+        if keyframe_index is not None:
+            copy_frames = keyframe_index.packets_between_keyframes(copy_start, copy_end)
+        else:
+            copy_frames = sum(
+                1
+                for pts, _ in packets
+                if copy_start - SMART_CUT_EDGE_TOLERANCE_SECONDS <= pts < copy_end - SMART_CUT_EDGE_TOLERANCE_SECONDS
+            )
 
-            resolved_threads = _resolve_ffmpeg_threads(ffmpeg_threads)
-            cmd.extend(
+        resolved_threads = _resolve_ffmpeg_threads(ffmpeg_threads)
+        pix_fmt = source_info.get("pix_fmt") or "yuv420p"
+        work_dir = output_path.parent / f"{output_path.stem}_smartcut_temp"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        partial_path = _partial_output_path(output_path)
+
+        def _encode_piece(piece_start: float, piece_end: float, piece_path: Path) -> List[str]:
+            return [
+                "ffmpeg",
+                "-ss", str(piece_start),
+                "-i", str(video_path),
+                "-t", str(piece_end - piece_start),
+                "-map", "0:v:0",
+                "-an",
+                "-sn",
+                "-c:v", "libx264",
+                "-preset", "fast",
+                "-crf", str(video_crf),
+                "-pix_fmt", str(pix_fmt),
+                "-threads", str(resolved_threads),
+                "-f", SMART_CUT_PIECE_FORMAT,
+                "-y", str(piece_path),
+            ]
+
+        pieces: List[Tuple[str, List[str]]] = []
+        if copy_start - start_time > SMART_CUT_EDGE_TOLERANCE_SECONDS:
+            pieces.append(("head", _encode_piece(start_time, copy_start, work_dir / "head.ts")))
+        pieces.append(
+            (
+                "copy",
                 [
-                    "-map",
-                    "0:a?",
+                    "ffmpeg",
+                    "-ss", str(copy_start),
+                    "-i", str(video_path),
+                    "-frames:v", str(copy_frames),
+                    "-map", "0:v:0",
+                    "-an",
                     "-sn",
-                    "-c:v",
-                    "libx264",
-                    "-c:a",
-                    "aac",
-                    "-preset",
-                    "fast",
-                    "-crf",
-                    str(video_crf),
-                    "-threads",
-                    str(resolved_threads),
-                    "-y",
-                    str(output_path),
-                ]
+                    "-c:v", "copy",
+                    "-f", SMART_CUT_PIECE_FORMAT,
+                    "-y", str(work_dir / "copy.ts"),
+                ],
+            )
+        )
+        if end_time - copy_end > SMART_CUT_EDGE_TOLERANCE_SECONDS:
+            pieces.append(("tail", _encode_piece(copy_end, end_time, work_dir / "tail.ts")))
+
+        try:
+            for name, cmd in pieces:
+                result = self._run_ffmpeg(cmd, label=f"clip {clip_id} smart-cut {name}")
+                if result.returncode != 0:
+                    logger.warning(f"Smart-cut {name} piece failed for clip {clip_id}: {result.stderr[-1000:]}")
+                    return None
+
+            concat_list = work_dir / "pieces.txt"
+            concat_list.write_text(
+                "".join(f"file '{(work_dir / f'{name}.ts').as_posix()}'\n" for name, _ in pieces),
+                encoding="utf-8",
             )
 
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            mux_cmd = [
+                "ffmpeg",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", str(concat_list),
+                "-ss", str(start_time),
+                "-t", str(end_time - start_time),
+                "-i", str(video_path),
+                "-map", "0:v:0",
+                "-map", "1:a?",
+                "-sn",
+                "-c:v", "copy",
+                "-c:a", audio_codec,
+                *(["-filter:a", audio_filter] if audio_filter else []),
+                "-y", str(partial_path),
+            ]
+            result = self._run_ffmpeg(mux_cmd, label=f"clip {clip_id} smart-cut concat")
             if result.returncode != 0:
-                raise RuntimeError(f"Error exporting short: {result.stderr}")
+                logger.warning(f"Smart-cut concat failed for clip {clip_id}: {result.stderr[-1000:]}")
+                return None
+            if not _publish_output(partial_path, output_path):
+                return None
 
-            return str(output_path)
+            logger.info(
+                f"✓ Exported clip {clip_id} with stream copy: {output_path.name} "
+                f"(copied {copy_end - copy_start:.2f}s of {end_time - start_time:.2f}s)"
+            )
+            return output_path
 
         finally:
-            if temp_path_step1.exists():
-                temp_path_step1.unlink()
-            if temp_srt_path and temp_srt_path.exists():
-                temp_srt_path.unlink()
+            shutil.rmtree(work_dir, ignore_errors=True)
+            partial_path.unlink(missing_ok=True)
 
-    def _escape_ffmpeg_filter_path(self, path: str) -> str:
+    def _prepare_mezzanine(
+        self,
+        video_path: Path,
+        *,
+        mode: str,
+        clip_count: int,
+        aspect_ratio: Optional[str],
+        transcript_path: Optional[str],
+        ffmpeg_threads: int = 0,
+        audio_passthrough: bool = False,
+    ) -> Optional[Path]:
         """
-        Escapa una ruta para usarse dentro de un string de filtro de ffmpeg.
+        Decido si uso un mezzanine para esta fuente y lo dejo listo
 
-        Nota: esto está pensado para filtros como `subtitles=...` y `movie=...`.
+        En modo "auto" miro el GOP promedio (índice de keyframes) y si la fuente es VFR.
+        La altura objetivo es la mínima que necesita el aspect ratio pedido: nunca
+        escalo hacia arriba y sin aspect ratio mantengo la resolución original.
+        Si la fuente trae AAC el mezzanine lo copia; con audio_passthrough descarto un
+        mezzanine previo que lo haya re-encodeado.
+
+        Returns:
+            Ruta al mezzanine, o None para exportar desde la fuente
         """
-        # Order matters: escape backslashes first.
-        return path.replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
+        if mode == "off" or clip_count == 0:
+            return None
+        if not transcript_path:
+            logger.info("Mezzanine skipped: it is stored next to the transcript and none was given")
+            return None
 
-    def _export_single_clip(
+        info = self.get_video_info(str(video_path))
+        if not info or not info.get("height"):
+            logger.warning("Mezzanine skipped: could not probe the source video")
+            return None
+
+        avg_gop_seconds = None
+        if mode == "auto":
+            index = load_or_build_keyframe_index(str(video_path), transcript_path)
+            if index is not None and index.keyframe_times:
+                avg_gop_seconds = index.duration / len(index.keyframe_times)
+
+        # Misma definición de CFR que el reframer y el face tracking (MediaInfo.is_cfr)
+        is_vfr = not info.get("is_cfr", True)
+        use_mezzanine, reason = should_build_mezzanine(
+            mode,
+            clip_count=clip_count,
+            avg_gop_seconds=avg_gop_seconds,
+            is_vfr=is_vfr,
+        )
+        logger.info(f"Mezzanine {'enabled' if use_mezzanine else 'skipped'}: {reason}")
+        if not use_mezzanine:
+            return None
+
+        source_height = int(info["height"])
+        target_height = source_height
+        if aspect_ratio in ASPECT_RATIO_OUTPUT_SIZES:
+            target_height = min(source_height, ASPECT_RATIO_OUTPUT_SIZES[aspect_ratio][1])
+        target_height -= target_height % 2
+
+        # En VFR el CFR de salida es el promedio real, no la base de tiempo nominal
+        frame_rate = info.get("avg_frame_rate") if is_vfr else info.get("r_frame_rate")
+
+        return ensure_mezzanine(
+            video_path,
+            get_mezzanine_path(transcript_path),
+            frame_rate=frame_rate or "30",
+            source_height=source_height,
+            target_height=target_height,
+            has_audio=bool(info.get("has_audio", True)),
+            # Audio AAC: lo copio, así el passthrough desde el mezzanine no pierde una generación
+            copy_audio=info.get("audio_codec") in PASSTHROUGH_AUDIO_CODECS,
+            require_audio_copy=audio_passthrough,
+            ffmpeg_threads=_resolve_ffmpeg_threads(ffmpeg_threads),
+        )
+
+    def _journal_exported_clip(
         self,
-        video_path: Path,
+        journal: ExportJournal,
+        output_path: Path,
+        *,
         clip: Dict,
-        video_name: str,
-        output_dir: Path,
-        aspect_ratio: Optional[str] = None,
-        add_subtitles: bool = False,
+        render_key: str,
+        transcript_path: Optional[str],
+        trim_ms_start: int,
+        trim_ms_end: int,
+        jump_cut: Optional[JumpCut] = None,
+    ) -> None:
+        """
+        Anoto un clip terminado en el journal si su duración coincide con la ventana
+
+        Con jump cuts la duración esperada es la de la ventana ya compactada. Un
+        archivo que no pasa la verificación no se anota: la próxima corrida lo rehace.
+        """
+        start_time, end_time = self._resolve_clip_window(
+            clip,
+            transcript_path=transcript_path,
+            trim_ms_start=trim_ms_start,
+            trim_ms_end=trim_ms_end,
+        )
+        expected_duration = end_time - start_time
+        jump_cut_plan = jump_cut.plan_for(start_time, end_time) if jump_cut is not None else None
+        if jump_cut_plan is not None:
+            expected_duration = jump_cut_plan.duration
+        duration = verify_clip_duration(output_path, expected_duration)
+        if duration is not None:
+            journal.record(output_path, clip_id=clip["clip_id"], render_key=render_key, duration=duration)
+
+    def _resolve_clip_window(
+        self,
+        clip: Dict,
+        *,
         transcript_path: Optional[str] = None,
-        subtitle_style: str = "default",
-        custom_style: Optional[Dict[str, str]] = None,
-        enable_face_tracking: bool = False,
-        face_tracking_strategy: str = "keep_in_frame",
-        face_tracking_sample_rate: int = 3,
-        add_logo: bool = False,
-        logo_path: Optional[str] = None,
-        logo_position: str = "top-right",
-        logo_scale: float = 0.1,
-        # Speech-edge trimming parameters
         trim_ms_start: int = 0,
         trim_ms_end: int = 0,
-        # Video quality and performance
-        video_crf: int = 23,
-        ffmpeg_threads: int = 0,
-        # Subtitle formatting
-        subtitle_max_chars_per_line: int = 42,
-        subtitle_max_duration: float = 5.0,
-    ) -> Optional[Path]:
+    ) -> Tuple[float, float]:
+        """
+        Calculo la ventana final (inicio, fin) de un clip en el video fuente.
+
+        Aplica el recorte speech-aware (si hay transcript) y nunca devuelve
+        una ventana de duración cero o negativa.
+        """
         clip_id = clip["clip_id"]
         start_time = float(clip["start_time"])
         end_time = float(clip["end_time"])
@@ -556,231 +3030,497 @@ class VideoExporter:
             start_time = float(clip["start_time"])
             end_time = float(clip["end_time"])
 
-        duration = end_time - start_time
+        return start_time, end_time
 
-        output_filename = f"{clip_id}.mp4"
-        output_path = output_dir / output_filename
+    def _build_clip_filter_args(
+        self,
+        *,
+        video_input_idx: int,
+        logo_input_idx: int,
+        aspect_ratio: Optional[str],
+        subtitle_filter: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        input_size: Optional[Tuple[int, int]] = None,
+        input_pix_fmt: Optional[str] = None,
+        jump_cut_filter: Optional[str] = None,
+        reframe_filter: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Armo los args de filtro y el -map de video de un clip
 
-        # Define paths for temporary files
-        temp_path_step1 = output_dir / f"{clip_id}_step1_temp.mp4"
-        temp_reframed_path = output_dir / f"{clip_id}_reframed_temp.mp4"
+        Orden: jump cuts → aspect ratio → logo → subtítulos (encima del logo). El
+        FilterGraph decide -vf o -filter_complex y, con el tamaño de la entrada, escala
+        el logo una sola vez.
 
-        subtitle_file = None
-        if add_subtitles and transcript_path:
-            subtitle_filename = f"{clip_id}.srt"
-            subtitle_file = output_dir / subtitle_filename
-            self.subtitle_generator.generate_srt_for_clip(
-                transcript_path=transcript_path,
-                clip_start=start_time,
-                clip_end=end_time,
-                output_path=str(subtitle_file),
-                max_chars_per_line=subtitle_max_chars_per_line,
-                max_duration=subtitle_max_duration,
+        Args:
+            logo_input_idx: Índice del input del logo, o -1 sin logo
+            input_size/input_pix_fmt: Frame de la entrada de video, si lo conozco
+            jump_cut_filter: select/setpts de JumpCutPlan; va primero para no escalar
+                frames que después se descartan
+            reframe_filter: Crop dinámico de CropTrajectory (face tracking en modo
+                trajectory); reemplaza al filtro de aspect ratio
+        """
+        graph = FilterGraph()
+        video = f"[{video_input_idx}:v]"
+        graph.set_input(video, size=input_size, pix_fmt=input_pix_fmt)
+        if jump_cut_filter:
+            video = graph.chain(video, jump_cut_filter, "[v_cut]")
+        aspect_filter = reframe_filter or self._base_video_filter(aspect_ratio, input_size)
+        if aspect_filter:
+            video = graph.chain(video, aspect_filter, "[v_filtered]")
+        if logo_input_idx != -1:
+            video = graph.overlay_logo(
+                video, f"[{logo_input_idx}:v]", scale=logo_scale, position=logo_position, output="[v_out]"
             )
+        if subtitle_filter:
+            video = graph.chain(video, subtitle_filter, "[v_sub]")
+        return graph.filter_args(video, pix_fmt=OUTPUT_PIX_FMT)
 
-        video_to_process = video_path
+    def _write_clip_srt(
+        self,
+        subtitle_file: Path,
+        *,
+        transcript_path: str,
+        start_time: float,
+        end_time: float,
+        max_chars_per_line: int,
+        max_duration: float,
+        time_map: Optional[Callable[[float], float]] = None,
+    ) -> Optional[str]:
+        """
+        Escribo el SRT de un clip y devuelvo su digest (None si no quedó escrito)
 
-        if enable_face_tracking and aspect_ratio == "9:16":
-            logger.info(
-                f"Face tracking enabled for clip {clip_id} (strategy: {face_tracking_strategy})"
+        Dentro de export_clips() cada ventana se genera una sola vez: la clave de render
+        lo pide primero y el export (u otra carpeta de variante) reusa ese archivo.
+        """
+        try:
+            transcript_mtime = Path(transcript_path).stat().st_mtime_ns
+        except OSError:
+            transcript_mtime = None
+        params = (
+            transcript_path,
+            transcript_mtime,
+            round(start_time, 6),
+            round(end_time, 6),
+            max_chars_per_line,
+            max_duration,
+            time_map is not None,
+        )
+        written = self._clip_srts.get(params) if self._clip_srts is not None else None
+        if written is not None and written[0].exists():
+            written_path, digest = written
+            if written_path != subtitle_file:
+                shutil.copyfile(written_path, subtitle_file)
+            return digest
+
+        self.subtitle_generator.generate_srt_for_clip(
+            transcript_path=transcript_path,
+            clip_start=start_time,
+            clip_end=end_time,
+            output_path=str(subtitle_file),
+            max_chars_per_line=max_chars_per_line,
+            max_duration=max_duration,
+            time_map=time_map,
+        )
+        digest = file_digest(str(subtitle_file))
+        if digest is not None and self._clip_srts is not None:
+            self._clip_srts[params] = (subtitle_file, digest)
+        return digest
+
+    def _compute_clip_render_keys(
+        self,
+        clip_jobs: List[Tuple[Dict, Path]],
+        *,
+        video_path: Path,
+        aspect_ratio: Optional[str],
+        add_subtitles: bool,
+        transcript_path: Optional[str],
+        subtitle_style: str,
+        custom_style: Optional[Dict[str, str]],
+        uses_face_tracking: bool,
+        face_tracking_strategy: str,
+        face_tracking_sample_rate: int,
+        logo_path: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        trim_ms_start: int,
+        trim_ms_end: int,
+        video_crf: int,
+        smart_cut: bool,
+        subtitle_max_chars_per_line: int,
+        subtitle_max_duration: float,
+        with_layers: bool = False,
+        audio_codec: str = "aac",
+        loudness: Optional[LoudnessNormalization] = None,
+        jump_cut: Optional[JumpCut] = None,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
+    ) -> Tuple[Dict[int, str], Dict[int, ClipLayerKeys]]:
+        """
+        Calculo la clave de render de cada clip (índice de clip_jobs → clave)
+
+        Genero los SRT acá para poder hashear su contenido (_write_clip_srt); el export
+        reusa esos mismos archivos. Si no puedo identificar la fuente devuelvo ({}, {})
+        (sin cache).
+
+        Returns:
+            (claves finales, claves de capas intermedias). Las capas solo se calculan
+            con with_layers y si hay logo o subtítulos encima de la base.
+        """
+        source_id = source_content_id(str(video_path))
+        if source_id is None:
+            logger.warning("Render cache disabled for this run: cannot identify the source video")
+            return {}, {}
+        logo_digest = file_digest(logo_path) if logo_path else None
+
+        keys: Dict[int, str] = {}
+        layers: Dict[int, ClipLayerKeys] = {}
+        for idx, (clip, clip_output_dir) in enumerate(clip_jobs):
+            start_time, end_time = self._resolve_clip_window(
+                clip,
+                transcript_path=transcript_path,
+                trim_ms_start=trim_ms_start,
+                trim_ms_end=trim_ms_end,
             )
-            try:
-                reframer = FaceReframer(
-                    frame_sample_rate=face_tracking_sample_rate,
-                    strategy=face_tracking_strategy,
-                )
-                reframer.reframe_video(
-                    input_path=str(video_path),
-                    output_path=str(temp_reframed_path),
-                    target_resolution=(1080, 1920),
+            jump_cut_plan = jump_cut.plan_for(start_time, end_time) if jump_cut is not None else None
+            srt_digest = None
+            if add_subtitles and transcript_path:
+                srt_digest = self._write_clip_srt(
+                    clip_output_dir / f"{clip['clip_id']}.srt",
+                    transcript_path=transcript_path,
                     start_time=start_time,
                     end_time=end_time,
+                    max_chars_per_line=subtitle_max_chars_per_line,
+                    max_duration=subtitle_max_duration,
+                    time_map=jump_cut_plan.remap if jump_cut_plan is not None else None,
                 )
-                video_to_process = temp_reframed_path
-                aspect_ratio = None
-                logger.info(f"Face tracking completed for clip {clip_id}")
-            except Exception as e:
-                logger.warning(
-                    f"Face tracking failed for clip {clip_id}: {e}, falling back to static crop."
-                )
-                video_to_process = video_path
-
-        # Architectural Decision: Use a two-step process when both logo and subtitles are enabled.
-        needs_two_steps = (
-            add_logo
-            and bool(logo_path)
-            and add_subtitles
-            and subtitle_file
-            and subtitle_file.exists()
-        )
 
-        # Determine the output target for the first command
-        first_step_output = temp_path_step1 if needs_two_steps else output_path
-
-        try:
-            # --- STEP 1: Process all filters EXCEPT subtitles ---
-            inputs, filter_chains = [], []
-            using_face_tracking = (
-                video_to_process == temp_reframed_path and temp_reframed_path.exists()
+            keys[idx] = self._clip_render_key(
+                source_id=source_id,
+                start_time=start_time,
+                end_time=end_time,
+                aspect_ratio=aspect_ratio,
+                uses_face_tracking=uses_face_tracking,
+                face_tracking_strategy=face_tracking_strategy,
+                face_tracking_sample_rate=face_tracking_sample_rate,
+                face_tracking_mode=face_tracking_mode,
+                logo_digest=logo_digest,
+                logo_position=logo_position,
+                logo_scale=logo_scale,
+                srt_digest=srt_digest,
+                subtitle_style=subtitle_style,
+                custom_style=custom_style,
+                video_crf=video_crf,
+                audio_codec=audio_codec,
+                audio_filter=_clip_audio_filter(start_time, end_time, loudness, jump_cut_plan),
+                smart_cut=smart_cut,
+                jump_cut_filter=jump_cut_plan.video_filter() if jump_cut_plan is not None else None,
             )
-            video_input_idx, audio_input_idx = (0, 1) if using_face_tracking else (0, 0)
-
-            if using_face_tracking:
-                inputs.extend(["-i", str(video_to_process)])
-                inputs.extend(["-ss", str(start_time), "-t", str(duration), "-i", str(video_path)])
-            else:
-                inputs.extend(["-ss", str(start_time), "-t", str(duration), "-i", str(video_path)])
+            if with_layers and not smart_cut and (logo_digest or srt_digest):
+                layers[idx] = self._clip_layer_keys(
+                    source_id=source_id,
+                    start_time=start_time,
+                    end_time=end_time,
+                    aspect_ratio=aspect_ratio,
+                    uses_face_tracking=uses_face_tracking,
+                    face_tracking_strategy=face_tracking_strategy,
+                    face_tracking_sample_rate=face_tracking_sample_rate,
+                    face_tracking_mode=face_tracking_mode,
+                    logo_digest=logo_digest,
+                    logo_position=logo_position,
+                    logo_scale=logo_scale,
+                    audio_codec=audio_codec,
+                )
+        return keys, layers
 
-            logo_input_idx = -1
-            if add_logo and logo_path:
-                inputs.extend(["-i", str(logo_path)])
-                logo_input_idx = audio_input_idx + 1
-                logger.info(f"Adding logo from {logo_path}")
+    def _clip_render_key(
+        self,
+        *,
+        source_id: str,
+        start_time: float,
+        end_time: float,
+        aspect_ratio: Optional[str],
+        uses_face_tracking: bool,
+        face_tracking_strategy: str,
+        face_tracking_sample_rate: int,
+        logo_digest: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        srt_digest: Optional[str],
+        subtitle_style: str,
+        custom_style: Optional[Dict[str, str]],
+        video_crf: int,
+        smart_cut: bool,
+        audio_codec: str = "aac",
+        audio_filter: Optional[str] = None,
+        jump_cut_filter: Optional[str] = None,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
+    ) -> str:
+        """
+        Clave de render de un clip: todo lo que define la salida y nada más
 
-            last_video_stream = f"[{video_input_idx}:v]"
+        El filtergraph es el mismo que arma _export_single_clip (con el SRT bajo un
+        nombre fijo); las rutas de entrada/salida y los threads no entran en la clave.
+        La trayectoria del crop (modo trajectory) sale de la fuente, la ventana y los
+        parámetros de face tracking, que ya están en la clave.
+        """
+        subtitle_filter = None
+        if srt_digest:
+            subtitle_filter = self._get_subtitle_filter(RENDER_KEY_SRT_PLACEHOLDER, subtitle_style, custom_style)
+        logo_input_idx = -1
+        if logo_digest:
+            # Con face tracking por frames el audio viene del input 1 y el logo pasa al 2
+            logo_input_idx = 2 if uses_face_tracking and face_tracking_mode == "frames" else 1
+
+        filter_args = self._build_clip_filter_args(
+            video_input_idx=0,
+            logo_input_idx=logo_input_idx,
+            aspect_ratio=None if uses_face_tracking else aspect_ratio,
+            subtitle_filter=subtitle_filter,
+            logo_position=logo_position,
+            logo_scale=logo_scale,
+            jump_cut_filter=jump_cut_filter,
+        )
+        key_parts = {
+            "source": source_id,
+            "window": [round(start_time, 6), round(end_time, 6)],
+            "filter_graph": " ".join(filter_args),
+            "face_tracking": self._face_tracking_key_part(
+                uses_face_tracking, face_tracking_strategy, face_tracking_sample_rate, aspect_ratio, face_tracking_mode
+            ),
+            "logo": logo_digest,
+            "srt": srt_digest,
+            "encoder": _clip_encoder_args(video_crf, audio_codec, choice=self._encoder_choice(aspect_ratio)),
+            "smart_cut": smart_cut,
+        }
+        # Solo con normalización: las claves sin filtro de audio no cambian
+        if audio_filter:
+            key_parts["audio_filter"] = audio_filter
+        return compute_render_key(key_parts)
 
-            # Add filters that can be chained simply
-            simple_filters = []
-            if aspect_ratio and not using_face_tracking:
-                aspect_filter = self._get_aspect_ratio_filter(aspect_ratio)
-                if aspect_filter:
-                    simple_filters.append(aspect_filter)
+    def _face_tracking_key_part(
+        self,
+        uses_face_tracking: bool,
+        strategy: str,
+        sample_rate: int,
+        aspect_ratio: Optional[str] = "9:16",
+        mode: str = DEFAULT_FACE_TRACKING_MODE,
+    ) -> Optional[Dict]:
+        if not uses_face_tracking:
+            return None
+        part = {
+            "strategy": strategy,
+            "sample_rate": sample_rate,
+            "target": list(self._output_size(aspect_ratio) or self._output_size("9:16")),
+        }
+        # Solo el modo trajectory entra: las claves por frames no cambian
+        if mode != "frames":
+            part["mode"] = mode
+        return part
 
-            # If we are NOT doing two steps, add subtitles here
-            if not needs_two_steps and add_subtitles and subtitle_file and subtitle_file.exists():
-                subtitle_filter = self._get_subtitle_filter(str(subtitle_file), subtitle_style, custom_style)
-                simple_filters.append(subtitle_filter)
+    def _clip_layer_keys(
+        self,
+        *,
+        source_id: str,
+        start_time: float,
+        end_time: float,
+        aspect_ratio: Optional[str],
+        uses_face_tracking: bool,
+        face_tracking_strategy: str,
+        face_tracking_sample_rate: int,
+        logo_digest: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        face_tracking_mode: str = DEFAULT_FACE_TRACKING_MODE,
+        audio_codec: str = "aac",
+    ) -> ClipLayerKeys:
+        """
+        Claves de las capas intermedias: cada una cubre solo sus propias entradas
 
-            cmd = ["ffmpeg"] + inputs
+        La base depende de la ventana y del recorte/reencuadre; la capa con logo, de
+        la base y del logo. El estilo de subtítulos no entra en ninguna, así que un
+        cambio de estilo reutiliza la última capa cacheada. Las capas llevan el audio
+        con audio_codec y el clip final lo copia: el códec entra en las dos claves.
+        """
+        layer_encoder = ["libx264", RENDER_LAYER_PRESET, RENDER_LAYER_CRF]
+        base = compute_render_key(
+            {
+                "layer": "base",
+                "source": source_id,
+                "window": [round(start_time, 6), round(end_time, 6)],
+                "aspect_filter": (
+                    None if uses_face_tracking else self._base_video_filter(aspect_ratio)
+                ),
+                "face_tracking": self._face_tracking_key_part(
+                    uses_face_tracking,
+                    face_tracking_strategy,
+                    face_tracking_sample_rate,
+                    aspect_ratio,
+                    face_tracking_mode,
+                ),
+                "encoder": layer_encoder,
+                "audio_codec": audio_codec,
+            }
+        )
+        branded = None
+        if logo_digest:
+            position = LOGO_OVERLAY_POSITIONS.get(logo_position, LOGO_OVERLAY_POSITIONS["top-right"])
+            branded = compute_render_key(
+                {
+                    "layer": "branded",
+                    "base": base,
+                    "logo": logo_digest,
+                    "overlay": {"position": position, "scale": logo_scale},
+                    "encoder": layer_encoder,
+                    "audio_codec": audio_codec,
+                }
+            )
+        return ClipLayerKeys(base=base, branded=branded)
 
-            # If a logo is present, we must use filter_complex
-            if logo_input_idx != -1:
-                # Apply simple filters first, if any
-                if simple_filters:
-                    filter_chains.append(f"{last_video_stream}{','.join(simple_filters)}[v_filtered]")
-                    last_video_stream = "[v_filtered]"
-
-                logo_stream = f"[{logo_input_idx}:v]"
-                logo_chains, last_video_stream = self._get_logo_overlay_filter(
-                    video_stream=last_video_stream,
-                    logo_stream=logo_stream,
-                    position=logo_position,
-                    scale=logo_scale,
-                )
-                filter_chains.extend(logo_chains)
+    def _build_layered_clip_graph(
+        self,
+        *,
+        video_input_idx: int,
+        logo_input_idx: int,
+        aspect_ratio: Optional[str],
+        subtitle_filter: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        input_size: Optional[Tuple[int, int]] = None,
+        input_pix_fmt: Optional[str] = None,
+        reframe_filter: Optional[str] = None,
+    ) -> Tuple[str, str, Dict[str, str]]:
+        """
+        Mismo grafo que _build_clip_filter_args, con derivaciones (split) para las capas
 
-                cmd.extend(["-filter_complex", ";".join(filter_chains), "-map", last_video_stream])
+        Derivo la base si después hay logo o subtítulos, y la capa con logo si después
+        hay subtítulos. Cada derivación va a su propia salida de ffmpeg.
 
-            elif simple_filters:
-                cmd.extend(["-vf", ",".join(simple_filters), "-map", f"{video_input_idx}:v"])
-            else:
-                cmd.extend(["-map", f"{video_input_idx}:v"])
+        Returns:
+            (filter_complex, -map del video final, {"base"|"branded": -map de la capa});
+            el filter_complex queda vacío si no hay nada que filtrar
+        """
+        taps: Dict[str, str] = {}
+        has_logo = logo_input_idx != -1
+
+        graph = FilterGraph()
+        source = f"[{video_input_idx}:v]"
+        graph.set_input(source, size=input_size, pix_fmt=input_pix_fmt)
+        current = graph.chain(
+            source, reframe_filter or self._base_video_filter(aspect_ratio, input_size), "[base]"
+        )
 
-            # BUGFIX: Add -sn flag when doing two-step processing to discard any subtitle streams
-            # This prevents FFmpeg from preserving subtitle metadata that would cause duplication in Step 2
-            if needs_two_steps:
-                cmd.extend(["-sn"])  # Discard subtitle streams
+        if has_logo or subtitle_filter:
+            graph.split(current, ["[base_layer]", "[base_next]"])
+            taps["base"] = "[base_layer]"
+            current = "[base_next]"
 
-            resolved_threads = _resolve_ffmpeg_threads(ffmpeg_threads)
-            cmd.extend(
-                [
-                    "-map",
-                    f"{audio_input_idx}:a?",
-                    "-c:v",
-                    "libx264",
-                    "-c:a",
-                    "aac",
-                    "-preset",
-                    "fast",
-                    "-crf",
-                    str(video_crf),
-                    "-threads",
-                    str(resolved_threads),
-                    "-y",
-                    str(first_step_output),
-                ]
+        if has_logo:
+            current = graph.overlay_logo(
+                current, f"[{logo_input_idx}:v]", scale=logo_scale, position=logo_position, output="[v_out]"
             )
+            if subtitle_filter:
+                graph.split(current, ["[branded_layer]", "[branded_next]"])
+                taps["branded"] = "[branded_layer]"
+                current = "[branded_next]"
 
-            result1 = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            if result1.returncode != 0:
-                logger.error(
-                    f"Error in video processing (Step 1) for clip {clip_id}: {result1.stderr}"
-                )
-                return None
-
-            # --- STEP 2: Add subtitles if required in a separate, safe step ---
-            if needs_two_steps:
-                logger.info("Applying subtitles in a second step to avoid duplication bug.")
-                subtitle_filter = self._get_subtitle_filter(str(subtitle_file), subtitle_style, custom_style)
-                cmd2 = [
-                    "ffmpeg",
-                    "-i",
-                    str(first_step_output),
-                    "-vf",
-                    subtitle_filter,
-                    "-c:a",
-                    "copy",
-                    "-y",
-                    str(output_path),
-                ]
-
-                result2 = subprocess.run(cmd2, capture_output=True, text=True, check=False)
-                if result2.returncode != 0:
-                    logger.error(
-                        f"Error adding subtitles (Step 2) for clip {clip_id}: {result2.stderr}"
-                    )
-                    first_step_output.replace(output_path)  # Fallback to the version without subtitles
-                    return output_path
-
-            logger.info(f"✓ Exported clip {clip_id}: {output_path.name}")
-            return output_path
+        if subtitle_filter:
+            current = graph.chain(current, subtitle_filter, "[v_sub]")
 
-        finally:
-            # Cleanup all temporary files
-            if temp_path_step1.exists():
-                temp_path_step1.unlink()
-            if temp_reframed_path and temp_reframed_path.exists():
-                temp_reframed_path.unlink()
+        filter_complex, maps = graph.build([current, *taps.values()], pix_fmt=OUTPUT_PIX_FMT)
+        return filter_complex, maps[0], dict(zip(taps, maps[1:]))
 
-    def _get_logo_overlay_filter(
+    def _export_clip_from_cached_layer(
         self,
         *,
-        video_stream: str,
-        logo_stream: str,
-        position: str = "top-right",
-        scale: float = 0.1,
-    ) -> tuple[list[str], str]:
+        clip_id,
+        layer_keys: ClipLayerKeys,
+        render_cache: RenderCache,
+        output_path: Path,
+        subtitle_filter: Optional[str],
+        logo_path: Optional[str],
+        logo_position: str,
+        logo_scale: float,
+        video_crf: int,
+        ffmpeg_threads: int,
+        aspect_ratio: Optional[str] = None,
+        audio_filter: Optional[str] = None,
+    ) -> Optional[Path]:
         """
-        Genera filtros FFmpeg para escalar y superponer un logo.
+        Armo el clip final desde la capa intermedia cacheada más avanzada
 
-        Args:
-            video_stream: Label del stream de video (por ej. "[0:v]" o "[v_filtered]").
-            logo_stream: Label del stream del logo (por ej. "[1:v]").
-            position: Posición del logo ("top-right", "top-left", "bottom-right", "bottom-left").
-            scale: Escala del logo relativa al ancho del video (0.1 = 10%).
+        Con la capa con logo solo quemo los subtítulos; con la base aplico logo y
+        subtítulos. El audio de la capa ya está listo para el MP4: lo copio, salvo
+        que haya que normalizarlo (las capas guardan el audio sin normalizar).
 
         Returns:
-            (filter_chains, output_stream_label)
+            output_path, o None si no hay capa cacheada o ffmpeg falla (export normal)
         """
-        positions = {
-            "top-right": "W-w-20:20",
-            "top-left": "20:20",
-            "bottom-right": "W-w-20:H-h-20",
-            "bottom-left": "20:H-h-20",
-        }
-        pos = positions.get(position, positions["top-right"])
-
-        # 1) Escalo el logo relativo al ancho del video (main_w) y preservo aspecto con h=-1
-        # 2) Superpongo el logo escalado en la posición elegida
-        logo_scaled = "[logo_scaled]"
-        video_for_overlay = "[video_for_overlay]"
-        output = "[v_out]"
+        layer_path = None
+        layer_name = None
+        filter_args: List[str] = []
+        inputs: List[str] = []
+
+        if subtitle_filter and layer_keys.branded:
+            layer_path = render_cache.lookup_layer(layer_keys.branded)
+            if layer_path is not None:
+                layer_name = "branded"
+                inputs = ["-i", str(layer_path)]
+                filter_args = ["-vf", subtitle_filter, "-map", "0:v"]
+
+        if layer_path is None:
+            layer_path = render_cache.lookup_layer(layer_keys.base)
+            if layer_path is None:
+                return None
+            layer_name = "base"
+            has_logo = bool(layer_keys.branded and logo_path)
+            inputs = ["-i", str(layer_path)]
+            if has_logo:
+                inputs.extend(["-i", str(logo_path)])
+            layer_size, layer_pix_fmt = _source_frame(self.get_video_info(str(layer_path)))
+            filter_args = self._build_clip_filter_args(
+                video_input_idx=0,
+                logo_input_idx=1 if has_logo else -1,
+                aspect_ratio=None,
+                subtitle_filter=subtitle_filter,
+                logo_position=logo_position,
+                logo_scale=logo_scale,
+                input_size=layer_size,
+                input_pix_fmt=layer_pix_fmt,
+            )
 
-        filter_chains = [
-            f"{logo_stream}{video_stream}scale2ref=w=main_w*{scale}:h=-1{logo_scaled}{video_for_overlay}",
-            f"{video_for_overlay}{logo_scaled}overlay={pos}{output}",
+        partial_path = _partial_output_path(output_path)
+        cmd = [
+            "ffmpeg",
+            *inputs,
+            *filter_args,
+            *(["-filter:a", audio_filter] if audio_filter else []),
+            "-map",
+            "0:a?",
+            "-sn",
+            *_clip_encoder_args(
+                video_crf, audio_codec="aac" if audio_filter else "copy", choice=self._encoder_choice(aspect_ratio)
+            ),
+            "-threads",
+            str(_resolve_ffmpeg_threads(ffmpeg_threads)),
+            "-y",
+            str(partial_path),
         ]
-        return filter_chains, output
+        try:
+            result = self._run_ffmpeg(cmd, label=f"clip {clip_id} from {layer_name} layer")
+            if result.returncode != 0:
+                logger.warning(
+                    f"Rebuild from cached {layer_name} layer failed for clip {clip_id}; "
+                    f"exporting from source: {result.stderr[-500:]}"
+                )
+                return None
+            if not _publish_output(partial_path, output_path):
+                return None
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+        logger.info(f"✓ Exported clip {clip_id} from cached {layer_name} layer: {output_path.name}")
+        return output_path
 
     def _get_aspect_ratio_filter(self, aspect_ratio: str) -> Optional[str]:
         """
@@ -796,19 +3536,20 @@ class VideoExporter:
         Returns:
             String de filtro para ffmpeg, o None si no se reconoce
         """
+        output_size = self._output_size(aspect_ratio)
         if aspect_ratio == "9:16":
             # Vertical (para Instagram Reels, TikTok, YouTube Shorts)
-            # Crop al centro y resize a 1080x1920
-            return "crop=ih*9/16:ih,scale=1080:1920"
+            # Crop al centro y resize a 1080x1920 (360x640 en borrador)
+            return "crop=ih*9/16:ih,scale={}:{}".format(*output_size)
 
         elif aspect_ratio == "1:1":
             # Cuadrado (para Instagram post)
             # Crop al centro y resize a 1080x1080
-            return "crop=ih:ih,scale=1080:1080"
+            return "crop=ih:ih,scale={}:{}".format(*output_size)
 
         elif aspect_ratio == "16:9":
             # Horizontal estándar (ya suele ser así, pero por si acaso)
-            return "scale=1920:1080"
+            return "scale={}:{}".format(*output_size)
 
         else:
             logger.warning(f"Aspect ratio '{aspect_ratio}' no reconocido, manteniendo original")
@@ -927,44 +3668,13 @@ class VideoExporter:
 
     def get_video_info(self, video_path: str) -> Dict:
         """
-        Obtengo información del video usando ffprobe
+        Obtengo información del video (un ffprobe por archivo, cacheado en media_info)
 
         Returns:
             Dict con duration, width, height, fps, etc.
         """
-        cmd = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            str(video_path),
-        ]
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-
-            data = json.loads(result.stdout)
-
-            # Extraigo info relevante del video stream
-            video_stream = next(
-                (s for s in data.get("streams", []) if s["codec_type"] == "video"),
-                None,
-            )
-
-            if not video_stream:
-                return {}
-
-            return {
-                "duration": float(data["format"].get("duration", 0)),
-                "width": video_stream.get("width"),
-                "height": video_stream.get("height"),
-                "fps": _safe_parse_ffprobe_r_frame_rate(video_stream.get("r_frame_rate")),
-                "codec": video_stream.get("codec_name"),
-            }
-
-        except Exception as e:
-            logger.error(f"Error getting video info: {e}")
+        info = probe_media(str(video_path))
+        if info is None:
+            logger.error(f"Error getting video info: cannot probe {video_path}")
             return {}
+        return info.to_video_info()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK: detección de rostros sobre frames reducidos por ffmpeg vs frame completo
+
+Compara, por frame muestreado, el camino anterior del reframer (cvtColor + MediaPipe
+sobre el frame completo, resize del frame completo a la resolución intermedia y crop)
+con el actual (DetectionFrameStream a 320 px + resize solo de la región recortada).
+
+Uso:
+    python tests/benchmark_face_detection.py [video.mp4] [--seconds 10] [--sample-rate 3]
+
+Sin video, usa el primer .mp4 de downloads/. No es un test de pytest.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import cv2
+
+from src.reframer import DetectionFrameStream, FaceReframer
+from src.utils.media_info import probe_media
+
+TARGET = (1080, 1920)
+
+
+def _read_frames(video_path: str, count: int):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _report(label: str, cpu_seconds: float, frames: int, faces=None) -> float:
+    per_frame = cpu_seconds * 1000 / max(frames, 1)
+    detail = f"  ({faces}/{frames} with face)" if faces is not None else ""
+    print(f"  {label:<34} {per_frame:7.2f} ms CPU/frame{detail}")
+    return per_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--sample-rate", type=int, default=3)
+    args = parser.parse_args()
+
+    video_path = args.video
+    if not video_path:
+        videos = sorted(Path("downloads").glob("*.mp4"))
+        if not videos:
+            print("ERROR: No video given and none found in downloads/")
+            return
+        video_path = str(videos[0])
+
+    media = probe_media(video_path)
+    if media is None:
+        print(f"ERROR: cannot probe {video_path}")
+        return
+    width, height = media.display_size
+    fps = media.fps
+    end_frame = int(min(args.seconds, media.duration) * fps)
+    sample_rate = args.sample_rate
+    sampled = list(range(0, end_frame, sample_rate))
+
+    scale = max(TARGET[0] / width, TARGET[1] / height)
+    scaled_size = (int(width * scale), int(height * scale))
+    region_size = (min(width, round(TARGET[0] / scale)), min(height, round(TARGET[1] / scale)))
+
+    print(f"BENCHMARK: {Path(video_path).name} {width}x{height} @ {fps:.2f}fps")
+    print(f"{len(sampled)} sampled frames of {end_frame} (every {sample_rate}), output {TARGET[0]}x{TARGET[1]}")
+    print("=" * 72)
+
+    frames = _read_frames(video_path, end_frame)
+    reframer = FaceReframer(frame_sample_rate=sample_rate)
+
+    print("Detection (per sampled frame):")
+    # El primer process() inicializa el grafo de MediaPipe: fuera de la medición
+    reframer._detect_largest_face(frames[0])
+    start = time.process_time()
+    faces = sum(1 for n in sampled if n < len(frames) and reframer._detect_largest_face(frames[n]))
+    full = _report("full frame (cvtColor + detect)", time.process_time() - start, len(sampled), faces)
+
+    start = time.process_time()
+    stream = DetectionFrameStream.open(
+        video_path,
+        frame_width=width,
+        frame_height=height,
+        fps=fps,
+        start_frame=0,
+        end_frame=end_frame,
+        sample_rate=sample_rate,
+    )
+    faces = 0
+    for _ in sampled:
+        frame = stream.read()
+        if frame is None:
+            break
+        faces += bool(reframer._detect_largest_face_rgb(frame, width, height))
+    stream.close()
+    python_cpu = time.process_time() - start
+    ffmpeg_cpu = stream.process.wait().cpu_seconds or 0.0
+    small = _report(f"{stream.width}px stream (detect only)", python_cpu, len(sampled), faces)
+    _report(f"{stream.width}px stream (+ ffmpeg decode)", python_cpu + ffmpeg_cpu, len(sampled), faces)
+
+    print("\nCrop to output (per frame):")
+    start = time.process_time()
+    for frame in frames:
+        scaled = cv2.resize(frame, scaled_size)
+        x = (scaled_size[0] - TARGET[0]) // 2
+        y = (scaled_size[1] - TARGET[1]) // 2
+        scaled[y:y + TARGET[1], x:x + TARGET[0]].copy()
+    resize_full = _report("resize full frame + crop", time.process_time() - start, len(frames))
+
+    start = time.process_time()
+    for frame in frames:
+        x = (width - region_size[0]) // 2
+        y = (height - region_size[1]) // 2
+        cv2.resize(frame[y:y + region_size[1], x:x + region_size[0]], TARGET)
+    resize_region = _report("crop region + resize", time.process_time() - start, len(frames))
+
+    print("=" * 72)
+    print(f"Detection: {full / max(small, 1e-9):.1f}x less CPU in the detect loop")
+    print(f"Crop:      {resize_full / max(resize_region, 1e-9):.1f}x less CPU per output frame")
+
+
+if __name__ == "__main__":
+    main()
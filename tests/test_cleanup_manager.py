@@ -14,11 +14,32 @@ Covers:
 """
 
 import json
+from functools import partial
 from pathlib import Path
 
 import pytest
 
+import src.cleanup_manager as cleanup_manager_module
 from src.cleanup_manager import CleanupManager
+from src.utils.state_manager import StateManager
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_project_dir: Path, monkeypatch):
+    """
+    CleanupManager creates its own StateManager, whose default settings file is the
+    repo's config/app_settings.json: point it to the tmp project instead, so saving the
+    normalized settings never touches the real file.
+    """
+    monkeypatch.setattr(
+        cleanup_manager_module,
+        "StateManager",
+        partial(
+            StateManager,
+            app_root=tmp_project_dir,
+            settings_file=tmp_project_dir / "config" / "app_settings.json",
+        ),
+    )
 
 
 @pytest.fixture
@@ -198,6 +219,39 @@ class TestGetVideoArtifacts:
         assert artifacts["temp_files"]["type"] == "temp_videos"
         assert artifacts["temp_files"]["file_count"] == 1
 
+    def test_get_video_artifacts_includes_mezzanine(
+        self, cleanup_manager, video_with_artifacts
+    ):
+        """Verify the mezzanine proxy recorded in state is listed as a video artifact."""
+        video_key = video_with_artifacts["video_key"]
+        mezzanine_file = video_with_artifacts["transcript_file"].with_name(
+            "test_video_transcript_mezzanine.mp4"
+        )
+        mezzanine_file.write_bytes(b"mezzanine" * 100)
+        cleanup_manager.state_manager.set_mezzanine_path(video_key, str(mezzanine_file))
+
+        artifacts = cleanup_manager.get_video_artifacts(video_key)
+
+        assert artifacts["mezzanine"]["exists"] is True
+        assert artifacts["mezzanine"]["type"] == "video"
+        assert artifacts["mezzanine"]["size"] == 900
+
+    def test_get_video_artifacts_finds_unrecorded_mezzanine(
+        self, cleanup_manager, video_with_artifacts
+    ):
+        """Verify a mezzanine next to the transcript is found even if state lacks it."""
+        video_key = video_with_artifacts["video_key"]
+        mezzanine_file = video_with_artifacts["transcript_file"].with_name(
+            "test_video_transcript_mezzanine.mp4"
+        )
+
+        assert "mezzanine" not in cleanup_manager.get_video_artifacts(video_key)
+
+        mezzanine_file.write_bytes(b"mezzanine")
+        artifacts = cleanup_manager.get_video_artifacts(video_key)
+
+        assert artifacts["mezzanine"]["path"] == mezzanine_file
+
 
 class TestDeleteVideoArtifacts:
     """Tests for delete_video_artifacts() method."""
@@ -313,6 +367,27 @@ class TestDeleteVideoArtifacts:
 
         assert results["transcript"] is True
 
+    def test_delete_video_artifacts_removes_mezzanine(
+        self, cleanup_manager, video_with_artifacts
+    ):
+        """Verify the mezzanine is deleted by default and cleared from state."""
+        video_key = video_with_artifacts["video_key"]
+        mezzanine_file = video_with_artifacts["transcript_file"].with_name(
+            "test_video_transcript_mezzanine.mp4"
+        )
+        mezzanine_file.write_bytes(b"mezzanine")
+        cleanup_manager.state_manager.set_mezzanine_path(video_key, str(mezzanine_file))
+
+        results = cleanup_manager.delete_video_artifacts(
+            video_key, artifact_types=["mezzanine"]
+        )
+
+        assert results["mezzanine"] is True
+        assert not mezzanine_file.exists()
+        assert video_with_artifacts["video_file"].exists()
+        state = cleanup_manager.state_manager.get_video_state(video_key)
+        assert state["mezzanine_path"] is None
+
 
 class TestDeleteAllProjectData:
     """Tests for delete_all_project_data() method."""
@@ -10,7 +10,13 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.clips_generator import ClipsGenerator, generate_clips_from_transcript
+from src.clips_generator import (
+    CLIPFINDER_BOUNDARY_HOOKS,
+    ClipsGenerator,
+    generate_clips_from_transcript,
+    get_boundary_cache_path,
+    solve_clips_from_boundaries,
+)
 
 
 # ============================================================================
@@ -756,6 +762,205 @@ class TestClipsMetadataPersistence:
             assert clip["method"] == original_clips[i]["method"]
 
 
+# ============================================================================
+# TEST: Boundary cache (incremental re-segmentation)
+# ============================================================================
+
+
+class FakeClipFinder:
+    """
+    Mimics the selection structure of clipsai.ClipFinder.find_clips without BERT.
+
+    Each round yields fixed super-clips; selection goes through
+    _text_tile_multiple_rounds/_remove_duplicates like the real implementation.
+    """
+
+    ROUNDS = {
+        5: [[(0.0, 20.0), (20.0, 50.0), (50.0, 95.0), (95.0, 130.0)]],
+        7: [[(0.0, 50.0), (50.0, 130.0)]],
+        11: [[(0.0, 200.0), (200.0, 400.0)]],
+    }
+
+    def __init__(self, min_clip_duration=30, max_clip_duration=90):
+        self._min_clip_duration = min_clip_duration
+        self._max_clip_duration = max_clip_duration
+        self.find_calls = 0
+
+    def find_clips(self, transcription):
+        self.find_calls += 1
+        clips = []
+        for k in (5, 7):
+            clips = self._text_tile_multiple_rounds([], [], k, self._min_clip_duration, self._max_clip_duration, clips)
+        clips = self._text_tile_multiple_rounds([], [], 11, 180, self._max_clip_duration, clips)
+        return [MagicMock(start_time=c["start_time"], end_time=c["end_time"]) for c in clips]
+
+    def _text_tile_multiple_rounds(self, clips, embeddings, k, min_d, max_d, final_clips):
+        for super_clips in self.ROUNDS[k]:
+            candidates = [{"start_time": s, "end_time": e} for s, e in super_clips]
+            final_clips += self._remove_duplicates(candidates, final_clips, min_d, max_d)
+        return final_clips
+
+    def _remove_duplicates(self, potential_clips, clips_to_check_against, min_d, max_d):
+        kept = []
+        for clip in potential_clips:
+            duration = clip["end_time"] - clip["start_time"]
+            if duration < min_d or duration > max_d:
+                continue
+            if any(
+                abs(clip["start_time"] - c["start_time"]) + abs(clip["end_time"] - c["end_time"]) < 15
+                for c in clips_to_check_against
+            ):
+                continue
+            kept.append(clip)
+        return kept
+
+
+@pytest.fixture
+def fake_clip_finder():
+    """Patch ClipFinder with FakeClipFinder instances (one per ClipsGenerator)."""
+    instances: List[FakeClipFinder] = []
+
+    def factory(**kwargs):
+        finder = FakeClipFinder(**kwargs)
+        instances.append(finder)
+        return finder
+
+    with patch("src.clips_generator.ClipFinder", side_effect=factory):
+        yield instances
+
+
+def _clip_windows(clips):
+    return [(c["start_time"], c["end_time"]) for c in clips]
+
+
+class TestBoundaryCache:
+    """Tests for cached TextTiling boundaries and selection re-solve."""
+
+    def test_installed_clip_finder_has_the_recorded_hooks(self):
+        """The private ClipFinder methods wrapped to record rounds exist in the pinned clipsai."""
+        import inspect
+
+        clipsai = pytest.importorskip("clipsai")
+
+        for name in CLIPFINDER_BOUNDARY_HOOKS:
+            assert callable(getattr(clipsai.ClipFinder, name, None)), name
+        # The wrapper forwards these four positional arguments
+        params = list(inspect.signature(clipsai.ClipFinder._remove_duplicates).parameters)
+        assert params[1:] == [
+            "potential_clips", "clips_to_check_against", "min_duration_secs", "max_duration_secs",
+        ]
+
+    def test_missing_hooks_warn_and_skip_the_cache(
+        self, tmp_project_dir, fake_clip_finder, transcript_with_words
+    ):
+        """Without the hooks (another clipsai version) clips are still found, uncached."""
+        transcript_path = tmp_project_dir / "temp" / "transcript.json"
+        transcript_path.write_text(json.dumps(transcript_with_words), encoding="utf-8")
+
+        generator = ClipsGenerator()
+        generator.clip_finder.find_clips = MagicMock(return_value=[])
+        generator.clip_finder._remove_duplicates = None
+        generator.logger = MagicMock()
+        with patch("src.clips_generator.Transcription"):
+            generator.generate_clips(str(transcript_path))
+
+        warnings = " ".join(str(c.args[0]) for c in generator.logger.warning.call_args_list)
+        assert "_remove_duplicates" in warnings
+        assert not get_boundary_cache_path(str(transcript_path)).exists()
+
+    def test_solve_filters_by_duration_and_duplicates(self):
+        """solve_clips_from_boundaries applies per-round min, global max and dedupe."""
+        data = {
+            "media_end_time": 300.0,
+            "rounds": [
+                {"k": 5, "min_duration": None, "candidates": [[0.0, 20.0], [20.0, 60.0], [60.0, 100.0]]},
+                {"k": 7, "min_duration": None, "candidates": [[21.0, 61.0], [100.0, 150.0]]},
+                {"k": 11, "min_duration": 180.0, "candidates": [[0.0, 150.0]]},
+            ],
+        }
+
+        result = solve_clips_from_boundaries(data, 30, 90)
+
+        # (21, 61) is a duplicate of (20, 60); (0, 150) fails the 180s round min
+        assert [(c.start_time, c.end_time) for c in result] == [
+            (20.0, 60.0),
+            (60.0, 100.0),
+            (100.0, 150.0),
+        ]
+
+    def test_solve_includes_full_media_when_short(self):
+        """Full media counts as a clip when it fits within max_clip_duration."""
+        data = {"media_end_time": 80.0, "rounds": []}
+
+        result = solve_clips_from_boundaries(data, 30, 90)
+
+        assert [(c.start_time, c.end_time) for c in result] == [(0.0, 80.0)]
+
+    def test_generate_clips_writes_boundary_cache(
+        self, tmp_project_dir, fake_clip_finder, transcript_with_words
+    ):
+        """First run records every TextTiling round next to the transcript."""
+        transcript_path = tmp_project_dir / "temp" / "transcript.json"
+        transcript_path.write_text(json.dumps(transcript_with_words), encoding="utf-8")
+
+        with patch("src.clips_generator.Transcription"):
+            ClipsGenerator().generate_clips(str(transcript_path))
+
+        cache_path = get_boundary_cache_path(str(transcript_path))
+        assert cache_path.name == "transcript_boundaries.json"
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        assert [r["k"] for r in data["rounds"]] == [5, 7, 11]
+        assert data["rounds"][0]["min_duration"] is None
+        assert data["rounds"][2]["min_duration"] == 180.0
+
+    def test_param_change_resolves_from_cache(
+        self, tmp_project_dir, fake_clip_finder, transcript_with_words
+    ):
+        """Changing min/max re-solves from the cache and matches a full run."""
+        transcript_path = tmp_project_dir / "temp" / "transcript.json"
+        transcript_path.write_text(json.dumps(transcript_with_words), encoding="utf-8")
+
+        with patch("src.clips_generator.Transcription"):
+            ClipsGenerator(min_clip_duration=30, max_clip_duration=90).generate_clips(str(transcript_path))
+            cached = ClipsGenerator(min_clip_duration=15, max_clip_duration=60).generate_clips(
+                str(transcript_path), max_clips=10
+            )
+
+        assert fake_clip_finder[1].find_calls == 0
+
+        expected_finder = FakeClipFinder(min_clip_duration=15, max_clip_duration=60)
+        expected = [(c.start_time, c.end_time) for c in expected_finder.find_clips(None)]
+        assert _clip_windows(cached) == expected
+
+    def test_modified_transcript_invalidates_cache(
+        self, tmp_project_dir, fake_clip_finder, transcript_with_words
+    ):
+        """A different transcript digest forces a full ClipsAI run."""
+        transcript_path = tmp_project_dir / "temp" / "transcript.json"
+        transcript_path.write_text(json.dumps(transcript_with_words), encoding="utf-8")
+
+        with patch("src.clips_generator.Transcription"):
+            ClipsGenerator().generate_clips(str(transcript_path))
+            transcript_with_words["segments"][0]["text"] = "Texto editado"
+            transcript_path.write_text(json.dumps(transcript_with_words), encoding="utf-8")
+            ClipsGenerator().generate_clips(str(transcript_path))
+
+        assert fake_clip_finder[1].find_calls == 1
+
+    def test_mock_clip_finder_does_not_write_cache(
+        self, tmp_project_dir, mock_clip_finder, transcript_with_words
+    ):
+        """Without recorded rounds nothing is cached."""
+        transcript_path = tmp_project_dir / "temp" / "transcript.json"
+        transcript_path.write_text(json.dumps(transcript_with_words), encoding="utf-8")
+        mock_clip_finder.find_clips.return_value = []
+
+        with patch("src.clips_generator.Transcription"):
+            ClipsGenerator().generate_clips(str(transcript_path))
+
+        assert not get_boundary_cache_path(str(transcript_path)).exists()
+
+
 # ============================================================================
 # TEST: generate_clips_from_transcript() helper function
 # ============================================================================
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/encoder_profile.py
+
+Verifica los args de cada opción, la elección por resolución, la persistencia del
+perfil (y cuándo se ignora) y el criterio de selección de la calibración.
+"""
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.encoder_profile import (
+    EncoderChoice,
+    EncoderProfile,
+    _pick_fastest,
+    load_encoder_profile,
+    writer_encoders,
+)
+
+
+def _profile(**overrides) -> EncoderProfile:
+    values = dict(
+        host=socket.gethostname(),
+        ffmpeg_version="ffmpeg version test",
+        crf=23,
+        encoders=["libx264", "h264_nvenc"],
+        choices={
+            "1080x1920": EncoderChoice(encoder="libx264", preset="veryfast", threads=2, fps=90.0),
+            "1080x1080": EncoderChoice(encoder="libx264", preset="faster", fps=120.0),
+            "1920x1080": EncoderChoice(encoder="h264_nvenc", rate_args=("-b:v", "5200k"), fps=400.0),
+        },
+    )
+    values.update(overrides)
+    return EncoderProfile(**values)
+
+
+class TestEncoderChoice:
+    def test_libx264_keeps_user_crf(self):
+        choice = EncoderChoice(encoder="libx264", preset="veryfast")
+        assert choice.video_args(20) == ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20"]
+
+    def test_hardware_uses_calibrated_rate(self):
+        choice = EncoderChoice(encoder="h264_nvenc", rate_args=("-b:v", "5200k"))
+        assert choice.video_args(20) == ["-c:v", "h264_nvenc", "-b:v", "5200k"]
+
+
+class TestChoiceFor:
+    def test_exact_and_nearest_resolution(self):
+        profile = _profile()
+        assert profile.choice_for(1080, 1920).preset == "veryfast"
+        assert profile.choice_for(720, 720).preset == "faster"
+
+    def test_same_area_prefers_same_orientation(self):
+        profile = _profile()
+        assert profile.choice_for(1920, 1080).encoder == "h264_nvenc"
+        assert profile.choice_for(1080, 1920).encoder == "libx264"
+
+    def test_unknown_size_uses_largest_area(self):
+        profile = _profile(choices={"1080x1080": EncoderChoice(encoder="libx264", preset="faster"),
+                                    "1920x1080": EncoderChoice(encoder="libx264", preset="veryfast")})
+        assert profile.choice_for().preset == "veryfast"
+
+
+class TestLoadEncoderProfile:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "profile.json"
+        _profile().save(path)
+
+        with patch("src.utils.encoder_profile.ffmpeg_version", return_value="ffmpeg version test"):
+            loaded = load_encoder_profile(path)
+
+        assert loaded is not None
+        assert loaded.choices["1920x1080"].rate_args == ("-b:v", "5200k")
+        assert loaded.choice_for(1080, 1920) == EncoderChoice(
+            encoder="libx264", preset="veryfast", threads=2, fps=90.0
+        )
+
+    def test_missing_profile(self, tmp_path):
+        assert load_encoder_profile(tmp_path / "missing.json") is None
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"host": "another-machine"},
+            {"ffmpeg_version": "ffmpeg version old"},
+            {"version": 0},
+        ],
+    )
+    def test_stale_profile_is_ignored(self, tmp_path, overrides):
+        path = tmp_path / "profile.json"
+        _profile(**overrides).save(path)
+
+        with patch("src.utils.encoder_profile.ffmpeg_version", return_value="ffmpeg version test"):
+            assert load_encoder_profile(path) is None
+
+    def test_cached_until_file_changes(self, tmp_path):
+        path = tmp_path / "profile.json"
+        _profile().save(path)
+
+        with patch("src.utils.encoder_profile.ffmpeg_version", return_value="ffmpeg version test"):
+            first = load_encoder_profile(path)
+            assert load_encoder_profile(path) is first
+
+            data = json.loads(path.read_text(encoding="utf-8"))
+            data["choices"]["1080x1920"]["preset"] = "superfast"
+            path.write_text(json.dumps(data), encoding="utf-8")
+            os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+
+            assert load_encoder_profile(path).choice_for(1080, 1920).preset == "superfast"
+
+    def test_writer_encoders_come_from_profile(self):
+        with patch("src.utils.encoder_profile.available_encoders") as probe:
+            assert writer_encoders(_profile()) == ["libx264", "h264_nvenc"]
+        probe.assert_not_called()
+
+
+class TestPickFastest:
+    REFERENCE = {"preset": "fast", "fps": 100.0, "kbps": 2000.0, "ssim": 0.95}
+
+    def test_fastest_within_targets(self):
+        candidates = [
+            self.REFERENCE,
+            {"preset": "veryfast", "fps": 180.0, "kbps": 2400.0, "ssim": 0.945},
+            {"preset": "ultrafast", "fps": 300.0, "kbps": 6000.0, "ssim": 0.95},
+            {"preset": "superfast", "fps": 250.0, "kbps": 2500.0, "ssim": 0.92},
+        ]
+
+        best = _pick_fastest(candidates, self.REFERENCE, max_ssim_drop=0.01, max_bitrate_ratio=1.5)
+
+        # ultrafast pasa el límite de bitrate, superfast pierde demasiada calidad
+        assert best["preset"] == "veryfast"
+
+    def test_falls_back_to_reference(self):
+        candidates = [{"preset": "ultrafast", "fps": 300.0, "kbps": 9000.0, "ssim": 0.95}]
+
+        best = _pick_fastest(candidates, self.REFERENCE, max_ssim_drop=0.01, max_bitrate_ratio=1.5)
+
+        assert best is self.REFERENCE
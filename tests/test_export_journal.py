@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/export_journal.py
+
+Verifica que el journal dé por terminado un clip solo con la misma clave y el
+mismo archivo, que sobreviva a recargarse y la verificación de duración.
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.export_journal import ExportJournal, get_export_journal_path, verify_clip_duration
+
+
+def _clip(tmp_path, name="1.mp4", content=b"render") -> Path:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+class TestExportJournal:
+    def test_recorded_clip_is_complete_after_reload(self, tmp_path):
+        clip = _clip(tmp_path)
+        journal_path = get_export_journal_path(tmp_path, "talk")
+        ExportJournal(journal_path).record(clip, clip_id=1, render_key="k1", duration=5.0)
+
+        reloaded = ExportJournal(journal_path)
+        assert journal_path.name == ".talk.export_journal.json"
+        assert reloaded.is_complete(clip, "k1")
+        assert not reloaded.is_complete(clip, "k2")
+        assert not reloaded.is_complete(tmp_path / "2.mp4", "k1")
+
+    def test_rewritten_or_missing_file_is_not_complete(self, tmp_path):
+        clip = _clip(tmp_path)
+        journal = ExportJournal(tmp_path / "journal.json")
+        journal.record(clip, clip_id=1, render_key="k1", duration=5.0)
+
+        stat = clip.stat()
+        os.utime(clip, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert not journal.is_complete(clip, "k1")
+
+        clip.unlink()
+        assert not journal.is_complete(clip, "k1")
+
+    def test_unreadable_journal_starts_empty(self, tmp_path):
+        clip = _clip(tmp_path)
+        journal_path = tmp_path / "journal.json"
+        journal_path.write_text("{not json")
+
+        journal = ExportJournal(journal_path)
+        assert not journal.is_complete(clip, "k1")
+        journal.record(clip, clip_id=1, render_key="k1", duration=5.0)
+        assert ExportJournal(journal_path).is_complete(clip, "k1")
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestVerifyClipDuration:
+    def test_within_tolerance(self, tmp_path):
+        clip = _clip(tmp_path)
+        with patch("src.utils.export_journal.probe_media", return_value=MagicMock(duration=5.02)):
+            assert verify_clip_duration(clip, 5.0) == 5.02
+
+    def test_mismatch_or_unprobeable(self, tmp_path):
+        clip = _clip(tmp_path)
+        with patch("src.utils.export_journal.probe_media", return_value=MagicMock(duration=2.0)):
+            assert verify_clip_duration(clip, 5.0) is None
+        with patch("src.utils.export_journal.probe_media", return_value=None):
+            assert verify_clip_duration(clip, 5.0) is None
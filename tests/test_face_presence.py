@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/face_presence.py
+
+Verifica la serialización de la cobertura, que se invalide si cambia la fuente,
+el comando de muestreo (solo keyframes, escalado en ffmpeg) y el conteo de muestras
+con rostro. numpy/mediapipe se reemplazan por mocks.
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils import face_presence
+from src.utils.face_presence import FaceCoverage, _probe_frame_size, probe_face_coverage, sample_probe_frames
+
+
+def _source(tmp_path) -> Path:
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"source" * 100)
+    return path
+
+
+def _coverage_for(path: Path, frames_with_face: int = 9) -> FaceCoverage:
+    stat = path.stat()
+    return FaceCoverage(
+        source_size=stat.st_size, source_mtime=stat.st_mtime, samples=36, frames_with_face=frames_with_face
+    )
+
+
+class TestFaceCoverage:
+    def test_round_trip(self, tmp_path):
+        coverage = _coverage_for(_source(tmp_path))
+        assert FaceCoverage.from_dict(coverage.to_dict()) == coverage
+        assert coverage.coverage == 0.25
+        assert coverage.summary() == "faces in 9/36 sampled frames (25%)"
+
+    def test_other_version_or_garbage_is_ignored(self, tmp_path):
+        data = _coverage_for(_source(tmp_path)).to_dict()
+        assert FaceCoverage.from_dict({**data, "version": 0}) is None
+        assert FaceCoverage.from_dict({"version": data["version"]}) is None
+        assert FaceCoverage.from_dict(None) is None
+
+    def test_changed_source_does_not_match(self, tmp_path):
+        path = _source(tmp_path)
+        coverage = _coverage_for(path)
+        assert coverage.matches_source(str(path))
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert not coverage.matches_source(str(path))
+        assert not coverage.matches_source(str(tmp_path / "missing.mp4"))
+
+
+class TestSampleProbeFrames:
+    def test_probe_size_keeps_aspect_with_even_height(self):
+        assert _probe_frame_size(1920, 1080) == (320, 180)
+        assert _probe_frame_size(1080, 1920) == (320, 568)
+
+    def test_keyframes_are_scaled_in_ffmpeg(self, tmp_path):
+        path = _source(tmp_path)
+        info = MagicMock(duration=72.0, width=1920, height=1080, display_size=(1920, 1080))
+        fake_np = MagicMock()
+        fake_np.fromfile.return_value.size = 320 * 180 * 3 * 2
+        with patch.object(face_presence, "np", fake_np), \
+             patch("src.utils.face_presence.probe_media", return_value=info), \
+             patch("src.utils.face_presence.run_ffmpeg", return_value=MagicMock(returncode=0)) as mock_run:
+            frames = sample_probe_frames(str(path), samples=36)
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-skip_frame") + 1] == "nokey"
+        assert cmd.index("-skip_frame") < cmd.index("-i")
+        assert cmd[cmd.index("-vf") + 1] == "fps=0.500000,scale=320:180"
+        assert cmd[cmd.index("-frames:v") + 1] == "36"
+        assert cmd[cmd.index("-pix_fmt") + 1] == "rgb24"
+        fake_np.fromfile.return_value.__getitem__.return_value.reshape.assert_called_once_with(2, 180, 320, 3)
+        assert frames is not None
+        # El archivo temporal se borra
+        assert not Path(cmd[-1]).exists()
+
+    def test_failed_ffmpeg_returns_none(self, tmp_path):
+        path = _source(tmp_path)
+        info = MagicMock(duration=72.0, width=1920, height=1080, display_size=(1920, 1080))
+        with patch.object(face_presence, "np", MagicMock()), \
+             patch("src.utils.face_presence.probe_media", return_value=info), \
+             patch("src.utils.face_presence.run_ffmpeg", return_value=MagicMock(returncode=1, stderr="boom")):
+            assert sample_probe_frames(str(path)) is None
+
+
+class TestProbeFaceCoverage:
+    def test_counts_samples_with_a_face(self, tmp_path):
+        path = _source(tmp_path)
+        fake_mp = MagicMock()
+        detector = fake_mp.solutions.face_detection.FaceDetection.return_value.__enter__.return_value
+        detector.process.side_effect = [
+            MagicMock(detections=[object()]),
+            MagicMock(detections=None),
+            MagicMock(detections=[]),
+            MagicMock(detections=[object(), object()]),
+        ]
+        with patch.object(face_presence, "np", MagicMock()), \
+             patch.object(face_presence, "mp", fake_mp), \
+             patch("src.utils.face_presence.sample_probe_frames", return_value=["f1", "f2", "f3", "f4"]):
+            coverage = probe_face_coverage(str(path))
+
+        assert coverage.samples == 4
+        assert coverage.frames_with_face == 2
+        assert coverage.matches_source(str(path))
+
+    def test_missing_dependencies_return_none(self, tmp_path):
+        with patch.object(face_presence, "mp", None):
+            assert probe_face_coverage(str(_source(tmp_path))) is None
+
+    def test_unreadable_video_returns_none(self, tmp_path):
+        with patch.object(face_presence, "np", MagicMock()), \
+             patch.object(face_presence, "mp", MagicMock()), \
+             patch("src.utils.face_presence.sample_probe_frames", return_value=None):
+            assert probe_face_coverage(str(_source(tmp_path))) is None
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/face_track.py
+
+Verifica las filas del cache de rostros (desconocido / sin rostro / rostro), qué
+frames faltan, y que el archivo mapeado en memoria se reutilice entre exports y se
+descarte si cambia la fuente o el detector. Los tests de disco necesitan numpy.
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils import face_track as face_track_module
+from src.utils.face_track import FaceTrack, get_face_track_paths, open_face_track
+
+
+class _Rows:
+    """Sustituto mínimo del array (frames, 5) de numpy"""
+
+    def __init__(self, frames: int):
+        self.data = [[0] * 5 for _ in range(frames)]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            frame, column = key
+            return self.data[frame][column]
+        return self.data[key]
+
+    def __setitem__(self, frame, values):
+        self.data[frame] = list(values)
+
+
+def _track(frames: int = 30) -> FaceTrack:
+    return FaceTrack(
+        _Rows(frames), fps=30.0, width=1920, height=1080, min_detection_confidence=0.5, detection_width=320
+    )
+
+
+def _media(**overrides):
+    values = dict(fps=30.0, is_cfr=True, display_size=(1920, 1080), frame_count=90, duration=3.0)
+    values.update(overrides)
+    return MagicMock(**values)
+
+
+class TestFaceTrack:
+    def test_rows_start_unknown(self):
+        track = _track()
+        assert not track.is_known(0)
+        assert track.face(0) is None
+        assert track.missing(range(0, 12, 3)) == [0, 3, 6, 9]
+
+    def test_store_faces_and_absences(self):
+        track = _track()
+        track.store({3: {'x': 100, 'y': 50, 'width': 40, 'height': 60}, 6: None})
+
+        assert track.is_known(3) and track.is_known(6)
+        assert track.face(3) == {
+            'x': 100, 'y': 50, 'width': 40, 'height': 60, 'center_x': 120, 'center_y': 80,
+        }
+        assert track.face(6) is None
+        assert track.missing(range(0, 12, 3)) == [0, 9]
+        assert track.timestamp(45) == 1.5
+
+    def test_frames_outside_the_video_are_never_missing_or_stored(self):
+        track = _track(frames=10)
+        track.store({12: None, -1: None})
+        assert track.missing([8, 9, 10, 11]) == [8, 9]
+        assert not track.is_known(12)
+
+    def test_matches_detector(self):
+        track = _track()
+        assert track.matches_detector(0.5, 320)
+        assert not track.matches_detector(0.7, 320)
+        assert not track.matches_detector(0.5, 480)
+
+
+class TestOpenFaceTrack:
+    def test_paths_live_next_to_the_transcript(self, tmp_path):
+        data_path, meta_path = get_face_track_paths(str(tmp_path / "video_transcript.json"))
+        assert data_path == tmp_path / "video_transcript_faces.npy"
+        assert meta_path == tmp_path / "video_transcript_faces.json"
+
+    def test_variable_frame_rate_has_no_track(self, tmp_path):
+        with patch.object(face_track_module, "np", MagicMock()), \
+             patch("src.utils.face_track.probe_media", return_value=_media(is_cfr=False)):
+            assert open_face_track(str(tmp_path / "video.mp4")) is None
+
+    def test_missing_numpy_has_no_track(self, tmp_path):
+        with patch.object(face_track_module, "np", None):
+            assert open_face_track(str(tmp_path / "video.mp4")) is None
+
+    def test_persisted_rows_are_reused_until_the_source_changes(self, tmp_path):
+        pytest.importorskip("numpy")
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"source" * 100)
+        transcript = str(tmp_path / "video_transcript.json")
+
+        with patch("src.utils.face_track.probe_media", return_value=_media()):
+            track = open_face_track(str(source), transcript)
+            assert track.frame_count == 90
+            track.store({30: {'x': 10, 'y': 20, 'width': 30, 'height': 40}, 33: None})
+            del track
+
+            # Otro export (otra estrategia, otro clip): mismas filas
+            reopened = open_face_track(str(source), transcript)
+            assert reopened.face(30)['center_x'] == 25
+            assert reopened.is_known(33) and reopened.face(33) is None
+            assert reopened.missing([27, 30, 33]) == [27]
+            del reopened
+
+            # Otro umbral de detección: cache nuevo
+            other = open_face_track(str(source), transcript, min_detection_confidence=0.7)
+            assert other.missing([30, 33]) == [30, 33]
+            del other
+
+            stat = source.stat()
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            changed = open_face_track(str(source), transcript, min_detection_confidence=0.7)
+            assert changed.missing([30, 33]) == [30, 33]
+
+    def test_without_transcript_the_track_stays_in_memory(self, tmp_path):
+        pytest.importorskip("numpy")
+        with patch("src.utils.face_track.probe_media", return_value=_media()):
+            track = open_face_track(str(tmp_path / "video.mp4"))
+        assert track.frame_count == 90
+        assert list(tmp_path.iterdir()) == []
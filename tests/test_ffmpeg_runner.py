@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/ffmpeg_runner.py
+
+Verifica el parseo de bloques -progress, la cola acotada de stderr, los plazos y las
+métricas por invocación. Usa un "ffmpeg" falso (script de Python) para no depender
+del binario real.
+"""
+
+import os
+import stat
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.ffmpeg_runner import (
+    FFmpegProcess,
+    _with_progress_args,
+    parse_progress_block,
+    run_ffmpeg,
+)
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="fake ffmpeg is a shebang script")
+
+
+def _fake_ffmpeg(tmp_path: Path, body: str) -> str:
+    script = tmp_path / "ffmpeg"
+    script.write_text(f"#!{sys.executable}\nimport sys, time\n" + textwrap.dedent(body), encoding="utf-8")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return str(script)
+
+
+class TestParseProgressBlock:
+    def test_parses_encoder_fields(self):
+        progress = parse_progress_block(
+            {
+                "frame": "300",
+                "fps": "61.5",
+                "speed": "2.05x",
+                "out_time": "00:00:10.010000",
+                "total_size": "1048576",
+                "progress": "continue",
+            },
+            label="clip 1",
+        )
+
+        assert progress.label == "clip 1"
+        assert progress.frame == 300
+        assert progress.fps == 61.5
+        assert progress.speed == 2.05
+        assert progress.out_time_seconds == pytest.approx(10.01)
+        assert progress.total_size == 1048576
+        assert progress.finished is False
+        assert progress.summary() == "00:10, 62 fps, 2.05x"
+
+    def test_missing_values_and_end_marker(self):
+        progress = parse_progress_block(
+            {"speed": "N/A", "out_time": "N/A", "out_time_us": "2500000", "progress": "end"}
+        )
+
+        assert progress.speed is None
+        assert progress.out_time_seconds == 2.5
+        assert progress.finished is True
+
+    def test_progress_args_are_inserted_once(self):
+        cmd = _with_progress_args(["ffmpeg", "-i", "in.mp4", "out.mp4"])
+
+        assert cmd[:4] == ["ffmpeg", "-nostats", "-progress", "pipe:1"]
+        assert cmd[-3:] == ["-i", "in.mp4", "out.mp4"]
+        assert _with_progress_args(cmd) == cmd
+
+
+class TestRunFFmpeg:
+    def test_reports_progress_and_resource_usage(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(
+            tmp_path,
+            """
+            assert sys.argv[1:4] == ["-nostats", "-progress", "pipe:1"]
+            for second in (1, 2):
+                print(f"frame={second * 30}\\nfps=60.0\\nspeed=2.0x\\nout_time=00:00:0{second}.000000")
+                print("progress=" + ("end" if second == 2 else "continue"), flush=True)
+            """,
+        )
+        events = []
+
+        result = run_ffmpeg([ffmpeg, "-i", "in.mp4", "out.mp4"], label="clip 7", on_progress=events.append)
+
+        assert result.returncode == 0
+        assert [event.out_time_seconds for event in events] == [1.0, 2.0]
+        assert events[-1].finished is True
+        assert result.last_progress == events[-1]
+        assert result.label == "clip 7"
+        assert result.elapsed_seconds > 0
+        if hasattr(os, "wait4"):
+            assert result.cpu_seconds is not None
+            assert result.peak_rss_mb > 0
+
+    def test_keeps_only_a_bounded_stderr_tail(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(
+            tmp_path,
+            """
+            for i in range(2000):
+                sys.stderr.write(f"frame {i:05d} " + "x" * 90 + "\\n")
+            sys.stderr.write("Conversion failed!\\n")
+            sys.exit(1)
+            """,
+        )
+
+        result = run_ffmpeg([ffmpeg, "out.mp4"], stderr_tail_bytes=4096)
+
+        assert result.returncode == 1
+        assert result.stderr.endswith("Conversion failed!\n")
+        # Cola acotada: como mucho el límite más un bloque de lectura
+        assert len(result.stderr) <= 4096 + 4096
+        assert "frame 00000" not in result.stderr
+
+    def test_stalled_process_is_killed(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(tmp_path, "time.sleep(30)\n")
+
+        result = run_ffmpeg([ffmpeg, "out.mp4"], stall_timeout=1)
+
+        assert result.timed_out is True
+        assert result.returncode != 0
+        assert result.elapsed_seconds < 10
+        assert "timed out" in result.stderr
+
+    def test_missing_binary_returns_failed_result(self, tmp_path):
+        result = run_ffmpeg([str(tmp_path / "no-such-ffmpeg"), "out.mp4"])
+
+        assert result.returncode == -1
+        assert result.stderr
+
+    def test_read_stdout_leaves_output_to_the_caller(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(
+            tmp_path,
+            """
+            assert "-progress" not in sys.argv
+            sys.stdout.buffer.write(b"\\x01" * 12)
+            sys.stdout.flush()
+            """,
+        )
+
+        process = FFmpegProcess([ffmpeg, "pipe:1"], read_stdout=True)
+        data = process.stdout.read(12)
+        result = process.wait()
+
+        assert data == b"\x01" * 12
+        assert result.returncode == 0
+        assert result.last_progress is None
+
+    def test_overall_deadline_kills_a_process_that_keeps_reporting(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(
+            tmp_path,
+            """
+            while True:
+                print("frame=1\\nprogress=continue", flush=True)
+                time.sleep(0.2)
+            """,
+        )
+
+        result = run_ffmpeg([ffmpeg, "out.mp4"], timeout=1, stall_timeout=60)
+
+        assert result.timed_out is True
+        assert result.returncode != 0
+        assert result.elapsed_seconds < 10
+
+    def test_poll_leaves_the_process_for_wait4(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(tmp_path, "sys.exit(3)\n")
+
+        process = FFmpegProcess([ffmpeg, "out.mp4"])
+        while process.poll() is None:
+            time.sleep(0.05)
+        result = process.wait()
+
+        assert result.returncode == 3
+        if hasattr(os, "wait4"):
+            assert result.cpu_seconds is not None
+
+    def test_poll_and_kill_do_not_steal_the_exit_status(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(tmp_path, "sys.exit(3)\n")
+
+        process = FFmpegProcess([ffmpeg, "out.mp4"])
+        while process.poll() is None:
+            time.sleep(0.05)
+        # Terminado pero sin cosechar: kill no señaliza un pid ajeno y wait lee el código real
+        assert process.poll() == 3
+        process.kill()
+        result = process.wait()
+
+        assert result.returncode == 3
+        assert process.poll() == 3
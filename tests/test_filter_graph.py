@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/filter_graph.py
+
+Verifica el armado y los pases de optimización: no-ops, scale/crop consecutivos,
+logo escalado una vez (o scale2ref sin ancho), ubicación de format y la
+serialización a -vf / -filter_complex.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.filter_graph import FilterGraph, filter_output_size, logo_overlay_width, split_filter_chain
+
+
+def _graph(size=(1920, 1080), pix_fmt="yuv420p") -> FilterGraph:
+    graph = FilterGraph()
+    graph.set_input("[0:v]", size=size, pix_fmt=pix_fmt)
+    return graph
+
+
+class TestHelpers:
+    def test_split_respects_quotes_and_escapes(self):
+        chain = "crop=ih*9/16:ih,subtitles='a,b.srt':force_style='Fontsize=20,Outline=1',scale=1080:1920"
+        assert split_filter_chain(chain) == [
+            "crop=ih*9/16:ih",
+            "subtitles='a,b.srt':force_style='Fontsize=20,Outline=1'",
+            "scale=1080:1920",
+        ]
+        assert split_filter_chain(r"drawtext=text=a\,b,null") == [r"drawtext=text=a\,b", "null"]
+
+    @pytest.mark.parametrize(
+        "spec, size, expected",
+        [
+            ("crop=ih*9/16:ih", (1920, 1080), (608, 1080)),
+            ("scale=1080:1920", None, (1080, 1920)),
+            ("scale=1080:-2", (1920, 1080), (1080, 608)),
+            ("scale=w=iw/2:h=ih/2", (1920, 1080), (960, 540)),
+            ("trim=start=1:end=2", (640, 360), (640, 360)),
+            ("sendcmd=c='0.500 crop@reframe x 10'", (640, 360), (640, 360)),
+            ("crop@reframe=608:1080:656:0", (1920, 1080), (608, 1080)),
+            ("scale=iw/2:-1", None, None),
+            ("hflip", (640, 360), None),
+        ],
+    )
+    def test_filter_output_size(self, spec, size, expected):
+        assert filter_output_size(spec, size) == expected
+
+    @pytest.mark.parametrize(
+        "spec, size, pix_fmt, expected",
+        [
+            # Como ffmpeg: redondeo al más cercano (mitades al par) y grilla de croma
+            ("crop=ih*9/16:ih", (1080, 1920), None, (1080, 1920)),
+            ("crop=ih*9/16:ih*0.999", (1920, 1080), "yuv420p", (608, 1078)),
+            ("crop=607.4:1079.5", (1920, 1080), "yuv420p", (606, 1080)),
+            ("crop=607.4:1079.5", (1920, 1080), "yuv444p", (607, 1080)),
+            ("crop=607.6:1078.5", (1920, 1080), "yuv444p", (608, 1078)),
+            ("crop=607.6:1078.6", (1920, 1080), "yuv422p", (608, 1079)),
+            ("crop=607:1079:exact=1", (1920, 1080), "yuv420p", (607, 1079)),
+        ],
+    )
+    def test_crop_size_follows_ffmpeg_rounding(self, spec, size, pix_fmt, expected):
+        assert filter_output_size(spec, size, pix_fmt) == expected
+
+    @pytest.mark.parametrize(
+        "spec",
+        ["crop=iw**2:ih", "crop=(1).real:ih", "crop=iw/0:ih", "crop=ow:ih", "crop=iw(1):ih"],
+    )
+    def test_only_plain_arithmetic_is_evaluated(self, spec):
+        assert filter_output_size(spec, (1920, 1080)) is None
+
+    def test_format_changes_the_crop_grid(self):
+        graph = _graph(pix_fmt="yuv420p")
+        out = graph.chain("[0:v]", "format=yuv444p,crop=607:1079,crop=607:1079", "[v]")
+        assert graph.filter_args(out) == ["-vf", "format=yuv444p,crop=607:1079", "-map", "0:v"]
+
+    def test_logo_width_never_below_two(self):
+        assert logo_overlay_width(1080, 0.1) == 108
+        assert logo_overlay_width(10, 0.01) == 2
+
+
+class TestSimplify:
+    def test_noop_scale_and_null_are_dropped(self):
+        graph = _graph()
+        out = graph.chain("[0:v]", ["null", "scale=1920:1080"], "[v]")
+        assert graph.filter_args(out) == ["-map", "0:v"]
+
+    def test_consecutive_scales_are_merged(self):
+        graph = _graph()
+        out = graph.chain("[0:v]", "scale=1280:720,scale=640:360", "[v]")
+        assert graph.filter_args(out) == ["-vf", "scale=640:360", "-map", "0:v"]
+
+    def test_consecutive_crops_become_one_centered_crop(self):
+        graph = _graph()
+        out = graph.chain("[0:v]", "crop=1600:900,crop=800:800", "[v]")
+        assert graph.filter_args(out) == ["-vf", "crop=800:800", "-map", "0:v"]
+
+    def test_unknown_size_keeps_graph_as_built(self):
+        graph = _graph(size=None)
+        out = graph.chain("[0:v]", "scale=1920:1080", "[v]")
+        assert graph.filter_args(out) == ["-vf", "scale=1920:1080", "-map", "0:v"]
+
+
+class TestLogoOverlay:
+    def test_known_width_prescales_once(self):
+        graph = _graph()
+        out = graph.overlay_logo("[0:v]", "[1:v]", scale=0.1, position="bottom-left", output="[v]")
+        args = graph.filter_args(out)
+        assert args == [
+            "-filter_complex",
+            "[1:v]scale=192:-1[logo0];[0:v][logo0]overlay=20:H-h-20[v]",
+            "-map",
+            "[v]",
+        ]
+
+    def test_same_width_is_shared_with_split(self):
+        graph = _graph()
+        branches = graph.split("[0:v]", ["[a]", "[b]"])
+        outs = [graph.overlay_logo(b, "[1:v]", scale=0.1) for b in branches]
+        filter_complex, maps = graph.build(outs)
+        assert "[1:v]scale=192:-1,split=2[logo0][logo1]" in filter_complex
+        assert filter_complex.count("scale=") == 1
+        assert maps == outs
+
+    def test_unknown_width_falls_back_to_scale2ref(self):
+        graph = _graph(size=None)
+        out = graph.overlay_logo("[0:v]", "[1:v]", scale=0.2, output="[v]")
+        filter_complex = graph.filter_args(out)[1]
+        assert filter_complex == (
+            "[1:v][0:v]scale2ref=w=main_w*0.2:h=-1[logo_scaled0][video_for_overlay0];"
+            "[video_for_overlay0][logo_scaled0]overlay=W-w-20:20[v]"
+        )
+
+
+class TestFormatPlacement:
+    def test_format_goes_after_the_smallest_scale(self):
+        graph = _graph(pix_fmt="yuv420p10le")
+        base = graph.chain("[0:v]", "crop=ih*9/16:ih,scale=1080:1920")
+        out = graph.chain(base, "subtitles='c.srt'", "[v]")
+        assert graph.filter_args(out, pix_fmt="yuv420p") == [
+            "-vf",
+            "crop=ih*9/16:ih,scale=1080:1920,format=yuv420p,subtitles='c.srt'",
+            "-map",
+            "0:v",
+        ]
+
+    def test_no_conversion_when_source_already_matches(self):
+        graph = _graph(pix_fmt="yuv420p")
+        out = graph.chain("[0:v]", "scale=1280:720", "[v]")
+        assert graph.filter_args(out, pix_fmt="yuv420p") == ["-vf", "scale=1280:720", "-map", "0:v"]
+
+    def test_existing_format_is_kept(self):
+        graph = _graph(pix_fmt="yuv444p")
+        out = graph.chain("[0:v]", "format=yuv420p,scale=1280:720", "[v]")
+        assert graph.filter_args(out, pix_fmt="yuv420p")[1] == "format=yuv420p,scale=1280:720"
+
+
+class TestSerialization:
+    def test_linear_chains_are_fused(self):
+        graph = _graph()
+        first = graph.chain("[0:v]", "scale=1280:720")
+        out = graph.chain(first, "subtitles='c.srt'", "[v]")
+        assert graph.filter_args(out) == ["-vf", "scale=1280:720,subtitles='c.srt'", "-map", "0:v"]
+
+    def test_outputs_are_never_fused_away(self):
+        graph = _graph()
+        base = graph.chain("[0:v]", "scale=1280:720")
+        tap, rest = graph.split(base, ["[tap]", "[rest]"])
+        out = graph.chain(rest, "subtitles='c.srt'", "[v]")
+        filter_complex, maps = graph.build([tap, out])
+        assert filter_complex == "[0:v]scale=1280:720,split=2[tap][rest];[rest]subtitles='c.srt'[v]"
+        assert maps == ["[tap]", "[v]"]
+
+    def test_untouched_input_maps_directly(self):
+        graph = _graph()
+        out = graph.chain("[0:v]", None, "[v]")
+        filter_complex, maps = graph.build([out])
+        assert filter_complex == ""
+        assert maps == ["0:v"]
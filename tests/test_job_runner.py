@@ -14,6 +14,7 @@ Tests cover:
 
 from __future__ import annotations
 
+import sys
 from pathlib import Path
 from typing import Any, Dict, List
 from unittest.mock import MagicMock, patch
@@ -166,6 +167,45 @@ class TestRunJobEventEmission:
         # Second progress event should have current=1 (after step)
         assert progress_events[1].current == 1
 
+    def test_step_progress_keeps_job_counters(self, job_runner, tmp_project_dir):
+        """Sub-step progress (e.g. clips exported) reuses the job counters and extends the label."""
+        runner, events, sm = job_runner
+
+        def fake_export(**kwargs):
+            runner._emit_step_progress(job_id=kwargs["job_id"], video_id=kwargs["video_id"], detail="clip 1/2")
+
+        with patch.object(runner, "_step_export_clips", side_effect=fake_export):
+            job = JobSpec(
+                job_id="test-sub-progress",
+                video_ids=["vid1"],
+                steps=[JobStep.EXPORT_CLIPS],
+                settings={},
+            )
+            runner.run_job(job)
+
+        progress_events = [e for e in events if isinstance(e, ProgressEvent)]
+        sub_events = [e for e in progress_events if e.label.endswith("clip 1/2")]
+        assert len(sub_events) == 1
+        assert sub_events[0].current == 0
+        assert sub_events[0].total == 1
+        assert sub_events[0].label.startswith("export_clips (vid1)")
+
+    def test_ffmpeg_progress_is_throttled_per_invocation(self, job_runner):
+        """ffmpeg progress blocks become at most one ProgressEvent per second per invocation (plus the end)."""
+        from src.utils.ffmpeg_runner import FFmpegProgress
+
+        runner, events, sm = job_runner
+        on_progress = runner._ffmpeg_progress_emitter(job_id="job", video_id="vid1")
+
+        with patch("src.core.job_runner.time.monotonic", return_value=100.0):
+            on_progress(FFmpegProgress(label="clip 1", out_time_seconds=1.0, speed=2.0))
+            on_progress(FFmpegProgress(label="clip 1", out_time_seconds=2.0, speed=2.0))
+            on_progress(FFmpegProgress(label="clip 2", out_time_seconds=1.0))
+            on_progress(FFmpegProgress(label="clip 1", out_time_seconds=3.0, finished=True))
+
+        labels = [e.label for e in events if isinstance(e, ProgressEvent)]
+        assert labels == ["clip 1: 00:01, 2.00x", "clip 2: 00:01", "clip 1: 00:03"]
+
     def test_run_job_failure_emits_error_events(self, job_runner, tmp_project_dir):
         """run_job emits LogEvent and JobStatusEvent with FAILED on exception."""
         runner, events, sm = job_runner
@@ -280,6 +320,33 @@ class TestRunStepRouting:
         assert call_kwargs["job_id"] == "job1"
         assert call_kwargs["video_id"] == "vid1"
 
+    @pytest.mark.parametrize(
+        "step, expected_kwargs",
+        [
+            (JobStep.EXPORT_DRAFTS, {"draft": True}),
+            (JobStep.FINALIZE_CLIPS, {"approved_only": True}),
+        ],
+    )
+    def test_run_step_routes_drafts_and_finalize(self, job_runner, tmp_project_dir, step, expected_kwargs):
+        """EXPORT_DRAFTS y FINALIZE_CLIPS reutilizan _step_export_clips con su modo."""
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+
+        with patch.object(runner, "_step_export_clips") as mock_export:
+            runner._run_step(
+                job_id="job1",
+                video_id="vid1",
+                step=step,
+                settings={},
+                run_output_dir=run_output_dir,
+            )
+
+        mock_export.assert_called_once()
+        call_kwargs = mock_export.call_args[1]
+        for key, value in expected_kwargs.items():
+            assert call_kwargs[key] == value
+
     def test_run_step_raises_for_download(self, job_runner, tmp_project_dir):
         """_run_step raises ValueError for JobStep.DOWNLOAD."""
         runner, events, sm = job_runner
@@ -355,6 +422,68 @@ class TestStepSkipBehavior:
         skip_logs = [e for e in log_events if "skipping" in e.message.lower() or "already" in e.message.lower()]
         assert len(skip_logs) >= 1
 
+    def test_generate_clips_skips_when_params_unchanged(self, job_runner, tmp_project_dir):
+        """_step_generate_clips skips when recorded clips_params match the settings."""
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+
+        sm.get_video_state.return_value = {
+            "transcript_path": "/some/path/transcript.json",
+            "clips_generated": True,
+            "clips_params": {
+                "min_clip_duration": 30,
+                "max_clip_duration": 90,
+                "min_clips": 3,
+                "max_clips": 10,
+            },
+        }
+
+        fake_module = MagicMock()
+        with patch.dict(sys.modules, {"src.clips_generator": fake_module}):
+            runner._step_generate_clips(
+                job_id="job1",
+                video_id="vid1",
+                settings={"skip_done": True},
+                run_output_dir=run_output_dir,
+            )
+
+        fake_module.ClipsGenerator.assert_not_called()
+
+    def test_generate_clips_reruns_when_params_changed(self, job_runner, tmp_project_dir):
+        """_step_generate_clips re-segments and records params when they changed."""
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+
+        sm.get_video_state.return_value = {
+            "transcript_path": "/some/path/transcript.json",
+            "clips_generated": True,
+            "clips_params": {
+                "min_clip_duration": 30,
+                "max_clip_duration": 90,
+                "min_clips": 3,
+                "max_clips": 10,
+            },
+        }
+
+        fake_module = MagicMock()
+        generator = fake_module.ClipsGenerator.return_value
+        generator.generate_clips.return_value = [{"clip_id": 1, "start_time": 0.0, "end_time": 40.0}]
+        generator.save_clips_metadata.return_value = "/some/path/clips.json"
+
+        with patch.dict(sys.modules, {"src.clips_generator": fake_module}):
+            runner._step_generate_clips(
+                job_id="job1",
+                video_id="vid1",
+                settings={"skip_done": True, "max_seconds": 60},
+                run_output_dir=run_output_dir,
+            )
+
+        fake_module.ClipsGenerator.assert_called_once_with(min_clip_duration=30, max_clip_duration=60)
+        _, kwargs = sm.mark_clips_generated.call_args
+        assert kwargs["clips_params"]["max_clip_duration"] == 60
+
     def test_export_clips_skips_when_already_done(self, job_runner, tmp_project_dir):
         """_step_export_clips skips when clips_exported is True."""
         runner, events, sm = job_runner
@@ -679,3 +808,95 @@ class TestErrorHandling:
                 settings={},
                 run_output_dir=run_output_dir,
             )
+
+    def test_finalize_without_approved_clips_raises_runtime_error(self, job_runner, tmp_project_dir):
+        """FINALIZE_CLIPS falla si la revisión no aprobó ningún clip."""
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+
+        sm.get_video_state.return_value = {"clips": [{"clip_id": 1, "start_time": 0, "end_time": 10}]}
+        sm.get_approved_clip_ids.return_value = []
+
+        with pytest.raises(RuntimeError, match="No approved clips"):
+            runner._step_export_clips(
+                job_id="job1",
+                video_id="vid1",
+                settings={},
+                run_output_dir=run_output_dir,
+                approved_only=True,
+            )
+
+
+class TestDraftReview:
+    """Borradores en baja resolución y render final solo de los aprobados."""
+
+    def _clips(self) -> List[Dict[str, Any]]:
+        return [{"clip_id": i, "start_time": i * 10.0, "end_time": i * 10.0 + 8.0, "text": "x"} for i in (1, 2, 3)]
+
+    def test_drafts_export_all_clips_to_drafts_dir(self, job_runner, tmp_project_dir):
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+        sm.get_video_state.return_value = {"clips": self._clips(), "clips_exported": True}
+        sm.state_file = Path(tmp_project_dir) / "temp" / "project_state.json"
+
+        with patch("src.video_exporter.VideoExporter") as mock_exporter_cls:
+            mock_exporter_cls.return_value.export_clips.return_value = []
+            runner._step_export_clips(
+                job_id="job1",
+                video_id="vid1",
+                settings={"skip_done": True},
+                run_output_dir=run_output_dir,
+                draft=True,
+            )
+
+        _, init_kwargs = mock_exporter_cls.call_args
+        assert init_kwargs["draft"] is True
+        assert Path(init_kwargs["output_dir"]).name == "drafts"
+        exported_clips = mock_exporter_cls.return_value.export_clips.call_args[1]["clips"]
+        assert [c["clip_id"] for c in exported_clips] == [1, 2, 3]
+        sm.mark_drafts_exported.assert_called_once()
+        sm.mark_clips_exported.assert_not_called()
+
+    def test_finalize_exports_only_approved_clips(self, job_runner, tmp_project_dir):
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+        sm.get_video_state.return_value = {"clips": self._clips()}
+        sm.get_approved_clip_ids.return_value = [3, 1]
+        sm.state_file = Path(tmp_project_dir) / "temp" / "project_state.json"
+
+        with patch("src.video_exporter.VideoExporter") as mock_exporter_cls:
+            mock_exporter_cls.return_value.export_clips.return_value = []
+            runner._step_export_clips(
+                job_id="job1",
+                video_id="vid1",
+                settings={},
+                run_output_dir=run_output_dir,
+                approved_only=True,
+            )
+
+        assert mock_exporter_cls.call_args[1]["draft"] is False
+        exported_clips = mock_exporter_cls.return_value.export_clips.call_args[1]["clips"]
+        assert [c["clip_id"] for c in exported_clips] == [1, 3]
+        sm.mark_clips_exported.assert_called_once()
+
+    def test_jump_cut_setting_falls_back_to_app_settings(self, job_runner, tmp_project_dir):
+        runner, events, sm = job_runner
+        run_output_dir = Path(tmp_project_dir) / "output" / ".cache" / "test"
+        run_output_dir.mkdir(parents=True, exist_ok=True)
+        sm.get_video_state.return_value = {"clips": self._clips()}
+        sm.load_settings.return_value = {"_wizard_completed": True, "jump_cut_max_silence_ms": 400}
+        sm.state_file = Path(tmp_project_dir) / "temp" / "project_state.json"
+
+        with patch("src.video_exporter.VideoExporter") as mock_exporter_cls:
+            mock_exporter_cls.return_value.export_clips.return_value = []
+            runner._step_export_clips(job_id="job1", video_id="vid1", settings={}, run_output_dir=run_output_dir)
+            assert mock_exporter_cls.return_value.export_clips.call_args[1]["jump_cut_max_silence_ms"] == 400
+
+            # El valor del job manda sobre el de la app
+            runner._step_export_clips(
+                job_id="job1", video_id="vid1", settings={"jump_cut_max_silence_ms": "0"}, run_output_dir=run_output_dir
+            )
+            assert mock_exporter_cls.return_value.export_clips.call_args[1]["jump_cut_max_silence_ms"] == 0
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/jump_cut.py
+
+Verifica los tramos que conservo a partir de los huecos entre palabras, el recorte
+con la envolvente de loudness, el remapeo de tiempos y los filtros select/aselect.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.jump_cut import JumpCut, JumpCutPlan, load_jump_cut, merge_word_spans
+from src.utils.loudness import LoudnessAnalysis
+
+
+def _words(*spans):
+    return [{"word": f"w{i}", "start": start, "end": end} for i, (start, end) in enumerate(spans)]
+
+
+def _analysis(loud_spans, seconds=20.0):
+    """Bloques de 100 ms: -20 LUFS dentro de loud_spans (fin del bloque), silencio digital fuera"""
+    block_ends = [round((i + 1) * 0.1, 1) for i in range(int(seconds * 10))]
+    momentary = [
+        -20.0 if any(start < t <= end + 0.4 for start, end in loud_spans) else None
+        for t in block_ends
+    ]
+    return LoudnessAnalysis(
+        source_size=1,
+        source_mtime=0.0,
+        block_ends=block_ends,
+        momentary=momentary,
+        short_term=momentary,
+        true_peaks=[-12.0 if m is not None else None for m in momentary],
+    )
+
+
+class TestMergeWordSpans:
+    def test_overlapping_and_duplicated_words_are_merged(self):
+        words = _words((2.0, 2.5), (0.0, 0.5), (0.4, 1.0), (2.0, 2.5))
+        words.append({"word": "untimed"})
+        assert merge_word_spans(words) == ((0.0, 1.0), (2.0, 2.5))
+
+
+class TestPlanFor:
+    def test_long_gaps_are_shortened_to_max_silence(self):
+        jump_cut = JumpCut(speech=merge_word_spans(_words((10.0, 11.0), (13.0, 14.0), (14.2, 15.0))), max_silence=0.4)
+        plan = jump_cut.plan_for(10.0, 15.5)
+
+        # El hueco de 2 s queda en 0.4 s (0.2 después de la palabra, 0.2 antes de la siguiente)
+        assert plan.keep == ((0.0, 1.2), (2.8, 5.5))
+        assert plan.window == 5.5
+        assert round(plan.duration, 3) == 3.9
+        assert round(plan.removed, 3) == 1.6
+
+    def test_no_plan_without_cuttable_gaps(self):
+        jump_cut = JumpCut(speech=merge_word_spans(_words((0.0, 1.0), (1.45, 2.0), (5.0, 6.0))), max_silence=0.4)
+        # Huecos de 0.45 s: más cortos que el máximo + el corte mínimo
+        assert jump_cut.plan_for(0.0, 2.5) is None
+        # Una sola palabra en la ventana: solo habría bordes, que no corto
+        assert jump_cut.plan_for(4.0, 7.0) is None
+
+    def test_loudness_envelope_keeps_non_silent_part_of_gap(self):
+        # Entre 1.0 y 4.0 no hay palabras, pero hay audio (risas) hasta 2.5
+        analysis = _analysis([(0.0, 1.0), (1.0, 2.5), (4.0, 5.0)])
+        speech = merge_word_spans(_words((0.0, 1.0), (4.0, 5.0)))
+
+        without_envelope = JumpCut(speech=speech, max_silence=0.4).plan_for(0.0, 5.0)
+        with_envelope = JumpCut(speech=speech, max_silence=0.4, analysis=analysis).plan_for(0.0, 5.0)
+
+        assert without_envelope.keep == ((0.0, 1.2), (3.8, 5.0))
+        # Solo corto lo silencioso: desde que termina el audio del hueco
+        assert with_envelope.keep[0][1] > 2.5
+        assert with_envelope.keep[1][0] == 3.8
+
+    def test_loud_gap_is_not_cut(self):
+        analysis = _analysis([(0.0, 5.0)])
+        jump_cut = JumpCut(speech=merge_word_spans(_words((0.0, 1.0), (4.0, 5.0))), max_silence=0.4, analysis=analysis)
+        assert jump_cut.plan_for(0.0, 5.0) is None
+
+
+class TestJumpCutPlan:
+    def _plan(self):
+        return JumpCutPlan(keep=((0.0, 1.5), (3.0, 5.2), (7.4, 10.0)), window=10.0)
+
+    def test_remap(self):
+        plan = self._plan()
+        assert plan.remap(1.0) == 1.0
+        # Dentro de un corte cae en el punto del corte
+        assert plan.remap(2.0) == 1.5
+        assert round(plan.remap(4.0), 3) == 2.5
+        assert round(plan.remap(10.0), 3) == 6.3
+
+    def test_filters(self):
+        plan = self._plan()
+        select = "gte(t,0.000)*lt(t,1.500)+gte(t,3.000)*lt(t,5.200)+gte(t,7.400)"
+        pts = "(T-gte(T,3.000)*1.500-gte(T,7.400)*2.200)/TB"
+        assert plan.video_filter() == f"select='{select}',setpts='{pts}'"
+        assert plan.audio_filter().startswith(f"aselect='{select}',asetpts='{pts}',aresample=async=1")
+
+
+class TestLoadJumpCut:
+    def test_loads_word_timeline(self, tmp_path):
+        transcript = tmp_path / "t.json"
+        transcript.write_text(
+            json.dumps({"segments": [{"start": 0.0, "end": 3.0, "words": _words((0.0, 1.0), (2.5, 3.0))}]})
+        )
+        jump_cut = load_jump_cut(str(transcript), 500)
+        assert jump_cut.speech == ((0.0, 1.0), (2.5, 3.0))
+        assert jump_cut.max_silence == 0.5
+
+    def test_disabled_or_without_words(self, tmp_path):
+        transcript = tmp_path / "t.json"
+        transcript.write_text(json.dumps({"segments": [{"start": 0.0, "end": 3.0, "text": "hola"}]}))
+        assert load_jump_cut(str(transcript), 0) is None
+        assert load_jump_cut(str(transcript), 500) is None
+        assert load_jump_cut(str(tmp_path / "missing.json"), 500) is None
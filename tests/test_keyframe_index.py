@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/keyframe_index.py
+
+Verifica la construcción del índice desde la salida de ffprobe, las consultas
+(keyframes, paquetes por GOP, seek plan) y el cache junto al transcript.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.keyframe_index import (
+    KeyframeIndex,
+    build_keyframe_index,
+    get_keyframe_index_path,
+    load_or_build_keyframe_index,
+)
+
+
+def _ffprobe_output(seconds: int = 6, fps: int = 10, gop: int = 20) -> str:
+    """Paquetes en orden de decodificación (P antes que B) con keyframe cada gop"""
+    lines = []
+    for n in range(seconds * fps):
+        flags = "K__" if n % gop == 0 else "___"
+        lines.append(f"pts_time={n / fps:.6f}|pos={1000 + n * 10}|flags={flags}")
+    # Simulo reordenamiento B-frame: swap de pares que no son keyframes
+    for i in range(1, len(lines) - 1, 2):
+        if "K" not in lines[i] and "K" not in lines[i + 1]:
+            lines[i], lines[i + 1] = lines[i + 1], lines[i]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def source_video(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\x00" * 64)
+    return video
+
+
+@pytest.fixture
+def mock_ffprobe():
+    with patch("src.utils.keyframe_index.subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stdout=_ffprobe_output(), stderr="")
+        yield mock_run
+
+
+class TestBuildKeyframeIndex:
+    def test_keyframes_offsets_and_gop_counts(self, source_video, mock_ffprobe):
+        index = build_keyframe_index(str(source_video))
+
+        assert index.keyframe_times == [0.0, 2.0, 4.0]
+        assert index.keyframe_offsets == [1000, 1200, 1400]
+        assert index.gop_packet_counts == [20, 20, 20]
+        assert index.packet_count == 60
+
+        cmd = mock_ffprobe.call_args[0][0]
+        assert cmd[0] == "ffprobe"
+        assert "packet=pts_time,pos,flags" in cmd
+
+    def test_ffprobe_failure_returns_none(self, source_video, mock_ffprobe):
+        mock_ffprobe.return_value = MagicMock(returncode=1, stdout="", stderr="boom")
+        assert build_keyframe_index(str(source_video)) is None
+
+
+class TestKeyframeIndexQueries:
+    @pytest.fixture
+    def index(self):
+        return KeyframeIndex(
+            source_size=64,
+            source_mtime=0.0,
+            duration=6.0,
+            keyframe_times=[0.0, 2.0, 4.0],
+            keyframe_offsets=[1000, 1200, 1400],
+            gop_packet_counts=[20, 20, 20],
+        )
+
+    def test_keyframes_between(self, index):
+        assert index.keyframes_between(1.0, 4.0) == [2.0, 4.0]
+
+    def test_packets_between_keyframes(self, index):
+        assert index.packets_between_keyframes(0.0, 4.0) == 40
+        assert index.packets_between_keyframes(2.0, 6.0) == 40
+
+    def test_seek_plan_estimates_decode_cost(self, index):
+        plan = index.seek_plan(3.0)
+        assert plan.keyframe_time == 2.0
+        assert plan.keyframe_offset == 1200
+        assert plan.frames_to_decode == 10
+
+    def test_seek_plan_on_keyframe(self, index):
+        plan = index.seek_plan(4.0)
+        assert plan.keyframe_time == 4.0
+        assert plan.frames_to_decode == 0
+
+
+class TestKeyframeIndexCache:
+    def test_index_saved_next_to_transcript(self, tmp_path):
+        transcript = tmp_path / "video_transcript.json"
+        assert get_keyframe_index_path(str(transcript)) == tmp_path / "video_transcript_keyframes.json"
+
+    def test_cache_reused_until_source_changes(self, tmp_path, source_video, mock_ffprobe):
+        transcript = tmp_path / "video_transcript.json"
+        transcript.write_text("{}")
+
+        first = load_or_build_keyframe_index(str(source_video), str(transcript))
+        second = load_or_build_keyframe_index(str(source_video), str(transcript))
+
+        assert first == second
+        assert mock_ffprobe.call_count == 1
+        cached = json.loads(get_keyframe_index_path(str(transcript)).read_text())
+        assert cached["keyframe_times"] == [0.0, 2.0, 4.0]
+
+        # Otro tamaño de archivo → el índice ya no corresponde y se reconstruye
+        source_video.write_bytes(b"\x00" * 128)
+        load_or_build_keyframe_index(str(source_video), str(transcript))
+        assert mock_ffprobe.call_count == 2
+
+    def test_without_transcript_is_not_persisted(self, tmp_path, source_video, mock_ffprobe):
+        index = load_or_build_keyframe_index(str(source_video))
+        assert index is not None
+        assert not list(tmp_path.glob("*_keyframes.json"))
@@ -3,8 +3,9 @@
 """
 Regression test: logo_scale is applied in filter_complex.
 
-Verifica que el filtergraph de overlay del logo incluya un scale2ref relativo
-al ancho del video (main_w * logo_scale).
+Verifica que el overlay del logo escale el logo relativo al ancho del video
+(ancho × logo_scale): con el ancho conocido, un scale fijo hecho una sola vez;
+sin él, scale2ref con main_w * logo_scale.
 """
 
 import sys
@@ -14,22 +15,39 @@ PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 
-def test_logo_scale_applied():
+def _logo_filter_complex(input_size):
     from src.video_exporter import VideoExporter
 
     exporter = VideoExporter.__new__(VideoExporter)  # evita __init__ (ffmpeg check)
-    chains, out = exporter._get_logo_overlay_filter(
-        video_stream="[0:v]",
-        logo_stream="[1:v]",
-        position="top-right",
-        scale=0.25,
+    args = exporter._build_clip_filter_args(
+        video_input_idx=0,
+        logo_input_idx=1,
+        aspect_ratio=None,
+        subtitle_filter=None,
+        logo_position="top-right",
+        logo_scale=0.25,
+        input_size=input_size,
     )
+    return args[args.index("-filter_complex") + 1], args[args.index("-map") + 1]
+
+
+def test_logo_scale_applied():
+    graph, out = _logo_filter_complex((1920, 1080))
+
+    assert "[1:v]scale=480:-1" in graph, "Expected logo pre-scaled to 1920 * 0.25"
+    assert "scale2ref" not in graph
+    assert out == "[v_out]"
+
+
+def test_logo_scale_applied_without_known_width():
+    graph, out = _logo_filter_complex(None)
 
-    assert any("scale2ref" in c for c in chains), "Expected scale2ref in logo filtergraph"
-    assert any("main_w*0.25" in c for c in chains), "Expected logo_scale applied via main_w*scale"
+    assert "scale2ref" in graph, "Expected scale2ref fallback in logo filtergraph"
+    assert "main_w*0.25" in graph, "Expected logo_scale applied via main_w*scale"
     assert out == "[v_out]"
 
 
 if __name__ == "__main__":
     test_logo_scale_applied()
+    test_logo_scale_applied_without_known_width()
     print("✓ PASS: logo_scale is applied in filter_complex filtergraph")
@@ -9,19 +9,25 @@ simultáneamente logo y subtítulos en video_exporter.py
 Contexto del Bug:
 - Antes: FFmpeg preservaba metadatos de subtítulos en el video temporal (Step 1)
 - En Step 2: Se aplicaban AMBOS subtítulos (los metadatos + los nuevos) → duplicación
-- Solución: Agregar -sn en Step 1 para descartar streams de subtítulos
+- Solución original: Agregar -sn en Step 1 para descartar streams de subtítulos
+- Ahora: logo y subtítulos van en un solo filter_complex (un solo encode) con -sn
 
 Test Cases:
 1. Solo logo → debe funcionar
 2. Solo subtítulos → debe funcionar
 3. Logo + subtítulos → debe funcionar SIN duplicación
+4. Logo + subtítulos → un solo encode, sin streams de subtítulos y con la franja
+   de subtítulos idéntica a la de un export solo-subtítulos (detección automática)
+5. Speedup del encode único vs el flujo legacy de dos pasos
 """
 
 import json
 import subprocess
 import sys
+import time
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -136,6 +142,81 @@ def create_test_transcript(output_path: Path):
     return output_path
 
 
+def run_export_recording_ffmpeg(exporter, **export_kwargs):
+    """
+    Ejecuta export_clips registrando cada comando ffmpeg que lanza el exporter
+
+    Returns:
+        (resultado de export_clips, lista de comandos ffmpeg)
+    """
+    from src.utils.ffmpeg_runner import run_ffmpeg
+
+    commands = []
+    real_run = run_ffmpeg
+
+    def recording_run(cmd, *args, **kwargs):
+        commands.append(list(cmd))
+        return real_run(cmd, *args, **kwargs)
+
+    with patch("src.video_exporter.run_ffmpeg", side_effect=recording_run):
+        result = exporter.export_clips(**export_kwargs)
+
+    return result, commands
+
+
+def count_subtitle_streams(video_path: Path) -> int:
+    """Cuenta los streams de subtítulos (soft subs) de un archivo"""
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "s",
+           "-show_entries", "stream=index", "-of", "csv=p=0", str(video_path)]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    return len([line for line in result.stdout.splitlines() if line.strip()])
+
+
+def read_subtitle_band(video_path: Path) -> bytes:
+    """
+    Lee el tercio inferior del primer frame en escala de grises (zona de subtítulos).
+
+    El logo va arriba a la derecha, así que esta franja solo depende del
+    video y de los subtítulos quemados.
+    """
+    cmd = ["ffmpeg", "-v", "error", "-i", str(video_path), "-frames:v", "1",
+           "-vf", "crop=iw:ih/3:0:ih*2/3,format=gray", "-f", "rawvideo", "-"]
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to read frame: {result.stderr.decode(errors='replace')}")
+    return result.stdout
+
+
+def mean_abs_diff(a: bytes, b: bytes) -> float:
+    """Diferencia media absoluta entre dos buffers de píxeles del mismo tamaño"""
+    if len(a) != len(b) or not a:
+        return float("inf")
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def build_legacy_two_step_commands(video: Path, logo: Path, srt: Path, step1: Path, output: Path,
+                                   aspect_filter: str, subtitle_filter: str):
+    """
+    Reconstruye el flujo legacy (logo en Step 1, subtítulos re-encodeando en Step 2)
+    para medir contra el encode único. Mismo filtergraph que usaba video_exporter.py.
+    """
+    step1_cmd = [
+        "ffmpeg", "-i", str(video), "-i", str(logo),
+        "-filter_complex",
+        f"[0:v]{aspect_filter}[v_filtered];"
+        "[1:v][v_filtered]scale2ref=w=main_w*0.1:h=-1[logo_scaled][video_for_overlay];"
+        "[video_for_overlay][logo_scaled]overlay=W-w-20:20[v_out]",
+        "-map", "[v_out]", "-sn", "-map", "0:a?",
+        "-c:v", "libx264", "-c:a", "aac", "-preset", "fast", "-crf", "23",
+        "-y", str(step1),
+    ]
+    step2_cmd = [
+        "ffmpeg", "-i", str(step1), "-vf", subtitle_filter,
+        "-c:a", "copy", "-y", str(output),
+    ]
+    return step1_cmd, step2_cmd
+
+
 def test_logo_only():
     """
     Test Case 1: Solo logo (sin subtítulos)
@@ -321,6 +402,181 @@ def test_logo_and_subtitles():
             return False
 
 
+def test_single_encode_no_duplication():
+    """
+    Test Case 4: Logo + Subtítulos en un solo encode (detección automática)
+
+    Verifica que:
+    1. El exporter lanza UN solo ffmpeg y el filtro subtitles aparece una vez
+    2. La salida no tiene streams de subtítulos (solo los quemados)
+    3. La franja de subtítulos es igual a la de un export solo-subtítulos
+       (subtítulos duplicados cambiarían esa franja)
+    """
+    print("\n" + "="*70)
+    print("TEST 4: Single-encode Logo + Subtitles (duplication check)")
+    print("="*70)
+
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+
+        video = create_test_video(tmpdir / "test.mp4", duration=5)
+        logo = create_test_logo(tmpdir / "logo.png")
+        transcript = create_test_transcript(tmpdir / "transcript.json")
+
+        from src.video_exporter import VideoExporter
+
+        clips = [{
+            'clip_id': '1',
+            'start_time': 0,
+            'end_time': 5,
+            'text_preview': 'Test clip'
+        }]
+        common = dict(
+            video_path=str(video),
+            clips=clips,
+            aspect_ratio="16:9",
+            transcript_path=str(transcript),
+            subtitle_style="default",
+        )
+
+        try:
+            reference, _ = run_export_recording_ffmpeg(
+                VideoExporter(output_dir=str(tmpdir / "subs_only")),
+                add_subtitles=True, add_logo=False, **common,
+            )
+            plain, _ = run_export_recording_ffmpeg(
+                VideoExporter(output_dir=str(tmpdir / "plain")),
+                add_subtitles=False, add_logo=False, **common,
+            )
+            result, commands = run_export_recording_ffmpeg(
+                VideoExporter(output_dir=str(tmpdir / "logo_subs")),
+                add_subtitles=True, add_logo=True, logo_path=str(logo),
+                logo_position="top-right", logo_scale=0.1, **common,
+            )
+
+            if not (result and reference and plain):
+                print("✗ FAIL: Output file not created")
+                return False
+
+            if len(commands) != 1:
+                print(f"✗ FAIL: Expected 1 ffmpeg encode, got {len(commands)}")
+                return False
+            if " ".join(commands[0]).count("subtitles=") != 1:
+                print("✗ FAIL: subtitles filter should appear exactly once")
+                return False
+            print("✓ Single ffmpeg encode with one subtitles filter")
+
+            sub_streams = count_subtitle_streams(Path(result[0]))
+            if sub_streams != 0:
+                print(f"✗ FAIL: Output has {sub_streams} subtitle stream(s)")
+                return False
+            print("✓ No soft subtitle streams in output")
+
+            band = read_subtitle_band(Path(result[0]))
+            reference_diff = mean_abs_diff(band, read_subtitle_band(Path(reference[0])))
+            plain_diff = mean_abs_diff(band, read_subtitle_band(Path(plain[0])))
+            print(f"  Subtitle band diff vs subs-only: {reference_diff:.2f}")
+            print(f"  Subtitle band diff vs no-subs:   {plain_diff:.2f}")
+
+            # Los subtítulos se ven (difiere del export sin subs) y una sola vez
+            # (coincide con el export solo-subtítulos salvo ruido de compresión)
+            if plain_diff <= reference_diff or reference_diff > 2.0:
+                print("✗ FAIL: Subtitle band does not match a single subtitle render")
+                return False
+
+            print("✓ PASS: Subtitles burned once in a single encode")
+            return True
+
+        except Exception as e:
+            print(f"✗ FAIL: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+
+def test_single_encode_speedup():
+    """
+    Test Case 5: Mide el tiempo del encode único contra el flujo legacy de dos pasos
+
+    Solo informa el speedup (los tiempos dependen de la máquina); falla si
+    alguno de los dos flujos no produce salida.
+    """
+    print("\n" + "="*70)
+    print("TEST 5: Single-encode speedup vs legacy two-step")
+    print("="*70)
+
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+
+        video = create_test_video(tmpdir / "test.mp4", duration=5)
+        logo = create_test_logo(tmpdir / "logo.png")
+        transcript = create_test_transcript(tmpdir / "transcript.json")
+
+        from src.video_exporter import VideoExporter
+
+        exporter = VideoExporter(output_dir=str(tmpdir / "single"))
+        clips = [{
+            'clip_id': '1',
+            'start_time': 0,
+            'end_time': 5,
+            'text_preview': 'Test clip'
+        }]
+
+        try:
+            start = time.perf_counter()
+            result = exporter.export_clips(
+                video_path=str(video),
+                clips=clips,
+                aspect_ratio="16:9",
+                add_logo=True,
+                logo_path=str(logo),
+                logo_position="top-right",
+                logo_scale=0.1,
+                add_subtitles=True,
+                transcript_path=str(transcript),
+                subtitle_style="default"
+            )
+            single_seconds = time.perf_counter() - start
+
+            if not result:
+                print("✗ FAIL: Single-encode output not created")
+                return False
+
+            # Reutilizo el SRT del export para que ambos flujos quemen lo mismo
+            srt = Path(result[0]).with_suffix(".srt")
+            legacy_dir = tmpdir / "legacy"
+            legacy_dir.mkdir()
+            step1_cmd, step2_cmd = build_legacy_two_step_commands(
+                video=video,
+                logo=logo,
+                srt=srt,
+                step1=legacy_dir / "1_step1_temp.mp4",
+                output=legacy_dir / "1.mp4",
+                aspect_filter=exporter._get_aspect_ratio_filter("16:9"),
+                subtitle_filter=exporter._get_subtitle_filter(str(srt), "default"),
+            )
+
+            start = time.perf_counter()
+            for cmd in (step1_cmd, step2_cmd):
+                step = subprocess.run(cmd, capture_output=True, text=True, check=False)
+                if step.returncode != 0:
+                    print(f"✗ FAIL: Legacy step failed: {step.stderr[-500:]}")
+                    return False
+            legacy_seconds = time.perf_counter() - start
+
+            speedup = legacy_seconds / single_seconds if single_seconds > 0 else float("inf")
+            print(f"  Legacy two-step: {legacy_seconds:.2f}s")
+            print(f"  Single encode:   {single_seconds:.2f}s")
+            print(f"✓ PASS: Speedup x{speedup:.2f}")
+            return True
+
+        except Exception as e:
+            print(f"✗ FAIL: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+
 def main():
     """
     Ejecutar todos los tests
@@ -330,7 +586,7 @@ def main():
     print("="*70)
     print("\nThis test verifies the fix for subtitle duplication when")
     print("logo and subtitles are enabled simultaneously.")
-    print("\nImplementation: -sn flag in Step 1 to discard subtitle streams")
+    print("\nImplementation: logo + subtitles in one filter_complex, -sn discards subtitle streams")
 
     # Verificar que FFmpeg está disponible
     try:
@@ -343,7 +599,9 @@ def main():
     results = {
         "test_1_logo_only": test_logo_only(),
         "test_2_subtitles_only": test_subtitles_only(),
-        "test_3_logo_and_subtitles": test_logo_and_subtitles()
+        "test_3_logo_and_subtitles": test_logo_and_subtitles(),
+        "test_4_single_encode_no_duplication": test_single_encode_no_duplication(),
+        "test_5_single_encode_speedup": test_single_encode_speedup(),
     }
 
     print("\n" + "="*70)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/loudness.py
+
+Verifica el parseo del log de ebur128, las medidas por ventana (gates, LRA, true
+peak), los filtros de cada modo y el cache del análisis junto al transcript.
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.loudness import (
+    LoudnessAnalysis,
+    LoudnessNormalization,
+    get_loudness_analysis_path,
+    load_or_build_loudness_analysis,
+    parse_ebur128_log,
+)
+
+
+EBUR128_LOG = """\
+[Parsed_ebur128_0 @ 0x1] t: 0.1        TARGET:-23 LUFS    M:-120.7 S:-120.7     I: -70.0 LUFS       LRA:   0.0 LU  FTPK: -inf -inf dBFS  TPK: -inf -inf dBFS
+[Parsed_ebur128_0 @ 0x1] t: 0.4        TARGET:-23 LUFS    M: -24.3 S:-120.7     I: -24.3 LUFS       LRA:   0.0 LU  FTPK: -9.2 -7.5 dBFS  TPK: -9.2 -7.5 dBFS
+[Parsed_ebur128_0 @ 0x1] t: 0.5        TARGET:-23 LUFS    M: -23.9 S:-120.7     I: -24.1 LUFS       LRA:   0.0 LU  FTPK: -8.8 dBFS  TPK: -8.8 dBFS
+"""
+
+
+def _analysis(seconds=20.0, loudness=-20.0, peak=-6.0, **overrides) -> LoudnessAnalysis:
+    blocks = int(round(seconds * 10))
+    values = dict(
+        source_size=123,
+        source_mtime=456.0,
+        block_ends=[round((i + 1) * 0.1, 1) for i in range(blocks)],
+        momentary=[loudness] * blocks,
+        short_term=[loudness] * blocks,
+        true_peaks=[peak] * blocks,
+    )
+    values.update(overrides)
+    return LoudnessAnalysis(**values)
+
+
+class TestParseEbur128Log:
+    def test_blocks_with_silence_and_multichannel_peaks(self):
+        blocks = parse_ebur128_log(EBUR128_LOG)
+
+        assert blocks == [
+            (0.1, None, None, None),
+            (0.4, -24.3, None, -7.5),
+            (0.5, -23.9, None, -8.8),
+        ]
+
+    def test_ignores_unrelated_lines(self):
+        assert parse_ebur128_log("Stream #0:1: Audio: aac\nsize=N/A time=00:00:01.00") == []
+
+
+class TestWindowStats:
+    def test_constant_loudness(self):
+        stats = _analysis().window_stats(2.0, 12.0)
+
+        assert stats.integrated == pytest.approx(-20.0)
+        assert stats.threshold == pytest.approx(-30.0)
+        assert stats.lra == pytest.approx(0.0)
+        assert stats.true_peak == pytest.approx(-6.0)
+
+    def test_only_blocks_inside_window(self):
+        momentary = [-30.0] * 100 + [-15.0] * 100
+        peaks = [-20.0] * 100 + [-3.0] * 100
+        analysis = _analysis(momentary=momentary, short_term=list(momentary), true_peaks=peaks)
+
+        stats = analysis.window_stats(0.0, 10.0)
+
+        assert stats.integrated == pytest.approx(-30.0)
+        assert stats.true_peak == pytest.approx(-20.0)
+
+    def test_relative_gate_drops_quiet_blocks(self):
+        # La mitad a -20 y la mitad a -45: el gate relativo (~-33) deja fuera las silenciosas
+        momentary = [-20.0, -45.0] * 100
+        stats = _analysis(momentary=momentary, short_term=list(momentary)).window_stats(0.0, 20.0)
+
+        assert stats.integrated == pytest.approx(-20.0)
+
+    def test_silence_has_no_stats(self):
+        analysis = _analysis(momentary=[None] * 200, short_term=[None] * 200, true_peaks=[None] * 200)
+        assert analysis.window_stats(0.0, 20.0) is None
+
+
+class TestLoudnessNormalization:
+    def test_gain_brings_integrated_to_target(self):
+        normalization = LoudnessNormalization(analysis=_analysis(peak=-12.0), mode="gain", target_lufs=-14.0)
+        assert normalization.filter_for(0.0, 10.0) == "volume=6.00dB"
+
+    def test_gain_is_capped_by_true_peak(self):
+        normalization = LoudnessNormalization(analysis=_analysis(peak=-4.0), mode="gain", target_lufs=-14.0)
+        assert normalization.filter_for(0.0, 10.0) == "volume=3.00dB"
+
+    def test_loudnorm_uses_measured_values(self):
+        normalization = LoudnessNormalization(analysis=_analysis(), mode="loudnorm", target_lufs=-16.0)
+
+        audio_filter = normalization.filter_for(0.0, 10.0)
+
+        assert audio_filter.startswith("loudnorm=I=-16.0:TP=-1.0:LRA=11.0:measured_I=-20.00:measured_TP=-6.00")
+        assert ":linear=true" in audio_filter
+        assert audio_filter.endswith(",aresample=48000")
+
+    def test_silent_window_has_no_filter(self):
+        analysis = _analysis(momentary=[None] * 200, short_term=[None] * 200)
+        assert LoudnessNormalization(analysis=analysis).filter_for(0.0, 10.0) is None
+
+
+class TestLoudnessCache:
+    def _source(self, tmp_path) -> Path:
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"0" * 64)
+        return video_path
+
+    def test_analysis_saved_next_to_transcript(self, tmp_path):
+        assert get_loudness_analysis_path(str(tmp_path / "video_transcript.json")) == (
+            tmp_path / "video_transcript_loudness.json"
+        )
+
+    def test_built_once_then_loaded(self, tmp_path):
+        video_path = self._source(tmp_path)
+        transcript_path = str(tmp_path / "video_transcript.json")
+
+        with patch("src.utils.loudness.probe_media", return_value=None), \
+             patch("src.utils.loudness.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr=EBUR128_LOG)
+            first = load_or_build_loudness_analysis(str(video_path), transcript_path)
+            second = load_or_build_loudness_analysis(str(video_path), transcript_path)
+
+        assert mock_run.call_count == 1
+        assert first == second
+        assert first.block_ends == [0.1, 0.4, 0.5]
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-af") + 1] == "ebur128=peak=true"
+
+    def test_changed_source_is_measured_again(self, tmp_path):
+        video_path = self._source(tmp_path)
+        transcript_path = str(tmp_path / "video_transcript.json")
+
+        with patch("src.utils.loudness.probe_media", return_value=None), \
+             patch("src.utils.loudness.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr=EBUR128_LOG)
+            load_or_build_loudness_analysis(str(video_path), transcript_path)
+            video_path.write_bytes(b"1" * 128)
+            load_or_build_loudness_analysis(str(video_path), transcript_path)
+
+        assert mock_run.call_count == 2
+
+    def test_older_format_is_ignored(self, tmp_path):
+        video_path = self._source(tmp_path)
+        transcript_path = str(tmp_path / "video_transcript.json")
+        stat = video_path.stat()
+        data = _analysis(source_size=stat.st_size, source_mtime=stat.st_mtime).to_dict()
+        data["version"] = 0
+        get_loudness_analysis_path(transcript_path).write_text(json.dumps(data), encoding="utf-8")
+
+        with patch("src.utils.loudness.probe_media", return_value=None), \
+             patch("src.utils.loudness.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr=EBUR128_LOG)
+            analysis = load_or_build_loudness_analysis(str(video_path), transcript_path)
+
+        assert mock_run.call_count == 1
+        assert analysis.block_ends == [0.1, 0.4, 0.5]
+
+    def test_source_without_audio(self, tmp_path):
+        video_path = self._source(tmp_path)
+
+        with patch("src.utils.loudness.probe_media", return_value=None), \
+             patch("src.utils.loudness.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stderr="Stream map '0:a:0' matches no streams.")
+            assert load_or_build_loudness_analysis(str(video_path)) is None
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/media_info.py
+
+Verifica el parseo del JSON de ffprobe (streams, rotación, conteo de frames) y el
+cache por (ruta, tamaño, mtime).
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.media_info import clear_media_info_cache, parse_ffprobe_output, probe_media
+
+
+def _ffprobe_data(**video_overrides) -> dict:
+    video = {
+        "index": 0,
+        "codec_type": "video",
+        "codec_name": "h264",
+        "width": 1920,
+        "height": 1080,
+        "r_frame_rate": "30000/1001",
+        "avg_frame_rate": "30000/1001",
+        "pix_fmt": "yuv420p",
+        "nb_frames": "1798",
+    }
+    video.update(video_overrides)
+    return {
+        "format": {"duration": "60.0", "format_name": "mov,mp4,m4a,3gp,3g2,mj2"},
+        "streams": [
+            video,
+            {
+                "index": 1,
+                "codec_type": "audio",
+                "codec_name": "aac",
+                "channels": 2,
+                "channel_layout": "stereo",
+                "sample_rate": "48000",
+            },
+        ],
+    }
+
+
+def _parse(data: dict):
+    return parse_ffprobe_output(data, path="video.mp4", size=1, mtime=0.0)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_media_info_cache()
+    yield
+    clear_media_info_cache()
+
+
+class TestParseFfprobeOutput:
+    def test_video_and_audio_fields(self):
+        info = _parse(_ffprobe_data())
+
+        assert (info.width, info.height) == (1920, 1080)
+        assert info.fps == pytest.approx(29.97, abs=0.001)
+        assert info.frame_count == 1798
+        assert info.is_cfr
+        assert (info.audio_codec, info.audio_channels, info.audio_sample_rate) == ("aac", 2, 48000)
+        assert [s.codec_type for s in info.streams] == ["video", "audio"]
+        assert info.to_video_info()["audio_channel_layout"] == "stereo"
+
+    def test_frame_count_from_duration_without_nb_frames(self):
+        info = _parse(_ffprobe_data(nb_frames=None, r_frame_rate="25/1", avg_frame_rate="25/1"))
+        assert info.frame_count == 1500
+
+    @pytest.mark.parametrize(
+        "overrides, rotation",
+        [
+            ({"side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]}, 90),
+            ({"side_data_list": [{"side_data_type": "Display Matrix", "rotation": 90}]}, 270),
+            ({"tags": {"rotate": "90"}}, 90),
+            ({}, 0),
+        ],
+    )
+    def test_rotation(self, overrides, rotation):
+        info = _parse(_ffprobe_data(**overrides))
+
+        assert info.rotation == rotation
+        expected_size = (1080, 1920) if rotation in (90, 270) else (1920, 1080)
+        assert info.display_size == expected_size
+
+    def test_variable_frame_rate(self):
+        assert not _parse(_ffprobe_data(r_frame_rate="60/1", avg_frame_rate="2997/100")).is_cfr
+
+    def test_exporter_dict_carries_the_same_cfr_decision(self):
+        # 0.5% de diferencia: VFR para el reframer, el face tracking y el mezzanine por igual
+        info = _parse(_ffprobe_data(r_frame_rate="30/1", avg_frame_rate="2985/100"))
+        assert info.is_cfr is False
+        assert info.to_video_info()["is_cfr"] is False
+
+    def test_no_video_stream(self):
+        data = _ffprobe_data()
+        data["streams"] = data["streams"][1:]
+        assert _parse(data) is None
+
+
+class TestProbeMedia:
+    def _source(self, tmp_path) -> Path:
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"0" * 64)
+        return video_path
+
+    def _ffprobe(self, returncode=0):
+        return MagicMock(returncode=returncode, stdout=json.dumps(_ffprobe_data()), stderr="")
+
+    def test_probed_once_per_file(self, tmp_path):
+        video_path = self._source(tmp_path)
+
+        with patch("src.utils.media_info.subprocess.run", return_value=self._ffprobe()) as mock_run:
+            first = probe_media(str(video_path))
+            second = probe_media(str(video_path))
+
+        assert mock_run.call_count == 1
+        assert first is second
+        assert first.size == 64
+
+    def test_changed_file_is_probed_again(self, tmp_path):
+        video_path = self._source(tmp_path)
+
+        with patch("src.utils.media_info.subprocess.run", return_value=self._ffprobe()) as mock_run:
+            probe_media(str(video_path))
+            video_path.write_bytes(b"1" * 128)
+            stat = video_path.stat()
+            os.utime(video_path, (stat.st_atime, stat.st_mtime + 10))
+            assert probe_media(str(video_path)).size == 128
+
+        assert mock_run.call_count == 2
+
+    def test_failures_are_not_cached(self, tmp_path):
+        video_path = self._source(tmp_path)
+
+        with patch("src.utils.media_info.subprocess.run", return_value=self._ffprobe(returncode=1)) as mock_run:
+            assert probe_media(str(video_path)) is None
+            assert probe_media(str(video_path)) is None
+
+        assert mock_run.call_count == 2
+
+    def test_missing_file(self, tmp_path):
+        with patch("src.utils.media_info.subprocess.run") as mock_run:
+            assert probe_media(str(tmp_path / "missing.mp4")) is None
+        mock_run.assert_not_called()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/mezzanine.py
+
+Verifica la decisión auto/on/off, el comando de ffmpeg
+(GOP fijo, CFR, escala) y la reutilización del mezzanine existente.
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.mezzanine import (
+    MEZZANINE_AUDIO_COPY_TAG,
+    MEZZANINE_AUTO_MIN_CLIPS,
+    build_mezzanine,
+    ensure_mezzanine,
+    get_mezzanine_path,
+    should_build_mezzanine,
+)
+
+
+@pytest.fixture
+def source_video(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"\x00" * 64)
+    return video
+
+
+def test_mezzanine_path_next_to_transcript(tmp_path):
+    transcript = tmp_path / "video_transcript.json"
+    assert get_mezzanine_path(str(transcript)) == tmp_path / "video_transcript_mezzanine.mp4"
+
+
+class TestShouldBuildMezzanine:
+    def test_off_and_on(self):
+        assert should_build_mezzanine("off", clip_count=30, avg_gop_seconds=10.0, is_vfr=True)[0] is False
+        assert should_build_mezzanine("on", clip_count=1, avg_gop_seconds=0.5, is_vfr=False)[0] is True
+
+    def test_on_without_clips_is_skipped(self):
+        assert should_build_mezzanine("on", clip_count=0, avg_gop_seconds=None, is_vfr=False)[0] is False
+
+    def test_auto_needs_enough_clips(self):
+        use, reason = should_build_mezzanine(
+            "auto", clip_count=MEZZANINE_AUTO_MIN_CLIPS - 1, avg_gop_seconds=10.0, is_vfr=True
+        )
+        assert use is False
+        assert "clips" in reason
+
+    def test_auto_long_gop_or_vfr(self):
+        clips = MEZZANINE_AUTO_MIN_CLIPS
+        assert should_build_mezzanine("auto", clip_count=clips, avg_gop_seconds=8.3, is_vfr=False)[0] is True
+        assert should_build_mezzanine("auto", clip_count=clips, avg_gop_seconds=2.0, is_vfr=True)[0] is True
+        assert should_build_mezzanine("auto", clip_count=clips, avg_gop_seconds=2.0, is_vfr=False)[0] is False
+        assert should_build_mezzanine("auto", clip_count=clips, avg_gop_seconds=None, is_vfr=False)[0] is False
+
+
+class TestBuildMezzanine:
+    def test_command_has_fixed_gop_cfr_and_scale(self, source_video, tmp_path):
+        output = tmp_path / "video_transcript_mezzanine.mp4"
+
+        def fake_run(cmd, **kwargs):
+            Path(cmd[-1]).write_bytes(b"mezzanine")
+            return MagicMock(returncode=0, stderr="")
+
+        with patch("src.utils.mezzanine.run_ffmpeg", side_effect=fake_run) as mock_run:
+            ok = build_mezzanine(
+                source_video,
+                output,
+                frame_rate="30000/1001",
+                source_height=2160,
+                target_height=1080,
+                ffmpeg_threads=4,
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert ok is True
+        assert output.read_bytes() == b"mezzanine"
+        assert cmd[cmd.index("-g") + 1] == "30"
+        assert cmd[cmd.index("-keyint_min") + 1] == "30"
+        assert cmd[cmd.index("-sc_threshold") + 1] == "0"
+        assert cmd[cmd.index("-r") + 1] == "30000/1001"
+        assert cmd[cmd.index("-vf") + 1] == "scale=-2:1080"
+        assert cmd[cmd.index("-threads") + 1] == "4"
+        # Escribo en un parcial y renombro al terminar
+        assert cmd[-1].endswith(".partial.mp4")
+        assert not Path(cmd[-1]).exists()
+
+    def test_no_scale_or_audio_when_not_needed(self, source_video, tmp_path):
+        with patch("src.utils.mezzanine.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stderr="boom")
+            ok = build_mezzanine(
+                source_video,
+                tmp_path / "m.mp4",
+                frame_rate="25/1",
+                source_height=720,
+                target_height=720,
+                has_audio=False,
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert ok is False
+        assert "-vf" not in cmd
+        assert "0:a:0" not in cmd
+        assert not (tmp_path / "m.mp4").exists()
+
+    def test_aac_audio_is_copied_and_tagged(self, source_video, tmp_path):
+        with patch("src.utils.mezzanine.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stderr="boom")
+            build_mezzanine(
+                source_video,
+                tmp_path / "m.mp4",
+                frame_rate="30/1",
+                source_height=720,
+                target_height=720,
+                copy_audio=True,
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert "-b:a" not in cmd
+        assert cmd[cmd.index("-metadata") + 1] == f"comment={MEZZANINE_AUDIO_COPY_TAG}"
+
+    def test_other_audio_is_reencoded_without_tag(self, source_video, tmp_path):
+        with patch("src.utils.mezzanine.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stderr="boom")
+            build_mezzanine(
+                source_video,
+                tmp_path / "m.mp4",
+                frame_rate="30/1",
+                source_height=720,
+                target_height=720,
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-c:a") + 1] == "aac"
+        assert "-metadata" not in cmd
+
+
+class TestEnsureMezzanine:
+    def test_reuses_current_mezzanine(self, source_video, tmp_path):
+        output = tmp_path / "m.mp4"
+        output.write_bytes(b"mezzanine")
+
+        with patch("src.utils.mezzanine.probe_media", return_value=MagicMock(height=1080)) as probe, \
+             patch("src.utils.mezzanine.build_mezzanine") as build:
+            result = ensure_mezzanine(
+                source_video, output, frame_rate="30/1", source_height=2160, target_height=1080
+            )
+
+        assert result == output
+        # Solo la lectura de la altura, ningún transcode
+        probe.assert_called_once_with(str(output))
+        build.assert_not_called()
+
+    def test_rebuilds_when_source_is_newer(self, source_video, tmp_path):
+        output = tmp_path / "m.mp4"
+        output.write_bytes(b"stale")
+        source_mtime = source_video.stat().st_mtime
+        os.utime(output, (source_mtime - 100, source_mtime - 100))
+
+        with patch("src.utils.mezzanine.build_mezzanine", return_value=True) as build:
+            result = ensure_mezzanine(
+                source_video, output, frame_rate="30/1", source_height=720, target_height=720
+            )
+
+        assert result == output
+        build.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "comment, require_copy, rebuilt",
+        [
+            (None, True, True),
+            (MEZZANINE_AUDIO_COPY_TAG, True, False),
+            (None, False, False),
+        ],
+    )
+    def test_passthrough_rejects_reencoded_audio(self, source_video, tmp_path, comment, require_copy, rebuilt):
+        output = tmp_path / "m.mp4"
+        output.write_bytes(b"mezzanine")
+
+        with patch("src.utils.mezzanine.probe_media", return_value=MagicMock(height=720, comment=comment)), \
+             patch("src.utils.mezzanine.build_mezzanine", return_value=True) as build:
+            result = ensure_mezzanine(
+                source_video,
+                output,
+                frame_rate="30/1",
+                source_height=720,
+                target_height=720,
+                copy_audio=True,
+                require_audio_copy=require_copy,
+            )
+
+        assert result == output
+        assert build.called is rebuilt
+        if rebuilt:
+            assert build.call_args.kwargs["copy_audio"] is True
@@ -10,6 +10,7 @@ Covers:
 - reframe_video() integration with mocked video I/O
 - Edge cases: no faces, multiple faces, face leaving frame
 - FFmpegVideoWriter helper class
+- CropTrajectory / compute_crop_trajectories() (two-pass reframing, face track cache)
 """
 
 import sys
@@ -121,7 +122,7 @@ def mock_detection_multiple_faces():
 class TestFFmpegVideoWriter:
     """Tests for the FFmpegVideoWriter helper class."""
 
-    @patch('subprocess.Popen')
+    @patch('src.utils.ffmpeg_runner.FFmpegProcess')
     def test_init_success(self, mock_popen, mock_numpy):
         """Test successful initialization of FFmpegVideoWriter."""
         with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': mock_numpy, 'mediapipe': MagicMock()}):
@@ -146,7 +147,7 @@ class TestFFmpegVideoWriter:
             assert writer.height == 1920
             assert writer.fps == 30.0
 
-    @patch('subprocess.Popen')
+    @patch('src.utils.ffmpeg_runner.FFmpegProcess')
     def test_init_custom_params(self, mock_popen, mock_numpy):
         """Test initialization with custom codec, preset, and crf."""
         with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': mock_numpy, 'mediapipe': MagicMock()}):
@@ -171,7 +172,7 @@ class TestFFmpegVideoWriter:
             assert writer.isOpened()
             assert writer.codec == 'h264_videotoolbox'
 
-    @patch('subprocess.Popen')
+    @patch('src.utils.ffmpeg_runner.FFmpegProcess')
     def test_init_failure(self, mock_popen, mock_numpy):
         """Test initialization failure handling."""
         with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': mock_numpy, 'mediapipe': MagicMock()}):
@@ -190,7 +191,7 @@ class TestFFmpegVideoWriter:
 
             assert not writer.isOpened()
 
-    @patch('subprocess.Popen')
+    @patch('src.utils.ffmpeg_runner.FFmpegProcess')
     def test_write_success(self, mock_popen, mock_numpy):
         """Test successful frame write."""
         with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': mock_numpy, 'mediapipe': MagicMock()}):
@@ -217,7 +218,7 @@ class TestFFmpegVideoWriter:
             assert result is True
             mock_process.stdin.write.assert_called_once()
 
-    @patch('subprocess.Popen')
+    @patch('src.utils.ffmpeg_runner.FFmpegProcess')
     def test_write_broken_pipe(self, mock_popen, mock_numpy):
         """Test write failure due to broken pipe."""
         with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': mock_numpy, 'mediapipe': MagicMock()}):
@@ -244,7 +245,7 @@ class TestFFmpegVideoWriter:
             assert result is False
             assert not writer._opened
 
-    @patch('subprocess.Popen')
+    @patch('src.utils.ffmpeg_runner.FFmpegProcess')
     def test_release(self, mock_popen, mock_numpy):
         """Test clean release of writer resources."""
         with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': mock_numpy, 'mediapipe': MagicMock()}):
@@ -254,7 +255,7 @@ class TestFFmpegVideoWriter:
 
             mock_process = MagicMock()
             mock_process.poll.return_value = None
-            mock_process.returncode = 0
+            mock_process.wait.return_value = MagicMock(returncode=0, timed_out=False)
             mock_popen.return_value = mock_process
 
             writer = reframer_module.FFmpegVideoWriter(
@@ -1040,6 +1041,120 @@ class TestReframeVideo:
                 assert frame_pos[0] == 60
 
 
+    def test_reframe_video_seeks_from_indexed_keyframe(self, tmp_path):
+        """With a keyframe index, seek lands on the keyframe and grabs forward to start_time."""
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            mock_face_detection = MagicMock()
+            reframer_module.mp.solutions.face_detection = mock_face_detection
+            mock_detector = MagicMock()
+            mock_face_detection.FaceDetection.return_value = mock_detector
+
+            mock_detection = MagicMock()
+            mock_bbox = MagicMock()
+            mock_bbox.xmin = 0.4
+            mock_bbox.ymin = 0.3
+            mock_bbox.width = 0.2
+            mock_bbox.height = 0.3
+            mock_detection.location_data.relative_bounding_box = mock_bbox
+            mock_results = MagicMock()
+            mock_results.detections = [mock_detection]
+            mock_detector.process.return_value = mock_results
+
+            mock_cap = MagicMock()
+            mock_cap.get.side_effect = lambda prop: {
+                reframer_module.cv2.CAP_PROP_FPS: 30.0,
+                reframer_module.cv2.CAP_PROP_FRAME_WIDTH: 1920,
+                reframer_module.cv2.CAP_PROP_FRAME_HEIGHT: 1080,
+                reframer_module.cv2.CAP_PROP_FRAME_COUNT: 300,
+            }.get(prop, 0)
+            mock_cap.isOpened.return_value = True
+
+            # Track frame position
+            frame_pos = [0]
+            def mock_set(prop, value):
+                if prop == reframer_module.cv2.CAP_PROP_POS_FRAMES:
+                    frame_pos[0] = int(value)
+            mock_cap.set = mock_set
+
+            frame_count = [0]
+            def mock_read():
+                # start_time=2, end_time=5 at 30fps = frames 60-150
+                current_frame = frame_pos[0] + frame_count[0]
+                if current_frame < 150:
+                    frame_count[0] += 1
+                    mock_frame = MagicMock()
+                    mock_frame.shape = (1080, 1920, 3)
+                    mock_frame.dtype = 'uint8'
+                    mock_frame.flags = {'C_CONTIGUOUS': True}
+                    return True, mock_frame
+                return False, None
+            mock_cap.read = mock_read
+
+            grabbed = [0]
+            def mock_grab():
+                grabbed[0] += 1
+                frame_pos[0] += 1
+                return True
+            mock_cap.grab = mock_grab
+
+            reframer_module.cv2.VideoCapture.return_value = mock_cap
+            reframer_module.cv2.cvtColor = MagicMock(return_value=MagicMock())
+            reframer_module.cv2.resize = MagicMock(return_value=MagicMock(
+                shape=(1920, 1080, 3),
+                dtype='uint8',
+                flags={'C_CONTIGUOUS': True},
+                __getitem__=lambda self, key: MagicMock(
+                    shape=(1920, 1080, 3),
+                    dtype='uint8',
+                    flags={'C_CONTIGUOUS': True}
+                )
+            ))
+
+            reframer_module.np.zeros = MagicMock(return_value=MagicMock(
+                shape=(1920, 1080, 3),
+                dtype='uint8',
+                flags={'C_CONTIGUOUS': True},
+                tobytes=MagicMock(return_value=b'\x00' * (1920 * 1080 * 3))
+            ))
+            reframer_module.np.uint8 = 'uint8'
+            reframer_module.np.ascontiguousarray = lambda x: x
+
+            mock_writer = MagicMock()
+            mock_writer.isOpened.return_value = True
+            mock_writer.write.return_value = True
+
+            with patch.object(reframer_module, 'FFmpegVideoWriter', return_value=mock_writer):
+                reframer = reframer_module.FaceReframer()
+                from src.utils.keyframe_index import SeekPlan
+                keyframe_index = MagicMock()
+                keyframe_index.seek_plan.return_value = SeekPlan(
+                    keyframe_time=1.5, keyframe_offset=0, frames_to_decode=15
+                )
+
+                input_path = tmp_path / "input.mp4"
+                output_path = tmp_path / "output.mp4"
+                input_path.touch()
+
+                result = reframer.reframe_video(
+                    str(input_path),
+                    str(output_path),
+                    target_resolution=(1080, 1920),
+                    start_time=2.0,
+                    end_time=5.0,
+                    keyframe_index=keyframe_index,
+                )
+
+                assert result == str(output_path)
+                # Keyframe at 1.5s = frame 45, then 15 grabs to reach frame 60
+                keyframe_index.seek_plan.assert_called_once_with(2.0)
+                assert grabbed[0] == 15
+                assert frame_pos[0] == 60
+
+
 # ============================================================================
 # EDGE CASE TESTS
 # ============================================================================
@@ -1371,3 +1486,477 @@ class TestEdgeCases:
                 expected_detections = 6
                 actual_detections = mock_detector.process.call_count
                 assert actual_detections == expected_detections
+
+    def test_reframe_video_variants_detects_once_for_all_outputs(self, tmp_path):
+        """Several outputs share one decode and one detection per sampled frame."""
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            mock_face_detection = MagicMock()
+            reframer_module.mp.solutions.face_detection = mock_face_detection
+            mock_detector = MagicMock()
+            mock_face_detection.FaceDetection.return_value = mock_detector
+
+            mock_detection = MagicMock()
+            mock_bbox = MagicMock()
+            mock_bbox.xmin = 0.4
+            mock_bbox.ymin = 0.3
+            mock_bbox.width = 0.2
+            mock_bbox.height = 0.3
+            mock_detection.location_data.relative_bounding_box = mock_bbox
+            mock_results = MagicMock()
+            mock_results.detections = [mock_detection]
+            mock_detector.process.return_value = mock_results
+
+            mock_cap = MagicMock()
+            mock_cap.get.side_effect = lambda prop: {
+                reframer_module.cv2.CAP_PROP_FPS: 30.0,
+                reframer_module.cv2.CAP_PROP_FRAME_WIDTH: 1920,
+                reframer_module.cv2.CAP_PROP_FRAME_HEIGHT: 1080,
+                reframer_module.cv2.CAP_PROP_FRAME_COUNT: 30,
+            }.get(prop, 0)
+            mock_cap.isOpened.return_value = True
+
+            frame_count = [0]
+            def mock_read():
+                if frame_count[0] < 30:
+                    frame_count[0] += 1
+                    mock_frame = MagicMock()
+                    mock_frame.shape = (1080, 1920, 3)
+                    return True, mock_frame
+                return False, None
+            mock_cap.read = mock_read
+
+            reframer_module.cv2.VideoCapture.return_value = mock_cap
+            reframer_module.cv2.cvtColor = MagicMock(return_value=MagicMock())
+
+            def fake_resize(frame, size):
+                width, height = size
+                scaled = MagicMock()
+                scaled.__getitem__ = lambda self, key: MagicMock(
+                    shape=(1920 if height >= 1920 else 1080, 1080, 3),
+                    dtype='uint8',
+                    flags={'C_CONTIGUOUS': True},
+                )
+                return scaled
+            reframer_module.cv2.resize = MagicMock(side_effect=fake_resize)
+            reframer_module.np.uint8 = 'uint8'
+
+            writers = {}
+            def make_writer(output_path, **kwargs):
+                writer = MagicMock()
+                writer.isOpened.return_value = True
+                writer.write.return_value = True
+                writers[output_path] = writer
+                return writer
+
+            with patch.object(reframer_module, 'FFmpegVideoWriter', side_effect=make_writer):
+                reframer = reframer_module.FaceReframer(frame_sample_rate=5)
+                vertical = str(tmp_path / "9x16.mp4")
+                square = str(tmp_path / "1x1.mp4")
+
+                result = reframer.reframe_video_variants(
+                    str(tmp_path / "input.mp4"),
+                    outputs={vertical: (1080, 1920), square: (1080, 1080)},
+                )
+
+            assert result == {vertical: vertical, square: square}
+            # Una detección por frame muestreado, no una por salida
+            assert mock_detector.process.call_count == 6
+            mock_cap.release.assert_called_once()
+            # 30 frames por salida (sin frame de prueba del codec)
+            assert writers[vertical].write.call_count == 30
+            assert writers[square].write.call_count == 30
+            writers[vertical].release.assert_called_once()
+            writers[square].release.assert_called_once()
+
+
+# ============================================================================
+# DETECTION FRAME STREAM TESTS
+# ============================================================================
+
+
+class TestDetectionFrameStream:
+    """Detection on small frames decoded and scaled by ffmpeg."""
+
+    def test_open_selects_only_sampled_frames(self):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            with patch.object(reframer_module, 'FFmpegProcess') as process_cls:
+                stream = reframer_module.DetectionFrameStream.open(
+                    "input.mp4",
+                    frame_width=1920,
+                    frame_height=1080,
+                    fps=30.0,
+                    start_frame=61,
+                    end_frame=150,
+                    sample_rate=3,
+                )
+
+            cmd = process_cls.call_args[0][0]
+            assert process_cls.call_args.kwargs["read_stdout"] is True
+            assert cmd[cmd.index('-ss') + 1] == f"{60.5 / 30:.6f}"
+            # El frame n del stream es el frame 61 + n: muestreo los múltiplos de 3 (63, 66, ...)
+            assert cmd[cmd.index('-vf') + 1] == "select='not(mod(n+1,3))',scale=320:180"
+            assert cmd[cmd.index('-frames:v') + 1] == "29"
+            assert cmd[cmd.index('-fps_mode') + 1] == "passthrough"
+            assert cmd[-1] == "pipe:1"
+            assert (stream.width, stream.height, stream.remaining) == (320, 180, 29)
+
+    def test_read_stops_on_short_frame_and_close_kills_early(self):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            process = MagicMock()
+            process.stdout.read.side_effect = [b'\x00' * (4 * 2 * 3), b'\x00' * 5]
+            stream = reframer_module.DetectionFrameStream(process, width=4, height=2, count=5)
+
+            assert stream.read() is not None
+            reframer_module.np.frombuffer.return_value.reshape.assert_called_once_with(2, 4, 3)
+            assert stream.read() is None
+            assert stream.read() is None
+            assert process.stdout.read.call_count == 2
+
+            stream.close()
+            process.kill.assert_not_called()
+            process.wait.assert_called_once()
+
+            unread = reframer_module.DetectionFrameStream(MagicMock(), width=4, height=2, count=5)
+            unread.close()
+            unread.process.kill.assert_called_once()
+
+    def test_reframe_detects_on_stream_frames_and_scales_only_the_crop(self, tmp_path):
+        """Detection uses the stream frames; each output frame resizes just the crop region."""
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            mock_face_detection = MagicMock()
+            reframer_module.mp.solutions.face_detection = mock_face_detection
+            mock_detector = MagicMock()
+            mock_face_detection.FaceDetection.return_value = mock_detector
+
+            mock_detection = MagicMock()
+            mock_bbox = MagicMock()
+            mock_bbox.xmin = 0.7
+            mock_bbox.ymin = 0.3
+            mock_bbox.width = 0.1
+            mock_bbox.height = 0.2
+            mock_detection.location_data.relative_bounding_box = mock_bbox
+            mock_detector.process.return_value = MagicMock(detections=[mock_detection])
+
+            mock_cap = MagicMock()
+            mock_cap.get.side_effect = lambda prop: {
+                reframer_module.cv2.CAP_PROP_FPS: 30.0,
+                reframer_module.cv2.CAP_PROP_FRAME_WIDTH: 1920,
+                reframer_module.cv2.CAP_PROP_FRAME_HEIGHT: 1080,
+                reframer_module.cv2.CAP_PROP_FRAME_COUNT: 6,
+            }.get(prop, 0)
+            mock_cap.isOpened.return_value = True
+            frames = []
+
+            def mock_read():
+                if len(frames) < 6:
+                    frame = MagicMock()
+                    frame.shape = (1080, 1920, 3)
+                    frames.append(frame)
+                    return True, frame
+                return False, None
+            mock_cap.read = mock_read
+            reframer_module.cv2.VideoCapture.return_value = mock_cap
+
+            stream = MagicMock()
+            small_frames = [MagicMock(name="small0"), MagicMock(name="small1")]
+            stream.read.side_effect = small_frames
+
+            mock_writer = MagicMock()
+            mock_writer.write.return_value = True
+            with patch.object(reframer_module.DetectionFrameStream, 'open', return_value=stream), \
+                 patch.object(reframer_module, 'FFmpegVideoWriter', return_value=mock_writer):
+                reframer = reframer_module.FaceReframer(frame_sample_rate=3)
+                reframer.reframe_video(str(tmp_path / "in.mp4"), str(tmp_path / "out.mp4"), (1080, 1920))
+
+            # Una detección por frame muestreado, sobre el frame chico y sin convertir el completo
+            assert [c.args[0] for c in mock_detector.process.call_args_list] == small_frames
+            reframer_module.cv2.cvtColor.assert_not_called()
+            stream.close.assert_called_once()
+
+            # Rostro centrado en x = 0.75 * 1920 = 1440: región de 608x1080 alrededor de él,
+            # escalada directo a 1080x1920
+            region = frames[0].__getitem__.call_args[0][0]
+            assert region == (slice(0, 1080), slice(1136, 1744))
+            resize_args = [c.args for c in reframer_module.cv2.resize.call_args_list]
+            assert len(resize_args) == 6
+            assert all(size == (1080, 1920) for _, size in resize_args)
+
+
+# ============================================================================
+# CROP TRAJECTORY TESTS
+# ============================================================================
+
+
+class TestCropTrajectory:
+    """Two-pass reframing: the crop path is computed on detection frames and applied by ffmpeg."""
+
+    def _module(self):
+        import importlib
+        import src.reframer as reframer_module
+        importlib.reload(reframer_module)
+        return reframer_module
+
+    def _trajectory(self, reframer_module, points):
+        return reframer_module.CropTrajectory(
+            width=1080, height=1920, region_width=608, region_height=1080, region_y=0, points=points
+        )
+
+    def test_video_filter_static_and_moving(self):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            reframer_module = self._module()
+
+            static = self._trajectory(reframer_module, ((0.0, 656),))
+            assert static.video_filter() == "crop=608:1080:656:0,scale=1080:1920"
+
+            moving = self._trajectory(reframer_module, ((0.0, 656), (1.017, 700), (2.05, 800)))
+            assert moving.video_filter(name="reframe_9x16") == (
+                "sendcmd=c='1.017 crop@reframe_9x16 x 700;2.050 crop@reframe_9x16 x 800',"
+                "crop@reframe_9x16=608:1080:656:0,scale=1080:1920"
+            )
+
+    def test_time_map_moves_changes_to_the_cut_timeline(self):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            reframer_module = self._module()
+            from src.utils.jump_cut import JumpCutPlan
+
+            plan = JumpCutPlan(keep=((0.0, 1.2), (2.8, 5.0)), window=5.0)
+            trajectory = self._trajectory(
+                reframer_module, ((0.0, 656), (1.5, 700), (2.0, 800), (3.0, 800), (4.0, 656))
+            )
+
+            # Los cambios dentro del corte caen en el punto del corte y gana el último
+            assert trajectory.video_filter(time_map=plan.remap) == (
+                "sendcmd=c='1.200 crop@reframe x 800;2.400 crop@reframe x 656',"
+                "crop@reframe=608:1080:656:0,scale=1080:1920"
+            )
+
+    def test_compute_reads_only_detection_frames(self, tmp_path):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            reframer_module = self._module()
+
+            mock_detector = MagicMock()
+            reframer_module.mp.solutions.face_detection.FaceDetection.return_value = mock_detector
+
+            def detection(xmin):
+                result = MagicMock()
+                bbox = result.location_data.relative_bounding_box
+                bbox.xmin, bbox.ymin, bbox.width, bbox.height = xmin, 0.3, 0.1, 0.2
+                return MagicMock(detections=[result])
+
+            # Rostro a la derecha, quieto, y después a la izquierda (sale de la safe zone)
+            mock_detector.process.side_effect = [detection(0.7), detection(0.7), detection(0.1)]
+            stream = MagicMock()
+            stream.read.side_effect = [MagicMock(), MagicMock(), MagicMock()]
+            media = MagicMock(display_size=(1920, 1080), fps=30.0, is_cfr=True, frame_count=900)
+
+            with patch.object(reframer_module, 'probe_media', return_value=media), \
+                 patch.object(reframer_module.DetectionFrameStream, 'open', return_value=stream) as open_stream:
+                reframer = reframer_module.FaceReframer(frame_sample_rate=3)
+                trajectories = reframer.compute_crop_trajectories(
+                    str(tmp_path / "in.mp4"), {"9:16": (1080, 1920)}, start_time=2.0, end_time=2.3
+                )
+
+            reframer_module.cv2.VideoCapture.assert_not_called()
+            assert open_stream.call_args.kwargs["start_frame"] == 60
+            assert open_stream.call_args.kwargs["end_frame"] == 69
+            assert mock_detector.process.call_count == 3
+            stream.close.assert_called_once()
+
+            trajectory = trajectories["9:16"]
+            assert (trajectory.region_width, trajectory.region_height, trajectory.region_y) == (608, 1080, 0)
+            # La primera muestra (frame 60) reemplaza al center crop; la de la izquierda
+            # (frame 66) mueve el crop medio frame antes de su timestamp
+            assert trajectory.points == ((0.0, 1136), (round(65.5 / 30 - 2.0, 3), 197))
+
+    def test_compute_rejects_variable_frame_rate(self, tmp_path):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            reframer_module = self._module()
+            media = MagicMock(display_size=(1920, 1080), fps=30.0, is_cfr=False)
+
+            with patch.object(reframer_module, 'probe_media', return_value=media), \
+                 patch.object(reframer_module.DetectionFrameStream, 'open') as open_stream:
+                reframer = reframer_module.FaceReframer()
+                with pytest.raises(ValueError):
+                    reframer.compute_crop_trajectories(str(tmp_path / "in.mp4"), {"9:16": (1080, 1920)})
+            open_stream.assert_not_called()
+
+    def test_face_track_is_filled_once_and_reused(self, tmp_path):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            reframer_module = self._module()
+            from src.utils.face_track import FaceTrack
+
+            class Rows(list):
+                def __getitem__(self, key):
+                    if isinstance(key, tuple):
+                        return super().__getitem__(key[0])[key[1]]
+                    return super().__getitem__(key)
+
+            track = FaceTrack(
+                Rows([0] * 5 for _ in range(900)),
+                fps=30.0, width=1920, height=1080, min_detection_confidence=0.5, detection_width=320,
+            )
+
+            mock_detector = MagicMock()
+            reframer_module.mp.solutions.face_detection.FaceDetection.return_value = mock_detector
+            result = MagicMock()
+            bbox = result.location_data.relative_bounding_box
+            bbox.xmin, bbox.ymin, bbox.width, bbox.height = 0.1, 0.3, 0.1, 0.2
+            mock_detector.process.return_value = MagicMock(detections=[result])
+            media = MagicMock(display_size=(1920, 1080), fps=30.0, is_cfr=True, frame_count=900)
+
+            def open_stream(*args, **kwargs):
+                stream = MagicMock()
+                count = len(range(kwargs["start_frame"], kwargs["end_frame"], kwargs["sample_rate"]))
+                stream.read.side_effect = [MagicMock()] * count + [None]
+                return stream
+
+            with patch.object(reframer_module, 'probe_media', return_value=media), \
+                 patch.object(reframer_module.DetectionFrameStream, 'open', side_effect=open_stream) as opened:
+                first = reframer_module.FaceReframer(frame_sample_rate=3).compute_crop_trajectories(
+                    str(tmp_path / "in.mp4"), {"9:16": (1080, 1920)}, start_time=2.0, end_time=2.3,
+                    face_track=track,
+                )
+                assert mock_detector.process.call_count == 3
+
+                # Otra estrategia y un clip que se solapa: solo detecta los frames nuevos
+                second = reframer_module.FaceReframer(
+                    frame_sample_rate=3, strategy="centered"
+                ).compute_crop_trajectories(
+                    str(tmp_path / "in.mp4"), {"9:16": (1080, 1920)}, start_time=2.0, end_time=2.5,
+                    face_track=track,
+                )
+
+            assert mock_detector.process.call_count == 5
+            assert opened.call_args.kwargs["start_frame"] == 69
+            assert opened.call_args.kwargs["end_frame"] == 73
+            assert track.missing(range(60, 75, 3)) == []
+            assert first["9:16"].points == ((0.0, 0),)
+            assert second["9:16"].points == ((0.0, 0),)
+
+            # Un cache de otro detector no se usa
+            reframer = reframer_module.FaceReframer(min_detection_confidence=0.7)
+            assert reframer._usable_face_track(track, 1920, 1080, 30.0) is None
+            assert reframer_module.FaceReframer()._usable_face_track(track, 1280, 720, 30.0) is None
+
+
+# ============================================================================
+# REFRAME PIPELINE TESTS
+# ============================================================================
+
+class TestReframePipeline:
+    """Frames-mode reframing runs decode, detect, crop and write as overlapping stages."""
+
+    def _setup(self, reframer_module, frame_count):
+        mock_detector = MagicMock()
+        reframer_module.mp.solutions.face_detection.FaceDetection.return_value = mock_detector
+        mock_detector.process.return_value = MagicMock(detections=None)
+
+        mock_cap = MagicMock()
+        mock_cap.get.side_effect = lambda prop: {
+            reframer_module.cv2.CAP_PROP_FPS: 30.0,
+            reframer_module.cv2.CAP_PROP_FRAME_WIDTH: 1920,
+            reframer_module.cv2.CAP_PROP_FRAME_HEIGHT: 1080,
+            reframer_module.cv2.CAP_PROP_FRAME_COUNT: frame_count,
+        }.get(prop, 0)
+        mock_cap.isOpened.return_value = True
+        frames = [MagicMock(name=f"frame{i}") for i in range(frame_count)]
+        mock_cap.read.side_effect = [(True, frame) for frame in frames] + [(False, None)]
+        reframer_module.cv2.VideoCapture.return_value = mock_cap
+        # Cada resize devuelve el frame del que salió la región
+        reframer_module.cv2.resize.side_effect = lambda region, size: (region, size)
+        for frame in frames:
+            frame.shape = (1080, 1920, 3)
+            frame.__getitem__.return_value = frame
+        return mock_cap, frames
+
+    def test_every_output_gets_every_frame_in_order_and_stats_are_kept(self, tmp_path):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            mock_cap, frames = self._setup(reframer_module, 40)
+            written = {}
+
+            def make_writer(output_path, width, height, **kwargs):
+                writer = MagicMock()
+                written[output_path] = []
+                writer.write.side_effect = lambda frame: written[output_path].append(frame) or True
+                return writer
+
+            with patch.object(reframer_module.DetectionFrameStream, 'open', return_value=None), \
+                 patch.object(reframer_module, 'FFmpegVideoWriter', side_effect=make_writer):
+                reframer = reframer_module.FaceReframer(frame_sample_rate=3)
+                reframer.pipeline_queue_size = 2
+                reframer.reframe_video_variants(
+                    str(tmp_path / "in.mp4"),
+                    {str(tmp_path / "v" / "out.mp4"): (1080, 1920), str(tmp_path / "s" / "out.mp4"): (1080, 1080)},
+                )
+
+            for output, size in [("v", (1080, 1920)), ("s", (1080, 1080))]:
+                assert written[str(tmp_path / output / "out.mp4")] == [(frame, size) for frame in frames]
+            mock_cap.release.assert_called_once()
+
+            stats = reframer.last_pipeline_stats
+            assert list(stats) == ["decode", "detect", "crop", "write v/out.mp4", "write s/out.mp4"]
+            assert stats["decode"].items == stats["crop"].items == 40
+            # Sin stream, el rostro de cada frame muestreado se detecta sobre el frame completo
+            assert stats["detect"].items == 14
+            assert reframer_module.mp.solutions.face_detection.FaceDetection.return_value.process.call_count == 14
+            assert stats["crop"].queue_size == 2
+            assert 0 <= stats["crop"].max_queue_depth <= 2
+            assert stats["write v/out.mp4"].items == 40
+
+    def test_writer_error_stops_the_pipeline_and_is_raised(self, tmp_path):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            mock_cap, _ = self._setup(reframer_module, 200)
+            mock_writer = MagicMock()
+            mock_writer.write.side_effect = [True] * 5 + [RuntimeError("encoder died")]
+
+            with patch.object(reframer_module.DetectionFrameStream, 'open', return_value=None), \
+                 patch.object(reframer_module, 'FFmpegVideoWriter', return_value=mock_writer):
+                reframer = reframer_module.FaceReframer()
+                with pytest.raises(RuntimeError, match="encoder died"):
+                    reframer.reframe_video(str(tmp_path / "in.mp4"), str(tmp_path / "out.mp4"), (1080, 1920))
+
+            mock_cap.release.assert_called_once()
+            mock_writer.release.assert_called_once()
+            assert reframer.last_pipeline_stats["crop"].items < 200
+
+    def test_stage_stats_summary(self):
+        with patch.dict('sys.modules', {'cv2': MagicMock(), 'numpy': MagicMock(), 'mediapipe': MagicMock()}):
+            import importlib
+            import src.reframer as reframer_module
+            importlib.reload(reframer_module)
+
+            stats = reframer_module.StageStats("crop", queue_size=8)
+            for depth in (8, 6, 7, 3):
+                stats.record_depth(depth)
+            stats.items, stats.busy_seconds, stats.wait_seconds = 4, 0.5, 1.25
+
+            assert stats.fps == 8.0
+            assert stats.mean_queue_depth == 6.0
+            assert stats.summary() == (
+                "crop: 4 frames, 8 fps, busy 0.50s, waiting 1.25s, input queue max 8/8 mean 6.0"
+            )
+            assert reframer_module.StageStats("decode").summary().endswith("waiting 0.00s")
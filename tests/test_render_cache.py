@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/utils/render_cache.py
+
+Verifica las claves (estables, sensibles a cada parte), el id de contenido de la
+fuente, fetch/store con conteo de hits/misses y el desalojo LRU por tamaño.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from unittest.mock import patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.render_cache import (
+    RenderCache,
+    compute_render_key,
+    file_digest,
+    source_content_id,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "cache"), max_bytes=1000)
+
+
+def _render(path: Path, size: int) -> Path:
+    path.write_bytes(b"x" * size)
+    return path
+
+
+class TestKeys:
+    def test_key_is_stable_and_order_independent(self):
+        a = compute_render_key({"source": "s", "window": [1.0, 2.0], "srt": None})
+        b = compute_render_key({"srt": None, "window": [1.0, 2.0], "source": "s"})
+        assert a == b
+
+    def test_key_changes_with_any_part(self):
+        base = {"source": "s", "window": [1.0, 2.0], "filter_graph": "-vf crop", "srt": "d1"}
+        key = compute_render_key(base)
+        for field, value in (("window", [1.0, 2.5]), ("filter_graph", "-vf scale"), ("srt", "d2")):
+            assert compute_render_key({**base, field: value}) != key
+
+    def test_file_digest(self, tmp_path):
+        f = tmp_path / "logo.png"
+        f.write_bytes(b"logo")
+        assert file_digest(str(f)) == file_digest(str(f))
+        assert file_digest(str(tmp_path / "missing.png")) is None
+        assert file_digest(None) is None
+
+    def test_source_content_id_follows_content_not_name(self, tmp_path):
+        a = _render(tmp_path / "a.mp4", 5000)
+        b = _render(tmp_path / "b.mp4", 5000)
+        c = tmp_path / "c.mp4"
+        c.write_bytes(b"y" * 5000)
+
+        assert source_content_id(str(a)) == source_content_id(str(b))
+        assert source_content_id(str(a)) != source_content_id(str(c))
+        assert source_content_id(str(tmp_path / "missing.mp4")) is None
+
+    def test_source_content_id_is_reused_until_the_file_changes(self, tmp_path):
+        video = _render(tmp_path / "video.mp4", 5000)
+        first = source_content_id(str(video))
+
+        with patch("builtins.open", side_effect=AssertionError("re-read")):
+            assert source_content_id(str(video)) == first
+
+        video.write_bytes(b"z" * 5000)
+        stat = video.stat()
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert source_content_id(str(video)) != first
+
+
+class TestFetchStore:
+    def test_miss_then_hit(self, cache, tmp_path):
+        output = tmp_path / "1.mp4"
+
+        assert cache.fetch("k", output) is False
+        _render(output, 100)
+        cache.store("k", output)
+        output.unlink()
+
+        assert cache.fetch("k", output) is True
+        assert output.read_bytes() == b"x" * 100
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.stored) == (1, 1, 1)
+
+    def test_store_links_when_possible(self, cache, tmp_path):
+        output = _render(tmp_path / "1.mp4", 100)
+        cache.store("k", output)
+
+        assert (cache.cache_dir / "k.mp4").stat().st_ino == output.stat().st_ino
+        assert [p.name for p in cache.cache_dir.iterdir()] == ["k.mp4"]
+
+    def test_store_copies_when_link_fails(self, cache, tmp_path):
+        output = _render(tmp_path / "1.mp4", 100)
+        with patch("src.utils.render_cache.os.link", side_effect=OSError("cross-device link")):
+            cache.store("k", output)
+
+        entry = cache.cache_dir / "k.mp4"
+        assert entry.read_bytes() == b"x" * 100
+        assert entry.stat().st_ino != output.stat().st_ino
+        assert cache.stats.stored == 1
+
+    def test_republishing_output_does_not_touch_cache_entry(self, cache, tmp_path):
+        output = _render(tmp_path / "1.mp4", 100)
+        cache.store("k", output)
+
+        # Un re-export escribe el parcial y lo renombra sobre la salida
+        partial = tmp_path / "1_partial_temp.mp4"
+        partial.write_bytes(b"new")
+        os.replace(partial, output)
+
+        again = tmp_path / "again.mp4"
+        assert cache.fetch("k", again) is True
+        assert again.read_bytes() == b"x" * 100
+
+    def test_lru_eviction_keeps_recently_used(self, cache, tmp_path):
+        for key in ("a", "b", "c"):
+            cache.store(key, _render(tmp_path / f"{key}.mp4", 400))
+            entry = cache.cache_dir / f"{key}.mp4"
+            if entry.exists():
+                past = time.time() - {"a": 30, "b": 20, "c": 10}[key]
+                os.utime(entry, (past, past))
+
+        # "a" se desaloja al guardar "c" (1200 > 1000); "b" y "c" quedan
+        assert not (cache.cache_dir / "a.mp4").exists()
+        assert cache.fetch("b", tmp_path / "b_out.mp4") is True
+
+        cache.store("d", _render(tmp_path / "d.mp4", 400))
+
+        # "b" se usó recién, así que el desalojado es "c"
+        assert (cache.cache_dir / "b.mp4").exists()
+        assert not (cache.cache_dir / "c.mp4").exists()
+        assert cache.total_bytes() <= 1000
+        assert cache.stats.evicted == 2
+
+    def test_zero_size_disables_store(self, tmp_path):
+        cache = RenderCache(str(tmp_path / "cache"), max_bytes=0)
+        cache.store("k", _render(tmp_path / "1.mp4", 10))
+        assert cache.fetch("k", tmp_path / "out.mp4") is False
+
+    def test_lookup_layer_counts_layer_hits(self, cache, tmp_path):
+        assert cache.lookup_layer("base") is None
+
+        cache.store("base", _render(tmp_path / "base.mp4", 100))
+        entry = cache.lookup_layer("base")
+
+        assert entry == cache.cache_dir / "base.mp4"
+        assert (cache.stats.layer_hits, cache.stats.hits, cache.stats.misses) == (1, 0, 0)
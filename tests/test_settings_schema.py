@@ -31,6 +31,7 @@ from src.config.settings_schema import (
     _normalize_auto_name_method,
     _normalize_auto_name_word_count,
     _normalize_crf,
+    _normalize_face_tracking_mode,
     _normalize_face_tracking_strategy,
     _normalize_ffmpeg_threads,
     _normalize_font_size,
@@ -442,6 +443,13 @@ class TestExportNormalizers:
         with pytest.raises(ValueError, match="keep_in_frame.*centered"):
             _normalize_face_tracking_strategy("invalid")
 
+    def test_normalize_face_tracking_mode(self):
+        """Only the trajectory and frames modes are accepted."""
+        assert _normalize_face_tracking_mode(" Trajectory ") == "trajectory"
+        assert _normalize_face_tracking_mode("FRAMES") == "frames"
+        with pytest.raises(ValueError, match="trajectory.*frames"):
+            _normalize_face_tracking_mode("pixels")
+
     def test_normalize_sample_rate_valid(self):
         """Valid sample rates pass through."""
         assert _normalize_sample_rate(1) == 1
@@ -493,6 +493,26 @@ class TestGenerateSrtForClip:
         assert result == str(output_path)
         assert output_path.exists()
 
+    def test_time_map_moves_entries_to_compacted_timeline(self, tmp_path, sample_transcript):
+        """Jump cuts pass a time_map; entries follow the compacted timeline."""
+        generator = SubtitleGenerator()
+
+        transcript_path = tmp_path / "transcript.json"
+        transcript_path.write_text(json.dumps(sample_transcript), encoding="utf-8")
+
+        output_path = tmp_path / "clip.srt"
+        # Half a second of the pause between segments is cut
+        generator.generate_srt_for_clip(
+            str(transcript_path),
+            clip_start=0.0,
+            clip_end=8.0,
+            output_path=str(output_path),
+            time_map=lambda t: t - 0.5 if t >= 3.75 else min(t, 3.5),
+        )
+
+        content = output_path.read_text(encoding="utf-8")
+        assert "00:00:03,500 --> 00:00:07,500\nToday we will discuss AI topics" in content
+
 
 # ============================================================================
 # EDGE CASE TESTS
@@ -230,7 +230,7 @@ class TestTranscribeMethod:
             patch(
                 "src.transcriber.load_whisper_model", return_value=mock_whisper_model
             ),
-            patch("subprocess.run") as mock_subprocess,
+            patch("src.transcriber.run_ffmpeg") as mock_subprocess,
         ):
             # Simulate ffmpeg failure
             mock_subprocess.return_value = MagicMock(
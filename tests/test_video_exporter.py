@@ -3,16 +3,18 @@
 Comprehensive pytest tests for src/video_exporter.py
 
 Tests cover:
-- Helper functions (_safe_parse_ffprobe_r_frame_rate, _resolve_ffmpeg_threads)
-- Filter generation (_get_logo_overlay_filter, _get_subtitle_filter, _get_aspect_ratio_filter)
+- Helper functions (_safe_parse_ffprobe_r_frame_rate from media_info, _resolve_ffmpeg_threads,
+  _resolve_export_workers, _split_thread_budget, _plan_full_video_segments)
+- Filter generation (logo overlay, _get_subtitle_filter, _get_aspect_ratio_filter)
 - Path escaping (_escape_ffmpeg_filter_path)
 - Integration tests with mocked subprocess for _export_single_clip
 """
 
+import json
 import os
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -22,9 +24,24 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 from src.video_exporter import (
     VideoExporter,
-    _safe_parse_ffprobe_r_frame_rate,
     _resolve_ffmpeg_threads,
+    _resolve_export_workers,
+    _split_thread_budget,
+    _plan_single_decode_groups,
+    _plan_smart_cut,
+    _plan_full_video_segments,
+    _count_cfr_frames,
+    _resolve_audio_codec,
+    DRAFT_ENCODER_CHOICE,
+    DRAFT_SCALE_FILTER,
 )
+from src.reframer import CropTrajectory
+from src.utils.jump_cut import JumpCutPlan
+from src.utils.loudness import LoudnessAnalysis
+from src.utils.media_info import _safe_parse_ffprobe_r_frame_rate
+from src.utils.face_presence import FaceCoverage
+from src.utils.render_cache import ClipLayerKeys, RenderCache
+from src.utils.encoder_profile import EncoderChoice, EncoderProfile
 
 
 # ============================================================================
@@ -44,6 +61,25 @@ def exporter():
     return exp
 
 
+def writes_outputs(mock_run):
+    """
+    Make a mocked run_ffmpeg write its -y outputs when it reports success.
+
+    Exports render to a temp name and rename it into place, so the file has to exist.
+    The mock's return_value still decides success, and tests can override it.
+    """
+    def _run(cmd, **kwargs):
+        result = mock_run.return_value
+        if result.returncode == 0:
+            for i, arg in enumerate(cmd):
+                if arg == "-y":
+                    Path(cmd[i + 1]).write_bytes(b"render")
+        return result
+
+    mock_run.side_effect = _run
+    return mock_run
+
+
 # ============================================================================
 # TESTS FOR _safe_parse_ffprobe_r_frame_rate()
 # ============================================================================
@@ -174,126 +210,96 @@ class TestResolveFFmpegThreads:
 
 
 # ============================================================================
-# TESTS FOR _get_logo_overlay_filter()
+# TESTS FOR _resolve_export_workers() / _split_thread_budget()
 # ============================================================================
 
 
-class TestGetLogoOverlayFilter:
-    """Tests for the _get_logo_overlay_filter method."""
+class TestExportWorkerBudget:
+    """Tests for parallel export worker count and per-worker thread budget."""
 
-    def test_top_right_position(self, exporter):
-        """Test logo placement in top-right corner."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="top-right",
-            scale=0.1,
-        )
-        assert len(chains) == 2
-        assert "scale2ref" in chains[0]
-        assert "main_w*0.1" in chains[0]
-        assert "W-w-20:20" in chains[1]  # top-right position
-        assert output == "[v_out]"
+    def test_workers_capped_by_clip_count(self):
+        """Never start more workers than clips."""
+        assert _resolve_export_workers(8, 3) == 3
+        assert _resolve_export_workers(2, 10) == 2
 
-    def test_top_left_position(self, exporter):
-        """Test logo placement in top-left corner."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="top-left",
-            scale=0.1,
-        )
-        assert "20:20" in chains[1]  # top-left position
-        assert output == "[v_out]"
+    def test_auto_workers_from_cpu_count(self):
+        """0 means one worker per 8 CPUs (at least 1)."""
+        with patch("os.cpu_count", return_value=32):
+            assert _resolve_export_workers(0, 10) == 4
+        with patch("os.cpu_count", return_value=4):
+            assert _resolve_export_workers(0, 10) == 1
 
-    def test_bottom_right_position(self, exporter):
-        """Test logo placement in bottom-right corner."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="bottom-right",
-            scale=0.1,
-        )
-        assert "W-w-20:H-h-20" in chains[1]  # bottom-right position
-        assert output == "[v_out]"
+    def test_single_worker_keeps_thread_setting(self):
+        """Sequential export keeps ffmpeg_threads unchanged (0 stays auto)."""
+        assert _split_thread_budget(0, 1) == 0
+        assert _split_thread_budget(6, 1) == 6
+
+    def test_budget_split_between_workers(self):
+        """Each worker gets an equal share of the thread budget."""
+        with patch("os.cpu_count", return_value=32):
+            assert _split_thread_budget(0, 4) == 8
+            assert _split_thread_budget(-2, 3) == 10
+        assert _split_thread_budget(2, 4) == 1
+
+
+# ============================================================================
+# TESTS FOR THE LOGO OVERLAY FILTER
+# ============================================================================
 
-    def test_bottom_left_position(self, exporter):
-        """Test logo placement in bottom-left corner."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="bottom-left",
-            scale=0.1,
-        )
-        assert "20:H-h-20" in chains[1]  # bottom-left position
-        assert output == "[v_out]"
 
-    def test_invalid_position_defaults_to_top_right(self, exporter):
-        """Invalid position defaults to top-right."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="center",  # invalid
-            scale=0.1,
+class TestLogoOverlayFilter:
+    """Tests for the logo overlay built by the clip filter graph."""
+
+    def _graph(self, exporter, position="top-right", scale=0.1, input_size=(1920, 1080)):
+        args = exporter._build_clip_filter_args(
+            video_input_idx=0,
+            logo_input_idx=1,
+            aspect_ratio=None,
+            subtitle_filter=None,
+            logo_position=position,
+            logo_scale=scale,
+            input_size=input_size,
         )
-        assert "W-w-20:20" in chains[1]  # defaults to top-right
+        return args[args.index("-filter_complex") + 1], args[args.index("-map") + 1]
+
+    @pytest.mark.parametrize(
+        "position, expected",
+        [
+            ("top-right", "overlay=W-w-20:20"),
+            ("top-left", "overlay=20:20"),
+            ("bottom-right", "overlay=W-w-20:H-h-20"),
+            ("bottom-left", "overlay=20:H-h-20"),
+            ("center", "overlay=W-w-20:20"),  # invalid → top-right
+        ],
+    )
+    def test_positions(self, exporter, position, expected):
+        graph, output = self._graph(exporter, position=position)
+        assert expected in graph
         assert output == "[v_out]"
 
-    def test_scale_0_1(self, exporter):
-        """Test 10% scale (logo is 10% of video width)."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="top-right",
-            scale=0.1,
-        )
-        assert "main_w*0.1" in chains[0]
-
-    def test_scale_0_25(self, exporter):
-        """Test 25% scale (logo is 25% of video width)."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="top-right",
-            scale=0.25,
-        )
-        assert "main_w*0.25" in chains[0]
-
-    def test_scale_0_5(self, exporter):
-        """Test 50% scale (logo is half of video width)."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="top-right",
-            scale=0.5,
-        )
-        assert "main_w*0.5" in chains[0]
-
-    def test_custom_stream_labels(self, exporter):
-        """Test with custom stream labels."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[v_filtered]",
-            logo_stream="[2:v]",
-            position="top-right",
-            scale=0.15,
-        )
-        assert "[2:v][v_filtered]" in chains[0]
-        assert "main_w*0.15" in chains[0]
-        assert output == "[v_out]"
+    @pytest.mark.parametrize("scale, width", [(0.1, 192), (0.25, 480), (0.5, 960)])
+    def test_logo_prescaled_once_to_static_width(self, exporter, scale, width):
+        """Known video width: the logo is scaled once (no per-frame scale2ref)."""
+        graph, _ = self._graph(exporter, scale=scale)
+        assert graph == f"[1:v]scale={width}:-1[logo0];[0:v][logo0]overlay=W-w-20:20[v_out]"
 
-    def test_filter_chain_structure(self, exporter):
-        """Verify filter chain has correct structure for FFmpeg."""
-        chains, output = exporter._get_logo_overlay_filter(
-            video_stream="[0:v]",
-            logo_stream="[1:v]",
-            position="top-right",
-            scale=0.1,
+    def test_logo_width_follows_aspect_ratio_output(self, exporter):
+        args = exporter._build_clip_filter_args(
+            video_input_idx=0,
+            logo_input_idx=2,
+            aspect_ratio="9:16",
+            subtitle_filter=None,
+            logo_position="top-right",
+            logo_scale=0.1,
         )
-        # First chain: scale2ref with logo and video inputs
-        assert "[1:v][0:v]scale2ref" in chains[0]
-        assert "[logo_scaled][video_for_overlay]" in chains[0]
-        # Second chain: overlay
-        assert "[video_for_overlay][logo_scaled]overlay=" in chains[1]
+        graph = args[args.index("-filter_complex") + 1]
+        assert "[2:v]scale=108:-1[logo0]" in graph
+        assert "[v_filtered][logo0]overlay=W-w-20:20[v_out]" in graph
+
+    def test_unknown_width_falls_back_to_scale2ref(self, exporter):
+        graph, output = self._graph(exporter, scale=0.15, input_size=None)
+        assert "[1:v][0:v]scale2ref=w=main_w*0.15:h=-1" in graph
+        assert output == "[v_out]"
 
 
 # ============================================================================
@@ -462,6 +468,51 @@ class TestGetAspectRatioFilter:
         assert result is None
 
 
+class TestDraftMode:
+    """Tests for low-resolution draft exports (360p short side, x264 ultrafast)."""
+
+    @pytest.mark.parametrize(
+        "aspect_ratio, expected",
+        [
+            ("9:16", "crop=ih*9/16:ih,scale=360:640"),
+            ("1:1", "crop=ih:ih,scale=360:360"),
+            ("16:9", "scale=640:360"),
+        ],
+    )
+    def test_aspect_filter_scaled_to_draft(self, exporter, aspect_ratio, expected):
+        exporter.draft = True
+        assert exporter._get_aspect_ratio_filter(aspect_ratio) == expected
+
+    def test_original_ratio_is_downscaled_only_in_draft(self, exporter):
+        assert exporter._base_video_filter(None) is None
+        exporter.draft = True
+        assert exporter._base_video_filter(None) == DRAFT_SCALE_FILTER
+        assert exporter._output_size(None, (1280, 720)) == (640, 360)
+
+    def test_draft_ignores_encoder_profile(self, exporter):
+        exporter.encoder_profile = MagicMock()
+        exporter.draft = True
+        assert exporter._encoder_choice("9:16") == DRAFT_ENCODER_CHOICE
+        exporter.encoder_profile.choice_for.assert_not_called()
+
+    def test_draft_export_reencodes_instead_of_stream_copy(self, exporter, tmp_path):
+        exporter.output_dir = tmp_path
+        exporter.draft = True
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        clips = [{"clip_id": 1, "start_time": 1.0, "end_time": 5.0}]
+
+        with patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter.export_clips(str(video_path), clips, flat_output=True, stream_copy=True)
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-c:v") + 1] == "libx264"
+        assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+        assert DRAFT_SCALE_FILTER in cmd
+
+
 # ============================================================================
 # TESTS FOR _escape_ffmpeg_filter_path()
 # ============================================================================
@@ -515,10 +566,10 @@ class TestExportSingleClipIntegration:
     @pytest.fixture
     def mock_subprocess_run(self):
         """Mock subprocess.run to capture FFmpeg commands."""
-        with patch("src.video_exporter.subprocess.run") as mock_run:
+        with patch("src.video_exporter.run_ffmpeg") as mock_run:
             # Default: all FFmpeg calls succeed
             mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
-            yield mock_run
+            yield writes_outputs(mock_run)
 
     @pytest.fixture
     def setup_clip_export(self, tmp_path, exporter):
@@ -665,10 +716,10 @@ class TestExportSingleClipIntegration:
         i_indices = [i for i, x in enumerate(cmd) if x == "-i"]
         assert len(i_indices) >= 2  # At least video and logo inputs
 
-    def test_two_step_processing_logo_and_subtitles(
+    def test_single_encode_logo_and_subtitles(
         self, mock_subprocess_run, setup_clip_export, tmp_path
     ):
-        """Test that logo + subtitles uses two-step processing."""
+        """Test that logo + subtitles are burned in a single encode."""
         data = setup_clip_export
 
         # Mock subtitle generator
@@ -698,18 +749,17 @@ class TestExportSingleClipIntegration:
             logo_scale=0.1,
         )
 
-        # Verify subprocess.run was called twice (two-step process)
-        assert mock_subprocess_run.call_count == 2
-
-        # First call should have logo filter_complex and -sn flag
-        first_call_cmd = mock_subprocess_run.call_args_list[0][0][0]
-        assert "-filter_complex" in first_call_cmd
-        assert "-sn" in first_call_cmd  # Discard subtitle streams
+        # Un solo encode: sin archivo intermedio ni segundo paso
+        assert mock_subprocess_run.call_count == 1
+        cmd = mock_subprocess_run.call_args[0][0]
+        assert "-sn" in cmd  # Discard subtitle streams
+        assert "_step1_temp" not in " ".join(cmd)
 
-        # Second call should have subtitle filter
-        second_call_cmd = mock_subprocess_run.call_args_list[1][0][0]
-        cmd_str = " ".join(second_call_cmd)
-        assert "subtitles=" in cmd_str
+        # Logo overlay y subtítulos en el mismo filter_complex, subtítulos al final
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert filter_complex.count("subtitles=") == 1
+        assert filter_complex.index("overlay=") < filter_complex.index("subtitles=")
+        assert cmd[cmd.index("-map") + 1] == "[v_sub]"
 
     def test_audio_mapping_with_face_tracking(
         self, mock_subprocess_run, setup_clip_export, tmp_path
@@ -743,6 +793,7 @@ class TestExportSingleClipIntegration:
                 transcript_path=None,
                 enable_face_tracking=True,
                 face_tracking_strategy="keep_in_frame",
+                face_tracking_mode="frames",
             )
 
             # Verify FaceReframer was used
@@ -848,6 +899,1663 @@ class TestExportSingleClipIntegration:
         preset_index = cmd.index("-preset")
         assert cmd[preset_index + 1] == "fast"
 
+    def test_encoder_profile_choice_is_used(self, mock_subprocess_run, setup_clip_export):
+        """With a calibrated encoder profile, the choice for the output size sets preset and threads."""
+        data = setup_clip_export
+        exporter = data["exporter"]
+        exporter.encoder_profile = EncoderProfile(
+            host="test",
+            ffmpeg_version="ffmpeg version test",
+            crf=23,
+            encoders=["libx264"],
+            choices={
+                "1080x1920": EncoderChoice(encoder="libx264", preset="veryfast", threads=2),
+                "1920x1080": EncoderChoice(encoder="libx264", preset="faster", threads=4),
+            },
+        )
+
+        exporter._export_single_clip(
+            video_path=data["video_path"],
+            clip=data["clip"],
+            video_name="test_video",
+            output_dir=data["output_dir"],
+            aspect_ratio="9:16",
+            add_subtitles=False,
+            transcript_path=None,
+            video_crf=20,
+            ffmpeg_threads=exporter._profile_threads(0, "9:16"),
+        )
+
+        cmd = mock_subprocess_run.call_args[0][0]
+        assert cmd[cmd.index("-preset") + 1] == "veryfast"
+        assert cmd[cmd.index("-crf") + 1] == "20"
+        assert cmd[cmd.index("-threads") + 1] == "2"
+        # Un valor explícito de ffmpeg_threads gana sobre el perfil
+        assert exporter._profile_threads(3, "9:16") == 3
+
+
+# ============================================================================
+# TESTS FOR stream-copy (smart cut) export
+# ============================================================================
+
+
+class TestPlanSmartCut:
+    """Tests for _plan_smart_cut()."""
+
+    def test_copy_span_between_inner_keyframes(self):
+        keyframes = [0.0, 2.0, 4.0, 6.0, 8.0]
+        assert _plan_smart_cut(keyframes, 1.5, 7.5) == (2.0, 6.0)
+
+    def test_keyframe_on_clip_edges(self):
+        keyframes = [0.0, 2.0, 4.0, 6.0]
+        assert _plan_smart_cut(keyframes, 2.0, 6.0) == (2.0, 6.0)
+
+    def test_no_complete_gop_returns_none(self):
+        assert _plan_smart_cut([0.0, 10.0], 1.0, 9.0) is None
+        assert _plan_smart_cut([0.0, 2.0, 2.5], 1.5, 3.0, min_copy=1.0) is None
+
+
+class TestExportSmartCutClip:
+    """Tests for _export_smart_cut_clip() with mocked subprocess and probe."""
+
+    PACKETS = [(t / 10.0, t % 20 == 0) for t in range(0, 101)]  # keyframe every 2s
+
+    def test_copies_full_gops_and_encodes_edges(self, exporter, tmp_path):
+        output_path = tmp_path / "1.mp4"
+        with patch.object(exporter, "get_video_info", return_value={"codec": "h264", "pix_fmt": "yuv420p"}), \
+             patch.object(exporter, "_probe_video_packets", return_value=self.PACKETS), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            writes_outputs(mock_run)
+            result = exporter._export_smart_cut_clip(
+                video_path=tmp_path / "video.mp4",
+                clip_id=1,
+                start_time=1.5,
+                end_time=7.5,
+                output_path=output_path,
+            )
+
+        assert result == output_path
+        head, copy, tail, mux = [c[0][0] for c in mock_run.call_args_list]
+
+        assert head[head.index("-ss") + 1] == "1.5"
+        assert head[head.index("-c:v") + 1] == "libx264"
+        assert copy[copy.index("-ss") + 1] == "2.0"
+        assert copy[copy.index("-c:v") + 1] == "copy"
+        # 2.0 <= pts < 6.0 → 40 paquetes (cada 0.1s)
+        assert copy[copy.index("-frames:v") + 1] == "40"
+        assert tail[tail.index("-ss") + 1] == "6.0"
+
+        # Concat demuxer + audio re-encodeado una vez para toda la ventana
+        assert mux[mux.index("-f") + 1] == "concat"
+        assert mux[mux.index("-c:v") + 1] == "copy"
+        assert mux[mux.index("-c:a") + 1] == "aac"
+        # Escribe a un temporal y lo renombra al terminar
+        assert mux[-1] == str(tmp_path / "1_partial_temp.mp4")
+        assert output_path.exists() and not Path(mux[-1]).exists()
+        assert not (tmp_path / "1_smartcut_temp").exists()
+
+    def test_keyframe_index_replaces_packet_probe(self, exporter, tmp_path):
+        from src.utils.keyframe_index import KeyframeIndex
+
+        index = KeyframeIndex(
+            source_size=0,
+            source_mtime=0.0,
+            duration=10.0,
+            keyframe_times=[0.0, 2.0, 4.0, 6.0, 8.0],
+            keyframe_offsets=[0, 10, 20, 30, 40],
+            gop_packet_counts=[20, 20, 20, 20, 20],
+        )
+        with patch.object(exporter, "get_video_info", return_value={"codec": "h264", "pix_fmt": "yuv420p"}), \
+             patch.object(exporter, "_probe_video_packets") as probe, \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter._export_smart_cut_clip(
+                video_path=tmp_path / "video.mp4",
+                clip_id=1,
+                start_time=1.5,
+                end_time=7.5,
+                output_path=tmp_path / "1.mp4",
+                keyframe_index=index,
+            )
+
+        probe.assert_not_called()
+        copy = mock_run.call_args_list[1][0][0]
+        assert copy[copy.index("-ss") + 1] == "2.0"
+        assert copy[copy.index("-frames:v") + 1] == "40"
+
+    def test_non_h264_source_returns_none(self, exporter, tmp_path):
+        with patch.object(exporter, "get_video_info", return_value={"codec": "vp9"}), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            result = exporter._export_smart_cut_clip(
+                video_path=tmp_path / "video.mp4",
+                clip_id=1,
+                start_time=1.5,
+                end_time=7.5,
+                output_path=tmp_path / "1.mp4",
+            )
+
+        assert result is None
+        mock_run.assert_not_called()
+
+    def test_single_clip_falls_back_to_encode(self, exporter, tmp_path):
+        """If the fast path does not apply, the regular libx264 export runs."""
+        with patch.object(exporter, "_export_smart_cut_clip", return_value=None) as smart_cut, \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            writes_outputs(mock_run)
+            result = exporter._export_single_clip(
+                video_path=tmp_path / "video.mp4",
+                clip={"clip_id": 1, "start_time": 1.0, "end_time": 5.0},
+                video_name="video",
+                output_dir=tmp_path,
+                stream_copy=True,
+            )
+
+        smart_cut.assert_called_once()
+        assert result == tmp_path / "1.mp4"
+        assert "libx264" in mock_run.call_args[0][0]
+
+    def test_filters_disable_fast_path(self, exporter, tmp_path):
+        with patch.object(exporter, "_export_smart_cut_clip") as smart_cut, \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter._export_single_clip(
+                video_path=tmp_path / "video.mp4",
+                clip={"clip_id": 1, "start_time": 1.0, "end_time": 5.0},
+                video_name="video",
+                output_dir=tmp_path,
+                aspect_ratio="9:16",
+                stream_copy=True,
+            )
+
+        smart_cut.assert_not_called()
+
+
+# ============================================================================
+# TESTS FOR export_full_video()
+# ============================================================================
+
+
+class TestExportFullVideo:
+    """Tests for export_full_video with mocked subprocess."""
+
+    def test_logo_and_subtitles_single_encode(self, exporter, tmp_path):
+        """Logo + subtitles are burned in one ffmpeg call."""
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        srt_path = tmp_path / "video.srt"
+        srt_path.write_text("1\n00:00:00,000 --> 00:00:05,000\nTest\n")
+        logo_path = tmp_path / "logo.png"
+        logo_path.touch()
+
+        with patch("src.video_exporter.run_ffmpeg") as mock_run, \
+             patch("src.utils.logo.coerce_logo_file", return_value=str(logo_path)):
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            output = exporter.export_full_video(
+                video_path=str(video_path),
+                output_filename="short.mp4",
+                srt_path=str(srt_path),
+                add_logo=True,
+                logo_path=str(logo_path),
+                flat_output=True,
+            )
+
+        assert output == str(tmp_path / "short.mp4")
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert filter_complex.count("subtitles=") == 1
+        assert filter_complex.index("overlay=") < filter_complex.index("subtitles=")
+        assert "-sn" in cmd
+
+
+    def test_segmented_encode_and_concat(self, exporter, tmp_path):
+        """Segments start after a keyframe, burn subtitles on the window clock and are concatenated."""
+        from src.utils.keyframe_index import KeyframeIndex
+
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        srt_path = tmp_path / "video.srt"
+        srt_path.write_text("1\n00:00:00,000 --> 00:00:05,000\nTest\n")
+        index = KeyframeIndex(
+            source_size=0,
+            source_mtime=0.0,
+            duration=240.0,
+            keyframe_times=[float(t) for t in range(0, 240, 10)],
+            keyframe_offsets=list(range(24)),
+            gop_packet_counts=[250] * 24,
+        )
+        concat_lists = []
+
+        def _fake_run(cmd, **kwargs):
+            if "concat" in cmd:
+                concat_lists.append(Path(cmd[cmd.index("-i") + 1]).read_text(encoding="utf-8"))
+            return MagicMock(returncode=0, stderr="", stdout="")
+
+        info = {"duration": 240.0, "fps": 25.0, "r_frame_rate": "25/1", "avg_frame_rate": "25/1"}
+        with patch.object(exporter, "get_video_info", return_value=info), \
+             patch("src.video_exporter.load_or_build_keyframe_index", return_value=index), \
+             patch("src.video_exporter.run_ffmpeg", side_effect=_fake_run) as mock_run:
+            output = exporter.export_full_video(
+                video_path=str(video_path),
+                output_filename="short.mp4",
+                srt_path=str(srt_path),
+                transcript_path=str(tmp_path / "video_transcript.json"),
+                flat_output=True,
+                segments=4,
+            )
+
+        assert output == str(tmp_path / "short.mp4")
+        *segment_cmds, mux = [c[0][0] for c in mock_run.call_args_list]
+        assert len(segment_cmds) == 4
+        starts = [float(cmd[cmd.index("-ss") + 1]) for cmd in segment_cmds]
+        assert starts == [0.0, 60.02, 120.02, 180.02]
+        # Una sola cadena lineal: va como -vf
+        second = segment_cmds[1][segment_cmds[1].index("-vf") + 1]
+        assert second.startswith("setpts=PTS+60.020000/TB,subtitles=")
+        assert second.endswith("setpts=PTS-60.020000/TB")
+        assert all("-an" in cmd and cmd[cmd.index("-f") + 1] == "mpegts" for cmd in segment_cmds)
+
+        # Audio una sola vez para toda la ventana; duraciones exactas en frames
+        assert mux[mux.index("-c:v") + 1] == "copy"
+        assert mux[mux.index("-c:a") + 1] == "aac"
+        assert mux[mux.index("-t") + 1] == "240.0"
+        assert "duration 60.040000" in concat_lists[0]
+        assert "duration 59.960000" in concat_lists[0]
+        assert not (tmp_path / "short_segments_temp").exists()
+
+    def test_segmented_falls_back_for_vfr_source(self, exporter, tmp_path):
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        info = {
+            "duration": 240.0,
+            "fps": 30.0,
+            "r_frame_rate": "30/1",
+            "avg_frame_rate": "2400/97",
+            "is_cfr": False,
+        }
+        with patch.object(exporter, "get_video_info", return_value=info), \
+             patch("src.video_exporter.load_or_build_keyframe_index") as build_index, \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter.export_full_video(video_path=str(video_path), flat_output=True, segments=4)
+
+        build_index.assert_not_called()
+        assert mock_run.call_count == 1
+        assert "libx264" in mock_run.call_args[0][0]
+
+
+class TestAudioPassthrough:
+    """Tests for audio stream copy when the source audio fits the MP4 output."""
+
+    def test_resolve_audio_codec(self):
+        assert _resolve_audio_codec("aac", passthrough=True) == "copy"
+        assert _resolve_audio_codec("aac") == "aac"
+        assert _resolve_audio_codec("opus", passthrough=True) == "aac"
+        assert _resolve_audio_codec(None) == "aac"
+
+    def test_export_clips_copies_aac_source_audio(self, exporter, tmp_path):
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        clips = [{"clip_id": 1, "start_time": 1.0, "end_time": 5.0}]
+
+        # Opt-in: sin pedirlo el audio se re-encodea
+        for passthrough, expected in ((True, "copy"), (False, "aac"), (None, "aac")):
+            kwargs = {} if passthrough is None else {"audio_passthrough": passthrough}
+            with patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+                 patch("src.video_exporter.run_ffmpeg") as mock_run:
+                mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+                exporter.export_clips(str(video_path), clips, flat_output=True, **kwargs)
+
+            cmd = mock_run.call_args[0][0]
+            assert cmd[cmd.index("-c:a") + 1] == expected
+
+    def test_render_key_depends_on_audio_codec(self, exporter):
+        key_args = dict(
+            source_id="source",
+            start_time=1.0,
+            end_time=5.0,
+            aspect_ratio=None,
+            uses_face_tracking=False,
+            face_tracking_strategy="keep_in_frame",
+            face_tracking_sample_rate=3,
+            logo_digest=None,
+            logo_position="top-right",
+            logo_scale=0.1,
+            srt_digest=None,
+            subtitle_style="default",
+            custom_style=None,
+            video_crf=23,
+            smart_cut=False,
+        )
+        assert exporter._clip_render_key(**key_args) == exporter._clip_render_key(**key_args, audio_codec="aac")
+        assert exporter._clip_render_key(**key_args) != exporter._clip_render_key(**key_args, audio_codec="copy")
+
+
+class TestLoudnessNormalization:
+    """Tests for per-clip loudness filters computed from the cached source analysis."""
+
+    def _analysis(self):
+        blocks = 200
+        return LoudnessAnalysis(
+            source_size=1,
+            source_mtime=0.0,
+            block_ends=[round((i + 1) * 0.1, 1) for i in range(blocks)],
+            momentary=[-20.0] * blocks,
+            short_term=[-20.0] * blocks,
+            true_peaks=[-12.0] * blocks,
+        )
+
+    def test_export_clips_filters_and_encodes_audio(self, exporter, tmp_path):
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        clips = [{"clip_id": 1, "start_time": 1.0, "end_time": 5.0}]
+
+        with patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+             patch("src.video_exporter.load_or_build_loudness_analysis", return_value=self._analysis()), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter.export_clips(
+                str(video_path), clips, flat_output=True, loudness_normalization="gain", loudness_target_lufs=-14.0
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-filter:a") + 1] == "volume=6.00dB"
+        # Con filtro de audio no puedo copiar el stream
+        assert cmd[cmd.index("-c:a") + 1] == "aac"
+
+    def test_off_does_not_analyze(self, exporter, tmp_path):
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        clips = [{"clip_id": 1, "start_time": 1.0, "end_time": 5.0}]
+
+        with patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+             patch("src.video_exporter.load_or_build_loudness_analysis") as mock_analysis, \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter.export_clips(str(video_path), clips, flat_output=True)
+
+        mock_analysis.assert_not_called()
+        assert "-filter:a" not in mock_run.call_args[0][0]
+
+
+class TestJumpCuts:
+    """Tests for jump cuts applied inside the clip encode (jump_cut_max_silence_ms)."""
+
+    CLIPS = [{"clip_id": 1, "start_time": 10.0, "end_time": 15.0}]
+
+    @pytest.fixture
+    def setup(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"source" * 1000)
+        transcript = tmp_path / "video_transcript.json"
+        words = [
+            {"word": "uno", "start": 10.0, "end": 11.0},
+            {"word": "dos", "start": 13.0, "end": 14.0},
+        ]
+        transcript.write_text(json.dumps({"segments": [{"start": 10.0, "end": 14.0, "words": words}]}))
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        return exporter, video_path, transcript
+
+    def _export(self, exporter, video_path, transcript, **kwargs):
+        with patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=self.CLIPS,
+                transcript_path=str(transcript),
+                flat_output=True,
+                **kwargs,
+            )
+        return result, mock_run
+
+    def test_cuts_are_filtered_in_the_single_encode(self, setup):
+        exporter, video_path, transcript = setup
+        result, mock_run = self._export(
+            exporter,
+            video_path,
+            transcript,
+            aspect_ratio="9:16",
+            add_subtitles=True,
+            jump_cut_max_silence_ms=400,
+            stream_copy=True,
+            single_decode=True,
+        )
+
+        assert len(result) == 1
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+        video_filter = cmd[cmd.index("-vf") + 1]
+        assert video_filter.startswith(
+            "select='gte(t,0.000)*lt(t,1.200)+gte(t,2.800)',setpts='(T-gte(T,2.800)*1.600)/TB',crop="
+        )
+        assert cmd[cmd.index("-filter:a") + 1].startswith("aselect=")
+        assert cmd[cmd.index("-fps_mode") + 1] == "passthrough"
+        # Con filtro de audio no hay passthrough
+        assert cmd[cmd.index("-c:a") + 1] == "aac"
+
+        # Los subtítulos se generan sobre la línea de tiempo compactada
+        time_map = exporter.subtitle_generator.generate_srt_for_clip.call_args.kwargs["time_map"]
+        assert round(time_map(3.0), 3) == 1.4
+
+    def test_disabled_by_default(self, setup):
+        exporter, video_path, transcript = setup
+        _, mock_run = self._export(exporter, video_path, transcript, aspect_ratio="9:16", audio_passthrough=True)
+
+        cmd = mock_run.call_args[0][0]
+        assert "select=" not in " ".join(cmd)
+        assert "-fps_mode" not in cmd
+        # Sin filtro de audio el passthrough sigue disponible
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+
+    def test_multi_aspect_cuts_before_the_split(self, setup):
+        exporter, video_path, transcript = setup
+        _, mock_run = self._export(
+            exporter, video_path, transcript, aspect_ratios=["9:16", "1:1"], jump_cut_max_silence_ms=400
+        )
+
+        cmd = mock_run.call_args[0][0]
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert filter_complex.startswith("[0:v]select=")
+        assert filter_complex.count("select=") == 1
+        assert "split=2[vsrc_9x16][vsrc_1x1]" in filter_complex
+        assert cmd.count("-fps_mode") == 2
+
+    def test_render_key_depends_on_cuts(self, exporter):
+        key_args = dict(
+            source_id="source",
+            start_time=10.0,
+            end_time=15.0,
+            aspect_ratio="9:16",
+            uses_face_tracking=False,
+            face_tracking_strategy="keep_in_frame",
+            face_tracking_sample_rate=3,
+            logo_digest=None,
+            logo_position="top-right",
+            logo_scale=0.1,
+            srt_digest=None,
+            subtitle_style="default",
+            custom_style=None,
+            video_crf=23,
+            smart_cut=False,
+        )
+        plan = JumpCutPlan(keep=((0.0, 1.2), (2.8, 5.0)), window=5.0)
+        assert exporter._clip_render_key(**key_args) != exporter._clip_render_key(
+            **key_args, jump_cut_filter=plan.video_filter()
+        )
+
+
+class TestFacePresence:
+    """Tests for skipping face tracking on sources without faces (face_coverage_threshold)."""
+
+    CLIPS = [{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}, {"clip_id": 2, "start_time": 5.0, "end_time": 9.0}]
+
+    @pytest.fixture
+    def setup(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"source" * 1000)
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        return exporter, video_path
+
+    def _coverage(self, video_path, frames_with_face):
+        stat = video_path.stat()
+        return FaceCoverage(
+            source_size=stat.st_size, source_mtime=stat.st_mtime, samples=36, frames_with_face=frames_with_face
+        )
+
+    def _export(self, exporter, video_path, probed, **kwargs):
+        with patch("src.video_exporter.probe_face_coverage", return_value=probed) as probe, \
+             patch("src.video_exporter.FaceReframer") as reframer_cls, \
+             patch("src.video_exporter.load_or_build_keyframe_index", return_value=None), \
+             patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=self.CLIPS,
+                aspect_ratio="9:16",
+                enable_face_tracking=True,
+                face_tracking_mode="frames",
+                flat_output=True,
+                **kwargs,
+            )
+        return result, probe, reframer_cls, mock_run
+
+    def test_low_coverage_uses_static_crop(self, setup):
+        exporter, video_path = setup
+        probed = self._coverage(video_path, 1)
+        result, probe, reframer_cls, mock_run = self._export(exporter, video_path, probed)
+
+        assert len(result) == 2
+        probe.assert_called_once_with(str(video_path))
+        reframer_cls.assert_not_called()
+        assert mock_run.call_count == 2
+        assert "crop=" in mock_run.call_args[0][0][mock_run.call_args[0][0].index("-vf") + 1]
+        assert exporter.last_face_coverage == probed
+
+    def test_cached_coverage_skips_probe(self, setup):
+        exporter, video_path = setup
+        cached = self._coverage(video_path, 30)
+        _, probe, reframer_cls, _ = self._export(exporter, video_path, None, face_coverage=cached)
+
+        probe.assert_not_called()
+        assert reframer_cls.return_value.reframe_video.call_count == 2
+        assert exporter.last_face_coverage == cached
+
+    def test_stale_coverage_is_probed_again(self, setup):
+        exporter, video_path = setup
+        stale = FaceCoverage(source_size=1, source_mtime=0.0, samples=36, frames_with_face=30)
+        _, probe, reframer_cls, _ = self._export(
+            exporter, video_path, self._coverage(video_path, 0), face_coverage=stale
+        )
+
+        probe.assert_called_once()
+        reframer_cls.assert_not_called()
+
+    def test_unknown_coverage_keeps_face_tracking(self, setup):
+        exporter, video_path = setup
+        _, _, reframer_cls, _ = self._export(exporter, video_path, None)
+
+        assert reframer_cls.return_value.reframe_video.call_count == 2
+        assert exporter.last_face_coverage is None
+
+    def test_zero_threshold_never_skips(self, setup):
+        exporter, video_path = setup
+        _, _, reframer_cls, _ = self._export(
+            exporter, video_path, self._coverage(video_path, 0), face_coverage_threshold=0.0
+        )
+
+        assert reframer_cls.return_value.reframe_video.call_count == 2
+
+
+class TestFaceTrackingTrajectory:
+    """Tests for face_tracking_mode="trajectory": ffmpeg crops along the face path in the clip encode."""
+
+    CLIP = {"clip_id": "c1", "start_time": 10.0, "end_time": 20.0}
+    MOVING = CropTrajectory(
+        width=1080, height=1920, region_width=608, region_height=1080, region_y=0,
+        points=((0.0, 656), (1.5, 900)),
+    )
+
+    def _export_single(self, exporter, tmp_path, reframer_cls, **kwargs):
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        with patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter._export_single_clip(
+                video_path=video_path,
+                clip=self.CLIP,
+                video_name="video",
+                output_dir=tmp_path,
+                aspect_ratio="9:16",
+                enable_face_tracking=True,
+                **kwargs,
+            )
+        return result, mock_run
+
+    def test_crop_follows_the_trajectory_in_the_single_encode(self, exporter, tmp_path):
+        render_cache = MagicMock()
+        with patch("src.video_exporter.FaceReframer") as reframer_cls:
+            reframer = reframer_cls.return_value
+            reframer.compute_crop_trajectories.return_value = {"9:16": self.MOVING}
+            result, mock_run = self._export_single(
+                exporter, tmp_path, reframer_cls, render_cache=render_cache, render_key="key"
+            )
+
+        assert result == tmp_path / "c1.mp4"
+        reframer.reframe_video.assert_not_called()
+        kwargs = reframer.compute_crop_trajectories.call_args.kwargs
+        assert kwargs["outputs"] == {"9:16": (1080, 1920)}
+        assert (kwargs["start_time"], kwargs["end_time"]) == (10.0, 20.0)
+
+        # Un solo proceso, una sola entrada: la fuente (video y audio)
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 1
+        assert cmd[cmd.index("-vf") + 1].startswith(
+            "sendcmd=c='1.500 crop@reframe_9x16 x 900',crop@reframe_9x16=608:1080:656:0,scale=1080:1920"
+        )
+        assert "0:a?" in cmd and "1:a?" not in cmd
+        assert not list(tmp_path.glob("*_reframed_temp.mp4"))
+        render_cache.store.assert_called_once_with("key", result)
+
+    def test_logo_and_subtitles_go_after_the_crop(self, exporter, tmp_path):
+        logo = tmp_path / "logo.png"
+        logo.write_bytes(b"png")
+        with patch("src.video_exporter.FaceReframer") as reframer_cls:
+            reframer_cls.return_value.compute_crop_trajectories.return_value = {"9:16": self.MOVING}
+            _, mock_run = self._export_single(
+                exporter, tmp_path, reframer_cls, add_logo=True, logo_path=str(logo)
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 2
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert filter_complex.startswith("[0:v]sendcmd=")
+        assert filter_complex.index("crop@reframe_9x16=") < filter_complex.index("overlay=")
+        assert "[1:v]" in filter_complex
+
+    def test_unavailable_trajectory_reframes_frames(self, exporter, tmp_path):
+        render_cache = MagicMock()
+        with patch("src.video_exporter.FaceReframer") as reframer_cls:
+            reframer = reframer_cls.return_value
+            reframer.compute_crop_trajectories.side_effect = ValueError("variable frame rate")
+            reframer.reframe_video.side_effect = lambda **kw: Path(kw["output_path"]).write_bytes(b"reframed")
+            result, mock_run = self._export_single(
+                exporter, tmp_path, reframer_cls, render_cache=render_cache, render_key="key"
+            )
+
+        assert result == tmp_path / "c1.mp4"
+        reframer.reframe_video.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 2
+        assert "1:a?" in cmd
+        # La salida por frames no corresponde a la clave del modo trajectory
+        render_cache.store.assert_not_called()
+
+    def test_frames_mode_keeps_the_vertical_encoder_choice(self, exporter, tmp_path):
+        exporter.encoder_profile = EncoderProfile(
+            host="test",
+            ffmpeg_version="ffmpeg version test",
+            crf=23,
+            encoders=["libx264"],
+            choices={
+                "1080x1920": EncoderChoice(encoder="libx264", preset="veryfast", threads=2),
+                # Sin tamaño de salida el perfil elige la resolución más grande
+                "3840x2160": EncoderChoice(encoder="libx264", preset="medium", threads=8),
+            },
+        )
+        with patch("src.video_exporter.FaceReframer") as reframer_cls:
+            reframer = reframer_cls.return_value
+            reframer.reframe_video.side_effect = lambda **kw: Path(kw["output_path"]).write_bytes(b"reframed")
+            _, mock_run = self._export_single(exporter, tmp_path, reframer_cls, face_tracking_mode="frames")
+
+        cmd = mock_run.call_args[0][0]
+        # El reencuadre ya está hecho (sin crop en el grafo) pero la salida sigue siendo 9:16
+        assert "crop=" not in " ".join(cmd)
+        assert cmd[cmd.index("-preset") + 1] == "veryfast"
+
+    def test_clips_share_one_face_track(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"source" * 1000)
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        clips = [self.CLIP, {"clip_id": "c2", "start_time": 15.0, "end_time": 25.0}]
+        track = MagicMock()
+        with patch("src.video_exporter.FaceReframer") as reframer_cls, \
+             patch("src.video_exporter.probe_face_coverage", return_value=None), \
+             patch("src.video_exporter.open_face_track", return_value=track) as open_track, \
+             patch.object(exporter, "get_video_info", return_value={"audio_codec": "aac"}), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            reframer = reframer_cls.return_value
+            reframer.compute_crop_trajectories.return_value = {"9:16": self.MOVING}
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=clips,
+                aspect_ratio="9:16",
+                enable_face_tracking=True,
+                flat_output=True,
+            )
+
+        assert len(result) == 2
+        open_track.assert_called_once_with(str(video_path), None)
+        calls = reframer.compute_crop_trajectories.call_args_list
+        assert [c.kwargs["face_track"] for c in calls] == [track, track]
+
+    def test_mode_is_part_of_the_render_key(self, exporter):
+        frames = exporter._face_tracking_key_part(True, "keep_in_frame", 3, "9:16", "frames")
+        assert frames == {"strategy": "keep_in_frame", "sample_rate": 3, "target": [1080, 1920]}
+        assert exporter._face_tracking_key_part(True, "keep_in_frame", 3, "9:16", "trajectory") == {
+            **frames,
+            "mode": "trajectory",
+        }
+        assert exporter._face_tracking_key_part(False, "keep_in_frame", 3, "9:16", "trajectory") is None
+
+    def test_variants_crop_each_branch_of_the_source(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"source" * 1000)
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        square = CropTrajectory(
+            width=1080, height=1080, region_width=1080, region_height=1080, region_y=0, points=((0.0, 420),)
+        )
+        with patch("src.video_exporter.FaceReframer") as reframer_cls, \
+             patch("src.video_exporter.probe_face_coverage", return_value=None), \
+             patch("src.video_exporter.load_or_build_keyframe_index") as keyframes, \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            reframer = reframer_cls.return_value
+            reframer.compute_crop_trajectories.return_value = {"9:16": self.MOVING, "1:1": square}
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=[{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}],
+                aspect_ratios=["9:16", "1:1", "16:9"],
+                enable_face_tracking=True,
+                flat_output=True,
+            )
+
+        assert len(result) == 3
+        reframer.compute_crop_trajectories.assert_called_once()
+        assert reframer.compute_crop_trajectories.call_args.kwargs["outputs"] == {
+            "9:16": (1080, 1920),
+            "1:1": (1080, 1080),
+        }
+        reframer.reframe_video_variants.assert_not_called()
+        keyframes.assert_not_called()
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 1
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert filter_complex.startswith("[0:v]split=3[vsrc_9x16][vsrc_1x1][vsrc_16x9]")
+        assert "[vsrc_9x16]sendcmd=c='1.500 crop@reframe_9x16 x 900',crop@reframe_9x16=608:1080:656:0" in filter_complex
+        assert "[vsrc_1x1]crop=1080:1080:420:0" in filter_complex
+
+
+class TestPlanFullVideoSegments:
+    """Tests for _plan_full_video_segments() / _count_cfr_frames()."""
+
+    KEYFRAMES = [float(t) for t in range(0, 300, 10)]
+
+    def test_cuts_half_a_frame_after_nearest_keyframe(self):
+        plan = _plan_full_video_segments(5.0, 245.0, self.KEYFRAMES, 4, 0.04)
+        assert plan == [(5.0, 60.02), (60.02, 120.02), (120.02, 180.02), (180.02, 245.0)]
+
+    def test_short_window_is_not_split(self):
+        assert _plan_full_video_segments(0.0, 90.0, self.KEYFRAMES, 4, 0.04) == [(0.0, 90.0)]
+        assert _plan_full_video_segments(0.0, 90.0, [0.0], 4, 0.04, min_segment=10.0) == [(0.0, 90.0)]
+
+    def test_sparse_keyframes_do_not_duplicate_cuts(self):
+        plan = _plan_full_video_segments(0.0, 200.0, [0.0, 100.0], 4, 0.04, min_segment=10.0)
+        assert plan == [(0.0, 100.02), (100.02, 200.0)]
+
+    def test_count_cfr_frames(self):
+        assert _count_cfr_frames(0.0, 60.02, 0.0, 0.04) == 1501
+        assert _count_cfr_frames(60.02, 120.02, 0.0, 0.04) == 1500
+        assert _count_cfr_frames(0.01, 0.04, 0.0, 0.04) == 0
+
+
+# ============================================================================
+# TESTS FOR export_clips() parallel mode
+# ============================================================================
+
+
+class TestExportClipsParallel:
+    """Tests for export_clips with a bounded worker pool."""
+
+    def _clips(self, count):
+        return [
+            {"clip_id": i, "start_time": i * 10.0, "end_time": i * 10.0 + 5.0}
+            for i in range(1, count + 1)
+        ]
+
+    def test_parallel_export_preserves_clip_order(self, exporter, tmp_path):
+        """Results follow clip order regardless of completion order."""
+        import threading
+        import time
+
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        seen_threads = []
+        seen_lock = threading.Lock()
+
+        def fake_export(**kwargs):
+            clip_id = kwargs["clip"]["clip_id"]
+            with seen_lock:
+                seen_threads.append((clip_id, kwargs["ffmpeg_threads"]))
+            # Later clips finish first
+            time.sleep(0.01 * (5 - clip_id))
+            return kwargs["output_dir"] / f"{clip_id}.mp4"
+
+        progress_calls = []
+        with patch.object(exporter, "_export_single_clip", side_effect=fake_export), \
+             patch("os.cpu_count", return_value=16):
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=self._clips(4),
+                flat_output=True,
+                export_workers=4,
+                progress_callback=lambda done, total, clip_id: progress_calls.append((done, total)),
+            )
+
+        assert result == [str(tmp_path / f"{i}.mp4") for i in range(1, 5)]
+        assert all(threads == 4 for _, threads in seen_threads)
+        assert progress_calls == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    def test_failed_clips_are_skipped(self, exporter, tmp_path):
+        """Clips whose export returns None are left out of the result."""
+        exporter.output_dir = tmp_path
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+
+        def fake_export(**kwargs):
+            clip_id = kwargs["clip"]["clip_id"]
+            return None if clip_id == 2 else kwargs["output_dir"] / f"{clip_id}.mp4"
+
+        with patch.object(exporter, "_export_single_clip", side_effect=fake_export):
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=self._clips(3),
+                flat_output=True,
+                export_workers=2,
+            )
+
+        assert result == [str(tmp_path / "1.mp4"), str(tmp_path / "3.mp4")]
+
+
+# ============================================================================
+# TESTS FOR single-decode export
+# ============================================================================
+
+
+class TestPlanSingleDecodeGroups:
+    """Tests for _plan_single_decode_groups()."""
+
+    def test_nearby_clips_share_a_group(self):
+        windows = [(20.0, 30.0), (0.0, 10.0), (12.0, 18.0)]
+        assert _plan_single_decode_groups(windows, max_gap=5.0) == [[1, 2, 0]]
+
+    def test_large_gap_starts_new_group(self):
+        windows = [(0.0, 10.0), (100.0, 110.0), (105.0, 120.0)]
+        assert _plan_single_decode_groups(windows, max_gap=30.0) == [[0], [1, 2]]
+
+    def test_branch_cap_splits_groups(self):
+        windows = [(i * 5.0, i * 5.0 + 4.0) for i in range(5)]
+        assert _plan_single_decode_groups(windows, max_branches=2) == [[0, 1], [2, 3], [4]]
+
+
+class TestExportClipGroup:
+    """Tests for _export_clip_group() with mocked subprocess and probe."""
+
+    SOURCE_INFO = {
+        "duration": 120.0,
+        "width": 1920,
+        "height": 1080,
+        "fps": 30.0,
+        "r_frame_rate": "30/1",
+        "codec": "h264",
+        "has_audio": True,
+        "audio_codec": "aac",
+    }
+
+    def _clip_jobs(self, tmp_path):
+        return [
+            ({"clip_id": 1, "start_time": 10.0, "end_time": 20.0}, tmp_path),
+            ({"clip_id": 2, "start_time": 15.0, "end_time": 30.0}, tmp_path),
+        ]
+
+    def test_command_splits_one_decode_into_outputs(self, exporter, tmp_path):
+        logo_path = tmp_path / "logo.png"
+        logo_path.touch()
+
+        with patch.object(exporter, "get_video_info", return_value=dict(self.SOURCE_INFO)), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            writes_outputs(mock_run)
+            result = exporter._export_clip_group(
+                video_path=tmp_path / "video.mp4",
+                clip_jobs=self._clip_jobs(tmp_path),
+                aspect_ratio="9:16",
+                add_logo=True,
+                logo_path=str(logo_path),
+                logo_scale=0.1,
+            )
+
+        assert result == [tmp_path / "1.mp4", tmp_path / "2.mp4"]
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+
+        # Una sola entrada de video, decodificada desde el primer clip hasta el último
+        assert cmd[cmd.index("-ss") + 1] == "10.0"
+        assert cmd[cmd.index("-t") + 1] == "20.0"
+
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert "[0:v]split=2[vsrc0][vsrc1]" in filter_complex
+        assert "[0:a]asplit=2[asrc0][asrc1]" in filter_complex
+        assert "trim=start=0.000000:end=10.000000,setpts=PTS-STARTPTS" in filter_complex
+        assert "trim=start=5.000000:end=20.000000,setpts=PTS-STARTPTS" in filter_complex
+        assert "atrim=start=5.000000:end=20.000000,asetpts=PTS-STARTPTS[aout1]" in filter_complex
+        # Logo escalado una vez al ancho de salida (1080 * 0.1), sin scale2ref por rama
+        assert "[1:v]scale=108:-1,split=2[logo0][logo1]" in filter_complex
+        assert "scale2ref" not in filter_complex
+
+        # Cada salida mapea su rama y fija el frame rate del fuente
+        assert cmd.count("-r") == 2
+        assert cmd[cmd.index("-r") + 1] == "30/1"
+        assert cmd.count("-sn") == 2
+        assert "[vlogo0]" in cmd and "[aout1]" in cmd
+        assert cmd[-1] == str(tmp_path / "2_partial_temp.mp4")
+        assert (tmp_path / "2.mp4").exists()
+
+    def test_copied_audio_uses_one_input_per_clip(self, exporter, tmp_path):
+        with patch.object(exporter, "get_video_info", return_value=dict(self.SOURCE_INFO)), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="", stdout="")
+            exporter._export_clip_group(
+                video_path=tmp_path / "video.mp4",
+                clip_jobs=self._clip_jobs(tmp_path),
+                audio_codec="copy",
+            )
+
+        cmd = mock_run.call_args[0][0]
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert "asplit" not in filter_complex and "atrim" not in filter_complex
+
+        # Inputs 1 y 2: la ventana de cada clip, solo para copiar su audio
+        input_indices = [i for i, arg in enumerate(cmd) if arg == "-i"]
+        assert len(input_indices) == 3
+        assert cmd[input_indices[1] - 4:input_indices[1]] == ["-ss", "10.0", "-t", "10.0"]
+        assert cmd[input_indices[2] - 4:input_indices[2]] == ["-ss", "15.0", "-t", "15.0"]
+        assert cmd.count("copy") == 2
+        assert cmd[cmd.index("2:a") + 1:cmd.index("2:a") + 3] == ["-c:a", "copy"]
+
+    def test_returns_none_without_frame_rate(self, exporter, tmp_path):
+        with patch.object(exporter, "get_video_info", return_value={}), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            result = exporter._export_clip_group(
+                video_path=tmp_path / "video.mp4",
+                clip_jobs=self._clip_jobs(tmp_path),
+            )
+
+        assert result is None
+        mock_run.assert_not_called()
+
+    def test_returns_none_when_ffmpeg_fails(self, exporter, tmp_path):
+        with patch.object(exporter, "get_video_info", return_value=dict(self.SOURCE_INFO)), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stderr="boom", stdout="")
+            result = exporter._export_clip_group(
+                video_path=tmp_path / "video.mp4",
+                clip_jobs=self._clip_jobs(tmp_path),
+            )
+
+        assert result is None
+
+
+class TestExportClipsSingleDecode:
+    """Tests for export_clips(single_decode=True)."""
+
+    def _clips(self):
+        return [
+            {"clip_id": 1, "start_time": 0.0, "end_time": 5.0},
+            {"clip_id": 2, "start_time": 6.0, "end_time": 10.0},
+            {"clip_id": 3, "start_time": 500.0, "end_time": 505.0},
+        ]
+
+    def test_nearby_clips_go_through_group_export(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        exporter.output_dir = tmp_path
+
+        def fake_group(**kwargs):
+            return [job_dir / f"{clip['clip_id']}.mp4" for clip, job_dir in kwargs["clip_jobs"]]
+
+        def fake_single(**kwargs):
+            return kwargs["output_dir"] / f"{kwargs['clip']['clip_id']}.mp4"
+
+        with patch.object(exporter, "_export_clip_group", side_effect=fake_group) as group, \
+             patch.object(exporter, "_export_single_clip", side_effect=fake_single) as single:
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=self._clips(),
+                flat_output=True,
+                single_decode=True,
+            )
+
+        assert result == [str(tmp_path / f"{i}.mp4") for i in (1, 2, 3)]
+        assert group.call_count == 1
+        assert [clip["clip_id"] for clip, _ in group.call_args.kwargs["clip_jobs"]] == [1, 2]
+        assert single.call_count == 1
+
+    def test_failed_group_falls_back_to_per_clip(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        exporter.output_dir = tmp_path
+
+        def fake_single(**kwargs):
+            return kwargs["output_dir"] / f"{kwargs['clip']['clip_id']}.mp4"
+
+        with patch.object(exporter, "_export_clip_group", return_value=None), \
+             patch.object(exporter, "_export_single_clip", side_effect=fake_single) as single:
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=self._clips(),
+                flat_output=True,
+                single_decode=True,
+            )
+
+        assert result == [str(tmp_path / f"{i}.mp4") for i in (1, 2, 3)]
+        assert single.call_count == 3
+
+    def test_face_tracking_disables_grouping(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        exporter.output_dir = tmp_path
+
+        with patch.object(exporter, "_export_clip_group") as group, \
+             patch.object(exporter, "_export_single_clip", return_value=None):
+            exporter.export_clips(
+                video_path=str(video_path),
+                clips=self._clips(),
+                aspect_ratio="9:16",
+                enable_face_tracking=True,
+                flat_output=True,
+                single_decode=True,
+            )
+
+        group.assert_not_called()
+
+
+# ============================================================================
+# TESTS FOR mezzanine proxy
+# ============================================================================
+
+
+class TestExportClipsMezzanine:
+    """Tests for export_clips(mezzanine=...) and _prepare_mezzanine()."""
+
+    VIDEO_INFO = {
+        "height": 2160,
+        "r_frame_rate": "30/1",
+        "avg_frame_rate": "30/1",
+        "is_cfr": True,
+        "has_audio": True,
+    }
+
+    def _long_gop_index(self):
+        index = MagicMock()
+        index.duration = 100.0
+        index.keyframe_times = [float(t) for t in range(0, 100, 10)]
+        return index
+
+    def test_clips_read_from_mezzanine(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        mezzanine_path = tmp_path / "video_transcript_mezzanine.mp4"
+        exporter.output_dir = tmp_path
+
+        def fake_single(**kwargs):
+            return kwargs["output_dir"] / f"{kwargs['clip']['clip_id']}.mp4"
+
+        with patch.object(exporter, "_prepare_mezzanine", return_value=mezzanine_path), \
+             patch.object(exporter, "_export_single_clip", side_effect=fake_single) as single:
+            exporter.export_clips(
+                video_path=str(video_path),
+                clips=[{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}],
+                transcript_path=str(tmp_path / "video_transcript.json"),
+                flat_output=True,
+                mezzanine="on",
+            )
+
+        assert single.call_args.kwargs["video_path"] == mezzanine_path
+
+    def test_off_does_not_probe(self, exporter, tmp_path):
+        with patch.object(exporter, "get_video_info") as info:
+            result = exporter._prepare_mezzanine(
+                tmp_path / "video.mp4",
+                mode="off",
+                clip_count=20,
+                aspect_ratio=None,
+                transcript_path=str(tmp_path / "t.json"),
+            )
+
+        assert result is None
+        info.assert_not_called()
+
+    def test_auto_builds_for_long_gops_at_target_height(self, exporter, tmp_path):
+        transcript = tmp_path / "video_transcript.json"
+        with patch.object(exporter, "get_video_info", return_value=self.VIDEO_INFO), \
+             patch("src.video_exporter.load_or_build_keyframe_index", return_value=self._long_gop_index()), \
+             patch("src.video_exporter.ensure_mezzanine", side_effect=lambda src, dst, **kw: dst) as ensure:
+            result = exporter._prepare_mezzanine(
+                tmp_path / "video.mp4",
+                mode="auto",
+                clip_count=12,
+                aspect_ratio="16:9",
+                transcript_path=str(transcript),
+            )
+
+        assert result == tmp_path / "video_transcript_mezzanine.mp4"
+        assert ensure.call_args.kwargs["target_height"] == 1080
+        assert ensure.call_args.kwargs["frame_rate"] == "30/1"
+
+    def test_auto_skips_few_clips(self, exporter, tmp_path):
+        with patch.object(exporter, "get_video_info", return_value=self.VIDEO_INFO), \
+             patch("src.video_exporter.load_or_build_keyframe_index", return_value=self._long_gop_index()), \
+             patch("src.video_exporter.ensure_mezzanine") as ensure:
+            result = exporter._prepare_mezzanine(
+                tmp_path / "video.mp4",
+                mode="auto",
+                clip_count=2,
+                aspect_ratio=None,
+                transcript_path=str(tmp_path / "t.json"),
+            )
+
+        assert result is None
+        ensure.assert_not_called()
+
+    def test_vfr_source_uses_average_frame_rate(self, exporter, tmp_path):
+        info = dict(
+            self.VIDEO_INFO, height=720, r_frame_rate="60/1", avg_frame_rate="30000/1001", is_cfr=False
+        )
+        with patch.object(exporter, "get_video_info", return_value=info), \
+             patch("src.video_exporter.ensure_mezzanine", side_effect=lambda src, dst, **kw: dst) as ensure:
+            exporter._prepare_mezzanine(
+                tmp_path / "video.mp4",
+                mode="on",
+                clip_count=3,
+                aspect_ratio="9:16",
+                transcript_path=str(tmp_path / "t.json"),
+            )
+
+        assert ensure.call_args.kwargs["frame_rate"] == "30000/1001"
+        # Nunca escalo hacia arriba
+        assert ensure.call_args.kwargs["target_height"] == 720
+
+    @pytest.mark.parametrize("audio_codec, passthrough", [("aac", True), ("aac", False), ("opus", True)])
+    def test_aac_source_audio_is_copied_into_mezzanine(self, exporter, tmp_path, audio_codec, passthrough):
+        info = dict(self.VIDEO_INFO, audio_codec=audio_codec)
+        with patch.object(exporter, "get_video_info", return_value=info), \
+             patch("src.video_exporter.ensure_mezzanine", side_effect=lambda src, dst, **kw: dst) as ensure:
+            exporter._prepare_mezzanine(
+                tmp_path / "video.mp4",
+                mode="on",
+                clip_count=3,
+                aspect_ratio=None,
+                transcript_path=str(tmp_path / "t.json"),
+                audio_passthrough=passthrough,
+            )
+
+        assert ensure.call_args.kwargs["copy_audio"] is (audio_codec == "aac")
+        assert ensure.call_args.kwargs["require_audio_copy"] is passthrough
+
+    def test_export_clips_passes_passthrough_to_mezzanine(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.touch()
+        exporter.output_dir = tmp_path
+
+        def fake_single(**kwargs):
+            return kwargs["output_dir"] / f"{kwargs['clip']['clip_id']}.mp4"
+
+        with patch.object(exporter, "_prepare_mezzanine", return_value=None) as prepare, \
+             patch.object(exporter, "_export_single_clip", side_effect=fake_single):
+            exporter.export_clips(
+                video_path=str(video_path),
+                clips=[{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}],
+                transcript_path=str(tmp_path / "video_transcript.json"),
+                flat_output=True,
+                mezzanine="on",
+                audio_passthrough=True,
+            )
+
+        assert prepare.call_args.kwargs["audio_passthrough"] is True
+
+
+# ============================================================================
+# TESTS FOR render cache
+# ============================================================================
+
+
+class TestExportClipsRenderCache:
+    """Tests for export_clips(render_cache_dir=...)."""
+
+    def _clips(self):
+        return [
+            {"clip_id": 1, "start_time": 0.0, "end_time": 5.0},
+            {"clip_id": 2, "start_time": 10.0, "end_time": 15.0},
+        ]
+
+    def _export(self, exporter, tmp_path, clips, **kwargs):
+        def fake_single(**export_args):
+            path = export_args["output_dir"] / f"{export_args['clip']['clip_id']}.mp4"
+            path.write_bytes(f"render {export_args['clip']['clip_id']}".encode())
+            export_args["render_cache"].store(export_args["render_key"], path)
+            return path
+
+        with patch.object(exporter, "_export_single_clip", side_effect=fake_single) as single:
+            result = exporter.export_clips(
+                video_path=str(tmp_path / "video.mp4"),
+                clips=clips,
+                flat_output=True,
+                render_cache_dir=str(tmp_path / "cache"),
+                **kwargs,
+            )
+        return result, single
+
+    @pytest.fixture
+    def setup(self, exporter, tmp_path):
+        (tmp_path / "video.mp4").write_bytes(b"source" * 1000)
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        return exporter
+
+    def test_second_run_reuses_unchanged_clips(self, setup, tmp_path):
+        self._export(setup, tmp_path, self._clips())
+        (tmp_path / "out" / "1.mp4").unlink()
+
+        clips = self._clips() + [{"clip_id": 3, "start_time": 20.0, "end_time": 25.0}]
+        result, single = self._export(setup, tmp_path, clips)
+
+        assert [c.kwargs["clip"]["clip_id"] for c in single.call_args_list] == [3]
+        assert result == [str(tmp_path / "out" / f"{i}.mp4") for i in (1, 2, 3)]
+        assert (tmp_path / "out" / "1.mp4").read_bytes() == b"render 1"
+        stats = setup.last_render_cache_stats
+        assert (stats.hits, stats.misses) == (2, 1)
+
+    def test_changed_encoder_args_miss(self, setup, tmp_path):
+        self._export(setup, tmp_path, self._clips(), video_crf=23)
+        _, single = self._export(setup, tmp_path, self._clips(), video_crf=18)
+
+        assert single.call_count == 2
+        assert setup.last_render_cache_stats.hits == 0
+
+    def test_changed_srt_content_misses(self, setup, tmp_path):
+        transcript = tmp_path / "t.json"
+        transcript.write_text("{}")
+        srt_text = {"value": "1\n00:00:00,000 --> 00:00:01,000\nhola\n"}
+
+        def fake_srt(**kwargs):
+            Path(kwargs["output_path"]).write_text(srt_text["value"])
+            return kwargs["output_path"]
+
+        setup.subtitle_generator.generate_srt_for_clip.side_effect = fake_srt
+        kwargs = dict(add_subtitles=True, transcript_path=str(transcript))
+        self._export(setup, tmp_path, self._clips(), **kwargs)
+        _, single = self._export(setup, tmp_path, self._clips(), **kwargs)
+        assert single.call_count == 0
+
+        srt_text["value"] = "1\n00:00:00,000 --> 00:00:01,000\nchau\n"
+        _, single = self._export(setup, tmp_path, self._clips(), **kwargs)
+        assert single.call_count == 2
+
+    def test_render_key_covers_style_but_not_paths(self, exporter):
+        common = dict(
+            source_id="src",
+            start_time=1.0,
+            end_time=5.0,
+            aspect_ratio="9:16",
+            uses_face_tracking=False,
+            face_tracking_strategy="keep_in_frame",
+            face_tracking_sample_rate=3,
+            logo_digest=None,
+            logo_position="top-right",
+            logo_scale=0.1,
+            srt_digest="abc",
+            custom_style=None,
+            video_crf=23,
+            smart_cut=False,
+        )
+        default = exporter._clip_render_key(subtitle_style="default", **common)
+
+        assert exporter._clip_render_key(subtitle_style="default", **common) == default
+        assert exporter._clip_render_key(subtitle_style="bold", **common) != default
+        assert exporter._clip_render_key(
+            subtitle_style="default", **{**common, "uses_face_tracking": True}
+        ) != default
+
+
+class TestExportJournalResume:
+    """Tests for the export journal: atomic outputs and clip-level resume."""
+
+    CLIPS = [{"clip_id": i, "start_time": 10.0 * i, "end_time": 10.0 * i + 5.0} for i in (1, 2, 3)]
+
+    @pytest.fixture
+    def setup(self, exporter, tmp_path):
+        (tmp_path / "video.mp4").write_bytes(b"source" * 1000)
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        return exporter
+
+    def _export(self, exporter, tmp_path, *, fail_clip=None, duration=5.0, **kwargs):
+        def fake_run(cmd, **run_kwargs):
+            outputs = [Path(cmd[i + 1]) for i, arg in enumerate(cmd) if arg == "-y"]
+            killed = fail_clip is not None and outputs[-1].name.startswith(f"{fail_clip}_")
+            for output in outputs:
+                output.write_bytes(b"half-written" if killed else b"render")
+            return MagicMock(returncode=1 if killed else 0, stderr="killed" if killed else "")
+
+        probed = MagicMock(duration=duration)
+        with patch("src.video_exporter.run_ffmpeg", side_effect=fake_run) as mock_run, \
+             patch("src.utils.export_journal.probe_media", return_value=probed):
+            result = exporter.export_clips(
+                video_path=str(tmp_path / "video.mp4"),
+                clips=self.CLIPS,
+                video_name="talk",
+                aspect_ratio="9:16",
+                flat_output=True,
+                **kwargs,
+            )
+        return result, [Path(c[0][0][-1]).name for c in mock_run.call_args_list]
+
+    def test_resume_skips_journaled_clips(self, setup, tmp_path):
+        out = tmp_path / "out"
+        result, _ = self._export(setup, tmp_path, fail_clip=3)
+
+        # El clip cortado no deja un 3.mp4 a medias
+        assert result == [str(out / "1.mp4"), str(out / "2.mp4")]
+        assert not (out / "3.mp4").exists() and not (out / "3_partial_temp.mp4").exists()
+        assert (out / ".talk.export_journal.json").exists()
+
+        result, rendered = self._export(setup, tmp_path)
+
+        assert rendered == ["3_partial_temp.mp4"]
+        assert result == [str(out / f"{i}.mp4") for i in (1, 2, 3)]
+        assert setup.last_resumed_clips == 2
+
+    def test_changed_parameters_rerender(self, setup, tmp_path):
+        self._export(setup, tmp_path, video_crf=23)
+        _, rendered = self._export(setup, tmp_path, video_crf=18)
+
+        assert len(rendered) == 3
+        assert setup.last_resumed_clips == 0
+
+    def test_replaced_file_is_rerendered(self, setup, tmp_path):
+        self._export(setup, tmp_path)
+        (tmp_path / "out" / "2.mp4").write_bytes(b"something else")
+
+        _, rendered = self._export(setup, tmp_path)
+
+        assert rendered == ["2_partial_temp.mp4"]
+
+    def test_multi_aspect_variants_resume(self, setup, tmp_path):
+        self._export(setup, tmp_path, aspect_ratios=["9:16", "1:1"])
+        result, rendered = self._export(setup, tmp_path, aspect_ratios=["9:16", "1:1"])
+
+        assert rendered == []
+        assert len(result) == 6
+        assert setup.last_resumed_clips == 6
+
+    def test_wrong_duration_is_not_journaled(self, setup, tmp_path):
+        self._export(setup, tmp_path, duration=1.0)
+        _, rendered = self._export(setup, tmp_path)
+
+        assert len(rendered) == 3
+
+    @pytest.mark.parametrize("aspect_ratios", [None, ["9:16", "1:1"]])
+    def test_each_srt_is_generated_once(self, setup, tmp_path, aspect_ratios):
+        transcript = tmp_path / "t.json"
+        transcript.write_text("{}")
+
+        def fake_srt(**kwargs):
+            Path(kwargs["output_path"]).write_text(f"1\n{kwargs['clip_start']}\n")
+            return kwargs["output_path"]
+
+        setup.subtitle_generator.generate_srt_for_clip.side_effect = fake_srt
+        self._export(
+            setup, tmp_path, add_subtitles=True, transcript_path=str(transcript), aspect_ratios=aspect_ratios
+        )
+
+        # La clave de render y el export comparten el SRT (también entre variantes)
+        generated = [c.kwargs["clip_start"] for c in setup.subtitle_generator.generate_srt_for_clip.call_args_list]
+        assert generated == [10.0, 20.0, 30.0]
+        srts = sorted(p.relative_to(tmp_path / "out").as_posix() for p in (tmp_path / "out").rglob("*.srt"))
+        if aspect_ratios:
+            assert srts == [f"{d}/{i}.srt" for d in ("1x1", "9x16") for i in (1, 2, 3)]
+
+
+class TestRenderCacheLayers:
+    """Tests for the layered render cache (render_cache_layers=True)."""
+
+    LAYER_ARGS = dict(
+        source_id="src",
+        start_time=1.0,
+        end_time=5.0,
+        aspect_ratio="9:16",
+        uses_face_tracking=False,
+        face_tracking_strategy="keep_in_frame",
+        face_tracking_sample_rate=3,
+        logo_position="top-right",
+        logo_scale=0.1,
+    )
+
+    def test_layer_keys_follow_only_their_inputs(self, exporter):
+        keys = exporter._clip_layer_keys(logo_digest="logo1", **self.LAYER_ARGS)
+        no_logo = exporter._clip_layer_keys(logo_digest=None, **self.LAYER_ARGS)
+        other_logo = exporter._clip_layer_keys(logo_digest="logo2", **self.LAYER_ARGS)
+        other_aspect = exporter._clip_layer_keys(
+            logo_digest="logo1", **{**self.LAYER_ARGS, "aspect_ratio": "1:1"}
+        )
+
+        assert no_logo.base == keys.base and no_logo.branded is None
+        assert other_logo.base == keys.base and other_logo.branded != keys.branded
+        assert other_aspect.base != keys.base and other_aspect.branded != keys.branded
+
+    def test_layer_keys_depend_on_the_layer_audio_codec(self, exporter):
+        encoded = exporter._clip_layer_keys(logo_digest="logo1", audio_codec="aac", **self.LAYER_ARGS)
+        copied = exporter._clip_layer_keys(logo_digest="logo1", audio_codec="copy", **self.LAYER_ARGS)
+
+        # El clip final copia el audio de la capa: una capa con AAC re-encodeado no sirve para passthrough
+        assert copied.base != encoded.base
+        assert copied.branded != encoded.branded
+
+    def test_layered_graph_taps_base_and_branded(self, exporter):
+        graph, final, taps = exporter._build_layered_clip_graph(
+            video_input_idx=0,
+            logo_input_idx=1,
+            aspect_ratio=None,
+            subtitle_filter="subtitles='c.srt'",
+            logo_position="top-right",
+            logo_scale=0.1,
+        )
+
+        assert taps == {"base": "[base_layer]", "branded": "[branded_layer]"}
+        assert final == "[v_sub]"
+        assert graph.startswith("[0:v]split=2[base_layer][base_next]")
+        assert "split=2[branded_layer][branded_next];[branded_next]subtitles='c.srt'[v_sub]" in graph
+
+    def test_layered_graph_without_overlays_has_no_taps(self, exporter):
+        _, final, taps = exporter._build_layered_clip_graph(
+            video_input_idx=0,
+            logo_input_idx=-1,
+            aspect_ratio="9:16",
+            subtitle_filter=None,
+            logo_position="top-right",
+            logo_scale=0.1,
+        )
+        assert taps == {}
+        assert final == "[base]"
+
+    def test_rebuild_from_branded_layer_burns_only_subtitles(self, exporter, tmp_path):
+        cache = RenderCache(str(tmp_path / "cache"))
+        keys = ClipLayerKeys(base="b" * 64, branded="c" * 64)
+        (tmp_path / "cache" / f"{keys.branded}.mp4").write_bytes(b"branded")
+
+        with patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter._export_clip_from_cached_layer(
+                clip_id=1,
+                layer_keys=keys,
+                render_cache=cache,
+                output_path=tmp_path / "1.mp4",
+                subtitle_filter="subtitles='1.srt'",
+                logo_path=str(tmp_path / "logo.png"),
+                logo_position="top-right",
+                logo_scale=0.1,
+                video_crf=23,
+                ffmpeg_threads=0,
+            )
+
+        cmd = mock_run.call_args[0][0]
+        assert result == tmp_path / "1.mp4"
+        assert cmd[cmd.index("-i") + 1] == str(tmp_path / "cache" / f"{keys.branded}.mp4")
+        assert cmd.count("-i") == 1
+        assert cmd[cmd.index("-vf") + 1] == "subtitles='1.srt'"
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert cache.stats.layer_hits == 1
+
+    def test_rebuild_without_cached_layer_falls_back(self, exporter, tmp_path):
+        cache = RenderCache(str(tmp_path / "cache"))
+        with patch("src.video_exporter.run_ffmpeg") as mock_run:
+            result = exporter._export_clip_from_cached_layer(
+                clip_id=1,
+                layer_keys=ClipLayerKeys(base="b" * 64, branded=None),
+                render_cache=cache,
+                output_path=tmp_path / "1.mp4",
+                subtitle_filter="subtitles='1.srt'",
+                logo_path=None,
+                logo_position="top-right",
+                logo_scale=0.1,
+                video_crf=23,
+                ffmpeg_threads=0,
+            )
+        assert result is None
+        mock_run.assert_not_called()
+
+
+class TestExportClipsMultiAspect:
+    """Tests for export_clips(aspect_ratios=[...]) fan-out."""
+
+    @pytest.fixture
+    def setup(self, exporter, tmp_path):
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"source" * 1000)
+        exporter.output_dir = tmp_path / "out"
+        exporter.output_dir.mkdir()
+        return exporter, video_path
+
+    def test_one_ffmpeg_per_clip_with_a_branch_per_ratio(self, setup, tmp_path):
+        exporter, video_path = setup
+        with patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=[{"clip_id": 1, "start_time": 2.0, "end_time": 7.0}],
+                aspect_ratios=["9:16", "1:1", "16:9", "9:16", "4:3"],
+                flat_output=True,
+            )
+
+        out = tmp_path / "out"
+        assert result == [str(out / "9x16" / "1.mp4"), str(out / "1x1" / "1.mp4"), str(out / "16x9" / "1.mp4")]
+        assert mock_run.call_count == 1
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 1
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        assert filter_complex.startswith("[0:v]split=3[vsrc_9x16][vsrc_1x1][vsrc_16x9]")
+        assert "[vsrc_1x1]crop=ih:ih,scale=1080:1080[vbase_1x1]" in filter_complex
+        assert cmd.count("-map") == 6
+        assert cmd[cmd.index("-t") + 1] == "5.0"
+
+    def test_logo_is_prescaled_per_variant(self, setup, tmp_path):
+        exporter, video_path = setup
+        logo = tmp_path / "logo.png"
+        logo.write_bytes(b"png")
+        with patch("src.video_exporter.run_ffmpeg") as mock_run:
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            exporter._export_clip_variants(
+                video_path=video_path,
+                clip={"clip_id": 1, "start_time": 0.0, "end_time": 5.0},
+                variants=[("9:16", tmp_path), ("16:9", tmp_path / "wide")],
+                face_tracked=[],
+                add_logo=True,
+                logo_path=str(logo),
+                logo_scale=0.1,
+            )
+
+        filter_complex = mock_run.call_args[0][0][mock_run.call_args[0][0].index("-filter_complex") + 1]
+        assert "scale2ref" not in filter_complex
+        # Un split del logo y un scale fijo por ancho de salida
+        assert "[1:v]split=2[logo_src0][logo_src1]" in filter_complex
+        assert "[logo_src0]scale=108:-1[logo0]" in filter_complex
+        assert "[logo_src1]scale=192:-1[logo1]" in filter_complex
+        assert "[vbase_9x16][logo0]overlay=W-w-20:20[vlogo_9x16]" in filter_complex
+
+    def test_face_trajectory_shared_by_vertical_and_square(self, setup, tmp_path):
+        exporter, video_path = setup
+
+        def fake_reframe(**kwargs):
+            for path in kwargs["outputs"]:
+                Path(path).write_bytes(b"reframed")
+
+        with patch("src.video_exporter.FaceReframer") as reframer_cls, \
+             patch("src.video_exporter.load_or_build_keyframe_index", return_value=None), \
+             patch("src.video_exporter.run_ffmpeg") as mock_run:
+            reframer_cls.return_value.reframe_video_variants.side_effect = fake_reframe
+            mock_run.return_value = MagicMock(returncode=0, stderr="")
+            writes_outputs(mock_run)
+            exporter.export_clips(
+                video_path=str(video_path),
+                clips=[{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}],
+                aspect_ratios=["9:16", "1:1", "16:9"],
+                enable_face_tracking=True,
+                face_tracking_mode="frames",
+                flat_output=True,
+            )
+
+        reframe = reframer_cls.return_value.reframe_video_variants
+        reframe.assert_called_once()
+        assert sorted(reframe.call_args.kwargs["outputs"].values()) == [(1080, 1080), (1080, 1920)]
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count("-i") == 3
+        filter_complex = cmd[cmd.index("-filter_complex") + 1]
+        # Las entradas reencuadradas se mapean directo, sin pasar por el filtergraph
+        assert filter_complex == "[0:v]scale=1920:1080[vbase_16x9]"
+        maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+        assert "1:v" in maps and "2:v" in maps and "[vbase_16x9]" in maps
+        # Los temporales del reencuadre se borran
+        assert not list((tmp_path / "out").rglob("*_reframed_temp.mp4"))
+
+    def test_failed_fanout_falls_back_per_variant(self, setup, tmp_path):
+        exporter, video_path = setup
+        with patch("src.video_exporter.run_ffmpeg") as mock_run, \
+             patch.object(exporter, "_export_single_clip") as single:
+            mock_run.return_value = MagicMock(returncode=1, stderr="boom")
+            single.side_effect = lambda **kw: kw["output_dir"] / "1.mp4"
+            result = exporter.export_clips(
+                video_path=str(video_path),
+                clips=[{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}],
+                aspect_ratios=["9:16", "1:1"],
+                flat_output=True,
+            )
+
+        assert [c.kwargs["aspect_ratio"] for c in single.call_args_list] == ["9:16", "1:1"]
+        assert result == [str(tmp_path / "out" / "9x16" / "1.mp4"), str(tmp_path / "out" / "1x1" / "1.mp4")]
+
+    def test_render_cache_skips_cached_variants(self, setup, tmp_path):
+        exporter, video_path = setup
+        clips = [{"clip_id": 1, "start_time": 0.0, "end_time": 5.0}]
+
+        def fake_run(cmd, **kwargs):
+            for i, arg in enumerate(cmd):
+                if arg == "-y":
+                    Path(cmd[i + 1]).write_bytes(b"render")
+            return MagicMock(returncode=0, stderr="")
+
+        with patch("src.video_exporter.run_ffmpeg", side_effect=fake_run):
+            exporter.export_clips(
+                video_path=str(video_path), clips=clips, aspect_ratios=["9:16", "1:1"],
+                flat_output=True, render_cache_dir=str(tmp_path / "cache"),
+            )
+        with patch("src.video_exporter.run_ffmpeg", side_effect=fake_run) as mock_run:
+            exporter.export_clips(
+                video_path=str(video_path), clips=clips, aspect_ratios=["9:16", "1:1", "16:9"],
+                flat_output=True, render_cache_dir=str(tmp_path / "cache"),
+            )
+
+        # Solo la variante nueva pasa por ffmpeg
+        cmd = mock_run.call_args[0][0]
+        assert mock_run.call_count == 1
+        assert cmd.count("-map") == 2
+        assert cmd[-1].endswith("16x9/1_partial_temp.mp4")
+        stats = exporter.last_render_cache_stats
+        assert (stats.hits, stats.misses) == (2, 1)
+
 
 # ============================================================================
 # MAIN ENTRY POINT FOR RUNNING TESTS DIRECTLY